@@ -241,6 +241,19 @@ class BaseAgent(BaseModel):
         return result
     return None
 
+  def get_required_history(self) -> Optional[int]:
+    """Returns the number of most recent session events this agent reads.
+
+    The runner only loads the history required by the agents in the tree, so
+    agents that read a bounded tail of the session, or nothing at all, should
+    override this. Sub-agents declare their own requirements.
+
+    Returns:
+      The number of most recent events, or None if the agent may read the whole
+      session history.
+    """
+    return None
+
   def _create_invocation_context(
       self, parent_context: InvocationContext
   ) -> InvocationContext:
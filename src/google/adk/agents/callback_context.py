@@ -14,16 +14,20 @@
 
 from __future__ import annotations
 
+from typing import AsyncGenerator
+from typing import AsyncIterable
 from typing import Optional
 from typing import TYPE_CHECKING
 
 from typing_extensions import override
 
+from ..artifacts.base_artifact_service import DEFAULT_CHUNK_SIZE
 from .readonly_context import ReadonlyContext
 
 if TYPE_CHECKING:
   from google.genai import types
 
+  from ..artifacts.base_artifact_service import ArtifactMetadata
   from ..events.event_actions import EventActions
   from ..sessions.state import State
   from .invocation_context import InvocationContext
@@ -76,12 +80,15 @@ class CallbackContext(ReadonlyContext):
     """
     if self._invocation_context.artifact_service is None:
       raise ValueError("Artifact service is not initialized.")
-    return await self._invocation_context.artifact_service.load_artifact(
-        app_name=self._invocation_context.app_name,
-        user_id=self._invocation_context.user_id,
-        session_id=self._invocation_context.session.id,
-        filename=filename,
-        version=version,
+    return await self._invocation_context.lookup_cache.get_or_load(
+        ("artifact", filename, version),
+        lambda: self._invocation_context.artifact_service.load_artifact(
+            app_name=self._invocation_context.app_name,
+            user_id=self._invocation_context.user_id,
+            session_id=self._invocation_context.session.id,
+            filename=filename,
+            version=version,
+        ),
     )
 
   async def save_artifact(self, filename: str, artifact: types.Part) -> int:
@@ -104,4 +111,98 @@ class CallbackContext(ReadonlyContext):
         artifact=artifact,
     )
     self._event_actions.artifact_delta[filename] = version
+    self._invocation_context.lookup_cache.invalidate_artifacts([filename])
+    return version
+
+  async def get_artifact_metadata(
+      self, filename: str, version: Optional[int] = None
+  ) -> Optional[ArtifactMetadata]:
+    """Gets the metadata of an artifact, without loading its contents.
+
+    Args:
+      filename: The filename of the artifact.
+      version: The version of the artifact. If None, the latest version will be
+        used.
+
+    Returns:
+      The metadata of the artifact, e.g. its size, or None if not found.
+    """
+    if self._invocation_context.artifact_service is None:
+      raise ValueError("Artifact service is not initialized.")
+    return (
+        await self._invocation_context.artifact_service.get_artifact_metadata(
+            app_name=self._invocation_context.app_name,
+            user_id=self._invocation_context.user_id,
+            session_id=self._invocation_context.session.id,
+            filename=filename,
+            version=version,
+        )
+    )
+
+  async def read_artifact_chunks(
+      self,
+      filename: str,
+      *,
+      version: Optional[int] = None,
+      offset: int = 0,
+      length: Optional[int] = None,
+      chunk_size: int = DEFAULT_CHUNK_SIZE,
+  ) -> AsyncGenerator[bytes, None]:
+    """Reads an artifact, or a range of it, in chunks.
+
+    Args:
+      filename: The filename of the artifact.
+      version: The version of the artifact. If None, the latest version will be
+        read.
+      offset: The offset of the first byte to read.
+      length: The maximum number of bytes to read. If None, the artifact is
+        read until its end.
+      chunk_size: The maximum size of the chunks.
+
+    Yields:
+      The chunks of the contents of the artifact.
+    """
+    if self._invocation_context.artifact_service is None:
+      raise ValueError("Artifact service is not initialized.")
+    async for (
+        chunk
+    ) in self._invocation_context.artifact_service.read_artifact_chunks(
+        app_name=self._invocation_context.app_name,
+        user_id=self._invocation_context.user_id,
+        session_id=self._invocation_context.session.id,
+        filename=filename,
+        version=version,
+        offset=offset,
+        length=length,
+        chunk_size=chunk_size,
+    ):
+      yield chunk
+
+  async def save_artifact_chunks(
+      self, filename: str, chunks: AsyncIterable[bytes], mime_type: str
+  ) -> int:
+    """Saves an artifact from chunks and records it as delta for the session.
+
+    Args:
+      filename: The filename of the artifact.
+      chunks: The chunks of the contents of the artifact.
+      mime_type: The MIME type of the artifact.
+
+    Returns:
+     The version of the artifact.
+    """
+    if self._invocation_context.artifact_service is None:
+      raise ValueError("Artifact service is not initialized.")
+    version = (
+        await self._invocation_context.artifact_service.save_artifact_chunks(
+            app_name=self._invocation_context.app_name,
+            user_id=self._invocation_context.user_id,
+            session_id=self._invocation_context.session.id,
+            filename=filename,
+            chunks=chunks,
+            mime_type=mime_type,
+        )
+    )
+    self._event_actions.artifact_delta[filename] = version
+    self._invocation_context.lookup_cache.invalidate_artifacts([filename])
     return version
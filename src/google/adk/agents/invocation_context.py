@@ -14,12 +14,19 @@
 
 from __future__ import annotations
 
+import copy
+from typing import Any
+from typing import Awaitable
+from typing import Callable
+from typing import Iterable
 from typing import Optional
+from typing import TypeVar
 import uuid
 
 from google.genai import types
 from pydantic import BaseModel
 from pydantic import ConfigDict
+from pydantic import PrivateAttr
 
 from ..artifacts.base_artifact_service import BaseArtifactService
 from ..memory.base_memory_service import BaseMemoryService
@@ -66,6 +73,51 @@ class _InvocationCostManager(BaseModel):
       )
 
 
+_T = TypeVar("_T")
+
+
+class InvocationLookupCache:
+  """Memoizes the memory and artifact lookups of an invocation.
+
+  The memories of the user and the artifacts of the session rarely change
+  within an invocation, while tools and callbacks may look them up at every
+  step. The cached artifacts are invalidated by the artifact deltas of the
+  events of the invocation.
+  """
+
+  def __init__(self):
+    self._results: dict[tuple[Any, ...], Any] = {}
+
+  async def get_or_load(
+      self, key: tuple[Any, ...], load: Callable[[], Awaitable[_T]]
+  ) -> _T:
+    """Returns the cached result of a lookup, loading it on a miss.
+
+    Args:
+      key: The key of the lookup, whose first item is its kind, e.g.
+        `("artifact", filename, version)`.
+      load: Loads the result on a miss.
+
+    Returns:
+      A copy of the result of the lookup, as callers may modify it, e.g. the
+      parts of a loaded artifact.
+    """
+    if key not in self._results:
+      self._results[key] = await load()
+    return copy.deepcopy(self._results[key])
+
+  def invalidate_artifacts(self, filenames: Iterable[str]) -> None:
+    """Drops the cached lookups of changed artifacts."""
+    filenames = set(filenames)
+    if not filenames:
+      return
+    for key in list(self._results):
+      if key[0] == "artifact_keys" or (
+          key[0] == "artifact" and key[1] in filenames
+      ):
+        del self._results[key]
+
+
 class InvocationContext(BaseModel):
   """An invocation context represents the data of a single invocation of an agent.
 
@@ -156,6 +208,12 @@ class InvocationContext(BaseModel):
   of this invocation.
   """
 
+  _lookup_cache: InvocationLookupCache = PrivateAttr(
+      default_factory=InvocationLookupCache
+  )
+  """The memoized lookups of this invocation, shared by the copies of this
+  context made for sub-agents."""
+
   def increment_llm_call_count(
       self,
   ):
@@ -169,6 +227,11 @@ class InvocationContext(BaseModel):
         self.run_config
     )
 
+  @property
+  def lookup_cache(self) -> InvocationLookupCache:
+    """The memoized memory and artifact lookups of this invocation."""
+    return self._lookup_cache
+
   @property
   def app_name(self) -> str:
     return self.session.app_name
@@ -166,6 +166,12 @@ class LlmAgent(BaseAgent):
   When set to 'none', the model request will not include any contents, such as
   user messages, tool results, etc.
   """
+  max_history_events: Optional[int] = Field(default=None, ge=1)
+  """The number of most recent session events the contents are built from.
+
+  When set, older events are neither included in the model request nor loaded
+  from the session service by the runner. By default the whole history is used.
+  """
 
   # Controlled input/output configurations - Start
   input_schema: Optional[type[BaseModel]] = None
@@ -284,6 +290,12 @@ class LlmAgent(BaseAgent):
     if ctx.end_invocation:
       return
 
+  @override
+  def get_required_history(self) -> Optional[int]:
+    if self.include_contents == 'none':
+      return 0
+    return self.max_history_events
+
   @property
   def canonical_model(self) -> BaseLlm:
     """The resolved self.model field as BaseLlm.
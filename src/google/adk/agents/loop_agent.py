@@ -40,6 +40,11 @@ class LoopAgent(BaseAgent):
   escalates.
   """
 
+  @override
+  def get_required_history(self) -> Optional[int]:
+    # Shell agents don't read the session history themselves.
+    return 0
+
   @override
   async def _run_async_impl(
       self, ctx: InvocationContext
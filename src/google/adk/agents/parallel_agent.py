@@ -18,6 +18,7 @@ from __future__ import annotations
 
 import asyncio
 from typing import AsyncGenerator
+from typing import Optional
 
 from typing_extensions import override
 
@@ -92,6 +93,11 @@ class ParallelAgent(BaseAgent):
   - Generating multiple responses for review by a subsequent evaluation agent.
   """
 
+  @override
+  def get_required_history(self) -> Optional[int]:
+    # Shell agents don't read the session history themselves.
+    return 0
+
   @override
   async def _run_async_impl(
       self, ctx: InvocationContext
@@ -12,6 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from __future__ import annotations
+
 from enum import Enum
 import logging
 import sys
@@ -48,6 +50,24 @@ class RunConfig(BaseModel):
   save_input_blobs_as_artifacts: bool = False
   """Whether or not to save the input blobs as artifacts."""
 
+  max_inline_blob_bytes: Optional[int] = None
+  """If set, inline blobs larger than this are moved out of session events.
+
+  When an event is appended to the session, each of its inline blobs larger
+  than this, e.g. an image or a PDF, is saved as an artifact and replaced by a
+  reference to it. References are resolved back into inline blobs only when
+  the contents are sent to a model. Requires an artifact service.
+  """
+
+  max_function_response_chars: Optional[int] = None
+  """If set, function responses larger than this are offloaded to artifacts.
+
+  The size is measured in characters of the JSON serialization of a response.
+  The model gets a truncated preview with a handle, which it can page through
+  with the `read_tool_response` tool, given to the model along with the tools
+  of the agent. Requires an artifact service.
+  """
+
   support_cfc: bool = False
   """
   Whether to support CFC (Compositional Function Calling). Only applicable for
@@ -17,6 +17,7 @@
 from __future__ import annotations
 
 from typing import AsyncGenerator
+from typing import Optional
 
 from typing_extensions import override
 
@@ -29,6 +30,11 @@ from .llm_agent import LlmAgent
 class SequentialAgent(BaseAgent):
   """A shell agent that runs its sub-agents in sequence."""
 
+  @override
+  def get_required_history(self) -> Optional[int]:
+    # Shell agents don't read the session history themselves.
+    return 0
+
   @override
   async def _run_async_impl(
       self, ctx: InvocationContext
@@ -12,12 +12,20 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from .base_artifact_service import ArtifactMetadata
 from .base_artifact_service import BaseArtifactService
+from .cached_artifact_service import ArtifactCacheStats
+from .cached_artifact_service import CachedArtifactService
+from .file_artifact_service import FileArtifactService
 from .gcs_artifact_service import GcsArtifactService
 from .in_memory_artifact_service import InMemoryArtifactService
 
 __all__ = [
+    'ArtifactCacheStats',
+    'ArtifactMetadata',
     'BaseArtifactService',
+    'CachedArtifactService',
+    'FileArtifactService',
     'GcsArtifactService',
     'InMemoryArtifactService',
 ]
@@ -0,0 +1,75 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+from typing import Iterator
+from typing import Optional
+from typing import Union
+
+from google.genai import types
+
+
+def part_data(part: types.Part) -> tuple[bytes, Optional[str]]:
+  """Returns the contents and the MIME type of an artifact."""
+  if part.inline_data is not None:
+    return part.inline_data.data or b"", part.inline_data.mime_type
+  if part.text is not None:
+    return part.text.encode("utf-8"), "text/plain"
+  raise ValueError("Only artifacts with inline data or text have contents.")
+
+
+def part_size(part: types.Part) -> int:
+  """Returns the approximate size of an artifact in memory, in bytes."""
+  if part.inline_data is not None:
+    return len(part.inline_data.data or b"")
+  if part.text is not None:
+    return len(part.text)
+  return len(part.model_dump_json(exclude_none=True))
+
+
+def byte_range(
+    size: int, offset: int, length: Optional[int]
+) -> tuple[int, int]:
+  """Returns the start and the end of a range of an artifact of a size.
+
+  Args:
+    size: The size of the artifact.
+    offset: The offset of the range.
+    length: The length of the range, or None to read until the end.
+
+  Returns:
+    The start and end offsets of the range, clipped to the artifact.
+
+  Raises:
+    ValueError: If the offset or the length are negative.
+  """
+  if offset < 0 or (length is not None and length < 0):
+    raise ValueError("The offset and length of a range can't be negative.")
+  start = min(offset, size)
+  end = size if length is None else min(offset + length, size)
+  return start, end
+
+
+def iter_chunks(
+    data: Union[bytes, memoryview],
+    offset: int,
+    length: Optional[int],
+    chunk_size: int,
+) -> Iterator[bytes]:
+  """Iterates over a range of some contents, a chunk at a time."""
+  start, end = byte_range(len(data), offset, length)
+  view = memoryview(data)
+  for chunk_start in range(start, end, chunk_size):
+    yield bytes(view[chunk_start : min(chunk_start + chunk_size, end)])
@@ -13,11 +13,34 @@
 # limitations under the License.
 
 
+from __future__ import annotations
+
 from abc import ABC
 from abc import abstractmethod
+from typing import AsyncGenerator
+from typing import AsyncIterable
 from typing import Optional
 
 from google.genai import types
+from pydantic import BaseModel
+
+from . import _utils
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+"""The default size of the chunks of streamed artifacts, in bytes."""
+
+
+class ArtifactMetadata(BaseModel):
+  """The metadata of a version of an artifact."""
+
+  version: int
+  """The version of the artifact."""
+
+  size: int
+  """The size of the contents of the artifact, in bytes."""
+
+  mime_type: Optional[str] = None
+  """The MIME type of the contents of the artifact."""
 
 
 class BaseArtifactService(ABC):
@@ -121,3 +144,136 @@ class BaseArtifactService(ABC):
     Returns:
         A list of all available versions of the artifact.
     """
+
+  async def get_artifact_metadata(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      filename: str,
+      version: Optional[int] = None,
+  ) -> Optional[ArtifactMetadata]:
+    """Gets the metadata of an artifact, without its contents.
+
+    The default implementation loads the artifact. Services storing the
+    metadata separately should override it.
+
+    Args:
+        app_name: The name of the application.
+        user_id: The ID of the user.
+        session_id: The ID of the session.
+        filename: The name of the artifact file.
+        version: The version of the artifact. If None, the latest version will
+          be used.
+
+    Returns:
+        The metadata of the artifact or None if not found.
+    """
+    if version is None:
+      versions = await self.list_versions(
+          app_name=app_name,
+          user_id=user_id,
+          session_id=session_id,
+          filename=filename,
+      )
+      if not versions:
+        return None
+      version = max(versions)
+    artifact = await self.load_artifact(
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+        filename=filename,
+        version=version,
+    )
+    if artifact is None:
+      return None
+    data, mime_type = _utils.part_data(artifact)
+    return ArtifactMetadata(
+        version=version, size=len(data), mime_type=mime_type
+    )
+
+  async def read_artifact_chunks(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      filename: str,
+      version: Optional[int] = None,
+      offset: int = 0,
+      length: Optional[int] = None,
+      chunk_size: int = DEFAULT_CHUNK_SIZE,
+  ) -> AsyncGenerator[bytes, None]:
+    """Reads the contents of an artifact, or a range of them, in chunks.
+
+    The default implementation loads the whole artifact. Services able to read
+    a part of an artifact should override it.
+
+    Args:
+        app_name: The name of the application.
+        user_id: The ID of the user.
+        session_id: The ID of the session.
+        filename: The name of the artifact file.
+        version: The version of the artifact. If None, the latest version will
+          be read.
+        offset: The offset of the first byte to read.
+        length: The maximum number of bytes to read. If None, the artifact is
+          read until its end.
+        chunk_size: The maximum size of the chunks.
+
+    Yields:
+        The chunks of the contents.
+
+    Raises:
+        ValueError: If the artifact doesn't exist.
+    """
+    artifact = await self.load_artifact(
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+        filename=filename,
+        version=version,
+    )
+    if artifact is None:
+      raise ValueError(f"Artifact {filename} not found.")
+    data, _ = _utils.part_data(artifact)
+    for chunk in _utils.iter_chunks(data, offset, length, chunk_size):
+      yield chunk
+
+  async def save_artifact_chunks(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      filename: str,
+      chunks: AsyncIterable[bytes],
+      mime_type: str,
+  ) -> int:
+    """Saves an artifact from the chunks of its contents.
+
+    The default implementation joins the chunks and saves them with
+    `save_artifact`. Services able to upload an artifact in parts should
+    override it.
+
+    Args:
+        app_name: The name of the application.
+        user_id: The ID of the user.
+        session_id: The ID of the session.
+        filename: The name of the artifact file.
+        chunks: The chunks of the contents of the artifact.
+        mime_type: The MIME type of the artifact.
+
+    Returns:
+        The revision ID, as returned by `save_artifact`.
+    """
+    data = b"".join([chunk async for chunk in chunks])
+    return await self.save_artifact(
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+        filename=filename,
+        artifact=types.Part.from_bytes(data=data, mime_type=mime_type),
+    )
@@ -0,0 +1,151 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Moves large inline blobs of contents to artifacts, and back.
+
+A blob moved to an artifact is replaced by a `file_data` part whose URI is
+`artifact:<quoted filename>?version=<version>`, which keeps the MIME type and
+display name of the blob.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Iterable
+from typing import Optional
+import urllib.parse
+
+from google.genai import types
+
+from .base_artifact_service import BaseArtifactService
+
+logger = logging.getLogger('google_adk.' + __name__)
+
+ARTIFACT_URI_SCHEME = 'artifact'
+
+
+def to_artifact_uri(filename: str, version: int) -> str:
+  """Returns the URI referencing a version of an artifact."""
+  return (
+      f'{ARTIFACT_URI_SCHEME}:{urllib.parse.quote(filename, safe="")}'
+      f'?version={version}'
+  )
+
+
+def parse_artifact_uri(uri: Optional[str]) -> Optional[tuple[str, int]]:
+  """Returns the filename and version of an artifact URI, or None."""
+  if not uri or not uri.startswith(ARTIFACT_URI_SCHEME + ':'):
+    return None
+  parsed = urllib.parse.urlsplit(uri)
+  versions = urllib.parse.parse_qs(parsed.query).get('version')
+  if not versions or not versions[0].isdigit():
+    return None
+  return urllib.parse.unquote(parsed.path), int(versions[0])
+
+
+async def externalize_blobs(
+    content: Optional[types.Content],
+    *,
+    artifact_service: BaseArtifactService,
+    app_name: str,
+    user_id: str,
+    session_id: str,
+    filename_prefix: str,
+    max_inline_bytes: int,
+) -> int:
+  """Moves the inline blobs of a content larger than a size to artifacts.
+
+  The parts of the content are replaced in place.
+
+  Args:
+    content: The content to update.
+    artifact_service: The artifact service storing the blobs.
+    app_name: The name of the app.
+    user_id: The id of the user.
+    session_id: The id of the session.
+    filename_prefix: The prefix of the artifact filenames, followed by the
+      index of the part.
+    max_inline_bytes: The size above which blobs are moved.
+
+  Returns:
+    The number of moved blobs.
+  """
+  if not content or not content.parts:
+    return 0
+  moved = 0
+  for i, part in enumerate(content.parts):
+    blob = part.inline_data
+    if blob is None or blob.data is None or len(blob.data) <= max_inline_bytes:
+      continue
+    filename = f'{filename_prefix}_{i}'
+    version = await artifact_service.save_artifact(
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+        filename=filename,
+        artifact=types.Part(inline_data=blob),
+    )
+    content.parts[i] = types.Part(
+        file_data=types.FileData(
+            file_uri=to_artifact_uri(filename, version),
+            mime_type=blob.mime_type,
+            display_name=blob.display_name,
+        )
+    )
+    moved += 1
+  return moved
+
+
+async def resolve_blob_references(
+    contents: Iterable[types.Content],
+    *,
+    artifact_service: Optional[BaseArtifactService],
+    app_name: str,
+    user_id: str,
+    session_id: str,
+) -> None:
+  """Replaces the artifact references in contents by the referenced blobs.
+
+  The parts of the contents are replaced in place, so the contents must be
+  copies of the ones stored in the session.
+  """
+  loaded: dict[tuple[str, int], Optional[types.Part]] = {}
+  for content in contents:
+    for i, part in enumerate(content.parts or []):
+      reference = parse_artifact_uri(part.file_data and part.file_data.file_uri)
+      if reference is None:
+        continue
+      if artifact_service is None:
+        logger.warning(
+            'Cannot resolve the reference to artifact %s without an artifact'
+            ' service.',
+            reference[0],
+        )
+        continue
+      if reference not in loaded:
+        loaded[reference] = await artifact_service.load_artifact(
+            app_name=app_name,
+            user_id=user_id,
+            session_id=session_id,
+            filename=reference[0],
+            version=reference[1],
+        )
+      artifact = loaded[reference]
+      if artifact is None:
+        logger.warning(
+            'Artifact %s version %d referenced by the session is missing.',
+            *reference,
+        )
+        continue
+      content.parts[i] = artifact
@@ -0,0 +1,488 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""A cache of artifact versions in front of another artifact service."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import AsyncGenerator
+from typing import AsyncIterable
+from typing import Optional
+
+from google.genai import types
+from pydantic import BaseModel
+from typing_extensions import override
+
+from . import _utils
+from .base_artifact_service import ArtifactMetadata
+from .base_artifact_service import BaseArtifactService
+from .base_artifact_service import DEFAULT_CHUNK_SIZE
+
+logger = logging.getLogger("google_adk." + __name__)
+
+_ArtifactPath = tuple[str, str, str, str]
+"""The app name, user ID, session ID and filename of an artifact."""
+_VersionKey = tuple[_ArtifactPath, int]
+
+_TMP_SUFFIX = ".tmp"
+
+
+class ArtifactCacheStats(BaseModel):
+  """Counters describing how the artifact cache has been used."""
+
+  hits: int = 0
+  """The number of artifacts served from memory."""
+
+  disk_hits: int = 0
+  """The number of artifacts served from the disk cache."""
+
+  misses: int = 0
+  """The number of artifacts loaded from the wrapped service."""
+
+
+class _MemoryCache:
+  """Artifact versions in memory, evicting the least recently used ones."""
+
+  def __init__(self, max_bytes: int):
+    self._max_bytes = max_bytes
+    self._total_bytes = 0
+    self._entries: OrderedDict[_VersionKey, tuple[int, types.Part]] = (
+        OrderedDict()
+    )
+
+  def get(self, key: _VersionKey) -> Optional[types.Part]:
+    entry = self._entries.get(key)
+    if entry is None:
+      return None
+    self._entries.move_to_end(key)
+    return entry[1]
+
+  def put(self, key: _VersionKey, part: types.Part) -> None:
+    size = _utils.part_size(part)
+    if size > self._max_bytes:
+      return
+    self.pop(key)
+    self._entries[key] = (size, part)
+    self._total_bytes += size
+    while self._total_bytes > self._max_bytes:
+      _, (evicted_size, _) = self._entries.popitem(last=False)
+      self._total_bytes -= evicted_size
+
+  def pop(self, key: _VersionKey) -> None:
+    entry = self._entries.pop(key, None)
+    if entry is not None:
+      self._total_bytes -= entry[0]
+
+  def keys(self) -> list[_VersionKey]:
+    return list(self._entries)
+
+
+class _DiskCache:
+  """Artifact versions on the local disk, evicting the least recently used.
+
+  Each version is stored in a file named by the hash of its key, with a JSON
+  header line followed by its contents. Only artifacts with inline data or
+  text are stored. The methods are called from worker threads.
+  """
+
+  def __init__(self, directory: str, max_bytes: int):
+    self._directory = directory
+    self._max_bytes = max_bytes
+    self._total_bytes = 0
+    self._lock = threading.Lock()
+    self._sizes: OrderedDict[str, int] = OrderedDict()
+    """The sizes of the cached files, from the least recently used."""
+    os.makedirs(directory, exist_ok=True)
+    files = []
+    for name in os.listdir(directory):
+      path = os.path.join(directory, name)
+      if name.endswith(_TMP_SUFFIX):
+        os.remove(path)
+        continue
+      stat = os.stat(path)
+      files.append((stat.st_mtime, name, stat.st_size))
+    for _, name, size in sorted(files):
+      self._sizes[name] = size
+      self._total_bytes += size
+
+  def _name(self, key: _VersionKey) -> str:
+    return hashlib.sha256(json.dumps(key).encode("utf-8")).hexdigest()
+
+  def get(self, key: _VersionKey) -> Optional[types.Part]:
+    name = self._name(key)
+    with self._lock:
+      if name not in self._sizes:
+        return None
+      self._sizes.move_to_end(name)
+    path = os.path.join(self._directory, name)
+    try:
+      with open(path, "rb") as f:
+        header = json.loads(f.readline())
+        data = f.read()
+      os.utime(path)
+    except FileNotFoundError:
+      # Evicted meanwhile.
+      return None
+    if header.get("text"):
+      return types.Part(text=data.decode("utf-8"))
+    return types.Part.from_bytes(data=data, mime_type=header.get("mime_type"))
+
+  def put(self, key: _VersionKey, part: types.Part) -> None:
+    if part.inline_data is not None:
+      header = {"mime_type": part.inline_data.mime_type}
+      data = part.inline_data.data or b""
+    elif part.text is not None:
+      header = {"text": True}
+      data = part.text.encode("utf-8")
+    else:
+      return
+    contents = json.dumps(header).encode("utf-8") + b"\n" + data
+    if len(contents) > self._max_bytes:
+      return
+
+    name = self._name(key)
+    fd, tmp_path = tempfile.mkstemp(dir=self._directory, suffix=_TMP_SUFFIX)
+    try:
+      with os.fdopen(fd, "wb") as f:
+        f.write(contents)
+      os.replace(tmp_path, os.path.join(self._directory, name))
+    except BaseException:
+      os.remove(tmp_path)
+      raise
+    evicted_names = []
+    with self._lock:
+      self._forget(name)
+      self._sizes[name] = len(contents)
+      self._total_bytes += len(contents)
+      while self._total_bytes > self._max_bytes:
+        evicted_name = next(iter(self._sizes))
+        self._forget(evicted_name)
+        evicted_names.append(evicted_name)
+    for evicted_name in evicted_names:
+      self._remove(evicted_name)
+
+  def pop(self, key: _VersionKey) -> None:
+    name = self._name(key)
+    with self._lock:
+      if name not in self._sizes:
+        return
+      self._forget(name)
+    self._remove(name)
+
+  def _forget(self, name: str) -> None:
+    size = self._sizes.pop(name, None)
+    if size is not None:
+      self._total_bytes -= size
+
+  def _remove(self, name: str) -> None:
+    try:
+      os.remove(os.path.join(self._directory, name))
+    except FileNotFoundError:
+      pass
+
+
+class CachedArtifactService(BaseArtifactService):
+  """A read-through cache of artifact versions in front of another service.
+
+  Saved artifact versions are immutable, so they are cached by their path and
+  version, in a bounded LRU cache in memory and, if `cache_dir` is set, in a
+  bounded LRU cache on the local disk that outlives the process. The latest
+  version of an artifact is cached for `latest_version_ttl_seconds`, and is
+  updated by the saves through this service.
+
+  Deleting an artifact through this service drops its cached versions. An
+  artifact deleted and saved again through another instance may be served
+  from the cache with its old contents, so `cache_dir` must not be shared by
+  services in front of different storages.
+  """
+
+  def __init__(
+      self,
+      artifact_service: BaseArtifactService,
+      *,
+      max_memory_bytes: int = 64 * 1024 * 1024,
+      cache_dir: Optional[str] = None,
+      max_disk_bytes: int = 1024 * 1024 * 1024,
+      latest_version_ttl_seconds: float = 5.0,
+  ):
+    """Initializes the cache.
+
+    Args:
+      artifact_service: The artifact service to cache.
+      max_memory_bytes: The maximum size of the contents of the artifact
+        versions cached in memory.
+      cache_dir: The directory of the disk cache. If None, artifacts are only
+        cached in memory.
+      max_disk_bytes: The maximum size of the disk cache.
+      latest_version_ttl_seconds: How long the latest version of an artifact
+        is used before it's listed again.
+    """
+    self.artifact_service = artifact_service
+    self.latest_version_ttl_seconds = latest_version_ttl_seconds
+    self._memory_cache = _MemoryCache(max_memory_bytes)
+    self._disk_cache = (
+        _DiskCache(cache_dir, max_disk_bytes) if cache_dir else None
+    )
+    self._latest_versions: dict[_ArtifactPath, tuple[float, int]] = {}
+    self._stats = ArtifactCacheStats()
+
+  @property
+  def cache_stats(self) -> ArtifactCacheStats:
+    """A snapshot of the cache counters."""
+    return self._stats.model_copy()
+
+  def _artifact_path(
+      self, app_name: str, user_id: str, session_id: str, filename: str
+  ) -> _ArtifactPath:
+    if filename.startswith("user:"):
+      # User-namespaced artifacts are shared by the sessions of the user.
+      session_id = ""
+    return (app_name, user_id, session_id, filename)
+
+  def _set_latest_version(self, path: _ArtifactPath, version: int) -> None:
+    self._latest_versions[path] = (time.time(), version)
+
+  async def _get_latest_version(self, path: _ArtifactPath) -> Optional[int]:
+    entry = self._latest_versions.get(path)
+    if entry is not None:
+      cached_at, version = entry
+      if time.time() - cached_at <= self.latest_version_ttl_seconds:
+        return version
+    app_name, user_id, session_id, filename = path
+    versions = await self.list_versions(
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+        filename=filename,
+    )
+    return max(versions) if versions else None
+
+  async def _get_cached(self, key: _VersionKey) -> Optional[types.Part]:
+    part = self._memory_cache.get(key)
+    if part is not None:
+      self._stats.hits += 1
+      return part
+    if self._disk_cache is None:
+      return None
+    part = await asyncio.to_thread(self._disk_cache.get, key)
+    if part is not None:
+      self._stats.disk_hits += 1
+      self._memory_cache.put(key, part)
+    return part
+
+  async def _put_cached(self, key: _VersionKey, part: types.Part) -> None:
+    self._memory_cache.put(key, part)
+    if self._disk_cache is not None:
+      try:
+        await asyncio.to_thread(self._disk_cache.put, key, part)
+      except OSError:
+        logger.warning(
+            "Failed to cache artifact %s on disk.", key, exc_info=True
+        )
+
+  @override
+  async def save_artifact(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      filename: str,
+      artifact: types.Part,
+  ) -> int:
+    version = await self.artifact_service.save_artifact(
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+        filename=filename,
+        artifact=artifact,
+    )
+    path = self._artifact_path(app_name, user_id, session_id, filename)
+    self._set_latest_version(path, version)
+    await self._put_cached((path, version), artifact.model_copy(deep=True))
+    return version
+
+  @override
+  async def load_artifact(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      filename: str,
+      version: Optional[int] = None,
+  ) -> Optional[types.Part]:
+    path = self._artifact_path(app_name, user_id, session_id, filename)
+    if version is None:
+      version = await self._get_latest_version(path)
+      if version is None:
+        return None
+
+    part = await self._get_cached((path, version))
+    if part is None:
+      self._stats.misses += 1
+      part = await self.artifact_service.load_artifact(
+          app_name=app_name,
+          user_id=user_id,
+          session_id=session_id,
+          filename=filename,
+          version=version,
+      )
+      if part is None:
+        return None
+      await self._put_cached((path, version), part)
+    # Callers may modify the artifact they get.
+    return part.model_copy(deep=True)
+
+  @override
+  async def list_artifact_keys(
+      self, *, app_name: str, user_id: str, session_id: str
+  ) -> list[str]:
+    return await self.artifact_service.list_artifact_keys(
+        app_name=app_name, user_id=user_id, session_id=session_id
+    )
+
+  @override
+  async def delete_artifact(
+      self, *, app_name: str, user_id: str, session_id: str, filename: str
+  ) -> None:
+    path = self._artifact_path(app_name, user_id, session_id, filename)
+    versions = await self.artifact_service.list_versions(
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+        filename=filename,
+    )
+    await self.artifact_service.delete_artifact(
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+        filename=filename,
+    )
+    self._latest_versions.pop(path, None)
+    for key in self._memory_cache.keys():
+      if key[0] == path:
+        self._memory_cache.pop(key)
+    if self._disk_cache is not None:
+      for version in versions:
+        self._disk_cache.pop((path, version))
+
+  @override
+  async def list_versions(
+      self, *, app_name: str, user_id: str, session_id: str, filename: str
+  ) -> list[int]:
+    versions = await self.artifact_service.list_versions(
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+        filename=filename,
+    )
+    path = self._artifact_path(app_name, user_id, session_id, filename)
+    if versions:
+      self._set_latest_version(path, max(versions))
+    else:
+      self._latest_versions.pop(path, None)
+    return versions
+
+  @override
+  async def get_artifact_metadata(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      filename: str,
+      version: Optional[int] = None,
+  ) -> Optional[ArtifactMetadata]:
+    return await self.artifact_service.get_artifact_metadata(
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+        filename=filename,
+        version=version,
+    )
+
+  @override
+  async def read_artifact_chunks(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      filename: str,
+      version: Optional[int] = None,
+      offset: int = 0,
+      length: Optional[int] = None,
+      chunk_size: int = DEFAULT_CHUNK_SIZE,
+  ) -> AsyncGenerator[bytes, None]:
+    path = self._artifact_path(app_name, user_id, session_id, filename)
+    if version is None:
+      version = await self._get_latest_version(path)
+      if version is None:
+        raise ValueError(f"Artifact {filename} not found.")
+
+    # Streamed artifacts are served from memory if they're cached, but are
+    # not cached, as they may be large.
+    part = self._memory_cache.get((path, version))
+    if part is not None:
+      self._stats.hits += 1
+      data, _ = _utils.part_data(part)
+      for chunk in _utils.iter_chunks(data, offset, length, chunk_size):
+        yield chunk
+      return
+
+    self._stats.misses += 1
+    async for chunk in self.artifact_service.read_artifact_chunks(
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+        filename=filename,
+        version=version,
+        offset=offset,
+        length=length,
+        chunk_size=chunk_size,
+    ):
+      yield chunk
+
+  @override
+  async def save_artifact_chunks(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      filename: str,
+      chunks: AsyncIterable[bytes],
+      mime_type: str,
+  ) -> int:
+    version = await self.artifact_service.save_artifact_chunks(
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+        filename=filename,
+        chunks=chunks,
+        mime_type=mime_type,
+    )
+    path = self._artifact_path(app_name, user_id, session_id, filename)
+    self._set_latest_version(path, version)
+    return version
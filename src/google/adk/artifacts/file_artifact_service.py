@@ -0,0 +1,453 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""An artifact service storing the artifacts on the local disk.
+
+The root directory contains:
+
+- `blobs/<ab>/<abcdef...>`: the contents of the artifacts, named by their
+  SHA-256 digest, so identical contents are only stored once across versions,
+  files and sessions.
+- `index/<app>/<user>/sessions/<session>/<filename>.json` and
+  `index/<app>/<user>/user/<filename>.json`: the versions of each file, with
+  the digest and the MIME type of their contents.
+
+All the files are written to a temporary file first and then renamed, so a
+crash never leaves a partially written blob or index. The blobs are read by
+memory-mapping them.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import mmap
+import os
+import tempfile
+from typing import Any
+from typing import AsyncGenerator
+from typing import AsyncIterable
+from typing import BinaryIO
+from typing import Optional
+import urllib.parse
+
+from google.genai import types
+from typing_extensions import override
+
+from . import _utils
+from .base_artifact_service import ArtifactMetadata
+from .base_artifact_service import BaseArtifactService
+from .base_artifact_service import DEFAULT_CHUNK_SIZE
+
+logger = logging.getLogger("google_adk." + __name__)
+
+_INDEX_SUFFIX = ".json"
+_TMP_SUFFIX = ".tmp"
+
+
+def _quote(name: str) -> str:
+  """Quotes a name into a single path component."""
+  return urllib.parse.quote(name, safe="").replace(".", "%2E")
+
+
+def _write_atomically(path: str, data: bytes) -> None:
+  directory = os.path.dirname(path)
+  os.makedirs(directory, exist_ok=True)
+  fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=_TMP_SUFFIX)
+  try:
+    with os.fdopen(fd, "wb") as f:
+      f.write(data)
+      f.flush()
+      os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+  except BaseException:
+    os.remove(tmp_path)
+    raise
+
+
+def _read_mapped(path: str) -> bytes:
+  with open(path, "rb") as f:
+    if os.fstat(f.fileno()).st_size == 0:
+      return b""
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+      return mapped[:]
+
+
+def _read_range(mapped: mmap.mmap, start: int, end: int) -> bytes:
+  return mapped[start:end]
+
+
+def _write_chunk(f: BinaryIO, chunk: bytes, digest: Any) -> None:
+  f.write(chunk)
+  digest.update(chunk)
+
+
+def _sync(f: BinaryIO) -> None:
+  f.flush()
+  os.fsync(f.fileno())
+
+
+class FileArtifactService(BaseArtifactService):
+  """An artifact service storing the artifacts on the local disk.
+
+  The contents of the artifacts are content-addressed, so saving the same
+  bytes again, e.g. in another session, doesn't use more disk space. Deleting
+  an artifact only deletes its index; the contents no longer referenced by
+  any artifact are deleted by `collect_garbage`.
+  """
+
+  def __init__(self, root_dir: str):
+    """Initializes the FileArtifactService.
+
+    Args:
+        root_dir: The directory to store the artifacts in. It's created if it
+          doesn't exist.
+    """
+    self.root_dir = root_dir
+    self._blobs_dir = os.path.join(root_dir, "blobs")
+    self._index_dir = os.path.join(root_dir, "index")
+    self._saving_digests: dict[str, int] = {}
+    """The digests of the blobs being written, kept by `collect_garbage`."""
+    os.makedirs(self._blobs_dir, exist_ok=True)
+    os.makedirs(self._index_dir, exist_ok=True)
+
+  def _file_has_user_namespace(self, filename: str) -> bool:
+    """Checks if the filename has a user namespace.
+
+    Args:
+        filename: The filename to check.
+
+    Returns:
+        True if the filename has a user namespace (starts with "user:"),
+        False otherwise.
+    """
+    return filename.startswith("user:")
+
+  def _session_dir(self, app_name: str, user_id: str, session_id: str) -> str:
+    return os.path.join(
+        self._index_dir,
+        _quote(app_name),
+        _quote(user_id),
+        "sessions",
+        _quote(session_id),
+    )
+
+  def _user_dir(self, app_name: str, user_id: str) -> str:
+    return os.path.join(
+        self._index_dir, _quote(app_name), _quote(user_id), "user"
+    )
+
+  def _index_path(
+      self, app_name: str, user_id: str, session_id: str, filename: str
+  ) -> str:
+    """Constructs the path of the index of an artifact.
+
+    Args:
+        app_name: The name of the application.
+        user_id: The ID of the user.
+        session_id: The ID of the session.
+        filename: The name of the artifact file.
+
+    Returns:
+        The path of the index listing the versions of the artifact.
+    """
+    if self._file_has_user_namespace(filename):
+      directory = self._user_dir(app_name, user_id)
+    else:
+      directory = self._session_dir(app_name, user_id, session_id)
+    return os.path.join(directory, _quote(filename) + _INDEX_SUFFIX)
+
+  def _blob_path(self, digest: str) -> str:
+    return os.path.join(self._blobs_dir, digest[:2], digest)
+
+  def _read_versions(self, index_path: str) -> list[dict[str, Any]]:
+    try:
+      with open(index_path, "r", encoding="utf-8") as f:
+        return json.load(f)["versions"]
+    except FileNotFoundError:
+      return []
+
+  def _write_blob(self, digest: str, data: bytes) -> None:
+    path = self._blob_path(digest)
+    if not os.path.exists(path):
+      _write_atomically(path, data)
+
+  def _add_version(
+      self,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      filename: str,
+      version_info: dict[str, Any],
+  ) -> int:
+    # The index is read and written without awaiting, so concurrent saves of
+    # the same file get distinct versions.
+    index_path = self._index_path(app_name, user_id, session_id, filename)
+    versions = self._read_versions(index_path)
+    versions.append(version_info)
+    _write_atomically(
+        index_path, json.dumps({"versions": versions}).encode("utf-8")
+    )
+    return len(versions) - 1
+
+  def _get_version_info(
+      self,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      filename: str,
+      version: Optional[int],
+  ) -> Optional[tuple[int, dict[str, Any]]]:
+    versions = self._read_versions(
+        self._index_path(app_name, user_id, session_id, filename)
+    )
+    if version is None:
+      version = len(versions) - 1
+    if not 0 <= version < len(versions):
+      return None
+    return version, versions[version]
+
+  @override
+  async def save_artifact(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      filename: str,
+      artifact: types.Part,
+  ) -> int:
+    if artifact.inline_data is not None:
+      data = artifact.inline_data.data or b""
+      version_info = {"mime_type": artifact.inline_data.mime_type}
+    elif artifact.text is not None:
+      data = artifact.text.encode("utf-8")
+      version_info = {"text": True}
+    else:
+      raise ValueError(
+          "FileArtifactService only supports artifacts with inline data or"
+          " text."
+      )
+
+    digest = hashlib.sha256(data).hexdigest()
+    self._saving_digests[digest] = self._saving_digests.get(digest, 0) + 1
+    try:
+      await asyncio.to_thread(self._write_blob, digest, data)
+    finally:
+      self._saving_digests[digest] -= 1
+      if not self._saving_digests[digest]:
+        del self._saving_digests[digest]
+
+    return self._add_version(
+        app_name,
+        user_id,
+        session_id,
+        filename,
+        {"digest": digest, "size": len(data), **version_info},
+    )
+
+  @override
+  async def load_artifact(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      filename: str,
+      version: Optional[int] = None,
+  ) -> Optional[types.Part]:
+    found = self._get_version_info(
+        app_name, user_id, session_id, filename, version
+    )
+    if found is None:
+      return None
+    version, version_info = found
+
+    try:
+      data = await asyncio.to_thread(
+          _read_mapped, self._blob_path(version_info["digest"])
+      )
+    except FileNotFoundError:
+      logger.warning(
+          "The contents of version %s of artifact %s are missing.",
+          version,
+          filename,
+      )
+      return None
+    if version_info.get("text"):
+      return types.Part(text=data.decode("utf-8"))
+    return types.Part.from_bytes(
+        data=data, mime_type=version_info.get("mime_type")
+    )
+
+  @override
+  async def list_artifact_keys(
+      self, *, app_name: str, user_id: str, session_id: str
+  ) -> list[str]:
+    filenames = []
+    for directory in (
+        self._session_dir(app_name, user_id, session_id),
+        self._user_dir(app_name, user_id),
+    ):
+      try:
+        names = os.listdir(directory)
+      except FileNotFoundError:
+        continue
+      filenames.extend(
+          urllib.parse.unquote(name.removesuffix(_INDEX_SUFFIX))
+          for name in names
+          if name.endswith(_INDEX_SUFFIX)
+      )
+    return sorted(filenames)
+
+  @override
+  async def delete_artifact(
+      self, *, app_name: str, user_id: str, session_id: str, filename: str
+  ) -> None:
+    try:
+      os.remove(self._index_path(app_name, user_id, session_id, filename))
+    except FileNotFoundError:
+      pass
+
+  @override
+  async def list_versions(
+      self, *, app_name: str, user_id: str, session_id: str, filename: str
+  ) -> list[int]:
+    versions = self._read_versions(
+        self._index_path(app_name, user_id, session_id, filename)
+    )
+    return list(range(len(versions)))
+
+  @override
+  async def get_artifact_metadata(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      filename: str,
+      version: Optional[int] = None,
+  ) -> Optional[ArtifactMetadata]:
+    found = self._get_version_info(
+        app_name, user_id, session_id, filename, version
+    )
+    if found is None:
+      return None
+    version, version_info = found
+    return ArtifactMetadata(
+        version=version,
+        size=version_info["size"],
+        mime_type=(
+            "text/plain"
+            if version_info.get("text")
+            else version_info.get("mime_type")
+        ),
+    )
+
+  @override
+  async def read_artifact_chunks(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      filename: str,
+      version: Optional[int] = None,
+      offset: int = 0,
+      length: Optional[int] = None,
+      chunk_size: int = DEFAULT_CHUNK_SIZE,
+  ) -> AsyncGenerator[bytes, None]:
+    found = self._get_version_info(
+        app_name, user_id, session_id, filename, version
+    )
+    if found is None:
+      raise ValueError(f"Artifact {filename} not found.")
+    _, version_info = found
+    start, end = _utils.byte_range(version_info["size"], offset, length)
+    if start == end:
+      return
+    with open(self._blob_path(version_info["digest"]), "rb") as f:
+      with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        for chunk_start in range(start, end, chunk_size):
+          chunk_end = min(chunk_start + chunk_size, end)
+          # Copying the chunk may fault in pages from the disk.
+          yield await asyncio.to_thread(
+              _read_range, mapped, chunk_start, chunk_end
+          )
+
+  @override
+  async def save_artifact_chunks(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      filename: str,
+      chunks: AsyncIterable[bytes],
+      mime_type: str,
+  ) -> int:
+    # The contents are written to a temporary file, hashed on the way, and
+    # then renamed to their digest.
+    fd, tmp_path = tempfile.mkstemp(dir=self._blobs_dir, suffix=_TMP_SUFFIX)
+    hasher = hashlib.sha256()
+    size = 0
+    try:
+      with os.fdopen(fd, "wb") as f:
+        async for chunk in chunks:
+          await asyncio.to_thread(_write_chunk, f, chunk, hasher)
+          size += len(chunk)
+        await asyncio.to_thread(_sync, f)
+      digest = hasher.hexdigest()
+      path = self._blob_path(digest)
+      if os.path.exists(path):
+        os.remove(tmp_path)
+      else:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(tmp_path, path)
+    except BaseException:
+      if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+      raise
+
+    return self._add_version(
+        app_name,
+        user_id,
+        session_id,
+        filename,
+        {"digest": digest, "size": size, "mime_type": mime_type},
+    )
+
+  def collect_garbage(self) -> int:
+    """Deletes the contents no longer referenced by any artifact.
+
+    Returns:
+        The number of blobs deleted.
+    """
+    referenced = set(self._saving_digests)
+    for directory, _, names in os.walk(self._index_dir):
+      for name in names:
+        if name.endswith(_INDEX_SUFFIX):
+          versions = self._read_versions(os.path.join(directory, name))
+          referenced.update(version["digest"] for version in versions)
+
+    num_deleted = 0
+    for directory, _, names in os.walk(self._blobs_dir):
+      for name in names:
+        if name.endswith(_TMP_SUFFIX) or name in referenced:
+          continue
+        os.remove(os.path.join(directory, name))
+        num_deleted += 1
+    return num_deleted
@@ -14,31 +14,99 @@
 
 """An artifact service implementation using Google Cloud Storage (GCS)."""
 
+from __future__ import annotations
+
+import asyncio
+from concurrent import futures
+import functools
 import logging
+from typing import Any
+from typing import AsyncGenerator
+from typing import AsyncIterable
+from typing import Callable
 from typing import Optional
+from typing import TypeVar
 
 from google.cloud import storage
 from google.genai import types
+import requests
 from typing_extensions import override
 
+from . import _utils
+from .base_artifact_service import ArtifactMetadata
 from .base_artifact_service import BaseArtifactService
+from .base_artifact_service import DEFAULT_CHUNK_SIZE
 
 logger = logging.getLogger("google_adk." + __name__)
 
+_T = TypeVar("_T")
+
+_DEFAULT_MAX_WORKERS = 16
+# Resumable uploads require chunks of a multiple of 256 KiB.
+_UPLOAD_CHUNK_SIZE = 40 * 256 * 1024
+
 
 class GcsArtifactService(BaseArtifactService):
-  """An artifact service implementation using Google Cloud Storage (GCS)."""
+  """An artifact service implementation using Google Cloud Storage (GCS).
 
-  def __init__(self, bucket_name: str, **kwargs):
+  The Google Cloud Storage client is synchronous, so its calls run in a thread
+  pool, without blocking the event loop. The HTTP connection pool of the client
+  is sized to the thread pool, so concurrent calls reuse their connections.
+  """
+
+  def __init__(
+      self,
+      bucket_name: str,
+      *,
+      max_workers: int = _DEFAULT_MAX_WORKERS,
+      **kwargs,
+  ):
     """Initializes the GcsArtifactService.
 
     Args:
         bucket_name: The name of the bucket to use.
+        max_workers: The maximum number of concurrent calls to GCS.
         **kwargs: Keyword arguments to pass to the Google Cloud Storage client.
     """
     self.bucket_name = bucket_name
     self.storage_client = storage.Client(**kwargs)
     self.bucket = self.storage_client.bucket(self.bucket_name)
+    self._executor = futures.ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="gcs_artifact_service"
+    )
+    if "_http" not in kwargs:
+      self._configure_connection_pool(max_workers)
+
+  def _configure_connection_pool(self, max_workers: int) -> None:
+    """Sizes the connection pool of the client to the thread pool."""
+    http = getattr(self.storage_client, "_http", None)
+    # Keeps the adapters configured by the client, e.g. for mutual TLS.
+    if (
+        isinstance(http, requests.Session)
+        and type(http.get_adapter("https://")) is requests.adapters.HTTPAdapter
+    ):
+      http.mount(
+          "https://",
+          requests.adapters.HTTPAdapter(
+              pool_connections=max_workers, pool_maxsize=max_workers
+          ),
+      )
+
+  async def _run(
+      self, func: Callable[..., _T], *args: Any, **kwargs: Any
+  ) -> _T:
+    """Runs a blocking call to GCS in the thread pool."""
+    return await asyncio.get_running_loop().run_in_executor(
+        self._executor, functools.partial(func, *args, **kwargs)
+    )
+
+  def _list_blob_names(self, prefix: str) -> list[str]:
+    # The blobs are listed lazily, page by page, so they're iterated in the
+    # thread pool too.
+    return [
+        blob.name
+        for blob in self.storage_client.list_blobs(self.bucket, prefix=prefix)
+    ]
 
   def _file_has_user_namespace(self, filename: str) -> bool:
     """Checks if the filename has a user namespace.
@@ -99,7 +167,8 @@ class GcsArtifactService(BaseArtifactService):
     )
     blob = self.bucket.blob(blob_name)
 
-    blob.upload_from_string(
+    await self._run(
+        blob.upload_from_string,
         data=artifact.inline_data.data,
         content_type=artifact.inline_data.mime_type,
     )
@@ -132,7 +201,7 @@ class GcsArtifactService(BaseArtifactService):
     )
     blob = self.bucket.blob(blob_name)
 
-    artifact_bytes = blob.download_as_bytes()
+    artifact_bytes = await self._run(blob.download_as_bytes)
     if not artifact_bytes:
       return None
     artifact = types.Part.from_bytes(
@@ -147,19 +216,13 @@ class GcsArtifactService(BaseArtifactService):
     filenames = set()
 
     session_prefix = f"{app_name}/{user_id}/{session_id}/"
-    session_blobs = self.storage_client.list_blobs(
-        self.bucket, prefix=session_prefix
-    )
-    for blob in session_blobs:
-      _, _, _, filename, _ = blob.name.split("/")
-      filenames.add(filename)
-
     user_namespace_prefix = f"{app_name}/{user_id}/user/"
-    user_namespace_blobs = self.storage_client.list_blobs(
-        self.bucket, prefix=user_namespace_prefix
+    session_blob_names, user_namespace_blob_names = await asyncio.gather(
+        self._run(self._list_blob_names, session_prefix),
+        self._run(self._list_blob_names, user_namespace_prefix),
     )
-    for blob in user_namespace_blobs:
-      _, _, _, filename, _ = blob.name.split("/")
+    for blob_name in session_blob_names + user_namespace_blob_names:
+      _, _, _, filename, _ = blob_name.split("/")
       filenames.add(filename)
 
     return sorted(list(filenames))
@@ -174,12 +237,15 @@ class GcsArtifactService(BaseArtifactService):
         session_id=session_id,
         filename=filename,
     )
-    for version in versions:
-      blob_name = self._get_blob_name(
-          app_name, user_id, session_id, filename, version
-      )
-      blob = self.bucket.blob(blob_name)
-      blob.delete()
+    blobs = [
+        self.bucket.blob(
+            self._get_blob_name(
+                app_name, user_id, session_id, filename, version
+            )
+        )
+        for version in versions
+    ]
+    await asyncio.gather(*(self._run(blob.delete) for blob in blobs))
     return
 
   @override
@@ -187,9 +253,114 @@ class GcsArtifactService(BaseArtifactService):
       self, *, app_name: str, user_id: str, session_id: str, filename: str
   ) -> list[int]:
     prefix = self._get_blob_name(app_name, user_id, session_id, filename, "")
-    blobs = self.storage_client.list_blobs(self.bucket, prefix=prefix)
+    blob_names = await self._run(self._list_blob_names, prefix)
     versions = []
-    for blob in blobs:
-      _, _, _, _, version = blob.name.split("/")
+    for blob_name in blob_names:
+      _, _, _, _, version = blob_name.split("/")
       versions.append(int(version))
     return versions
+
+  async def _get_versioned_blob(
+      self,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      filename: str,
+      version: Optional[int],
+  ) -> tuple[Optional[int], Optional[storage.Blob]]:
+    """Gets a version of an artifact with its metadata, without its contents."""
+    if version is None:
+      versions = await self.list_versions(
+          app_name=app_name,
+          user_id=user_id,
+          session_id=session_id,
+          filename=filename,
+      )
+      if not versions:
+        return None, None
+      version = max(versions)
+    blob_name = self._get_blob_name(
+        app_name, user_id, session_id, filename, version
+    )
+    return version, await self._run(self.bucket.get_blob, blob_name)
+
+  @override
+  async def get_artifact_metadata(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      filename: str,
+      version: Optional[int] = None,
+  ) -> Optional[ArtifactMetadata]:
+    version, blob = await self._get_versioned_blob(
+        app_name, user_id, session_id, filename, version
+    )
+    if blob is None:
+      return None
+    return ArtifactMetadata(
+        version=version, size=blob.size or 0, mime_type=blob.content_type
+    )
+
+  @override
+  async def read_artifact_chunks(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      filename: str,
+      version: Optional[int] = None,
+      offset: int = 0,
+      length: Optional[int] = None,
+      chunk_size: int = DEFAULT_CHUNK_SIZE,
+  ) -> AsyncGenerator[bytes, None]:
+    _, blob = await self._get_versioned_blob(
+        app_name, user_id, session_id, filename, version
+    )
+    if blob is None:
+      raise ValueError(f"Artifact {filename} not found.")
+    start, end = _utils.byte_range(blob.size or 0, offset, length)
+    for chunk_start in range(start, end, chunk_size):
+      # The end of the range of a download is inclusive.
+      yield await self._run(
+          blob.download_as_bytes,
+          start=chunk_start,
+          end=min(chunk_start + chunk_size, end) - 1,
+      )
+
+  @override
+  async def save_artifact_chunks(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      filename: str,
+      chunks: AsyncIterable[bytes],
+      mime_type: str,
+  ) -> int:
+    versions = await self.list_versions(
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+        filename=filename,
+    )
+    version = 0 if not versions else max(versions) + 1
+
+    blob = self.bucket.blob(
+        self._get_blob_name(app_name, user_id, session_id, filename, version)
+    )
+    # The chunks are sent in a resumable upload, which only creates the blob
+    # once it's closed, so a failed upload leaves no partial version.
+    writer = await self._run(
+        blob.open,
+        "wb",
+        chunk_size=_UPLOAD_CHUNK_SIZE,
+        content_type=mime_type,
+    )
+    async for chunk in chunks:
+      await self._run(writer.write, chunk)
+    await self._run(writer.close)
+    return version
@@ -14,23 +14,81 @@
 
 """An in-memory implementation of the artifact service."""
 
+from __future__ import annotations
+
+from collections import OrderedDict
+import dataclasses
 import logging
+from typing import Any
 from typing import Optional
 
 from google.genai import types
 from pydantic import BaseModel
 from pydantic import Field
+from pydantic import PrivateAttr
 from typing_extensions import override
 
+from . import _utils
 from .base_artifact_service import BaseArtifactService
 
 logger = logging.getLogger("google_adk." + __name__)
 
 
+@dataclasses.dataclass
+class _ArtifactFile:
+  """The bookkeeping of the versions of an artifact file."""
+
+  app_name: str
+  user_id: str
+  scope: Optional[str]
+  """The session ID of the file, or None if it's in the user namespace."""
+  filename: str
+  first_version: int = 0
+  """The version of the oldest version kept."""
+  num_bytes: int = 0
+  """The total size of the versions kept."""
+
+
 class InMemoryArtifactService(BaseArtifactService, BaseModel):
-  """An in-memory implementation of the artifact service."""
+  """An in-memory implementation of the artifact service.
+
+  The filenames are indexed by app, user and session, so listing the artifacts
+  of a session doesn't scan the artifacts of the others. By default, all the
+  versions of all the artifacts are kept. With `max_versions_per_file`, the
+  oldest versions of a file are dropped; with `max_total_bytes`, the least
+  recently saved or loaded files are dropped, along with the oldest versions
+  of the file being saved if it's the only one left. The latest version of the
+  file being saved is always kept.
+  """
 
   artifacts: dict[str, list[types.Part]] = Field(default_factory=dict)
+  """The versions kept of each artifact, by the path of the artifact."""
+
+  max_versions_per_file: Optional[int] = None
+  """The maximum number of versions kept per file, or None for no limit."""
+
+  max_total_bytes: Optional[int] = None
+  """The maximum total size of the artifacts kept, or None for no limit."""
+
+  _files: OrderedDict[str, _ArtifactFile] = PrivateAttr(
+      default_factory=OrderedDict
+  )
+  """The artifact files, by path, from the least recently used."""
+
+  _index: dict[str, dict[str, dict[Optional[str], set[str]]]] = PrivateAttr(
+      default_factory=dict
+  )
+  """The filenames by app name, user ID, and session ID or None."""
+
+  _total_bytes: int = PrivateAttr(default=0)
+
+  def model_post_init(self, __context: Any) -> None:
+    """Indexes the artifacts the service is created with."""
+    for path, versions in self.artifacts.items():
+      app_name, user_id, session_id, filename = path.split("/", 3)
+      file = self._add_file(path, app_name, user_id, session_id, filename)
+      file.num_bytes = sum(_utils.part_size(part) for part in versions)
+      self._total_bytes += file.num_bytes
 
   def _file_has_user_namespace(self, filename: str) -> bool:
     """Checks if the filename has a user namespace.
@@ -62,6 +120,70 @@ class InMemoryArtifactService(BaseArtifactService, BaseModel):
       return f"{app_name}/{user_id}/user/{filename}"
     return f"{app_name}/{user_id}/{session_id}/{filename}"
 
+  def _add_file(
+      self,
+      path: str,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      filename: str,
+  ) -> _ArtifactFile:
+    scope = None if self._file_has_user_namespace(filename) else session_id
+    file = _ArtifactFile(app_name, user_id, scope, filename)
+    self._files[path] = file
+    self._index.setdefault(app_name, {}).setdefault(user_id, {}).setdefault(
+        scope, set()
+    ).add(filename)
+    return file
+
+  def _remove_file(self, path: str) -> None:
+    self.artifacts.pop(path, None)
+    file = self._files.pop(path)
+    self._total_bytes -= file.num_bytes
+    user_index = self._index[file.app_name][file.user_id]
+    user_index[file.scope].discard(file.filename)
+    # Drops the empty levels of the index.
+    if not user_index[file.scope]:
+      del user_index[file.scope]
+      if not user_index:
+        del self._index[file.app_name][file.user_id]
+        if not self._index[file.app_name]:
+          del self._index[file.app_name]
+
+  def _drop_oldest_versions(self, path: str, num_versions: int) -> None:
+    file = self._files[path]
+    dropped = self.artifacts[path][:num_versions]
+    del self.artifacts[path][:num_versions]
+    num_bytes = sum(_utils.part_size(part) for part in dropped)
+    file.first_version += num_versions
+    file.num_bytes -= num_bytes
+    self._total_bytes -= num_bytes
+
+  def _enforce_retention(self, saved_path: str) -> None:
+    versions = self.artifacts[saved_path]
+    if (
+        self.max_versions_per_file is not None
+        and len(versions) > self.max_versions_per_file
+    ):
+      self._drop_oldest_versions(
+          saved_path, len(versions) - max(self.max_versions_per_file, 1)
+      )
+
+    if self.max_total_bytes is None:
+      return
+    while self._total_bytes > self.max_total_bytes:
+      path = next(iter(self._files))
+      if path != saved_path:
+        self._remove_file(path)
+        continue
+      # Only the saved file is left.
+      while (
+          self._total_bytes > self.max_total_bytes
+          and len(self.artifacts[saved_path]) > 1
+      ):
+        self._drop_oldest_versions(saved_path, 1)
+      return
+
   @override
   async def save_artifact(
       self,
@@ -73,10 +195,17 @@ class InMemoryArtifactService(BaseArtifactService, BaseModel):
       artifact: types.Part,
   ) -> int:
     path = self._artifact_path(app_name, user_id, session_id, filename)
-    if path not in self.artifacts:
+    file = self._files.get(path)
+    if file is None:
+      file = self._add_file(path, app_name, user_id, session_id, filename)
       self.artifacts[path] = []
-    version = len(self.artifacts[path])
+    self._files.move_to_end(path)
+    version = file.first_version + len(self.artifacts[path])
     self.artifacts[path].append(artifact)
+    num_bytes = _utils.part_size(artifact)
+    file.num_bytes += num_bytes
+    self._total_bytes += num_bytes
+    self._enforce_retention(path)
     return version
 
   @override
@@ -93,34 +222,31 @@ class InMemoryArtifactService(BaseArtifactService, BaseModel):
     versions = self.artifacts.get(path)
     if not versions:
       return None
+    file = self._files[path]
+    self._files.move_to_end(path)
     if version is None:
-      version = -1
-    return versions[version]
+      return versions[-1]
+    index = version - file.first_version
+    if not 0 <= index < len(versions):
+      return None
+    return versions[index]
 
   @override
   async def list_artifact_keys(
       self, *, app_name: str, user_id: str, session_id: str
   ) -> list[str]:
-    session_prefix = f"{app_name}/{user_id}/{session_id}/"
-    usernamespace_prefix = f"{app_name}/{user_id}/user/"
-    filenames = []
-    for path in self.artifacts:
-      if path.startswith(session_prefix):
-        filename = path.removeprefix(session_prefix)
-        filenames.append(filename)
-      elif path.startswith(usernamespace_prefix):
-        filename = path.removeprefix(usernamespace_prefix)
-        filenames.append(filename)
-    return sorted(filenames)
+    user_index = self._index.get(app_name, {}).get(user_id, {})
+    return sorted(
+        user_index.get(session_id, set()) | user_index.get(None, set())
+    )
 
   @override
   async def delete_artifact(
       self, *, app_name: str, user_id: str, session_id: str, filename: str
   ) -> None:
     path = self._artifact_path(app_name, user_id, session_id, filename)
-    if not self.artifacts.get(path):
-      return None
-    self.artifacts.pop(path, None)
+    if path in self._files:
+      self._remove_file(path)
 
   @override
   async def list_versions(
@@ -130,4 +256,5 @@ class InMemoryArtifactService(BaseArtifactService, BaseModel):
     versions = self.artifacts.get(path)
     if not versions:
       return []
-    return list(range(len(versions)))
+    first_version = self._files[path].first_version
+    return list(range(first_version, first_version + len(versions)))
@@ -33,6 +33,9 @@ from . import cli_deploy
 from .. import version
 from ..evaluation.local_eval_set_results_manager import LocalEvalSetResultsManager
 from ..sessions.in_memory_session_service import InMemorySessionService
+from ..sessions.session_export import export_sessions
+from ..sessions.session_export import import_sessions
+from ..sessions.vertex_ai_session_service import VertexAiSessionService
 from .cli import run_cli
 from .cli_eval import MISSING_EVAL_DEPENDENCIES_MESSAGE
 from .fast_api import get_fast_api_app
@@ -435,7 +438,8 @@ def fast_api_common_options():
         type=str,
         help=(
             "Optional. The artifact storage URI to store the artifacts,"
-            " supported URIs: gs://<bucket name> for GCS artifact service."
+            " supported URIs: gs://<bucket name> for GCS artifact service,"
+            " file://<directory> for file artifact service."
         ),
         default=None,
     )
@@ -473,6 +477,17 @@ def fast_api_common_options():
         default=False,
         help="Optional. Whether to enable cloud trace for telemetry.",
     )
+    @click.option(
+        "--cache_sessions",
+        is_flag=True,
+        show_default=True,
+        default=False,
+        help=(
+            "Optional. Whether to cache the sessions of --session_db_url in"
+            " memory. Only use it with a single server, as app and user state"
+            " updated by other servers may be served stale for 30 seconds."
+        ),
+    )
     @click.option(
         "--reload/--no-reload",
         default=True,
@@ -505,6 +520,7 @@ def cli_web(
     host: str = "127.0.0.1",
     port: int = 8000,
     trace_to_cloud: bool = False,
+    cache_sessions: bool = False,
     reload: bool = True,
 ):
   """Starts a FastAPI server with Web UI for agents.
@@ -547,6 +563,7 @@ def cli_web(
       allow_origins=allow_origins,
       web=True,
       trace_to_cloud=trace_to_cloud,
+      cache_sessions=cache_sessions,
       lifespan=_lifespan,
   )
   config = uvicorn.Config(
@@ -580,6 +597,7 @@ def cli_api_server(
     host: str = "127.0.0.1",
     port: int = 8000,
     trace_to_cloud: bool = False,
+    cache_sessions: bool = False,
     reload: bool = True,
 ):
   """Starts a FastAPI server for agents.
@@ -601,6 +619,7 @@ def cli_api_server(
           allow_origins=allow_origins,
           web=False,
           trace_to_cloud=trace_to_cloud,
+          cache_sessions=cache_sessions,
       ),
       host=host,
       port=port,
@@ -610,6 +629,178 @@ def cli_api_server(
   server.run()
 
 
+@main.group()
+def sessions():
+  """Exports and imports sessions."""
+  pass
+
+
+def _create_session_service(session_db_url: str, app_name: Optional[str]):
+  """Creates the session service of a URL, as `adk api_server` does.
+
+  Returns:
+    The session service and the app name to use with it.
+  """
+  if session_db_url.startswith("agentengine://"):
+    agent_engine_id = session_db_url.split("://")[1]
+    if not agent_engine_id:
+      raise click.ClickException("Agent engine id can not be empty.")
+    envs.load_dotenv_for_agent("", os.getcwd())
+    return (
+        VertexAiSessionService(
+            os.environ["GOOGLE_CLOUD_PROJECT"],
+            os.environ["GOOGLE_CLOUD_LOCATION"],
+        ),
+        agent_engine_id,
+    )
+  from ..sessions.database_session_service import DatabaseSessionService
+
+  return DatabaseSessionService(db_url=session_db_url), app_name
+
+
+def session_transfer_options():
+  """Decorator to add common session export and import options."""
+
+  def decorator(func):
+    @click.option(
+        "--session_db_url",
+        required=True,
+        help=(
+            "Required. The database URL of the sessions, as in `adk"
+            " api_server`, e.g. 'sqlite:///sessions.db' or"
+            " 'agentengine://<agent_engine_resource_id>'."
+        ),
+    )
+    @click.option(
+        "--format",
+        "export_format",
+        type=click.Choice(["jsonl", "parquet"]),
+        default=None,
+        help=(
+            "Optional. The format of the file. Inferred from its extension by"
+            " default."
+        ),
+    )
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+      return func(*args, **kwargs)
+
+    return wrapper
+
+  return decorator
+
+
+@sessions.command("export", cls=HelpfulCommand)
+@session_transfer_options()
+@click.option(
+    "--user_id",
+    "user_ids",
+    multiple=True,
+    help=(
+        "Optional. The users whose sessions are exported. All users by default,"
+        " which is only supported by database URLs."
+    ),
+)
+@click.option(
+    "--page_size",
+    type=int,
+    default=100,
+    show_default=True,
+    help="Optional. The number of sessions and events read at a time.",
+)
+@click.argument("app_name", type=str, required=True)
+@click.argument("path", type=click.Path(dir_okay=False, writable=True))
+def cli_sessions_export(
+    app_name: str,
+    path: str,
+    session_db_url: str,
+    export_format: Optional[str],
+    user_ids: tuple[str, ...],
+    page_size: int,
+):
+  """Exports the sessions of an app to a JSONL or Parquet file.
+
+  APP_NAME: The name of the app.
+
+  PATH: The path of the file to write.
+
+  Example:
+
+    adk sessions export --session_db_url=sqlite:///sessions.db my_app sessions.jsonl
+  """
+  session_service, app_name = _create_session_service(session_db_url, app_name)
+
+  async def _export():
+    exported_user_ids = list(user_ids)
+    if not exported_user_ids:
+      if not hasattr(session_service, "list_user_ids"):
+        raise click.ClickException(
+            "Please specify the users to export with --user_id."
+        )
+      exported_user_ids = await session_service.list_user_ids(app_name)
+    return await export_sessions(
+        session_service,
+        path,
+        app_name=app_name,
+        user_ids=exported_user_ids,
+        export_format=export_format,
+        page_size=page_size,
+    )
+
+  stats = asyncio.run(_export())
+  click.secho(
+      f"Exported {stats.sessions} sessions and {stats.events} events to"
+      f" {path}.",
+      fg="green",
+  )
+
+
+@sessions.command("import", cls=HelpfulCommand)
+@session_transfer_options()
+@click.option(
+    "--concurrency",
+    type=int,
+    default=4,
+    show_default=True,
+    help="Optional. The number of sessions imported concurrently.",
+)
+@click.argument(
+    "path", type=click.Path(exists=True, dir_okay=False, readable=True)
+)
+def cli_sessions_import(
+    path: str,
+    session_db_url: str,
+    export_format: Optional[str],
+    concurrency: int,
+):
+  """Imports the sessions of an exported file.
+
+  Interrupted imports can be resumed by running the command again: existing
+  sessions and events are skipped.
+
+  PATH: The path of the exported file.
+
+  Example:
+
+    adk sessions import --session_db_url=sqlite:///sessions.db sessions.jsonl
+  """
+  session_service, app_name = _create_session_service(session_db_url, None)
+  stats = asyncio.run(
+      import_sessions(
+          session_service,
+          path,
+          app_name=app_name,
+          export_format=export_format,
+          concurrency=concurrency,
+      )
+  )
+  click.secho(
+      f"Imported {stats.sessions} sessions and {stats.events} events from"
+      f" {path}, skipping {stats.skipped_events} existing events.",
+      fg="green",
+  )
+
+
 @deploy.command("cloud_run")
 @click.option(
     "--project",
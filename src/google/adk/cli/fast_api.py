@@ -26,6 +26,7 @@ from typing import Any
 from typing import List
 from typing import Literal
 from typing import Optional
+from typing import Union
 
 import click
 from fastapi import FastAPI
@@ -55,6 +56,7 @@ from ..agents.live_request_queue import LiveRequest
 from ..agents.live_request_queue import LiveRequestQueue
 from ..agents.llm_agent import Agent
 from ..agents.run_config import StreamingMode
+from ..artifacts.file_artifact_service import FileArtifactService
 from ..artifacts.gcs_artifact_service import GcsArtifactService
 from ..artifacts.in_memory_artifact_service import InMemoryArtifactService
 from ..errors.not_found_error import NotFoundError
@@ -69,6 +71,12 @@ from ..evaluation.local_eval_sets_manager import LocalEvalSetsManager
 from ..events.event import Event
 from ..memory.in_memory_memory_service import InMemoryMemoryService
 from ..runners import Runner
+from ..sessions.base_session_service import GetSessionConfig
+from ..sessions.base_session_service import ListEventsConfig
+from ..sessions.base_session_service import ListEventsResponse
+from ..sessions.base_session_service import ListSessionsConfig
+from ..sessions.base_session_service import ListSessionsResponse
+from ..sessions.cached_session_service import CachedSessionService
 from ..sessions.database_session_service import DatabaseSessionService
 from ..sessions.in_memory_session_service import InMemorySessionService
 from ..sessions.session import Session
@@ -198,6 +206,7 @@ def get_fast_api_app(
     allow_origins: Optional[list[str]] = None,
     web: bool,
     trace_to_cloud: bool = False,
+    cache_sessions: bool = False,
     lifespan: Optional[Lifespan[FastAPI]] = None,
 ) -> FastAPI:
   # InMemory tracing dict.
@@ -274,6 +283,11 @@ def get_fast_api_app(
       )
     else:
       session_service = DatabaseSessionService(db_url=session_db_url)
+      if cache_sessions:
+        # Requests read the same session several times, e.g. in `/run` and
+        # then in the runner. Only safe with a single server, as the cached
+        # app and user state isn't validated against the database.
+        session_service = CachedSessionService(session_service)
   else:
     session_service = InMemorySessionService()
 
@@ -282,6 +296,9 @@ def get_fast_api_app(
     if artifact_storage_uri.startswith("gs://"):
       gcs_bucket = artifact_storage_uri.split("://")[1]
       artifact_service = GcsArtifactService(bucket_name=gcs_bucket)
+    elif artifact_storage_uri.startswith("file://"):
+      artifact_dir = artifact_storage_uri.split("://")[1]
+      artifact_service = FileArtifactService(root_dir=artifact_dir)
     else:
       raise click.ClickException(
           "Unsupported artifact storage URI: %s" % artifact_storage_uri
@@ -339,12 +356,22 @@ def get_fast_api_app(
       response_model_exclude_none=True,
   )
   async def get_session(
-      app_name: str, user_id: str, session_id: str
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      num_recent_events: Optional[int] = Query(default=None, ge=1),
+      after_timestamp: Optional[float] = None,
   ) -> Session:
     # Connect to managed session if agent_engine_id is set.
     app_name = agent_engine_id if agent_engine_id else app_name
     session = await session_service.get_session(
-        app_name=app_name, user_id=user_id, session_id=session_id
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+        config=GetSessionConfig(
+            num_recent_events=num_recent_events,
+            after_timestamp=after_timestamp,
+        ),
     )
     if not session:
       raise HTTPException(status_code=404, detail="Session not found")
@@ -354,18 +381,103 @@ def get_fast_api_app(
       "/apps/{app_name}/users/{user_id}/sessions",
       response_model_exclude_none=True,
   )
-  async def list_sessions(app_name: str, user_id: str) -> list[Session]:
+  async def list_sessions(
+      app_name: str,
+      user_id: str,
+      page_size: Optional[int] = Query(default=None, ge=1, le=1000),
+      page_token: Optional[str] = None,
+      include_event_count: bool = False,
+      include_last_event: bool = False,
+  ) -> Union[list[Session], ListSessionsResponse]:
+    """Lists the sessions of a user.
+
+    With `page_size` or `page_token`, a page of sessions is returned, the most
+    recently updated first, with the token of the next page. Otherwise, all
+    the sessions are returned.
+
+    Sessions generated as a part of Eval are removed, so a page can have fewer
+    sessions than `page_size` even if it isn't the last one.
+    """
     # Connect to managed session if agent_engine_id is set.
     app_name = agent_engine_id if agent_engine_id else app_name
-    list_sessions_response = await session_service.list_sessions(
-        app_name=app_name, user_id=user_id
-    )
-    return [
+    if page_size is None and page_token is None:
+      list_sessions_response = await session_service.list_sessions(
+          app_name=app_name, user_id=user_id
+      )
+      return [
+          session
+          for session in list_sessions_response.sessions
+          # Remove sessions that were generated as a part of Eval.
+          if not session.id.startswith(EVAL_SESSION_ID_PREFIX)
+      ]
+
+    try:
+      response = await session_service.list_sessions_page(
+          app_name=app_name,
+          user_id=user_id,
+          config=ListSessionsConfig(
+              page_size=page_size or 100,
+              page_token=page_token,
+              include_event_count=include_event_count,
+              include_last_event=include_last_event,
+          ),
+      )
+    except ValueError as e:
+      raise HTTPException(status_code=400, detail=str(e)) from e
+    response.sessions = [
         session
-        for session in list_sessions_response.sessions
-        # Remove sessions that were generated as a part of Eval.
+        for session in response.sessions
         if not session.id.startswith(EVAL_SESSION_ID_PREFIX)
     ]
+    if response.event_counts is not None:
+      response.event_counts = {
+          session.id: response.event_counts[session.id]
+          for session in response.sessions
+          if session.id in response.event_counts
+      }
+    return response
+
+  @app.get(
+      "/apps/{app_name}/users/{user_id}/sessions/{session_id}/events",
+      response_model_exclude_none=True,
+  )
+  async def list_events(
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      page_size: int = Query(default=100, ge=1, le=1000),
+      page_token: Optional[str] = None,
+      author: Optional[list[str]] = Query(default=None),
+      after_timestamp: Optional[float] = None,
+      before_timestamp: Optional[float] = None,
+      has_function_calls: Optional[bool] = None,
+  ) -> ListEventsResponse:
+    """Lists a page of the events of a session, the oldest first."""
+    # Connect to managed session if agent_engine_id is set.
+    app_name = agent_engine_id if agent_engine_id else app_name
+    if (
+        await session_service.get_session_version(
+            app_name=app_name, user_id=user_id, session_id=session_id
+        )
+        is None
+    ):
+      raise HTTPException(status_code=404, detail="Session not found")
+    try:
+      return await session_service.list_events(
+          app_name=app_name,
+          user_id=user_id,
+          session_id=session_id,
+          config=ListEventsConfig(
+              page_size=page_size,
+              page_token=page_token,
+              authors=author,
+              after_timestamp=after_timestamp,
+              before_timestamp=before_timestamp,
+              has_function_calls=has_function_calls,
+          ),
+      )
+    except ValueError as e:
+      raise HTTPException(status_code=400, detail=str(e)) from e
 
   @app.post(
       "/apps/{app_name}/users/{user_id}/sessions/{session_id}",
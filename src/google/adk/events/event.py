@@ -16,16 +16,26 @@ from __future__ import annotations
 from datetime import datetime
 import random
 import string
+from typing import Any
 from typing import Optional
 
 from google.genai import types
 from pydantic import alias_generators
 from pydantic import ConfigDict
 from pydantic import Field
+from pydantic import model_serializer
+from pydantic import PrivateAttr
+from pydantic import SerializerFunctionWrapHandler
 
 from ..models.llm_response import LlmResponse
 from .event_actions import EventActions
 
+_LAZY_FIELD_TYPES = {
+    'content': types.Content,
+    'grounding_metadata': types.GroundingMetadata,
+}
+"""Fields that can be validated lazily, mapped to their types."""
+
 
 class Event(LlmResponse):
   """Represents an event in a conversation between agents and users.
@@ -86,12 +96,82 @@ class Event(LlmResponse):
   timestamp: float = Field(default_factory=lambda: datetime.now().timestamp())
   """The timestamp of the event."""
 
+  _raw_fields: dict[str, Any] = PrivateAttr(default_factory=dict)
+  """The raw JSON of fields whose validation is deferred to the first access."""
+
   def model_post_init(self, __context):
     """Post initialization logic for the event."""
     # Generates a random ID for the event.
     if not self.id:
       self.id = Event.new_id()
 
+  @classmethod
+  def with_lazy_fields(cls, raw_fields: dict[str, Any], **kwargs: Any) -> Event:
+    """Creates an event whose `content` and `grounding_metadata` are lazy.
+
+    The given raw JSON is only validated when the field is first accessed,
+    compared or serialized. Session services use this so that loading a long
+    history doesn't pay for validating contents that are never read.
+
+    Args:
+      raw_fields: The raw JSON dictionaries, keyed by field name.
+      **kwargs: The other fields of the event.
+
+    Returns:
+      The event.
+    """
+    event = cls(**kwargs)
+    for name, raw in raw_fields.items():
+      if name not in _LAZY_FIELD_TYPES:
+        raise ValueError(f'Field {name} can not be validated lazily.')
+      if raw:
+        # A field missing from __dict__ is resolved by __getattr__.
+        event.__dict__.pop(name)
+        event._raw_fields[name] = raw
+        # The field is set, as if it was validated with the others.
+        event.__pydantic_fields_set__.add(name)
+    return event
+
+  def __getattr__(self, name: str) -> Any:
+    # Only called for attributes missing from __dict__, which for fields means
+    # their validation has been deferred.
+    if name in _LAZY_FIELD_TYPES:
+      raw_fields = self.__pydantic_private__.get('_raw_fields')
+      if raw_fields and name in raw_fields:
+        value = _LAZY_FIELD_TYPES[name].model_validate(raw_fields[name])
+        # Keeps the field order, which determines the serialization order.
+        values = {**self.__dict__, name: value}
+        object.__setattr__(
+            self,
+            '__dict__',
+            {k: values[k] for k in type(self).model_fields if k in values},
+        )
+        # Copies of this event may share the dict, so it is replaced instead of
+        # being mutated.
+        self._raw_fields = {k: v for k, v in raw_fields.items() if k != name}
+        return value
+    return super().__getattr__(name)
+
+  def _hydrate(self) -> None:
+    """Validates all the fields whose validation has been deferred."""
+    for name in list(self._raw_fields):
+      getattr(self, name)
+
+  @model_serializer(mode='wrap')
+  def _serialize(self, handler: SerializerFunctionWrapHandler):
+    self._hydrate()
+    return handler(self)
+
+  def __repr_args__(self):
+    self._hydrate()
+    return super().__repr_args__()
+
+  def __eq__(self, other: Any) -> bool:
+    if isinstance(other, Event):
+      self._hydrate()
+      other._hydrate()
+    return super().__eq__(other)
+
   def is_final_response(self) -> bool:
     """Returns whether the event is the final response of the agent."""
     if self.actions.skip_summarization or self.long_running_tool_ids:
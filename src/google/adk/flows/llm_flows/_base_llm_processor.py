@@ -13,11 +13,13 @@
 # limitations under the License.
 
 """Defines the processor interface used for BaseLlmFlow."""
+
 from __future__ import annotations
 
 from abc import ABC
 from abc import abstractmethod
 from typing import AsyncGenerator
+from typing import Optional
 from typing import TYPE_CHECKING
 
 from ...agents.invocation_context import InvocationContext
@@ -29,7 +31,25 @@ if TYPE_CHECKING:
 
 
 class BaseLlmRequestProcessor(ABC):
-  """Base class for LLM request processor."""
+  """Base class for LLM request processor.
+
+  Processors that declare the parts of the request they read and write run
+  concurrently with the processors and tools they don't conflict with. A part
+  is a field of `LlmRequest`, e.g. `contents`, or a subfield, e.g.
+  `config.system_instruction`, or `session` for the session of the
+  invocation. Conflicting processors run in order, so the request is built
+  the same way whatever the timing.
+  """
+
+  reads: Optional[frozenset[str]] = None
+  """The parts the processor reads, or None for any part."""
+
+  writes: Optional[frozenset[str]] = None
+  """The parts the processor writes, or None for any part.
+
+  Processors writing any part run alone, after the previous processors, and
+  the events they yield are seen by the next ones.
+  """
 
   @abstractmethod
   async def run_async(
@@ -0,0 +1,164 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Runs the request processors and tool preprocessors concurrently.
+
+Each step declares the parts of the request it reads and writes. A step waits
+for the previous steps it conflicts with, i.e. that write a part it reads or
+writes, or read a part it writes, so conflicting steps run in their declared
+order. Steps that don't declare the parts they write are barriers: they run
+alone, once all the previous steps are done.
+
+The events of the concurrent steps are yielded in the order of the steps, once
+all of them are done.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+from typing import AsyncGenerator
+from typing import AsyncIterable
+from typing import Callable
+from typing import Optional
+from typing import TYPE_CHECKING
+
+from ...events.event import Event
+from ...tools.base_tool import BaseTool
+from ...tools.tool_context import ToolContext
+
+if TYPE_CHECKING:
+  from ...agents.invocation_context import InvocationContext
+  from ...models.llm_request import LlmRequest
+  from ._base_llm_processor import BaseLlmRequestProcessor
+
+# The parts written by the default implementation of `process_llm_request`.
+_DEFAULT_TOOL_WRITES = frozenset({'config.tools', 'tools_dict'})
+
+
+@dataclasses.dataclass
+class PreprocessingStep:
+  """A request processor, or the preprocessor of a tool."""
+
+  reads: Optional[frozenset[str]]
+  writes: Optional[frozenset[str]]
+  run: Callable[[], AsyncGenerator[Event, None]]
+
+
+def processor_step(
+    processor: BaseLlmRequestProcessor,
+    invocation_context: InvocationContext,
+    llm_request: LlmRequest,
+) -> PreprocessingStep:
+  return PreprocessingStep(
+      reads=processor.reads,
+      writes=processor.writes,
+      run=lambda: processor.run_async(invocation_context, llm_request),
+  )
+
+
+def tool_step(
+    tool: BaseTool,
+    invocation_context: InvocationContext,
+    llm_request: LlmRequest,
+) -> PreprocessingStep:
+  reads, writes = tool.llm_request_reads, tool.llm_request_writes
+  if (
+      writes is None
+      and type(tool).process_llm_request is BaseTool.process_llm_request
+  ):
+    reads, writes = frozenset(), _DEFAULT_TOOL_WRITES
+
+  async def run() -> AsyncGenerator[Event, None]:
+    await tool.process_llm_request(
+        tool_context=ToolContext(invocation_context), llm_request=llm_request
+    )
+    return
+    yield  # AsyncGenerator requires a yield in function body.
+
+  return PreprocessingStep(reads=reads, writes=writes, run=run)
+
+
+def _overlap(parts: frozenset[str], other_parts: frozenset[str]) -> bool:
+  """Whether two sets of parts share a part, or a part and its subpart."""
+  return any(
+      part == other
+      or part.startswith(other + '.')
+      or other.startswith(part + '.')
+      for part in parts
+      for other in other_parts
+  )
+
+
+def _reads_overlap(
+    reads: Optional[frozenset[str]], writes: frozenset[str]
+) -> bool:
+  if reads is None:
+    return bool(writes)
+  return _overlap(reads, writes)
+
+
+def _conflict(step: PreprocessingStep, other: PreprocessingStep) -> bool:
+  if step.writes is None or other.writes is None:
+    return True
+  return (
+      _overlap(step.writes, other.writes)
+      or _reads_overlap(other.reads, step.writes)
+      or _reads_overlap(step.reads, other.writes)
+  )
+
+
+async def _run_after(
+    predecessors: list[asyncio.Task[list[Event]]], step: PreprocessingStep
+) -> list[Event]:
+  await asyncio.gather(*predecessors)
+  return [event async for event in step.run()]
+
+
+async def run_steps(
+    steps: AsyncIterable[PreprocessingStep],
+) -> AsyncGenerator[Event, None]:
+  """Runs the steps concurrently, yielding their events in order.
+
+  Args:
+    steps: The steps, in their declared order. The next step is only read
+      once the previous barriers are done.
+
+  Yields:
+    The events of the steps.
+  """
+  pending: list[tuple[PreprocessingStep, asyncio.Task[list[Event]]]] = []
+
+  async def drain() -> list[Event]:
+    results = await asyncio.gather(*(task for _, task in pending))
+    pending.clear()
+    return [event for events in results for event in events]
+
+  try:
+    async for step in steps:
+      if step.writes is None:
+        for event in await drain():
+          yield event
+        async for event in step.run():
+          yield event
+        continue
+      predecessors = [task for other, task in pending if _conflict(step, other)]
+      pending.append(
+          (step, asyncio.create_task(_run_after(predecessors, step)))
+      )
+    for event in await drain():
+      yield event
+  finally:
+    for _, task in pending:
+      task.cancel()
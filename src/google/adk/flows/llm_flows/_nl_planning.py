@@ -41,6 +41,9 @@ if TYPE_CHECKING:
 class _NlPlanningRequestProcessor(BaseLlmRequestProcessor):
   """Processor for NL planning."""
 
+  reads = frozenset({'session', 'contents', 'config'})
+  writes = frozenset({'contents', 'config'})
+
   async def run_async(
       self, invocation_context: InvocationContext, llm_request: LlmRequest
   ) -> AsyncGenerator[Event, None]:
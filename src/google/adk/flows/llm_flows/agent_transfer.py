@@ -37,6 +37,11 @@ if typing.TYPE_CHECKING:
 class _AgentTransferLlmRequestProcessor(BaseLlmRequestProcessor):
   """Agent transfer request processor."""
 
+  reads = frozenset()
+  writes = frozenset(
+      {'config.system_instruction', 'config.tools', 'tools_dict'}
+  )
+
   @override
   async def run_async(
       self, invocation_context: InvocationContext, llm_request: LlmRequest
@@ -41,7 +41,12 @@ from ...models.llm_response import LlmResponse
 from ...telemetry import trace_call_llm
 from ...telemetry import trace_send_data
 from ...telemetry import tracer
-from ...tools.tool_context import ToolContext
+from ...tools.base_tool import BaseTool
+from ...tools.read_tool_response_tool import read_tool_response_tool
+from ._concurrent_preprocessing import PreprocessingStep
+from ._concurrent_preprocessing import processor_step
+from ._concurrent_preprocessing import run_steps
+from ._concurrent_preprocessing import tool_step
 
 if TYPE_CHECKING:
   from ...agents.llm_agent import LlmAgent
@@ -54,6 +59,21 @@ logger = logging.getLogger('google_adk.' + __name__)
 _ADK_AGENT_NAME_LABEL_KEY = 'adk_agent_name'
 
 
+def _needs_read_tool_response(
+    invocation_context: InvocationContext, tools: list[BaseTool]
+) -> bool:
+  """Whether function responses may be offloaded without a tool to read them."""
+  if invocation_context.artifact_service is None:
+    return False
+  if any(tool.name == read_tool_response_tool.name for tool in tools):
+    return False
+  run_config = invocation_context.run_config
+  return (
+      run_config is not None
+      and run_config.max_function_response_chars is not None
+  ) or any(tool.max_response_chars is not None for tool in tools)
+
+
 class BaseLlmFlow(ABC):
   """A basic flow that calls the LLM in a loop until a final response is generated.
 
@@ -331,19 +351,24 @@ class BaseLlmFlow(ABC):
     if not isinstance(agent, LlmAgent):
       return
 
-    # Runs processors.
-    for processor in self.request_processors:
-      async for event in processor.run_async(invocation_context, llm_request):
-        yield event
+    async def steps() -> AsyncGenerator[PreprocessingStep, None]:
+      # Runs processors.
+      for processor in self.request_processors:
+        yield processor_step(processor, invocation_context, llm_request)
+
+      # Run processors for tools.
+      tools = await agent.canonical_tools(ReadonlyContext(invocation_context))
+      for tool in tools:
+        yield tool_step(tool, invocation_context, llm_request)
+      # The model reads the offloaded function responses with this tool.
+      if _needs_read_tool_response(invocation_context, tools):
+        yield tool_step(
+            read_tool_response_tool, invocation_context, llm_request
+        )
 
-    # Run processors for tools.
-    for tool in await agent.canonical_tools(
-        ReadonlyContext(invocation_context)
-    ):
-      tool_context = ToolContext(invocation_context)
-      await tool.process_llm_request(
-          tool_context=tool_context, llm_request=llm_request
-      )
+    # Independent processors and tools run concurrently.
+    async for event in run_steps(steps()):
+      yield event
 
   async def _postprocess_async(
       self,
@@ -30,6 +30,9 @@ from ._base_llm_processor import BaseLlmRequestProcessor
 
 class _BasicLlmRequestProcessor(BaseLlmRequestProcessor):
 
+  reads = frozenset()
+  writes = frozenset({'model', 'config', 'live_connect_config'})
+
   @override
   async def run_async(
       self, invocation_context: InvocationContext, llm_request: LlmRequest
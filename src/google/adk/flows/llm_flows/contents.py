@@ -23,6 +23,7 @@ from google.genai import types
 from typing_extensions import override
 
 from ...agents.invocation_context import InvocationContext
+from ...artifacts.blob_references import resolve_blob_references
 from ...events.event import Event
 from ...models.llm_request import LlmRequest
 from ._base_llm_processor import BaseLlmRequestProcessor
@@ -33,6 +34,9 @@ from .functions import REQUEST_EUC_FUNCTION_CALL_NAME
 class _ContentLlmRequestProcessor(BaseLlmRequestProcessor):
   """Builds the contents for the LLM request."""
 
+  reads = frozenset({'session'})
+  writes = frozenset({'contents'})
+
   @override
   async def run_async(
       self, invocation_context: InvocationContext, llm_request: LlmRequest
@@ -44,11 +48,22 @@ class _ContentLlmRequestProcessor(BaseLlmRequestProcessor):
       return
 
     if agent.include_contents != 'none':
+      events = invocation_context.session.events
+      if agent.max_history_events:
+        events = _get_recent_events(events, agent.max_history_events)
       llm_request.contents = _get_contents(
           invocation_context.branch,
-          invocation_context.session.events,
+          events,
           agent.name,
       )
+      # Blobs moved out of the session events are only loaded when sent.
+      await resolve_blob_references(
+          llm_request.contents,
+          artifact_service=invocation_context.artifact_service,
+          app_name=invocation_context.app_name,
+          user_id=invocation_context.user_id,
+          session_id=invocation_context.session.id,
+      )
 
     # Maintain async generator behavior
     if False:  # Ensures it behaves as a generator
@@ -58,6 +73,33 @@ class _ContentLlmRequestProcessor(BaseLlmRequestProcessor):
 request_processor = _ContentLlmRequestProcessor()
 
 
+def _get_recent_events(events: list[Event], max_events: int) -> list[Event]:
+  """Gets the recent events, along with the function calls they respond to.
+
+  The window of recent events is extended to the past until each function
+  response in it has its function call, as the model rejects function responses
+  without function calls.
+  """
+  start = max(len(events) - max_events, 0)
+  missing_ids = set()
+  for event in events[start:]:
+    missing_ids.update(
+        function_response.id
+        for function_response in event.get_function_responses()
+    )
+  for event in events[start:]:
+    missing_ids.difference_update(
+        function_call.id for function_call in event.get_function_calls()
+    )
+  missing_ids.discard(None)
+  while missing_ids and start > 0:
+    start -= 1
+    missing_ids.difference_update(
+        function_call.id for function_call in events[start].get_function_calls()
+    )
+  return events[start:]
+
+
 def _rearrange_events_for_async_function_responses_in_history(
     events: list[Event],
 ) -> list[Event]:
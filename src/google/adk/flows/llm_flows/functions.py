@@ -36,6 +36,8 @@ from ...telemetry import trace_merged_tool_calls
 from ...telemetry import trace_tool_call
 from ...telemetry import tracer
 from ...tools.base_tool import BaseTool
+from ...tools.read_tool_response_tool import offload_function_response
+from ...tools.read_tool_response_tool import ReadToolResponseTool
 from ...tools.tool_context import ToolContext
 
 AF_FUNCTION_CALL_ID_PREFIX = 'adk-'
@@ -187,6 +189,9 @@ async def handle_function_calls_async(
         if not function_response:
           continue
 
+      function_response = await _offload_function_response(
+          tool, function_response, tool_context, invocation_context
+      )
       # Builds the function response event.
       function_response_event = __build_response_event(
           tool, function_response, tool_context, invocation_context
@@ -281,6 +286,9 @@ async def handle_function_calls_live(
         if not function_response:
           continue
 
+      function_response = await _offload_function_response(
+          tool, function_response, tool_context, invocation_context
+      )
       # Builds the function response event.
       function_response_event = __build_response_event(
           tool, function_response, tool_context, invocation_context
@@ -450,6 +458,34 @@ async def __call_tool_async(
   return await tool.run_async(args=args, tool_context=tool_context)
 
 
+async def _offload_function_response(
+    tool: BaseTool,
+    function_response: Any,
+    tool_context: ToolContext,
+    invocation_context: InvocationContext,
+) -> Any:
+  """Offloads the response to an artifact if it's larger than the limit."""
+  max_chars = tool.max_response_chars
+  if max_chars is None and invocation_context.run_config:
+    max_chars = invocation_context.run_config.max_function_response_chars
+  if max_chars is None or isinstance(tool, ReadToolResponseTool):
+    return function_response
+  if not invocation_context.artifact_service:
+    logger.warning(
+        'Cannot offload the response of tool %s without an artifact service.',
+        tool.name,
+    )
+    return function_response
+  if not isinstance(function_response, dict):
+    function_response = {'result': function_response}
+  return await offload_function_response(
+      function_response,
+      tool_name=tool.name,
+      tool_context=tool_context,
+      max_chars=max_chars,
+  )
+
+
 def __build_response_event(
     tool: BaseTool,
     function_result: dict[str, object],
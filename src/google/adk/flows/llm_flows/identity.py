@@ -29,6 +29,9 @@ from ._base_llm_processor import BaseLlmRequestProcessor
 class _IdentityLlmRequestProcessor(BaseLlmRequestProcessor):
   """Gives the agent identity from the framework."""
 
+  reads = frozenset()
+  writes = frozenset({'config.system_instruction'})
+
   @override
   async def run_async(
       self, invocation_context: InvocationContext, llm_request: LlmRequest
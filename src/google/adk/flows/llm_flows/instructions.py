@@ -37,6 +37,9 @@ if TYPE_CHECKING:
 class _InstructionsLlmRequestProcessor(BaseLlmRequestProcessor):
   """Handles instructions and global instructions for LLM flow."""
 
+  reads = frozenset({'session'})
+  writes = frozenset({'config.system_instruction'})
+
   @override
   async def run_async(
       self, invocation_context: InvocationContext, llm_request: LlmRequest
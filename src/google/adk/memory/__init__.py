@@ -15,14 +15,26 @@ import logging
 
 from .base_memory_service import BaseMemoryService
 from .in_memory_memory_service import InMemoryMemoryService
+from .memory_ingestion_queue import MemoryIngestionQueue
 
 logger = logging.getLogger('google_adk.' + __name__)
 
 __all__ = [
     'BaseMemoryService',
     'InMemoryMemoryService',
+    'MemoryIngestionQueue',
 ]
 
+try:
+  from .local_vector_memory_service import LocalVectorMemoryService
+
+  __all__.append('LocalVectorMemoryService')
+except ImportError:
+  logger.debug(
+      'NumPy is not installed. If you want to use the LocalVectorMemoryService'
+      ' please install it. If not, you can ignore this warning.'
+  )
+
 try:
   from .vertex_ai_rag_memory_service import VertexAiRagMemoryService
 
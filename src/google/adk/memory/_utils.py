@@ -16,8 +16,43 @@
 from __future__ import annotations
 
 from datetime import datetime
+from typing import Container
+from typing import Optional
+from typing import Sequence
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+  from ..events.event import Event
 
 
 def format_timestamp(timestamp: float) -> str:
   """Formats the timestamp of the memory entry."""
   return datetime.fromtimestamp(timestamp).isoformat()
+
+
+def events_after_watermark(
+    events: Sequence[Event],
+    watermark: Optional[float],
+    ingested_event_ids: Container[str],
+) -> list[Event]:
+  """Returns the events of a session that were not ingested yet.
+
+  Args:
+    events: The events of the session, in chronological order. They may only
+      be the most recent ones.
+    watermark: The timestamp of the last ingested event of the session, or None
+      if none was ingested.
+    ingested_event_ids: The ids of the ingested events, which must include the
+      ones at the watermark.
+
+  Returns:
+    The events from the watermark on that were not ingested. Only these events
+    are visited, so ingesting a session after every turn costs a constant time
+    per turn.
+  """
+  start = len(events)
+  while start > 0 and (
+      watermark is None or events[start - 1].timestamp >= watermark
+  ):
+    start -= 1
+  return [e for e in events[start:] if e.id not in ingested_event_ids]
@@ -17,6 +17,7 @@ from __future__ import annotations
 
 from abc import ABC
 from abc import abstractmethod
+from typing import Sequence
 from typing import TYPE_CHECKING
 
 from pydantic import BaseModel
@@ -58,6 +59,18 @@ class BaseMemoryService(ABC):
         session: The session to add.
     """
 
+  async def add_sessions_to_memory(self, sessions: Sequence[Session]):
+    """Adds a batch of sessions to the memory service.
+
+    The default implementation adds the sessions one at a time. Services that
+    can ingest several sessions at once should override it.
+
+    Args:
+        sessions: The sessions to add.
+    """
+    for session in sessions:
+      await self.add_session_to_memory(session)
+
   @abstractmethod
   async def search_memory(
       self,
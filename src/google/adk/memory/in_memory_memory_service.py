@@ -15,7 +15,12 @@
 
 from __future__ import annotations
 
+import collections
+import dataclasses
+import heapq
+import math
 import re
+from typing import Optional
 from typing import TYPE_CHECKING
 
 from typing_extensions import override
@@ -29,66 +34,136 @@ if TYPE_CHECKING:
   from ..events.event import Event
   from ..sessions.session import Session
 
+# Sequences of Unicode letters and digits.
+_WORD_PATTERN = re.compile(r'[^\W_]+')
+
 
 def _user_key(app_name: str, user_id: str):
   return f'{app_name}/{user_id}'
 
 
-def _extract_words_lower(text: str) -> set[str]:
-  """Extracts words from a string and converts them to lowercase."""
-  return set([word.lower() for word in re.findall(r'[A-Za-z]+', text)])
+def _tokenize(text: str) -> list[str]:
+  """Splits a text into case-folded words, in any script."""
+  return _WORD_PATTERN.findall(text.casefold())
+
+
+@dataclasses.dataclass
+class _Document:
+  event: Event
+  length: int
+
+
+class _UserIndex:
+  """An inverted index of the events of a user."""
+
+  def __init__(self):
+    self.documents: dict[str, _Document] = {}
+    """Keys are event ids."""
+    self.postings: dict[str, dict[str, int]] = collections.defaultdict(dict)
+    """Keys are terms, then event ids. Values are term frequencies."""
+    self.session_watermarks: dict[str, float] = {}
+    """The timestamps of the last ingested events of the sessions."""
+    self.total_length = 0
+
+  def add_session(self, session: Session) -> None:
+    """Indexes the events of a session added since the last time."""
+    watermark = self.session_watermarks.get(session.id)
+    for event in _utils.events_after_watermark(
+        session.events, watermark, self.documents
+    ):
+      if event.content and event.content.parts:
+        self._add(event)
+    if session.events:
+      last_timestamp = session.events[-1].timestamp
+      self.session_watermarks[session.id] = (
+          last_timestamp
+          if watermark is None
+          else max(watermark, last_timestamp)
+      )
+
+  def _add(self, event: Event) -> None:
+    terms = _tokenize(
+        ' '.join(part.text for part in event.content.parts if part.text)
+    )
+    frequencies = collections.Counter(terms)
+    self.documents[event.id] = _Document(event=event, length=len(terms))
+    self.total_length += len(terms)
+    for term, frequency in frequencies.items():
+      self.postings[term][event.id] = frequency
 
 
 class InMemoryMemoryService(BaseMemoryService):
   """An in-memory memory service for prototyping purpose only.
 
-  Uses keyword matching instead of semantic search.
+  Uses BM25 keyword ranking instead of semantic search. The events are indexed
+  when sessions are added, so a search only visits the events containing one
+  of the words of the query.
   """
 
-  def __init__(self):
-    self._session_events: dict[str, dict[str, list[Event]]] = {}
-    """Keys are app_name/user_id, session_id. Values are session event lists."""
+  def __init__(
+      self, *, top_k: Optional[int] = 10, k1: float = 1.2, b: float = 0.75
+  ):
+    """Initializes the service.
+
+    Args:
+      top_k: The maximum number of memories returned by a search, or None to
+        return every matching memory.
+      k1: The BM25 term frequency saturation.
+      b: The BM25 document length normalization.
+    """
+    self.top_k = top_k
+    self.k1 = k1
+    self.b = b
+    self._indexes: dict[str, _UserIndex] = {}
+    """Keys are app_name/user_id."""
 
   @override
   async def add_session_to_memory(self, session: Session):
     user_key = _user_key(session.app_name, session.user_id)
-    self._session_events[user_key] = self._session_events.get(
-        _user_key(session.app_name, session.user_id), {}
-    )
-    self._session_events[user_key][session.id] = [
-        event
-        for event in session.events
-        if event.content and event.content.parts
-    ]
+    if user_key not in self._indexes:
+      self._indexes[user_key] = _UserIndex()
+    self._indexes[user_key].add_session(session)
 
   @override
   async def search_memory(
       self, *, app_name: str, user_id: str, query: str
   ) -> SearchMemoryResponse:
-    user_key = _user_key(app_name, user_id)
-    if user_key not in self._session_events:
+    index = self._indexes.get(_user_key(app_name, user_id))
+    if not index or not index.documents:
       return SearchMemoryResponse()
 
-    words_in_query = set(query.lower().split())
-    response = SearchMemoryResponse()
+    num_documents = len(index.documents)
+    average_length = index.total_length / num_documents or 1.0
+    scores: dict[str, float] = collections.defaultdict(float)
+    for term in set(_tokenize(query)):
+      postings = index.postings.get(term)
+      if not postings:
+        continue
+      idf = math.log(
+          1 + (num_documents - len(postings) + 0.5) / (len(postings) + 0.5)
+      )
+      for event_id, frequency in postings.items():
+        length = index.documents[event_id].length
+        norm = self.k1 * (1 - self.b + self.b * length / average_length)
+        scores[event_id] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+
+    def rank(event_id: str) -> tuple[float, float]:
+      # Ties go to the most recent events.
+      return scores[event_id], index.documents[event_id].event.timestamp
+
+    if self.top_k is None:
+      event_ids = sorted(scores, key=rank, reverse=True)
+    else:
+      event_ids = heapq.nlargest(self.top_k, scores, key=rank)
 
-    for session_events in self._session_events[user_key].values():
-      for event in session_events:
-        if not event.content or not event.content.parts:
-          continue
-        words_in_event = _extract_words_lower(
-            ' '.join([part.text for part in event.content.parts if part.text])
-        )
-        if not words_in_event:
-          continue
-
-        if any(query_word in words_in_event for query_word in words_in_query):
-          response.memories.append(
-              MemoryEntry(
-                  content=event.content,
-                  author=event.author,
-                  timestamp=_utils.format_timestamp(event.timestamp),
-              )
+    response = SearchMemoryResponse()
+    for event_id in event_ids:
+      event = index.documents[event_id].event
+      response.memories.append(
+          MemoryEntry(
+              content=event.content,
+              author=event.author,
+              timestamp=_utils.format_timestamp(event.timestamp),
           )
-
+      )
     return response
@@ -0,0 +1,548 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""A memory service searching event embeddings stored on the local disk.
+
+The memories of each user are stored in a directory with:
+
+- `meta.json`: the dimension of the vectors and the current generation of the
+  files below, replaced atomically.
+- `vectors.<generation>.f32`: a float32 matrix of the normalized embeddings,
+  one row per event, memory-mapped.
+- `entries.<generation>.jsonl`: an append-only log of the added rows, with the
+  contents of their events, and of the deleted rows, with their session.
+- `centroids.npy`: the centroids of the coarse index, if enabled.
+
+A row is only visible once its entry is written, after its vector, so a crash
+never exposes a partially written row. Deleted rows are skipped by searches,
+and the files are compacted into a new generation once half of the rows are
+deleted.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import json
+import logging
+import os
+from typing import Any
+from typing import Awaitable
+from typing import Callable
+from typing import Optional
+from typing import Sequence
+from typing import TYPE_CHECKING
+from typing import Union
+import urllib.parse
+
+from google.genai import types
+import numpy as np
+from typing_extensions import override
+
+from . import _utils
+from .base_memory_service import BaseMemoryService
+from .base_memory_service import SearchMemoryResponse
+from .memory_entry import MemoryEntry
+
+if TYPE_CHECKING:
+  from ..events.event import Event
+  from ..sessions.session import Session
+
+logger = logging.getLogger('google_adk.' + __name__)
+
+Embeddings = Union[np.ndarray, Sequence[Sequence[float]]]
+Embedder = Callable[[list[str]], Union[Embeddings, Awaitable[Embeddings]]]
+"""Embeds a batch of texts, returning one vector per text."""
+
+_MIN_CAPACITY = 1024
+_MIN_COMPACTION_ROWS = 1024
+# The number of vectors per list below which a coarse index isn't trained.
+_MIN_VECTORS_PER_LIST = 39
+_KMEANS_SAMPLE_PER_LIST = 256
+_KMEANS_ITERATIONS = 10
+
+
+def _event_text(event: Event) -> str:
+  if not event.content or not event.content.parts:
+    return ''
+  return ' '.join(part.text for part in event.content.parts if part.text)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+  norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+  return vectors / np.where(norms == 0, 1, norms)
+
+
+class _VectorStore:
+  """The vectors and entries of the memories of a user."""
+
+  def __init__(self, directory: str, num_lists: Optional[int], chunk_rows: int):
+    self._directory = directory
+    self._num_lists = num_lists
+    self._chunk_rows = chunk_rows
+    self.lock = asyncio.Lock()
+    self.dim: Optional[int] = None
+    self._generation = 0
+    self._trained_size = 0
+    self._vectors: Optional[np.memmap] = None
+    self._capacity = 0
+    self._count = 0
+    self._alive = np.zeros(0, dtype=bool)
+    self._num_deleted = 0
+    self._offsets: list[int] = []
+    """The offsets of the entries of the rows in the entries file."""
+    self._row_keys: list[tuple[str, str]] = []
+    """The session and event ids of the rows."""
+    self.event_rows: dict[str, int] = {}
+    self.session_event_ids: dict[str, set[str]] = {}
+    self.session_watermarks: dict[str, float] = {}
+    """The timestamps of the last ingested events of the sessions."""
+    self._centroids: Optional[np.ndarray] = None
+    self._assignments = np.zeros(0, dtype=np.int32)
+    os.makedirs(directory, exist_ok=True)
+    self._load()
+    self._entries_file = open(self._path('entries', 'jsonl'), 'ab')
+
+  def _path(self, name: str, extension: str) -> str:
+    return os.path.join(
+        self._directory, f'{name}.{self._generation}.{extension}'
+    )
+
+  def _load(self) -> None:
+    meta_path = os.path.join(self._directory, 'meta.json')
+    if not os.path.exists(meta_path):
+      return
+    with open(meta_path, 'r', encoding='utf-8') as f:
+      meta = json.load(f)
+    self.dim = meta['dim']
+    self._generation = meta['generation']
+    self._trained_size = meta.get('trained_size', 0)
+    vectors_path = self._path('vectors', 'f32')
+    if os.path.exists(vectors_path):
+      self._map_vectors(os.path.getsize(vectors_path) // (self.dim * 4))
+
+    entries_path = self._path('entries', 'jsonl')
+    if not os.path.exists(entries_path):
+      return
+    with open(entries_path, 'rb') as f:
+      offset = 0
+      for line in f:
+        try:
+          entry = json.loads(line)
+        except ValueError:
+          # Torn by a crash while it was written.
+          logger.warning('Truncating a torn memory entry in %s.', entries_path)
+          break
+        if entry['op'] == 'add':
+          self._add_row(
+              entry['session_id'],
+              entry['event_id'],
+              entry['timestamp'],
+              offset,
+          )
+        else:
+          self._delete_rows(entry['rows'])
+          if 'session_id' in entry:
+            self._forget_session(entry['session_id'])
+        offset += len(line)
+    if offset != os.path.getsize(entries_path):
+      with open(entries_path, 'r+b') as f:
+        f.truncate(offset)
+
+    centroids_path = os.path.join(self._directory, 'centroids.npy')
+    if self._num_lists and os.path.exists(centroids_path):
+      centroids = np.load(centroids_path)
+      if centroids.shape == (self._num_lists, self.dim):
+        self._centroids = centroids
+        self._assign(0, self._count)
+
+  def _write_meta(self) -> None:
+    meta_path = os.path.join(self._directory, 'meta.json')
+    with open(meta_path + '.tmp', 'w', encoding='utf-8') as f:
+      json.dump(
+          {
+              'dim': self.dim,
+              'generation': self._generation,
+              'trained_size': self._trained_size,
+          },
+          f,
+      )
+      f.flush()
+      os.fsync(f.fileno())
+    os.replace(meta_path + '.tmp', meta_path)
+
+  def _map_vectors(self, capacity: int) -> None:
+    """Maps the vectors file, growing it to the given number of rows."""
+    if self._vectors is not None:
+      self._vectors.flush()
+      self._vectors = None
+    path = self._path('vectors', 'f32')
+    with open(path, 'ab') as f:
+      if f.tell() < capacity * self.dim * 4:
+        f.truncate(capacity * self.dim * 4)
+    self._capacity = capacity
+    if capacity:
+      self._vectors = np.memmap(
+          path, dtype=np.float32, mode='r+', shape=(capacity, self.dim)
+      )
+    alive = np.zeros(capacity, dtype=bool)
+    alive[: len(self._alive)] = self._alive[:capacity]
+    self._alive = alive
+    assignments = np.zeros(capacity, dtype=np.int32)
+    assignments[: len(self._assignments)] = self._assignments[:capacity]
+    self._assignments = assignments
+
+  def _add_row(
+      self, session_id: str, event_id: str, timestamp: float, offset: int
+  ) -> None:
+    row = self._count
+    self._count += 1
+    self._alive[row] = True
+    self._offsets.append(offset)
+    self._row_keys.append((session_id, event_id))
+    self.event_rows[event_id] = row
+    self.session_event_ids.setdefault(session_id, set()).add(event_id)
+    self.advance_watermark(session_id, timestamp)
+
+  def advance_watermark(self, session_id: str, timestamp: float) -> None:
+    watermark = self.session_watermarks.get(session_id, timestamp)
+    self.session_watermarks[session_id] = max(watermark, timestamp)
+
+  def _delete_rows(self, rows: list[int]) -> None:
+    for row in rows:
+      if not self._alive[row]:
+        continue
+      self._alive[row] = False
+      self._num_deleted += 1
+      session_id, event_id = self._row_keys[row]
+      del self.event_rows[event_id]
+      self.session_event_ids[session_id].discard(event_id)
+
+  def add(
+      self,
+      session_id: str,
+      events: list[Event],
+      embeddings: np.ndarray,
+  ) -> None:
+    """Adds the events with their normalized embeddings."""
+    if self.dim is None:
+      self.dim = embeddings.shape[1]
+      self._write_meta()
+    if self._count + len(events) > self._capacity:
+      self._map_vectors(
+          max(self._count + len(events), self._capacity * 2, _MIN_CAPACITY)
+      )
+    start = self._count
+    self._vectors[start : start + len(events)] = embeddings
+    # The entries commit the rows, so the vectors are written first.
+    self._vectors.flush()
+    offset = self._entries_file.tell()
+    lines = []
+    for event in events:
+      line = (
+          json.dumps({
+              'op': 'add',
+              'session_id': session_id,
+              'event_id': event.id,
+              'author': event.author,
+              'timestamp': event.timestamp,
+              'content': event.content.model_dump(
+                  exclude_none=True, mode='json'
+              ),
+          })
+          + '\n'
+      ).encode('utf-8')
+      self._add_row(session_id, event.id, event.timestamp, offset)
+      offset += len(line)
+      lines.append(line)
+    self._entries_file.write(b''.join(lines))
+    self._entries_file.flush()
+
+    if self._centroids is not None:
+      self._assign(start, self._count)
+    self._maybe_train()
+
+  def _forget_session(self, session_id: str) -> None:
+    self.session_event_ids.pop(session_id, None)
+    self.session_watermarks.pop(session_id, None)
+
+  def delete_session(self, session_id: str) -> None:
+    """Deletes the rows of a session, and its watermark."""
+    rows = [
+        self.event_rows[e] for e in self.session_event_ids.get(session_id, ())
+    ]
+    if not rows:
+      self._forget_session(session_id)
+      return
+    # The session is logged so that replaying the log doesn't restore the
+    # watermark set by its rows.
+    entry = {'op': 'delete', 'rows': rows, 'session_id': session_id}
+    self._entries_file.write((json.dumps(entry) + '\n').encode('utf-8'))
+    self._entries_file.flush()
+    self._delete_rows(rows)
+    self._forget_session(session_id)
+    if self._num_deleted >= max(_MIN_COMPACTION_ROWS, self._count // 2):
+      self._compact()
+
+  def search(self, query: np.ndarray, top_k: Optional[int], num_probes: int):
+    """Returns the rows most similar to a normalized query, with scores."""
+    if not self._count:
+      return []
+    best_rows = np.zeros(0, dtype=np.int64)
+    best_scores = np.zeros(0, dtype=np.float32)
+    probes = None
+    if self._centroids is not None:
+      probes = np.argsort(self._centroids @ query)[-num_probes:]
+    for start in range(0, self._count, self._chunk_rows):
+      end = min(start + self._chunk_rows, self._count)
+      mask = self._alive[start:end]
+      if probes is not None:
+        mask = mask & np.isin(self._assignments[start:end], probes)
+      rows = start + np.flatnonzero(mask)
+      if not len(rows):
+        continue
+      if len(rows) == end - start:
+        scores = self._vectors[start:end] @ query
+      else:
+        scores = self._vectors[rows] @ query
+      best_rows = np.concatenate([best_rows, rows])
+      best_scores = np.concatenate([best_scores, scores])
+      if top_k is not None and len(best_rows) > top_k:
+        keep = np.argpartition(-best_scores, top_k)[:top_k]
+        best_rows, best_scores = best_rows[keep], best_scores[keep]
+    order = np.argsort(-best_scores, kind='stable')
+    return [(int(best_rows[i]), float(best_scores[i])) for i in order]
+
+  def read_entry(self, row: int) -> dict[str, Any]:
+    with open(self._path('entries', 'jsonl'), 'rb') as f:
+      f.seek(self._offsets[row])
+      return json.loads(f.readline())
+
+  def _assign(self, start: int, end: int) -> None:
+    """Assigns rows to the list of their nearest centroid."""
+    for chunk_start in range(start, end, self._chunk_rows):
+      chunk_end = min(chunk_start + self._chunk_rows, end)
+      self._assignments[chunk_start:chunk_end] = np.argmax(
+          self._vectors[chunk_start:chunk_end] @ self._centroids.T, axis=1
+      )
+
+  def _maybe_train(self) -> None:
+    """Trains the coarse index once there are enough vectors, or 4x more."""
+    num_alive = self._count - self._num_deleted
+    if (
+        not self._num_lists
+        or num_alive < self._num_lists * _MIN_VECTORS_PER_LIST
+        or (self._centroids is not None and num_alive < 4 * self._trained_size)
+    ):
+      return
+    rng = np.random.default_rng(0)
+    alive_rows = np.flatnonzero(self._alive[: self._count])
+    sample = np.asarray(
+        self._vectors[
+            np.sort(
+                rng.choice(
+                    alive_rows,
+                    size=min(
+                        len(alive_rows),
+                        self._num_lists * _KMEANS_SAMPLE_PER_LIST,
+                    ),
+                    replace=False,
+                )
+            )
+        ]
+    )
+    centroids = sample[
+        rng.choice(len(sample), size=self._num_lists, replace=False)
+    ]
+    for _ in range(_KMEANS_ITERATIONS):
+      assignments = np.argmax(sample @ centroids.T, axis=1)
+      for i in range(self._num_lists):
+        members = sample[assignments == i]
+        if len(members):
+          centroids[i] = members.mean(axis=0)
+      centroids = _normalize(centroids)
+    self._centroids = centroids.astype(np.float32)
+    self._trained_size = num_alive
+    centroids_path = os.path.join(self._directory, 'centroids.npy')
+    with open(centroids_path + '.tmp', 'wb') as f:
+      np.save(f, self._centroids)
+    os.replace(centroids_path + '.tmp', centroids_path)
+    self._write_meta()
+    self._assign(0, self._count)
+
+  def _compact(self) -> None:
+    """Rewrites the alive rows into the files of a new generation."""
+    alive_rows = np.flatnonzero(self._alive[: self._count])
+    entries = [self.read_entry(int(row)) for row in alive_rows]
+    vectors = np.asarray(self._vectors[alive_rows])
+    old_paths = [self._path('vectors', 'f32'), self._path('entries', 'jsonl')]
+    self._entries_file.close()
+    self._vectors = None
+
+    self._generation += 1
+    with open(self._path('entries', 'jsonl'), 'wb') as f:
+      for entry in entries:
+        f.write((json.dumps(entry) + '\n').encode('utf-8'))
+    vectors.tofile(self._path('vectors', 'f32'))
+    self._write_meta()
+    for path in old_paths:
+      os.remove(path)
+
+    self._capacity = 0
+    self._count = 0
+    self._num_deleted = 0
+    self._alive = np.zeros(0, dtype=bool)
+    self._assignments = np.zeros(0, dtype=np.int32)
+    self._offsets = []
+    self._row_keys = []
+    self.event_rows = {}
+    self.session_event_ids = {}
+    self.session_watermarks = {}
+    self._load()
+    self._entries_file = open(self._path('entries', 'jsonl'), 'ab')
+
+  def close(self) -> None:
+    if self._vectors is not None:
+      self._vectors.flush()
+      self._vectors = None
+    self._entries_file.close()
+
+
+class LocalVectorMemoryService(BaseMemoryService):
+  """A memory service doing semantic search over locally stored embeddings.
+
+  The text of each event is embedded with the given embedder, e.g. a
+  sentence-transformers model, and searches return the events whose
+  embeddings have the highest cosine similarity with the query's.
+
+  Searches compare the query with every vector of the user, in batches, by
+  default. For large corpora, set `num_lists` to train a coarse index, which
+  partitions the vectors into lists by nearest centroid and only compares the
+  query with the vectors of its `num_probes` nearest lists.
+  """
+
+  def __init__(
+      self,
+      root_dir: str,
+      embedder: Embedder,
+      *,
+      top_k: Optional[int] = 10,
+      num_lists: Optional[int] = None,
+      num_probes: int = 8,
+      chunk_rows: int = 65536,
+  ):
+    """Initializes the service.
+
+    Args:
+      root_dir: The directory storing the memories.
+      embedder: A function, or a coroutine function, embedding a batch of
+        texts.
+      top_k: The maximum number of memories returned by a search, or None to
+        return every memory.
+      num_lists: If set, the number of lists of the coarse index.
+      num_probes: The number of lists searched when the coarse index is used.
+      chunk_rows: The number of vectors compared with a query at a time.
+    """
+    self.root_dir = root_dir
+    self.embedder = embedder
+    self.top_k = top_k
+    self.num_lists = num_lists
+    self.num_probes = num_probes
+    self.chunk_rows = chunk_rows
+    self._stores: dict[tuple[str, str], _VectorStore] = {}
+
+  def _get_store(self, app_name: str, user_id: str) -> _VectorStore:
+    key = (app_name, user_id)
+    if key not in self._stores:
+      self._stores[key] = _VectorStore(
+          os.path.join(
+              self.root_dir,
+              urllib.parse.quote(app_name, safe=''),
+              urllib.parse.quote(user_id, safe=''),
+          ),
+          self.num_lists,
+          self.chunk_rows,
+      )
+    return self._stores[key]
+
+  async def _embed(self, texts: list[str]) -> np.ndarray:
+    embeddings = self.embedder(texts)
+    if inspect.isawaitable(embeddings):
+      embeddings = await embeddings
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    if embeddings.ndim != 2 or len(embeddings) != len(texts):
+      raise ValueError(
+          f'Expected {len(texts)} embeddings, got an array of shape'
+          f' {embeddings.shape}.'
+      )
+    return _normalize(embeddings)
+
+  @override
+  async def add_session_to_memory(self, session: Session):
+    store = self._get_store(session.app_name, session.user_id)
+    async with store.lock:
+      new_events = [
+          event
+          for event in _utils.events_after_watermark(
+              session.events,
+              store.session_watermarks.get(session.id),
+              store.event_rows,
+          )
+          if _event_text(event)
+      ]
+      if new_events:
+        embeddings = await self._embed([_event_text(e) for e in new_events])
+        if store.dim is not None and embeddings.shape[1] != store.dim:
+          raise ValueError(
+              f'Expected embeddings of dimension {store.dim}, got'
+              f' {embeddings.shape[1]}.'
+          )
+        store.add(session.id, new_events, embeddings)
+      if session.events:
+        store.advance_watermark(session.id, session.events[-1].timestamp)
+
+  async def delete_session_from_memory(
+      self, *, app_name: str, user_id: str, session_id: str
+  ) -> None:
+    """Deletes the memories of a session."""
+    store = self._get_store(app_name, user_id)
+    async with store.lock:
+      store.delete_session(session_id)
+
+  @override
+  async def search_memory(
+      self, *, app_name: str, user_id: str, query: str
+  ) -> SearchMemoryResponse:
+    store = self._get_store(app_name, user_id)
+    if store.dim is None:
+      return SearchMemoryResponse()
+    query_embedding = (await self._embed([query]))[0]
+    async with store.lock:
+      response = SearchMemoryResponse()
+      for row, _ in store.search(query_embedding, self.top_k, self.num_probes):
+        entry = store.read_entry(row)
+        response.memories.append(
+            MemoryEntry(
+                content=types.Content.model_validate(entry['content']),
+                author=entry['author'],
+                timestamp=_utils.format_timestamp(entry['timestamp']),
+            )
+        )
+    return response
+
+  def close(self) -> None:
+    """Flushes and closes the files of the memories."""
+    for store in self._stores.values():
+      store.close()
+    self._stores.clear()
@@ -0,0 +1,132 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Optional
+from typing import TYPE_CHECKING
+
+from .base_memory_service import BaseMemoryService
+
+if TYPE_CHECKING:
+  from ..sessions.session import Session
+
+logger = logging.getLogger('google_adk.' + __name__)
+
+_SessionKey = tuple[str, str, str]
+
+
+class MemoryIngestionQueue:
+  """Adds sessions to a memory service in batches, in the background.
+
+  Sessions enqueued again before they are ingested are only ingested once, in
+  their latest version. The pending sessions are added to the memory service
+  every `flush_interval_seconds`, in batches of at most `batch_size` sessions.
+  The sessions of a batch that fails are enqueued again and retried with the
+  next batches, unless a newer version of them was enqueued in the meantime.
+
+  The ingestion runs in a task of the event loop of the first `enqueue`, so
+  `close` must be awaited before that loop stops to ingest the last sessions.
+  """
+
+  def __init__(
+      self,
+      memory_service: BaseMemoryService,
+      *,
+      batch_size: int = 16,
+      flush_interval_seconds: float = 1.0,
+  ):
+    """Initializes the queue.
+
+    Args:
+      memory_service: The memory service to add the sessions to.
+      batch_size: The maximum number of sessions added at a time.
+      flush_interval_seconds: The time sessions wait for others to be batched
+        with.
+    """
+    self.memory_service = memory_service
+    self.batch_size = batch_size
+    self.flush_interval_seconds = flush_interval_seconds
+    self._pending: dict[_SessionKey, Session] = {}
+    self._ingest_lock: Optional[asyncio.Lock] = None
+    self._wakeup: Optional[asyncio.Event] = None
+    self._task: Optional[asyncio.Task[None]] = None
+
+  @property
+  def num_pending(self) -> int:
+    """The number of sessions waiting to be ingested."""
+    return len(self._pending)
+
+  def enqueue(self, session: Session) -> None:
+    """Schedules the new events of a session to be added to memory."""
+    key = _session_key(session)
+    # Moves the session to the end, so sessions are ingested in order.
+    self._pending.pop(key, None)
+    self._pending[key] = session
+    if self._task is None or self._task.done():
+      self._ingest_lock = asyncio.Lock()
+      self._wakeup = asyncio.Event()
+      self._task = asyncio.create_task(self._run())
+    self._wakeup.set()
+
+  async def flush(self) -> None:
+    """Adds all the pending sessions to memory now."""
+    if self._ingest_lock is None:
+      return
+    async with self._ingest_lock:
+      failed_sessions: list[Session] = []
+      while self._pending:
+        batch = []
+        while self._pending and len(batch) < self.batch_size:
+          key = next(iter(self._pending))
+          batch.append(self._pending.pop(key))
+        try:
+          await self.memory_service.add_sessions_to_memory(batch)
+        except Exception:  # pylint: disable=broad-exception-caught
+          logger.exception(
+              'Failed to add %d sessions to memory, they will be retried.',
+              len(batch),
+          )
+          failed_sessions.extend(batch)
+      for session in failed_sessions:
+        # A newer version of the session also holds the failed events.
+        self._pending.setdefault(_session_key(session), session)
+      if failed_sessions and self._wakeup is not None:
+        self._wakeup.set()
+
+  async def close(self) -> None:
+    """Adds the pending sessions to memory and stops the background task."""
+    if self._task is not None:
+      self._task.cancel()
+      try:
+        await self._task
+      except asyncio.CancelledError:
+        pass
+      self._task = None
+    await self.flush()
+
+  async def _run(self) -> None:
+    while True:
+      await self._wakeup.wait()
+      # Waits for more sessions to batch with.
+      await asyncio.sleep(self.flush_interval_seconds)
+      self._wakeup.clear()
+      # Lets `close` cancel the task without interrupting a batch.
+      await asyncio.shield(self.flush())
+
+
+def _session_key(session: Session) -> _SessionKey:
+  return (session.app_name, session.user_id, session.id)
@@ -20,7 +20,9 @@ import json
 import os
 import tempfile
 from typing import Optional
+from typing import Sequence
 from typing import TYPE_CHECKING
+import uuid
 
 from google.genai import types
 from typing_extensions import override
@@ -62,47 +64,94 @@ class VertexAiRagMemoryService(BaseMemoryService):
         similarity_top_k=similarity_top_k,
         vector_distance_threshold=vector_distance_threshold,
     )
+    self._watermarks: dict[tuple[str, str, str], tuple[float, set[str]]] = {}
+    """The timestamps of the last uploaded events of the sessions, with the
+    ids of the uploaded events at that timestamp."""
 
   @override
   async def add_session_to_memory(self, session: Session):
-    with tempfile.NamedTemporaryFile(
-        mode="w", delete=False, suffix=".txt"
-    ) as temp_file:
+    """Uploads the events of a session added since the last upload.
 
-      output_lines = []
-      for event in session.events:
-        if not event.content or not event.content.parts:
-          continue
-        text_parts = [
-            part.text.replace("\n", " ")
-            for part in event.content.parts
-            if part.text
-        ]
-        if text_parts:
-          output_lines.append(
-              json.dumps({
-                  "author": event.author,
-                  "timestamp": event.timestamp,
-                  "text": ".".join(text_parts),
-              })
-          )
-      output_string = "\n".join(output_lines)
-      temp_file.write(output_string)
-      temp_file_path = temp_file.name
+    The upload watermarks are kept in memory, so the first upload of a session
+    after a restart uploads all of its events again.
+    """
+    await self.add_sessions_to_memory([session])
+
+  @override
+  async def add_sessions_to_memory(self, sessions: Sequence[Session]):
+    """Uploads the events of sessions added since their last upload.
 
+    The new events of the sessions of each user are uploaded as a single file
+    per corpus. Files can't have metadata, so searches filter them by app and
+    user through their display name, and each line names the session of its
+    event.
+    """
     if not self._vertex_rag_store.rag_resources:
       raise ValueError("Rag resources must be set.")
 
-    for rag_resource in self._vertex_rag_store.rag_resources:
-      rag.upload_file(
-          corpus_name=rag_resource.rag_corpus,
-          path=temp_file_path,
-          # this is the temp workaround as upload file does not support
-          # adding metadata, thus use display_name to store the session info.
-          display_name=f"{session.app_name}.{session.user_id}.{session.id}",
-      )
+    sessions_by_user: dict[
+        tuple[str, str], list[tuple[Session, list[Event]]]
+    ] = {}
+    for session in sessions:
+      new_events = self._get_new_events(session)
+      if new_events:
+        sessions_by_user.setdefault(
+            (session.app_name, session.user_id), []
+        ).append((session, new_events))
+
+    for (app_name, user_id), user_sessions in sessions_by_user.items():
+      output_lines = [
+          line
+          for session, new_events in user_sessions
+          for line in _event_lines(session, new_events)
+      ]
+      if output_lines:
+        file_id = (
+            user_sessions[0][0].id
+            if len(user_sessions) == 1
+            else uuid.uuid4().hex
+        )
+        self._upload_file(f"{app_name}.{user_id}.{file_id}", output_lines)
+      for session, new_events in user_sessions:
+        self._advance_watermark(session, new_events)
+
+  def _get_new_events(self, session: Session) -> list[Event]:
+    watermark, watermark_ids = self._watermarks.get(
+        (session.app_name, session.user_id, session.id), (None, set())
+    )
+    return _utils.events_after_watermark(
+        session.events, watermark, watermark_ids
+    )
+
+  def _advance_watermark(self, session: Session, new_events: list[Event]):
+    session_key = (session.app_name, session.user_id, session.id)
+    watermark, watermark_ids = self._watermarks.get(session_key, (None, set()))
+    last_timestamp = new_events[-1].timestamp
+    if last_timestamp != watermark:
+      watermark_ids = set()
+    watermark_ids.update(
+        event.id for event in new_events if event.timestamp == last_timestamp
+    )
+    self._watermarks[session_key] = (last_timestamp, watermark_ids)
+
+  def _upload_file(self, display_name: str, output_lines: list[str]):
+    with tempfile.NamedTemporaryFile(
+        mode="w", delete=False, suffix=".txt"
+    ) as temp_file:
+      temp_file.write("\n".join(output_lines))
+      temp_file_path = temp_file.name
 
-    os.remove(temp_file_path)
+    try:
+      for rag_resource in self._vertex_rag_store.rag_resources:
+        rag.upload_file(
+            corpus_name=rag_resource.rag_corpus,
+            path=temp_file_path,
+            # this is the temp workaround as upload file does not support
+            # adding metadata, thus use display_name to store the session info.
+            display_name=display_name,
+        )
+    finally:
+      os.remove(temp_file_path)
 
   @override
   async def search_memory(
@@ -126,8 +175,9 @@ class VertexAiRagMemoryService(BaseMemoryService):
       # TODO: Add server side filtering by app_name and user_id.
       if not context.source_display_name.startswith(f"{app_name}.{user_id}."):
         continue
-      session_id = context.source_display_name.split(".")[-1]
-      events = []
+      # The session of the lines uploaded before they named it.
+      default_session_id = context.source_display_name.split(".")[-1]
+      events_by_session: dict[str, list[Event]] = {}
       if context.text:
         lines = context.text.split("\n")
 
@@ -146,15 +196,18 @@ class VertexAiRagMemoryService(BaseMemoryService):
 
             content = types.Content(parts=[types.Part(text=text)])
             event = Event(author=author, timestamp=timestamp, content=content)
-            events.append(event)
+            events_by_session.setdefault(
+                event_data.get("session_id", default_session_id), []
+            ).append(event)
           except json.JSONDecodeError:
             # Not valid JSON, skip this line
             continue
 
-      if session_id in session_events_map:
-        session_events_map[session_id].append(events)
-      else:
-        session_events_map[session_id] = [events]
+      for session_id, events in events_by_session.items():
+        if session_id in session_events_map:
+          session_events_map[session_id].append(events)
+        else:
+          session_events_map[session_id] = [events]
 
     # Remove overlap and combine events from the same session.
     for session_id, event_lists in session_events_map.items():
@@ -173,6 +226,29 @@ class VertexAiRagMemoryService(BaseMemoryService):
     return SearchMemoryResponse(memories=memory_results)
 
 
+def _event_lines(session: Session, events: list[Event]) -> list[str]:
+  """Returns the JSON lines uploaded for the text of events."""
+  output_lines = []
+  for event in events:
+    if not event.content or not event.content.parts:
+      continue
+    text_parts = [
+        part.text.replace("\n", " ")
+        for part in event.content.parts
+        if part.text
+    ]
+    if text_parts:
+      output_lines.append(
+          json.dumps({
+              "author": event.author,
+              "timestamp": event.timestamp,
+              "text": ".".join(text_parts),
+              "session_id": session.id,
+          })
+      )
+  return output_lines
+
+
 def _merge_event_lists(event_lists: list[list[Event]]) -> list[list[Event]]:
   """Merge event lists that have overlapping timestamps."""
   merged = []
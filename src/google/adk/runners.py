@@ -33,12 +33,17 @@ from .agents.live_request_queue import LiveRequestQueue
 from .agents.llm_agent import LlmAgent
 from .agents.run_config import RunConfig
 from .artifacts.base_artifact_service import BaseArtifactService
+from .artifacts.blob_references import externalize_blobs
 from .artifacts.in_memory_artifact_service import InMemoryArtifactService
+from .auth.auth_tool import AuthToolArguments
 from .code_executors.built_in_code_executor import BuiltInCodeExecutor
 from .events.event import Event
+from .flows.llm_flows.functions import REQUEST_EUC_FUNCTION_CALL_NAME
 from .memory.base_memory_service import BaseMemoryService
 from .memory.in_memory_memory_service import InMemoryMemoryService
+from .memory.memory_ingestion_queue import MemoryIngestionQueue
 from .sessions.base_session_service import BaseSessionService
+from .sessions.base_session_service import GetSessionConfig
 from .sessions.in_memory_session_service import InMemorySessionService
 from .sessions.session import Session
 from .telemetry import tracer
@@ -60,6 +65,8 @@ class Runner:
       artifact_service: The artifact service for the runner.
       session_service: The session service for the runner.
       memory_service: The memory service for the runner.
+      memory_ingestion_queue: The queue adding sessions to memory after each
+        run.
   """
 
   app_name: str
@@ -72,6 +79,8 @@ class Runner:
   """The session service for the runner."""
   memory_service: Optional[BaseMemoryService] = None
   """The memory service for the runner."""
+  memory_ingestion_queue: Optional[MemoryIngestionQueue] = None
+  """The queue adding sessions to memory after each run."""
 
   def __init__(
       self,
@@ -81,6 +90,7 @@ class Runner:
       artifact_service: Optional[BaseArtifactService] = None,
       session_service: BaseSessionService,
       memory_service: Optional[BaseMemoryService] = None,
+      memory_ingestion_queue: Optional[MemoryIngestionQueue] = None,
   ):
     """Initializes the Runner.
 
@@ -90,12 +100,15 @@ class Runner:
         artifact_service: The artifact service for the runner.
         session_service: The session service for the runner.
         memory_service: The memory service for the runner.
+        memory_ingestion_queue: If set, the sessions are enqueued to be added
+          to memory after each run, e.g. `MemoryIngestionQueue(memory_service)`.
     """
     self.app_name = app_name
     self.agent = agent
     self.artifact_service = artifact_service
     self.session_service = session_service
     self.memory_service = memory_service
+    self.memory_ingestion_queue = memory_ingestion_queue
 
   def run(
       self,
@@ -172,11 +185,22 @@ class Runner:
       The events generated by the agent.
     """
     with tracer.start_as_current_span('invocation'):
+      config = self._get_session_config()
       session = await self.session_service.get_session(
-          app_name=self.app_name, user_id=user_id, session_id=session_id
+          app_name=self.app_name,
+          user_id=user_id,
+          session_id=session_id,
+          config=config,
       )
       if not session:
         raise ValueError(f'Session not found: {session_id}')
+      # The timestamp of the oldest loaded event, if older events were not
+      # loaded.
+      truncated_before = (
+          session.events[0].timestamp
+          if config and len(session.events) >= config.num_recent_events
+          else None
+      )
 
       invocation_context = self._new_invocation_context(
           session,
@@ -193,12 +217,29 @@ class Runner:
             run_config.save_input_blobs_as_artifacts,
         )
 
-      invocation_context.agent = self._find_agent_to_run(session, root_agent)
+      agent = self._find_agent_to_run(session, root_agent)
+      if agent is None and truncated_before is not None:
+        agent = await self._find_agent_to_run_in_history(
+            session, root_agent, before_timestamp=truncated_before
+        )
+      invocation_context.agent = agent or root_agent
+      if truncated_before is not None:
+        await self._load_referenced_function_calls(
+            session, before_timestamp=truncated_before
+        )
       async for event in invocation_context.agent.run_async(invocation_context):
         if not event.partial:
+          await self._externalize_blobs(session, event, run_config)
           await self.session_service.append_event(session=session, event=event)
+          if event.actions.artifact_delta:
+            invocation_context.lookup_cache.invalidate_artifacts(
+                event.actions.artifact_delta
+            )
         yield event
 
+      if self.memory_ingestion_queue:
+        self.memory_ingestion_queue.enqueue(session)
+
   async def _append_new_message_to_session(
       self,
       session: Session,
@@ -241,8 +282,33 @@ class Runner:
         author='user',
         content=new_message,
     )
+    await self._externalize_blobs(session, event, invocation_context.run_config)
     await self.session_service.append_event(session=session, event=event)
 
+  async def _externalize_blobs(
+      self, session: Session, event: Event, run_config: Optional[RunConfig]
+  ) -> None:
+    """Moves the large inline blobs of an event to artifacts.
+
+    The event is updated in place before it is appended, so the session and the
+    callers only see references to the blobs.
+    """
+    if (
+        not run_config
+        or run_config.max_inline_blob_bytes is None
+        or not self.artifact_service
+    ):
+      return
+    await externalize_blobs(
+        event.content,
+        artifact_service=self.artifact_service,
+        app_name=self.app_name,
+        user_id=session.user_id,
+        session_id=session.id,
+        filename_prefix=f'blob_{event.id}',
+        max_inline_bytes=run_config.max_inline_blob_bytes,
+    )
+
   async def run_live(
       self,
       *,
@@ -299,7 +365,9 @@ class Runner:
     )
 
     root_agent = self.agent
-    invocation_context.agent = self._find_agent_to_run(session, root_agent)
+    invocation_context.agent = (
+        self._find_agent_to_run(session, root_agent) or root_agent
+    )
 
     invocation_context.active_streaming_tools = {}
     # TODO(hangfei): switch to use canonical_tools.
@@ -324,11 +392,15 @@ class Runner:
 
     async for event in invocation_context.agent.run_live(invocation_context):
       await self.session_service.append_event(session=session, event=event)
+      if event.actions.artifact_delta:
+        invocation_context.lookup_cache.invalidate_artifacts(
+            event.actions.artifact_delta
+        )
       yield event
 
   def _find_agent_to_run(
       self, session: Session, root_agent: BaseAgent
-  ) -> BaseAgent:
+  ) -> Optional[BaseAgent]:
     """Finds the agent to run to continue the session.
 
     A qualified agent must be either of:
@@ -341,24 +413,104 @@ class Runner:
         root_agent: The root agent of the runner.
 
     Returns:
-      The agent of the last message in the session or the root agent.
+      The agent of the last message in the session, or None if no suitable
+      agents are found in the session.
     """
-    for event in filter(lambda e: e.author != 'user', reversed(session.events)):
-      if event.author == root_agent.name:
-        # Found root agent.
-        return root_agent
-      if not (agent := root_agent.find_sub_agent(event.author)):
-        # Agent not found, continue looking.
-        logger.warning(
-            'Event from an unknown agent: %s, event id: %s',
-            event.author,
-            event.id,
-        )
-        continue
-      if self._is_transferable_across_agent_tree(agent):
+    for event in reversed(session.events):
+      if agent := self._get_agent_to_continue(event, root_agent):
+        return agent
+    return None
+
+  async def _find_agent_to_run_in_history(
+      self, session: Session, root_agent: BaseAgent, *, before_timestamp: float
+  ) -> Optional[BaseAgent]:
+    """Finds the agent to run in the history that was not loaded.
+
+    Args:
+        session: The session to find the agent for.
+        root_agent: The root agent of the runner.
+        before_timestamp: The timestamp of the oldest loaded event.
+
+    Returns:
+      The agent of the last message in the session history, or None if no
+      suitable agents are found in the history.
+    """
+    async for event in self.session_service.iter_events(
+        app_name=session.app_name,
+        user_id=session.user_id,
+        session_id=session.id,
+        before_timestamp=before_timestamp,
+    ):
+      if agent := self._get_agent_to_continue(event, root_agent):
         return agent
-    # Falls back to root agent if no suitable agents are found in the session.
-    return root_agent
+    return None
+
+  async def _load_referenced_function_calls(
+      self, session: Session, *, before_timestamp: float
+  ) -> None:
+    """Loads the older function calls the loaded events refer to.
+
+    The function responses must be sent along with their function calls, and
+    the auth requests are resumed from the function calls that requested them,
+    so these function calls are loaded even if they are older than the history
+    the agents require. The loaded events are put before the other events of
+    the session.
+
+    Args:
+        session: The session whose events were loaded.
+        before_timestamp: The timestamp of the oldest loaded event.
+    """
+    missing_ids = _get_missing_function_call_ids(session.events)
+    if not missing_ids:
+      return
+    loaded_events = []
+    async for event in self.session_service.iter_events(
+        app_name=session.app_name,
+        user_id=session.user_id,
+        session_id=session.id,
+        before_timestamp=before_timestamp,
+    ):
+      if not any(
+          function_call.id in missing_ids
+          for function_call in event.get_function_calls()
+      ):
+        continue
+      loaded_events.insert(0, event)
+      missing_ids = _get_missing_function_call_ids(
+          loaded_events + session.events
+      )
+      if not missing_ids:
+        break
+    session.events[:0] = loaded_events
+
+  def _get_agent_to_continue(
+      self, event: Event, root_agent: BaseAgent
+  ) -> Optional[BaseAgent]:
+    """Returns the author of the event if it can continue the session."""
+    if event.author == 'user':
+      return None
+    if event.author == root_agent.name:
+      # Found root agent.
+      return root_agent
+    if not (agent := root_agent.find_sub_agent(event.author)):
+      # Agent not found, continue looking.
+      logger.warning(
+          'Event from an unknown agent: %s, event id: %s',
+          event.author,
+          event.id,
+      )
+      return None
+    if self._is_transferable_across_agent_tree(agent):
+      return agent
+    return None
+
+  def _get_session_config(self) -> Optional[GetSessionConfig]:
+    """Returns the config to only load the history the agents require."""
+    required_history = _get_required_history(self.agent)
+    if required_history is None:
+      return None
+    # Loads at least one event, as zero would mean no limit.
+    return GetSessionConfig(num_recent_events=max(required_history, 1))
 
   def _is_transferable_across_agent_tree(self, agent_to_run: BaseAgent) -> bool:
     """Whether the agent to run can transfer to any other agent in the agent tree.
@@ -490,6 +642,39 @@ class Runner:
     await self._cleanup_toolsets(self._collect_toolset(self.agent))
 
 
+def _get_missing_function_call_ids(events: list[Event]) -> set[str]:
+  """Returns the IDs of the function calls referred to but not in the events."""
+  referenced_ids = set()
+  function_call_ids = set()
+  for event in events:
+    for function_response in event.get_function_responses():
+      referenced_ids.add(function_response.id)
+    for function_call in event.get_function_calls():
+      function_call_ids.add(function_call.id)
+      if function_call.name == REQUEST_EUC_FUNCTION_CALL_NAME:
+        # The auth request refers to the function call requesting the auth.
+        referenced_ids.add(
+            AuthToolArguments.model_validate(
+                function_call.args
+            ).function_call_id
+        )
+  referenced_ids.discard(None)
+  return referenced_ids - function_call_ids
+
+
+def _get_required_history(agent: BaseAgent) -> Optional[int]:
+  """Returns the number of recent events required by the agent tree."""
+  required_history = agent.get_required_history()
+  for sub_agent in agent.sub_agents:
+    if required_history is None:
+      break
+    sub_agent_required_history = _get_required_history(sub_agent)
+    if sub_agent_required_history is None:
+      return None
+    required_history = max(required_history, sub_agent_required_history)
+  return required_history
+
+
 class InMemoryRunner(Runner):
   """An in-memory Runner for testing and development.
 
@@ -14,7 +14,9 @@
 import logging
 
 from .base_session_service import BaseSessionService
+from .cached_session_service import CachedSessionService
 from .in_memory_session_service import InMemorySessionService
+from .log_session_service import LogSessionService
 from .session import Session
 from .state import State
 from .vertex_ai_session_service import VertexAiSessionService
@@ -24,7 +26,9 @@ logger = logging.getLogger('google_adk.' + __name__)
 
 __all__ = [
     'BaseSessionService',
+    'CachedSessionService',
     'InMemorySessionService',
+    'LogSessionService',
     'Session',
     'State',
     'VertexAiSessionService',
@@ -32,8 +36,14 @@ __all__ = [
 
 try:
   from .database_session_service import DatabaseSessionService
+  from .session_sweeper import RetentionPolicy
+  from .session_sweeper import SessionSweeper
+  from .sharded_session_service import ShardedSessionService
 
   __all__.append('DatabaseSessionService')
+  __all__.append('RetentionPolicy')
+  __all__.append('SessionSweeper')
+  __all__.append('ShardedSessionService')
 except ImportError:
   logger.debug(
       'DatabaseSessionService require sqlalchemy>=2.0, please ensure it is'
@@ -12,13 +12,40 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Utility functions for session service."""
+
 from __future__ import annotations
 
+import base64
+import json
+import logging
+import math
+import pickle
 from typing import Any
+from typing import Callable
 from typing import Optional
 
 from google.genai import types
 
+from ..events.event_actions import EventActions
+from .state import State
+
+logger = logging.getLogger('google_adk.' + __name__)
+
+try:
+  import zstandard
+except ImportError:
+  zstandard = None
+
+_EVENT_ACTIONS_FORMAT_VERSION = b'\x01'
+_CODEC_JSON = b'j'
+_CODEC_ZSTD_JSON = b'z'
+_CODEC_PICKLE = b'p'
+
+_PICKLE_LINE_PREFIX = b'p'
+
+COMPRESSION_THRESHOLD_BYTES = 4096
+"""Encoded event actions larger than this are compressed if zstd is available."""
+
 
 def decode_content(
     content: Optional[dict[str, Any]],
@@ -36,3 +63,172 @@ def decode_grounding_metadata(
   if not grounding_metadata:
     return None
   return types.GroundingMetadata.model_validate(grounding_metadata)
+
+
+def split_state(
+    state: dict[str, Any],
+) -> tuple[dict[str, Any], dict[str, Any], dict[str, Any]]:
+  """Splits a state into app, user and session state, dropping temp state."""
+  app_state = {}
+  user_state = {}
+  session_state = {}
+  for key, value in state.items():
+    if key.startswith(State.APP_PREFIX):
+      app_state[key.removeprefix(State.APP_PREFIX)] = value
+    elif key.startswith(State.USER_PREFIX):
+      user_state[key.removeprefix(State.USER_PREFIX)] = value
+    elif not key.startswith(State.TEMP_PREFIX):
+      session_state[key] = value
+  return app_state, user_state, session_state
+
+
+def prefix_state(prefix: str, state: dict[str, Any]) -> dict[str, Any]:
+  """Prefixes the keys of an app or user state, as in a session state."""
+  return {prefix + key: value for key, value in state.items()}
+
+
+def is_compact_event_actions(data: bytes) -> bool:
+  """Whether the data was produced by `encode_event_actions`.
+
+  Event actions written by older versions are plain pickles, which never start
+  with the format version byte.
+  """
+  return data[:1] == _EVENT_ACTIONS_FORMAT_VERSION and data[1:2] in (
+      _CODEC_JSON,
+      _CODEC_ZSTD_JSON,
+      _CODEC_PICKLE,
+  )
+
+
+def encode_event_actions(actions: EventActions) -> bytes:
+  """Encodes event actions into a versioned, compact binary payload.
+
+  The payload is a format version byte, a codec byte, and the body. The body is
+  the minified JSON of the actions, compressed with zstd once it exceeds
+  `COMPRESSION_THRESHOLD_BYTES` and the `zstandard` package is installed.
+  Actions whose state delta holds values that JSON doesn't restore as is, e.g.
+  datetimes, tuples, dicts with non-string keys or arbitrary objects, are
+  pickled instead.
+  """
+  if not is_json_native(actions.state_delta):
+    logger.debug('Event actions are not JSON native, pickling them.')
+    return _EVENT_ACTIONS_FORMAT_VERSION + _CODEC_PICKLE + pickle.dumps(actions)
+  body = actions.model_dump_json(by_alias=True, exclude_defaults=True).encode(
+      'utf-8'
+  )
+
+  if zstandard is not None and len(body) > COMPRESSION_THRESHOLD_BYTES:
+    return (
+        _EVENT_ACTIONS_FORMAT_VERSION
+        + _CODEC_ZSTD_JSON
+        + zstandard.ZstdCompressor().compress(body)
+    )
+  return _EVENT_ACTIONS_FORMAT_VERSION + _CODEC_JSON + body
+
+
+def is_json_native(value: Any) -> bool:
+  """Whether a value is restored as is from its JSON serialization."""
+  if value is None or type(value) in (str, int, bool):
+    return True
+  if type(value) is float:
+    return math.isfinite(value)
+  if type(value) is list:
+    return all(is_json_native(item) for item in value)
+  if type(value) is dict:
+    return all(
+        type(key) is str and is_json_native(item) for key, item in value.items()
+    )
+  return False
+
+
+def encode_json_or_pickle(value: Any) -> bytes:
+  """Encodes a value into a single line of ASCII.
+
+  Values that JSON restores as is are encoded as compact JSON, and the others
+  as a base64 pickle, so values that can't be pickled raise an error.
+  """
+  if is_json_native(value):
+    return json.dumps(value, separators=(',', ':')).encode('ascii')
+  return _PICKLE_LINE_PREFIX + base64.b64encode(pickle.dumps(value))
+
+
+def decode_json_or_pickle(
+    data: bytes, json_decoder: Callable[[bytes], Any] = json.loads
+) -> Any:
+  """Decodes a value encoded by `encode_json_or_pickle`.
+
+  Args:
+    data: The encoded value.
+    json_decoder: Decodes the values encoded as JSON.
+
+  Returns:
+    The decoded value.
+  """
+  if data[:1] == _PICKLE_LINE_PREFIX:
+    return pickle.loads(base64.b64decode(data[1:]))
+  return json_decoder(data)
+
+
+def decode_event_actions(data: bytes) -> EventActions:
+  """Decodes event actions encoded by `encode_event_actions`.
+
+  Legacy payloads that are plain pickles are decoded as well.
+  """
+  if not is_compact_event_actions(data):
+    return pickle.loads(data)
+
+  codec, body = data[1:2], data[2:]
+  if codec == _CODEC_PICKLE:
+    return pickle.loads(body)
+  if codec == _CODEC_ZSTD_JSON:
+    if zstandard is None:
+      raise ImportError(
+          'Event actions are compressed with zstd, please install the'
+          ' `zstandard` package to read them.'
+      )
+    body = zstandard.ZstdDecompressor().decompress(body)
+  return EventActions.model_validate_json(body)
+
+
+def session_version(last_update_time: float, num_events: int) -> str:
+  """Returns a token that changes whenever a session is updated.
+
+  Every appended event changes the number of events, and state changes move the
+  update time.
+  """
+  return f'{last_update_time!r}:{num_events}'
+
+
+def encode_page_token(*values: Any) -> str:
+  """Encodes the position after the last item of a page into a page token."""
+  return base64.urlsafe_b64encode(
+      json.dumps(values, separators=(',', ':')).encode('utf-8')
+  ).decode('ascii')
+
+
+def decode_page_token(page_token: str, *value_types: type) -> tuple[Any, ...]:
+  """Decodes a page token produced by `encode_page_token`.
+
+  Args:
+    page_token: The page token.
+    *value_types: The types of the encoded values. Floats also accept ints, as
+      JSON doesn't tell them apart.
+
+  Returns:
+    The encoded values.
+
+  Raises:
+    ValueError: If the page token is malformed, or its values don't have the
+      given types.
+  """
+  try:
+    values = json.loads(base64.urlsafe_b64decode(page_token.encode('ascii')))
+  except (ValueError, UnicodeError) as e:
+    raise ValueError(f'Invalid page token: {page_token!r}') from e
+  if not isinstance(values, list) or len(values) != len(value_types):
+    raise ValueError(f'Invalid page token: {page_token!r}')
+  for value, value_type in zip(values, value_types):
+    accepted_types = (int, float) if value_type is float else value_type
+    if isinstance(value, bool) or not isinstance(value, accepted_types):
+      raise ValueError(f'Invalid page token: {page_token!r}')
+  return tuple(values)
@@ -12,13 +12,19 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from __future__ import annotations
+
 import abc
 from typing import Any
+from typing import AsyncGenerator
 from typing import Optional
 
+from pydantic import alias_generators
 from pydantic import BaseModel
+from pydantic import ConfigDict
 from pydantic import Field
 
+from . import _session_util
 from ..events.event import Event
 from .session import Session
 from .state import State
@@ -29,6 +35,25 @@ class GetSessionConfig(BaseModel):
 
   num_recent_events: Optional[int] = None
   after_timestamp: Optional[float] = None
+  state_keys: Optional[list[str]] = None
+  """If set, only these keys of the state are loaded.
+
+  Keys use the same prefixes as the session state, e.g. `app:` and `user:`.
+  """
+
+
+class ListSessionsConfig(BaseModel):
+  """The configuration of listing a page of sessions."""
+
+  page_size: int = Field(default=100, ge=1)
+  page_token: Optional[str] = None
+  """The `next_page_token` of the previous page, if any."""
+
+  include_event_count: bool = False
+  """Whether to return the number of events of each session."""
+
+  include_last_event: bool = False
+  """Whether to return the last event of each session as its only event."""
 
 
 class ListSessionsResponse(BaseModel):
@@ -37,7 +62,76 @@ class ListSessionsResponse(BaseModel):
   The events and states are not set within each Session object.
   """
 
+  model_config = ConfigDict(
+      alias_generator=alias_generators.to_camel,
+      populate_by_name=True,
+  )
+  """The pydantic model config."""
+
   sessions: list[Session] = Field(default_factory=list)
+  next_page_token: Optional[str] = None
+  """The token of the next page, or None if this is the last page."""
+
+  event_counts: Optional[dict[str, int]] = None
+  """The number of events of each session, by session id, if requested."""
+
+
+class ListEventsConfig(BaseModel):
+  """The configuration of listing a page of the events of a session."""
+
+  page_size: int = Field(default=100, ge=1)
+  page_token: Optional[str] = None
+  """The `next_page_token` of the previous page, if any."""
+
+  authors: Optional[list[str]] = None
+  """If set, only the events of these authors are listed."""
+
+  after_timestamp: Optional[float] = None
+  """If set, only the events at or after this timestamp are listed."""
+
+  before_timestamp: Optional[float] = None
+  """If set, only the events before this timestamp are listed."""
+
+  has_function_calls: Optional[bool] = None
+  """If set, only the events with, or without, function calls are listed."""
+
+  def matches(self, event: Event) -> bool:
+    """Whether an event passes the filters, ignoring the page token."""
+    if self.authors is not None and event.author not in self.authors:
+      return False
+    if (
+        self.after_timestamp is not None
+        and event.timestamp < self.after_timestamp
+    ):
+      return False
+    if (
+        self.before_timestamp is not None
+        and event.timestamp >= self.before_timestamp
+    ):
+      return False
+    if self.has_function_calls is not None and self.has_function_calls != bool(
+        event.get_function_calls()
+    ):
+      return False
+    return True
+
+
+class ListEventsResponse(BaseModel):
+  """The response of listing the events of a session."""
+
+  model_config = ConfigDict(
+      alias_generator=alias_generators.to_camel,
+      populate_by_name=True,
+  )
+  """The pydantic model config."""
+
+  events: list[Event] = Field(default_factory=list)
+  next_page_token: Optional[str] = None
+  """The token of the next page, or None if this is the last page."""
+
+
+class SessionConflictError(ValueError):
+  """Raised when an event conflicts with a concurrent update of the session."""
 
 
 class BaseSessionService(abc.ABC):
@@ -79,12 +173,173 @@ class BaseSessionService(abc.ABC):
   ) -> Optional[Session]:
     """Gets a session."""
 
+  async def iter_events(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      before_timestamp: Optional[float] = None,
+  ) -> AsyncGenerator[Event, None]:
+    """Iterates over the events of a session, from the newest to the oldest.
+
+    Subclasses should override this to page through the stored events instead
+    of loading the whole session.
+
+    Args:
+      app_name: the name of the app.
+      user_id: the id of the user.
+      session_id: the id of the session.
+      before_timestamp: if set, only the events older than this timestamp are
+        yielded.
+
+    Yields:
+      The events of the session in reverse chronological order.
+    """
+    session = await self.get_session(
+        app_name=app_name, user_id=user_id, session_id=session_id
+    )
+    if not session:
+      return
+    for event in reversed(session.events):
+      if before_timestamp is None or event.timestamp < before_timestamp:
+        yield event
+
+  async def get_session_version(
+      self, *, app_name: str, user_id: str, session_id: str
+  ) -> Optional[str]:
+    """Returns a token that changes whenever the session is updated.
+
+    Caches use it to check whether a copy of the session is still current, so
+    subclasses should override this with a lookup that is cheaper than loading
+    the session.
+
+    Args:
+      app_name: the name of the app.
+      user_id: the id of the user.
+      session_id: the id of the session.
+
+    Returns:
+      The version of the session, or None if the session doesn't exist.
+    """
+    session = await self.get_session(
+        app_name=app_name, user_id=user_id, session_id=session_id
+    )
+    if not session:
+      return None
+    return _session_util.session_version(
+        session.last_update_time, len(session.events)
+    )
+
   @abc.abstractmethod
   async def list_sessions(
       self, *, app_name: str, user_id: str
   ) -> ListSessionsResponse:
     """Lists all the sessions."""
 
+  async def list_sessions_page(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      config: Optional[ListSessionsConfig] = None,
+  ) -> ListSessionsResponse:
+    """Lists a page of sessions, the most recently updated first.
+
+    Subclasses should override this to only load the sessions of the page.
+
+    Args:
+      app_name: the name of the app.
+      user_id: the id of the user.
+      config: the page to list and the fields to include.
+
+    Returns:
+      The sessions of the page, without state, and without events unless
+      `include_last_event` is set.
+
+    Raises:
+      ValueError: If the page token is invalid.
+    """
+    config = config or ListSessionsConfig()
+    response = await self.list_sessions(app_name=app_name, user_id=user_id)
+    sessions = sorted(
+        response.sessions,
+        key=lambda s: (s.last_update_time, s.id),
+        reverse=True,
+    )
+    if config.page_token:
+      cursor = _session_util.decode_page_token(config.page_token, float, str)
+      sessions = [s for s in sessions if (s.last_update_time, s.id) < cursor]
+    page = ListSessionsResponse(sessions=sessions[: config.page_size])
+    if len(sessions) > config.page_size:
+      last_session = page.sessions[-1]
+      page.next_page_token = _session_util.encode_page_token(
+          last_session.last_update_time, last_session.id
+      )
+
+    if config.include_event_count:
+      page.event_counts = {}
+    for session in page.sessions:
+      session.state = {}
+      session.events = []
+      if not config.include_event_count and not config.include_last_event:
+        continue
+      full_session = await self.get_session(
+          app_name=app_name,
+          user_id=user_id,
+          session_id=session.id,
+          config=(
+              None
+              if config.include_event_count
+              else GetSessionConfig(num_recent_events=1)
+          ),
+      )
+      if not full_session:
+        continue
+      if config.include_event_count:
+        page.event_counts[session.id] = len(full_session.events)
+      if config.include_last_event:
+        session.events = full_session.events[-1:]
+    return page
+
+  async def list_events(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      config: Optional[ListEventsConfig] = None,
+  ) -> ListEventsResponse:
+    """Lists a page of the events of a session, the oldest first.
+
+    Events are ordered by (timestamp, id). Subclasses should override this to
+    only load the events of the page.
+
+    Args:
+      app_name: the name of the app.
+      user_id: the id of the user.
+      session_id: the id of the session.
+      config: the page to list and the filters of the events.
+
+    Returns:
+      The events of the page, which is empty if the session doesn't exist.
+
+    Raises:
+      ValueError: If the page token is invalid.
+    """
+    config = config or ListEventsConfig()
+    session = await self.get_session(
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+        config=GetSessionConfig(
+            after_timestamp=config.after_timestamp, state_keys=[]
+        ),
+    )
+    if not session:
+      return ListEventsResponse()
+    return paginate_events(session.events, config)
+
   @abc.abstractmethod
   async def delete_session(
       self, *, app_name: str, user_id: str, session_id: str
@@ -107,3 +362,28 @@ class BaseSessionService(abc.ABC):
       if key.startswith(State.TEMP_PREFIX):
         continue
       session.state.update({key: value})
+
+
+def paginate_events(
+    events: list[Event], config: ListEventsConfig
+) -> ListEventsResponse:
+  """Filters and pages through events, without copying them."""
+  cursor = None
+  if config.page_token:
+    cursor = _session_util.decode_page_token(config.page_token, float, str)
+  matches = sorted(
+      (
+          event
+          for event in events
+          if config.matches(event)
+          and (cursor is None or (event.timestamp, event.id) > cursor)
+      ),
+      key=lambda event: (event.timestamp, event.id),
+  )
+  response = ListEventsResponse(events=matches[: config.page_size])
+  if len(matches) > config.page_size:
+    last_event = response.events[-1]
+    response.next_page_token = _session_util.encode_page_token(
+        last_event.timestamp, last_event.id
+    )
+  return response
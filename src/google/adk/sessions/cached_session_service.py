@@ -0,0 +1,395 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+from collections import OrderedDict
+import copy
+import logging
+import time
+from typing import Any
+from typing import AsyncGenerator
+from typing import Generic
+from typing import Hashable
+from typing import Optional
+from typing import TypeVar
+
+from pydantic import BaseModel
+from typing_extensions import override
+
+from . import _session_util
+from ..events.event import Event
+from .base_session_service import BaseSessionService
+from .base_session_service import GetSessionConfig
+from .base_session_service import ListEventsConfig
+from .base_session_service import ListEventsResponse
+from .base_session_service import ListSessionsConfig
+from .base_session_service import ListSessionsResponse
+from .session import Session
+from .state import State
+
+logger = logging.getLogger('google_adk.' + __name__)
+
+_SessionKey = tuple[str, str, str]
+_K = TypeVar('_K', bound=Hashable)
+_V = TypeVar('_V')
+
+
+class SessionCacheStats(BaseModel):
+  """Counters describing how the session cache has been used."""
+
+  hits: int = 0
+  """The number of sessions served from the cache."""
+
+  misses: int = 0
+  """The number of sessions loaded from the wrapped service."""
+
+  invalidations: int = 0
+  """The number of cached sessions dropped because they were out of date."""
+
+
+class _LruCache(Generic[_K, _V]):
+  """A bounded mapping that evicts the least recently used entries."""
+
+  def __init__(self, max_size: int):
+    self._max_size = max_size
+    self._entries: OrderedDict[_K, tuple[float, _V]] = OrderedDict()
+
+  def get(self, key: _K, max_age: Optional[float] = None) -> Optional[_V]:
+    entry = self._entries.get(key)
+    if entry is None:
+      return None
+    stored_at, value = entry
+    if max_age is not None and time.time() - stored_at > max_age:
+      del self._entries[key]
+      return None
+    self._entries.move_to_end(key)
+    return value
+
+  def put(self, key: _K, value: _V) -> None:
+    self._entries[key] = (time.time(), value)
+    self._entries.move_to_end(key)
+    while len(self._entries) > self._max_size:
+      self._entries.popitem(last=False)
+
+  def pop(self, key: _K) -> None:
+    self._entries.pop(key, None)
+
+  def __len__(self) -> int:
+    return len(self._entries)
+
+
+class _CachedSession:
+  """A cached session, holding only the session-scoped state."""
+
+  def __init__(self, session: Session, version: str):
+    self.session = session
+    self.version = version
+    self.validated_at = time.time()
+
+
+class CachedSessionService(BaseSessionService):
+  """A read-through, write-through cache in front of another session service.
+
+  Sessions are kept in a bounded LRU cache, with app and user state cached
+  separately so that an update to them is seen by every cached session of the
+  app or user. Before a cached session is served, its version is checked
+  against the wrapped service with `get_session_version`, which is much
+  cheaper than loading the session. Appended events are written to the wrapped
+  service first and then applied to the cached copy.
+
+  App and user state changed through another instance of the wrapped service
+  are picked up when a session of the app or user is next loaded, or after
+  `state_ttl_seconds` at the latest, so the cache is meant for services whose
+  state is only updated by the process using it.
+  """
+
+  def __init__(
+      self,
+      session_service: BaseSessionService,
+      *,
+      max_sessions: int = 1000,
+      max_states: int = 1000,
+      max_staleness_seconds: float = 0.0,
+      state_ttl_seconds: float = 30.0,
+  ):
+    """Initializes the cache.
+
+    Args:
+      session_service: The session service to cache.
+      max_sessions: The maximum number of cached sessions.
+      max_states: The maximum number of cached app states, and separately of
+        cached user states.
+      max_staleness_seconds: How long a cached session is served without
+        checking its version again. The default checks on every read.
+      state_ttl_seconds: How long cached app and user state are served before
+        they are loaded again.
+    """
+    self.session_service = session_service
+    self.max_staleness_seconds = max_staleness_seconds
+    self.state_ttl_seconds = state_ttl_seconds
+    self._sessions: _LruCache[_SessionKey, _CachedSession] = _LruCache(
+        max_sessions
+    )
+    self._app_states: _LruCache[str, dict[str, Any]] = _LruCache(max_states)
+    self._user_states: _LruCache[tuple[str, str], dict[str, Any]] = _LruCache(
+        max_states
+    )
+    self._stats = SessionCacheStats()
+
+  @property
+  def cache_stats(self) -> SessionCacheStats:
+    """A snapshot of the cache counters."""
+    return self._stats.model_copy()
+
+  def invalidate(self, *, app_name: str, user_id: str, session_id: str) -> None:
+    """Drops a session from the cache."""
+    self._sessions.pop((app_name, user_id, session_id))
+
+  @override
+  async def create_session(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      state: Optional[dict[str, Any]] = None,
+      session_id: Optional[str] = None,
+  ) -> Session:
+    session = await self.session_service.create_session(
+        app_name=app_name, user_id=user_id, state=state, session_id=session_id
+    )
+    self._cache_session(session)
+    return session
+
+  @override
+  async def get_session(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      config: Optional[GetSessionConfig] = None,
+  ) -> Optional[Session]:
+    key = (app_name, user_id, session_id)
+    cached_session = await self._get_cached_session(key, config)
+    if cached_session is not None:
+      self._stats.hits += 1
+      return cached_session
+
+    self._stats.misses += 1
+    if config and config != GetSessionConfig():
+      # Partial sessions are not cached.
+      return await self.session_service.get_session(
+          app_name=app_name,
+          user_id=user_id,
+          session_id=session_id,
+          config=config,
+      )
+    session = await self.session_service.get_session(
+        app_name=app_name, user_id=user_id, session_id=session_id
+    )
+    if session:
+      self._cache_session(session)
+    return session
+
+  @override
+  async def iter_events(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      before_timestamp: Optional[float] = None,
+  ) -> AsyncGenerator[Event, None]:
+    async for event in self.session_service.iter_events(
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+        before_timestamp=before_timestamp,
+    ):
+      yield event
+
+  @override
+  async def get_session_version(
+      self, *, app_name: str, user_id: str, session_id: str
+  ) -> Optional[str]:
+    return await self.session_service.get_session_version(
+        app_name=app_name, user_id=user_id, session_id=session_id
+    )
+
+  @override
+  async def list_sessions(
+      self, *, app_name: str, user_id: str
+  ) -> ListSessionsResponse:
+    return await self.session_service.list_sessions(
+        app_name=app_name, user_id=user_id
+    )
+
+  @override
+  async def list_sessions_page(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      config: Optional[ListSessionsConfig] = None,
+  ) -> ListSessionsResponse:
+    return await self.session_service.list_sessions_page(
+        app_name=app_name, user_id=user_id, config=config
+    )
+
+  @override
+  async def list_events(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      config: Optional[ListEventsConfig] = None,
+  ) -> ListEventsResponse:
+    return await self.session_service.list_events(
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+        config=config,
+    )
+
+  @override
+  async def delete_session(
+      self, *, app_name: str, user_id: str, session_id: str
+  ) -> None:
+    self.invalidate(app_name=app_name, user_id=user_id, session_id=session_id)
+    await self.session_service.delete_session(
+        app_name=app_name, user_id=user_id, session_id=session_id
+    )
+
+  @override
+  async def append_event(self, session: Session, event: Event) -> Event:
+    key = (session.app_name, session.user_id, session.id)
+    last_update_time = session.last_update_time
+    version = session.version
+    try:
+      event = await self.session_service.append_event(session, event)
+    except Exception:
+      self._sessions.pop(key)
+      raise
+    if event.partial:
+      return event
+
+    app_state_delta, user_state_delta, session_state_delta = (
+        _session_util.split_state(
+            event.actions.state_delta if event.actions else {}
+        )
+    )
+    if app_state_delta:
+      app_state = self._app_states.get(session.app_name)
+      if app_state is not None:
+        app_state.update(app_state_delta)
+    if user_state_delta:
+      user_state = self._user_states.get((session.app_name, session.user_id))
+      if user_state is not None:
+        user_state.update(user_state_delta)
+
+    cached_session = self._sessions.get(key)
+    if cached_session is None:
+      return event
+    if (
+        cached_session.session.last_update_time != last_update_time
+        or session.version > version + 1
+    ):
+      # The session was appended to through another session object, so the
+      # cached copy can't be brought up to date.
+      self._sessions.pop(key)
+      self._stats.invalidations += 1
+      return event
+    cached_session.session.events.append(copy.deepcopy(event))
+    cached_session.session.state.update(copy.deepcopy(session_state_delta))
+    cached_session.session.last_update_time = session.last_update_time
+    cached_session.session.version = session.version
+    cached_session.version = _session_util.session_version(
+        session.last_update_time, len(cached_session.session.events)
+    )
+    return event
+
+  async def _get_cached_session(
+      self, key: _SessionKey, config: Optional[GetSessionConfig]
+  ) -> Optional[Session]:
+    """Returns a copy of the cached session if it is still current."""
+    app_name, user_id, session_id = key
+    cached_session = self._sessions.get(key)
+    if cached_session is None:
+      return None
+    app_state = self._app_states.get(app_name, self.state_ttl_seconds)
+    user_state = self._user_states.get(
+        (app_name, user_id), self.state_ttl_seconds
+    )
+    if app_state is None or user_state is None:
+      return None
+
+    if time.time() - cached_session.validated_at > self.max_staleness_seconds:
+      version = await self.session_service.get_session_version(
+          app_name=app_name, user_id=user_id, session_id=session_id
+      )
+      if version != cached_session.version:
+        self._sessions.pop(key)
+        self._stats.invalidations += 1
+        return None
+      cached_session.validated_at = time.time()
+
+    # Only copies the events that are returned.
+    events = cached_session.session.events
+    if config and config.num_recent_events:
+      events = events[-config.num_recent_events :]
+    if config and config.after_timestamp:
+      events = [
+          event for event in events if event.timestamp >= config.after_timestamp
+      ]
+    session = copy.deepcopy(
+        cached_session.session.model_copy(update={'events': events})
+    )
+    session.state.update(
+        _session_util.prefix_state(State.APP_PREFIX, copy.deepcopy(app_state))
+    )
+    session.state.update(
+        _session_util.prefix_state(State.USER_PREFIX, copy.deepcopy(user_state))
+    )
+    if config and config.state_keys is not None:
+      state_keys = set(config.state_keys)
+      session.state = {
+          key: value
+          for key, value in session.state.items()
+          if key in state_keys
+      }
+    return session
+
+  def _cache_session(self, session: Session) -> None:
+    """Caches a copy of a full session loaded from the wrapped service."""
+    app_state, user_state, session_state = _session_util.split_state(
+        session.state
+    )
+    self._app_states.put(session.app_name, copy.deepcopy(app_state))
+    self._user_states.put(
+        (session.app_name, session.user_id), copy.deepcopy(user_state)
+    )
+    cached_session = copy.deepcopy(
+        session.model_copy(update={'state': session_state})
+    )
+    self._sessions.put(
+        (session.app_name, session.user_id, session.id),
+        _CachedSession(
+            cached_session,
+            _session_util.session_version(
+                session.last_update_time, len(session.events)
+            ),
+        ),
+    )
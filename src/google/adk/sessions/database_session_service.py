@@ -13,28 +13,41 @@
 # limitations under the License.
 from __future__ import annotations
 
+import asyncio
 import copy
 from datetime import datetime
 import json
 import logging
 from typing import Any
+from typing import AsyncGenerator
 from typing import Optional
 import uuid
+import weakref
 
 from google.genai import types
+from sqlalchemy import and_
 from sqlalchemy import Boolean
 from sqlalchemy import delete
 from sqlalchemy import Dialect
 from sqlalchemy import ForeignKeyConstraint
 from sqlalchemy import func
+from sqlalchemy import Integer
+from sqlalchemy import or_
+from sqlalchemy import select
+from sqlalchemy import text
 from sqlalchemy import Text
+from sqlalchemy import tuple_
+from sqlalchemy import type_coerce
+from sqlalchemy import update
 from sqlalchemy.dialects import mysql
 from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.engine import create_engine
 from sqlalchemy.engine import Engine
 from sqlalchemy.exc import ArgumentError
 from sqlalchemy.ext.mutable import MutableDict
 from sqlalchemy.inspection import inspect
+from sqlalchemy.orm import aliased
 from sqlalchemy.orm import DeclarativeBase
 from sqlalchemy.orm import Mapped
 from sqlalchemy.orm import mapped_column
@@ -43,7 +56,7 @@ from sqlalchemy.orm import Session as DatabaseSessionFactory
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.schema import MetaData
 from sqlalchemy.types import DateTime
-from sqlalchemy.types import PickleType
+from sqlalchemy.types import LargeBinary
 from sqlalchemy.types import String
 from sqlalchemy.types import TypeDecorator
 from typing_extensions import override
@@ -51,9 +64,14 @@ from tzlocal import get_localzone
 
 from . import _session_util
 from ..events.event import Event
+from ..events.event_actions import EventActions
 from .base_session_service import BaseSessionService
 from .base_session_service import GetSessionConfig
+from .base_session_service import ListEventsConfig
+from .base_session_service import ListEventsResponse
+from .base_session_service import ListSessionsConfig
 from .base_session_service import ListSessionsResponse
+from .base_session_service import SessionConflictError
 from .session import Session
 from .state import State
 
@@ -67,6 +85,7 @@ class DynamicJSON(TypeDecorator):
   """A JSON-like type that uses JSONB on PostgreSQL and TEXT with JSON serialization for other databases."""
 
   impl = Text  # Default implementation is TEXT
+  cache_ok = True
 
   def load_dialect_impl(self, dialect: Dialect):
     if dialect.name == "postgresql":
@@ -80,7 +99,8 @@ class DynamicJSON(TypeDecorator):
     if value is not None:
       if dialect.name == "postgresql":
         return value  # JSONB handles dict directly
-      return json.dumps(value)  # Serialize to JSON string for TEXT
+      # Serialize to minified JSON string for TEXT
+      return json.dumps(value, separators=(",", ":"))
     return value
 
   def process_result_value(self, value, dialect: Dialect):
@@ -92,6 +112,29 @@ class DynamicJSON(TypeDecorator):
     return value
 
 
+class CompactEventActions(TypeDecorator):
+  """Stores event actions as versioned, compact JSON.
+
+  The column keeps the binary type used by the previous pickle storage, so
+  existing tables don't need a schema change. Pickled rows written by older
+  versions are still readable and can be rewritten with
+  `DatabaseSessionService.migrate_event_actions`.
+  """
+
+  impl = LargeBinary
+  cache_ok = True
+
+  def process_bind_param(self, value, dialect: Dialect):
+    if value is not None:
+      return _session_util.encode_event_actions(value)
+    return value
+
+  def process_result_value(self, value, dialect: Dialect):
+    if value is not None:
+      return _session_util.decode_event_actions(value)
+    return value
+
+
 class PreciseTimestamp(TypeDecorator):
   """Represents a timestamp precise to the microsecond."""
 
@@ -130,6 +173,8 @@ class StorageSession(Base):
   state: Mapped[MutableDict[str, Any]] = mapped_column(
       MutableDict.as_mutable(DynamicJSON), default={}
   )
+  # Incremented by every appended event.
+  version: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
 
   create_time: Mapped[DateTime] = mapped_column(DateTime(), default=func.now())
   update_time: Mapped[DateTime] = mapped_column(
@@ -172,7 +217,7 @@ class StorageEvent(Base):
       PreciseTimestamp, default=func.now()
   )
   content: Mapped[dict[str, Any]] = mapped_column(DynamicJSON, nullable=True)
-  actions: Mapped[MutableDict[str, Any]] = mapped_column(PickleType)
+  actions: Mapped[EventActions] = mapped_column(CompactEventActions)
 
   long_running_tool_ids_json: Mapped[Optional[str]] = mapped_column(
       Text, nullable=True
@@ -187,6 +232,9 @@ class StorageEvent(Base):
   )
   error_message: Mapped[str] = mapped_column(String(1024), nullable=True)
   interrupted: Mapped[bool] = mapped_column(Boolean, nullable=True)
+  session_version: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+  """The version the event brought its session to, or None for the events
+  appended by older versions."""
 
   storage_session: Mapped[StorageSession] = relationship(
       "StorageSession",
@@ -246,23 +294,24 @@ class StorageEvent(Base):
     return storage_event
 
   def to_event(self) -> Event:
-    return Event(
+    # Content and grounding metadata are only validated when accessed.
+    return Event.with_lazy_fields(
+        {
+            "content": self.content,
+            "grounding_metadata": self.grounding_metadata,
+        },
         id=self.id,
         invocation_id=self.invocation_id,
         author=self.author,
         branch=self.branch,
         actions=self.actions,
         timestamp=self.timestamp.timestamp(),
-        content=_session_util.decode_content(self.content),
         long_running_tool_ids=self.long_running_tool_ids,
         partial=self.partial,
         turn_complete=self.turn_complete,
         error_code=self.error_code,
         error_message=self.error_message,
         interrupted=self.interrupted,
-        grounding_metadata=_session_util.decode_grounding_metadata(
-            self.grounding_metadata
-        ),
     )
 
 
@@ -301,11 +350,65 @@ class StorageUserState(Base):
   )
 
 
+class StorageStateEntry(Base):
+  """Represents a single state key stored in the database.
+
+  Only used when the service stores state per key, in which case the state
+  columns of the other tables are left empty.
+  """
+
+  __tablename__ = "state_entries"
+
+  app_name: Mapped[str] = mapped_column(
+      String(DEFAULT_MAX_KEY_LENGTH), primary_key=True
+  )
+  # One of "app", "user" or "session".
+  scope: Mapped[str] = mapped_column(String(16), primary_key=True)
+  # Empty for app state.
+  user_id: Mapped[str] = mapped_column(
+      String(DEFAULT_MAX_KEY_LENGTH), primary_key=True, default=""
+  )
+  # Empty for app and user state.
+  session_id: Mapped[str] = mapped_column(
+      String(DEFAULT_MAX_KEY_LENGTH), primary_key=True, default=""
+  )
+  key: Mapped[str] = mapped_column(
+      String(DEFAULT_MAX_VARCHAR_LENGTH), primary_key=True
+  )
+  value: Mapped[Any] = mapped_column(DynamicJSON, nullable=True)
+  update_time: Mapped[DateTime] = mapped_column(
+      DateTime(), default=func.now(), onupdate=func.now()
+  )
+
+
+_APP_SCOPE = "app"
+_USER_SCOPE = "user"
+_SESSION_SCOPE = "session"
+
+
 class DatabaseSessionService(BaseSessionService):
   """A session service that uses a database for storage."""
 
-  def __init__(self, db_url: str, **kwargs: Any):
-    """Initializes the database session service with a database URL."""
+  def __init__(
+      self,
+      db_url: str,
+      *,
+      per_key_state: bool = False,
+      max_append_attempts: int = 3,
+      **kwargs: Any,
+  ):
+    """Initializes the database session service with a database URL.
+
+    Args:
+      db_url: The database URL.
+      per_key_state: Whether to store app, user and session state as one row
+        per key instead of one JSON document per scope. State deltas are then
+        upserted key by key, and reads only fetch the scopes and keys they
+        need. Existing documents can be moved with `migrate_state_to_entries`.
+      max_append_attempts: How many times an event is appended before giving
+        up, when the session keeps being updated concurrently.
+      **kwargs: Additional arguments passed to `create_engine`.
+    """
     # 1. Create DB engine for db connection
     # 2. Create all tables based on schema
     # 3. Initialize all properties
@@ -330,6 +433,15 @@ class DatabaseSessionService(BaseSessionService):
     logger.info(f"Local timezone: {local_timezone}")
 
     self.db_engine: Engine = db_engine
+    self.per_key_state = per_key_state
+    self.max_append_attempts = max_append_attempts
+    # Whether appended events update the app state. A ShardedSessionService
+    # keeps the app state on its primary database only.
+    self._store_app_state = True
+    # Serializes the appends to a session within this process.
+    self._session_locks: weakref.WeakValueDictionary[
+        tuple[str, str, str], asyncio.Lock
+    ] = weakref.WeakValueDictionary()
     self.metadata: MetaData = MetaData()
     self.inspector = inspect(self.db_engine)
 
@@ -341,6 +453,23 @@ class DatabaseSessionService(BaseSessionService):
     # Uncomment to recreate DB every time
     # Base.metadata.drop_all(self.db_engine)
     Base.metadata.create_all(self.db_engine)
+    self._add_version_columns()
+
+  def _add_version_columns(self) -> None:
+    """Adds the version columns to tables created by older versions."""
+    inspector = inspect(self.db_engine)
+    for table_name, column_definition in (
+        (StorageSession.__tablename__, "version INTEGER NOT NULL DEFAULT 0"),
+        (StorageEvent.__tablename__, "session_version INTEGER"),
+    ):
+      column_name = column_definition.split()[0]
+      columns = inspector.get_columns(table_name)
+      if any(column["name"] == column_name for column in columns):
+        continue
+      with self.db_engine.begin() as connection:
+        connection.execute(
+            text(f"ALTER TABLE {table_name} ADD COLUMN {column_definition}")
+        )
 
   @override
   async def create_session(
@@ -357,6 +486,14 @@ class DatabaseSessionService(BaseSessionService):
     # 4. Build the session object with generated id
     # 5. Return the session
 
+    if self.per_key_state:
+      return self._create_session_per_key(
+          app_name=app_name,
+          user_id=user_id,
+          state=state,
+          session_id=session_id,
+      )
+
     with self.database_session_factory() as session_factory:
 
       # Fetch app and user states from storage
@@ -413,9 +550,47 @@ class DatabaseSessionService(BaseSessionService):
           id=str(storage_session.id),
           state=merged_state,
           last_update_time=storage_session.update_time.timestamp(),
+          version=storage_session.version,
       )
       return session
 
+  def _create_session_per_key(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      state: Optional[dict[str, Any]],
+      session_id: Optional[str],
+  ) -> Session:
+    with self.database_session_factory() as session_factory:
+      storage_session = StorageSession(
+          app_name=app_name, user_id=user_id, id=session_id, state={}
+      )
+      session_factory.add(storage_session)
+      # Generates the session id.
+      session_factory.flush()
+      _upsert_state_entries(
+          session_factory,
+          app_name,
+          user_id,
+          storage_session.id,
+          *_extract_state_delta(state),
+      )
+      session_factory.commit()
+      session_factory.refresh(storage_session)
+
+      app_state, user_state, session_state = _load_state_entries(
+          session_factory, app_name, user_id, storage_session.id
+      )
+      return Session(
+          app_name=str(storage_session.app_name),
+          user_id=str(storage_session.user_id),
+          id=str(storage_session.id),
+          state=_merge_state(app_state, user_state, session_state),
+          last_update_time=storage_session.update_time.timestamp(),
+          version=storage_session.version,
+      )
+
   @override
   async def get_session(
       self,
@@ -454,18 +629,38 @@ class DatabaseSessionService(BaseSessionService):
           .all()
       )
 
-      # Fetch states from storage
-      storage_app_state = session_factory.get(StorageAppState, (app_name))
-      storage_user_state = session_factory.get(
-          StorageUserState, (app_name, user_id)
-      )
+      state_keys = config.state_keys if config else None
+      if self.per_key_state:
+        # Values are freshly loaded, so they don't need to be copied.
+        app_state, user_state, merged_state = _load_state_entries(
+            session_factory, app_name, user_id, session_id, state_keys
+        )
+        merged_state.update(
+            _session_util.prefix_state(State.APP_PREFIX, app_state)
+        )
+        merged_state.update(
+            _session_util.prefix_state(State.USER_PREFIX, user_state)
+        )
+      else:
+        # Fetch states from storage
+        storage_app_state = session_factory.get(StorageAppState, (app_name))
+        storage_user_state = session_factory.get(
+            StorageUserState, (app_name, user_id)
+        )
 
-      app_state = storage_app_state.state if storage_app_state else {}
-      user_state = storage_user_state.state if storage_user_state else {}
-      session_state = storage_session.state
+        app_state = storage_app_state.state if storage_app_state else {}
+        user_state = storage_user_state.state if storage_user_state else {}
+        session_state = storage_session.state
 
-      # Merge states
-      merged_state = _merge_state(app_state, user_state, session_state)
+        # Merge states
+        merged_state = _merge_state(app_state, user_state, session_state)
+        if state_keys is not None:
+          state_keys = set(state_keys)
+          merged_state = {
+              key: value
+              for key, value in merged_state.items()
+              if key in state_keys
+          }
 
       # Convert storage session to session
       session = Session(
@@ -474,10 +669,87 @@ class DatabaseSessionService(BaseSessionService):
           id=session_id,
           state=merged_state,
           last_update_time=storage_session.update_time.timestamp(),
+          version=storage_session.version,
       )
       session.events = [e.to_event() for e in reversed(storage_events)]
     return session
 
+  @override
+  async def iter_events(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      before_timestamp: Optional[float] = None,
+      page_size: int = 100,
+  ) -> AsyncGenerator[Event, None]:
+    """Pages through the events of a session, from the newest to the oldest.
+
+    Each page is loaded with its own database session, resuming after the last
+    (timestamp, id) pair that was yielded.
+    """
+    cursor = None
+    while True:
+      with self.database_session_factory() as session_factory:
+        query = session_factory.query(StorageEvent).filter(
+            StorageEvent.app_name == app_name,
+            StorageEvent.user_id == user_id,
+            StorageEvent.session_id == session_id,
+        )
+        if before_timestamp is not None:
+          query = query.filter(
+              StorageEvent.timestamp < datetime.fromtimestamp(before_timestamp)
+          )
+        if cursor is not None:
+          last_timestamp, last_id = cursor
+          query = query.filter(
+              or_(
+                  StorageEvent.timestamp < last_timestamp,
+                  and_(
+                      StorageEvent.timestamp == last_timestamp,
+                      StorageEvent.id < last_id,
+                  ),
+              )
+          )
+        storage_events = (
+            query.order_by(
+                StorageEvent.timestamp.desc(), StorageEvent.id.desc()
+            )
+            .limit(page_size)
+            .all()
+        )
+        events = [e.to_event() for e in storage_events]
+        if storage_events:
+          cursor = (storage_events[-1].timestamp, storage_events[-1].id)
+      for event in events:
+        yield event
+      if len(events) < page_size:
+        return
+
+  @override
+  async def get_session_version(
+      self, *, app_name: str, user_id: str, session_id: str
+  ) -> Optional[str]:
+    with self.database_session_factory() as session_factory:
+      update_time = session_factory.scalar(
+          select(StorageSession.update_time).where(
+              StorageSession.app_name == app_name,
+              StorageSession.user_id == user_id,
+              StorageSession.id == session_id,
+          )
+      )
+      if update_time is None:
+        return None
+      num_events = session_factory.scalar(
+          select(func.count()).where(
+              StorageEvent.app_name == app_name,
+              StorageEvent.user_id == user_id,
+              StorageEvent.session_id == session_id,
+          )
+      )
+    return _session_util.session_version(update_time.timestamp(), num_events)
+
   @override
   async def list_sessions(
       self, *, app_name: str, user_id: str
@@ -497,10 +769,217 @@ class DatabaseSessionService(BaseSessionService):
             id=storage_session.id,
             state={},
             last_update_time=storage_session.update_time.timestamp(),
+            version=storage_session.version,
         )
         sessions.append(session)
       return ListSessionsResponse(sessions=sessions)
 
+  @override
+  async def list_sessions_page(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      config: Optional[ListSessionsConfig] = None,
+  ) -> ListSessionsResponse:
+    """Lists a page of sessions with keyset pagination on (update_time, id).
+
+    Event counts and last events are loaded with one query each for the whole
+    page.
+    """
+    config = config or ListSessionsConfig()
+    with self.database_session_factory() as session_factory:
+      query = session_factory.query(StorageSession).filter(
+          StorageSession.app_name == app_name,
+          StorageSession.user_id == user_id,
+      )
+      if config.page_token:
+        last_update_time, last_id = _decode_cursor(config.page_token)
+        # Compares against the stored update time of the last session when it
+        # still exists, since databases may store it at a lower precision than
+        # the bound datetime, e.g. SQLite's CURRENT_TIMESTAMP.
+        last_session = aliased(StorageSession)
+        last_update_time = func.coalesce(
+            select(last_session.update_time)
+            .where(
+                last_session.app_name == app_name,
+                last_session.user_id == user_id,
+                last_session.id == last_id,
+            )
+            .scalar_subquery(),
+            last_update_time,
+        )
+        query = query.filter(
+            or_(
+                StorageSession.update_time < last_update_time,
+                and_(
+                    StorageSession.update_time == last_update_time,
+                    StorageSession.id < last_id,
+                ),
+            )
+        )
+      storage_sessions = (
+          query.order_by(
+              StorageSession.update_time.desc(), StorageSession.id.desc()
+          )
+          .limit(config.page_size + 1)
+          .all()
+      )
+      response = ListSessionsResponse(
+          sessions=[
+              Session(
+                  app_name=app_name,
+                  user_id=user_id,
+                  id=storage_session.id,
+                  state={},
+                  last_update_time=storage_session.update_time.timestamp(),
+                  version=storage_session.version,
+              )
+              for storage_session in storage_sessions[: config.page_size]
+          ]
+      )
+      if len(storage_sessions) > config.page_size:
+        last_session = storage_sessions[config.page_size - 1]
+        response.next_page_token = _encode_cursor(
+            last_session.update_time, last_session.id
+        )
+
+      session_ids = [session.id for session in response.sessions]
+      session_filter = (
+          StorageEvent.app_name == app_name,
+          StorageEvent.user_id == user_id,
+          StorageEvent.session_id.in_(session_ids),
+      )
+      if config.include_event_count:
+        response.event_counts = dict.fromkeys(session_ids, 0)
+        response.event_counts.update(
+            session_factory.execute(
+                select(StorageEvent.session_id, func.count())
+                .where(*session_filter)
+                .group_by(StorageEvent.session_id)
+            ).all()
+        )
+      if config.include_last_event and session_ids:
+        ranked_events = (
+            select(
+                StorageEvent.id,
+                StorageEvent.session_id,
+                func.row_number()
+                .over(
+                    partition_by=StorageEvent.session_id,
+                    order_by=(
+                        StorageEvent.timestamp.desc(),
+                        StorageEvent.id.desc(),
+                    ),
+                )
+                .label("rank"),
+            )
+            .where(*session_filter)
+            .subquery()
+        )
+        last_events = session_factory.scalars(
+            select(StorageEvent).join(
+                ranked_events,
+                and_(
+                    *session_filter,
+                    StorageEvent.id == ranked_events.c.id,
+                    StorageEvent.session_id == ranked_events.c.session_id,
+                    ranked_events.c.rank == 1,
+                ),
+            )
+        ).all()
+        last_events_by_session = {
+            storage_event.session_id: storage_event.to_event()
+            for storage_event in last_events
+        }
+        for session in response.sessions:
+          if session.id in last_events_by_session:
+            session.events = [last_events_by_session[session.id]]
+    return response
+
+  @override
+  async def list_events(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      config: Optional[ListEventsConfig] = None,
+  ) -> ListEventsResponse:
+    """Lists a page of events with keyset pagination on (timestamp, id).
+
+    All filters but `has_function_calls`, which needs the event content, are
+    applied by the database. When it is set, events are read in batches until
+    the page is full.
+    """
+    config = config or ListEventsConfig()
+    cursor = _decode_cursor(config.page_token) if config.page_token else None
+    matches: list[StorageEvent] = []
+    with self.database_session_factory() as session_factory:
+      query = session_factory.query(StorageEvent).filter(
+          StorageEvent.app_name == app_name,
+          StorageEvent.user_id == user_id,
+          StorageEvent.session_id == session_id,
+      )
+      if config.authors is not None:
+        query = query.filter(StorageEvent.author.in_(config.authors))
+      if config.after_timestamp is not None:
+        query = query.filter(
+            StorageEvent.timestamp
+            >= datetime.fromtimestamp(config.after_timestamp)
+        )
+      if config.before_timestamp is not None:
+        query = query.filter(
+            StorageEvent.timestamp
+            < datetime.fromtimestamp(config.before_timestamp)
+        )
+      # One more event than the page is read to know if there is a next page.
+      while len(matches) <= config.page_size:
+        batch_query = query
+        if cursor is not None:
+          last_timestamp, last_id = cursor
+          batch_query = batch_query.filter(
+              or_(
+                  StorageEvent.timestamp > last_timestamp,
+                  and_(
+                      StorageEvent.timestamp == last_timestamp,
+                      StorageEvent.id > last_id,
+                  ),
+              )
+          )
+        batch = (
+            batch_query.order_by(StorageEvent.timestamp, StorageEvent.id)
+            .limit(config.page_size + 1)
+            .all()
+        )
+        for storage_event in batch:
+          if (
+              config.has_function_calls is None
+              or config.has_function_calls
+              == (
+                  any(
+                      part.get("function_call")
+                      for part in (storage_event.content or {}).get(
+                          "parts"
+                      ) or []
+                  )
+              )
+          ):
+            matches.append(storage_event)
+        if len(batch) <= config.page_size:
+          break
+        cursor = (batch[-1].timestamp, batch[-1].id)
+
+      response = ListEventsResponse(
+          events=[e.to_event() for e in matches[: config.page_size]]
+      )
+      if len(matches) > config.page_size:
+        last_event = matches[config.page_size - 1]
+        response.next_page_token = _encode_cursor(
+            last_event.timestamp, last_event.id
+        )
+    return response
+
   @override
   async def delete_session(
       self, app_name: str, user_id: str, session_id: str
@@ -512,6 +991,15 @@ class DatabaseSessionService(BaseSessionService):
           StorageSession.id == session_id,
       )
       session_factory.execute(stmt)
+      if self.per_key_state:
+        session_factory.execute(
+            delete(StorageStateEntry).where(
+                StorageStateEntry.app_name == app_name,
+                StorageStateEntry.scope == _SESSION_SCOPE,
+                StorageStateEntry.user_id == user_id,
+                StorageStateEntry.session_id == session_id,
+            )
+        )
       session_factory.commit()
 
   @override
@@ -521,67 +1009,465 @@ class DatabaseSessionService(BaseSessionService):
     if event.partial:
       return event
 
-    # 1. Check if timestamp is stale
-    # 2. Update session attributes based on event config
-    # 3. Store event to table
+    async with self._get_session_lock(session):
+      attempt = 1
+      while not self._try_append_event(session, event):
+        if attempt >= self.max_append_attempts:
+          raise SessionConflictError(
+              f"Failed to append event {event.id} to session {session.id}"
+              f" after {attempt} attempts, as the session kept being updated"
+              " concurrently."
+          )
+        await self._rebase_session(session, event)
+        attempt += 1
+
+    # Also update the in-memory session
+    await super().append_event(session=session, event=event)
+    return event
+
+  def _get_session_lock(self, session: Session) -> asyncio.Lock:
+    key = (session.app_name, session.user_id, session.id)
+    lock = self._session_locks.get(key)
+    if lock is None:
+      lock = asyncio.Lock()
+      self._session_locks[key] = lock
+    return lock
+
+  def _try_append_event(self, session: Session, event: Event) -> bool:
+    """Stores the event if the session is at the version of the session object.
+
+    Returns:
+      Whether the event was stored. If not, the session was updated through
+      another session object since it was loaded.
+    """
+    # Extract state delta
+    app_state_delta = {}
+    user_state_delta = {}
+    session_state_delta = {}
+    if event.actions:
+      if event.actions.state_delta:
+        app_state_delta, user_state_delta, session_state_delta = (
+            _extract_state_delta(event.actions.state_delta)
+        )
+    if not self._store_app_state:
+      app_state_delta = {}
+
+    with self.database_session_factory() as session_factory:
+      session_filter = (
+          StorageSession.app_name == session.app_name,
+          StorageSession.user_id == session.user_id,
+          StorageSession.id == session.id,
+      )
+      values = {"version": session.version + 1}
+      if session_state_delta and not self.per_key_state:
+        session_state = session_factory.scalar(
+            select(StorageSession.state).where(*session_filter)
+        )
+        values["state"] = {**(session_state or {}), **session_state_delta}
+      # Only succeeds if nobody else appended since the session was loaded.
+      result = session_factory.execute(
+          update(StorageSession)
+          .where(*session_filter, StorageSession.version == session.version)
+          .values(**values)
+      )
+      if result.rowcount != 1:
+        session_factory.rollback()
+        return False
+
+      if self.per_key_state:
+        # Only the changed keys are written.
+        _upsert_state_entries(
+            session_factory,
+            session.app_name,
+            session.user_id,
+            session.id,
+            app_state_delta,
+            user_state_delta,
+            session_state_delta,
+        )
+      else:
+        # Fetch states from storage
+        storage_app_state = session_factory.get(
+            StorageAppState, (session.app_name)
+        )
+        storage_user_state = session_factory.get(
+            StorageUserState, (session.app_name, session.user_id)
+        )
+
+        # Merge state and update storage
+        if app_state_delta and storage_app_state:
+          storage_app_state.state = {
+              **storage_app_state.state,
+              **app_state_delta,
+          }
+        if user_state_delta and storage_user_state:
+          storage_user_state.state = {
+              **storage_user_state.state,
+              **user_state_delta,
+          }
+
+      storage_event = StorageEvent.from_event(session, event)
+      storage_event.session_version = session.version + 1
+      session_factory.add(storage_event)
+      session_factory.flush()
+      update_time = session_factory.scalar(
+          select(StorageSession.update_time).where(*session_filter)
+      )
+      session_factory.commit()
+
+    # Update timestamp with commit time
+    session.last_update_time = update_time.timestamp()
+    session.version += 1
+    return True
+
+  async def _rebase_session(self, session: Session, event: Event) -> None:
+    """Applies the events appended through other session objects.
+
+    Raises:
+      SessionConflictError: If those events changed any of the state keys that
+        the event changes.
+      ValueError: If the session doesn't exist.
+    """
+    known_event_ids = {e.id for e in session.events}
     with self.database_session_factory() as session_factory:
       storage_session = session_factory.get(
           StorageSession, (session.app_name, session.user_id, session.id)
       )
+      if storage_session is None:
+        raise ValueError(f"Session {session.id} not found.")
+      # The versions the events were appended at order them regardless of
+      # the clocks of the writers.
+      query = session_factory.query(StorageEvent).filter(
+          StorageEvent.app_name == session.app_name,
+          StorageEvent.user_id == session.user_id,
+          StorageEvent.session_id == session.id,
+          StorageEvent.session_version > session.version,
+      )
+      missed_events = [
+          storage_event.to_event()
+          for storage_event in query.order_by(StorageEvent.session_version)
+          if storage_event.id not in known_event_ids
+      ]
+      version = storage_session.version
+      update_time = storage_session.update_time
+
+    changed_keys = {
+        key
+        for missed_event in missed_events
+        if missed_event.actions
+        for key in missed_event.actions.state_delta
+    }
+    delta_keys = event.actions.state_delta.keys() if event.actions else ()
+    conflicting_keys = sorted(
+        key
+        for key in delta_keys
+        if key in changed_keys and not key.startswith(State.TEMP_PREFIX)
+    )
+    if conflicting_keys:
+      raise SessionConflictError(
+          f"Event {event.id} conflicts with concurrent updates of session"
+          f" {session.id} to the state keys {conflicting_keys}."
+      )
 
-      if storage_session.update_time.timestamp() > session.last_update_time:
-        raise ValueError(
-            "The last_update_time provided in the session object"
-            f" {datetime.fromtimestamp(session.last_update_time):'%Y-%m-%d %H:%M:%S'} is"
-            " earlier than the update_time in the storage_session"
-            f" {storage_session.update_time:'%Y-%m-%d %H:%M:%S'}. Please check"
-            " if it is a stale session."
-        )
+    logger.info(
+        "Rebasing event %s onto %d concurrent events of session %s.",
+        event.id,
+        len(missed_events),
+        session.id,
+    )
+    for missed_event in missed_events:
+      await super().append_event(session=session, event=missed_event)
+    session.version = version
+    session.last_update_time = update_time.timestamp()
 
-      # Fetch states from storage
-      storage_app_state = session_factory.get(
-          StorageAppState, (session.app_name)
-      )
-      storage_user_state = session_factory.get(
-          StorageUserState, (session.app_name, session.user_id)
+  async def list_user_ids(self, app_name: str) -> list[str]:
+    """Returns the ids of the users that have sessions of an app."""
+    with self.database_session_factory() as session_factory:
+      return list(
+          session_factory.scalars(
+              select(StorageSession.user_id)
+              .where(StorageSession.app_name == app_name)
+              .distinct()
+              .order_by(StorageSession.user_id)
+          )
       )
 
-      app_state = storage_app_state.state if storage_app_state else {}
-      user_state = storage_user_state.state if storage_user_state else {}
-      session_state = storage_session.state
+  async def get_app_state(self, app_name: str) -> dict[str, Any]:
+    """Returns the app state, without the `app:` prefix."""
+    with self.database_session_factory() as session_factory:
+      if self.per_key_state:
+        app_state, _, _ = _load_state_entries(session_factory, app_name, "", "")
+        return app_state
+      storage_app_state = session_factory.get(StorageAppState, (app_name))
+      return dict(storage_app_state.state) if storage_app_state else {}
 
-      # Extract state delta
-      app_state_delta = {}
-      user_state_delta = {}
-      session_state_delta = {}
-      if event.actions:
-        if event.actions.state_delta:
-          app_state_delta, user_state_delta, session_state_delta = (
-              _extract_state_delta(event.actions.state_delta)
+  async def update_app_state(
+      self, app_name: str, state_delta: dict[str, Any]
+  ) -> None:
+    """Updates the app state with a delta, given without the `app:` prefix."""
+    if not state_delta:
+      return
+    with self.database_session_factory() as session_factory:
+      if self.per_key_state:
+        _upsert_state_entries(
+            session_factory, app_name, "", "", state_delta, {}, {}
+        )
+      else:
+        storage_app_state = session_factory.get(StorageAppState, (app_name))
+        if storage_app_state is None:
+          session_factory.add(
+              StorageAppState(app_name=app_name, state=dict(state_delta))
           )
+        else:
+          storage_app_state.state = {**storage_app_state.state, **state_delta}
+      session_factory.commit()
 
-      # Merge state and update storage
-      if app_state_delta:
-        app_state.update(app_state_delta)
-        storage_app_state.state = app_state
-      if user_state_delta:
-        user_state.update(user_state_delta)
-        storage_user_state.state = user_state
-      if session_state_delta:
-        session_state.update(session_state_delta)
-        storage_session.state = session_state
+  def migrate_event_actions(self, batch_size: int = 500) -> int:
+    """Rewrites event actions stored as pickles in the compact JSON format.
+
+    Events are processed in primary key order and committed in batches, so the
+    migration can be interrupted and resumed at any time.
+
+    Args:
+      batch_size: The number of events to read and rewrite per transaction.
+
+    Returns:
+      The number of events that were rewritten.
+    """
+    table = StorageEvent.__table__
+    primary_key = tuple_(
+        table.c.app_name, table.c.user_id, table.c.session_id, table.c.id
+    )
+    raw_actions = type_coerce(table.c.actions, LargeBinary)
+    last_key = None
+    migrated = 0
+    while True:
+      with self.database_session_factory() as session_factory:
+        stmt = (
+            select(
+                table.c.app_name,
+                table.c.user_id,
+                table.c.session_id,
+                table.c.id,
+                raw_actions,
+            )
+            .order_by(
+                table.c.app_name,
+                table.c.user_id,
+                table.c.session_id,
+                table.c.id,
+            )
+            .limit(batch_size)
+        )
+        if last_key is not None:
+          stmt = stmt.where(primary_key > tuple_(*last_key))
+        rows = session_factory.execute(stmt).all()
+        if not rows:
+          return migrated
+
+        for app_name, user_id, session_id, event_id, data in rows:
+          if data is None or _session_util.is_compact_event_actions(data):
+            continue
+          session_factory.execute(
+              update(table)
+              .where(
+                  table.c.app_name == app_name,
+                  table.c.user_id == user_id,
+                  table.c.session_id == session_id,
+                  table.c.id == event_id,
+              )
+              .values(
+                  actions=type_coerce(
+                      _session_util.encode_event_actions(
+                          _session_util.decode_event_actions(data)
+                      ),
+                      LargeBinary,
+                  )
+              )
+          )
+          migrated += 1
+        session_factory.commit()
+        last_key = tuple(rows[-1][:4])
 
-      session_factory.add(StorageEvent.from_event(session, event))
+  def migrate_state_to_entries(self) -> int:
+    """Moves state stored as JSON documents into the per-key state table.
 
+    Each document is cleared in the same transaction that writes its keys, so
+    the migration can be run again if it's interrupted.
+
+    Returns:
+      The number of state keys that were moved.
+    """
+    migrated = 0
+    with self.database_session_factory() as session_factory:
+      for storage_app_state in session_factory.query(StorageAppState):
+        if storage_app_state.state:
+          _upsert_state_entries(
+              session_factory,
+              storage_app_state.app_name,
+              "",
+              "",
+              dict(storage_app_state.state),
+              {},
+              {},
+          )
+          migrated += len(storage_app_state.state)
+          storage_app_state.state = {}
+      for storage_user_state in session_factory.query(StorageUserState):
+        if storage_user_state.state:
+          _upsert_state_entries(
+              session_factory,
+              storage_user_state.app_name,
+              storage_user_state.user_id,
+              "",
+              {},
+              dict(storage_user_state.state),
+              {},
+          )
+          migrated += len(storage_user_state.state)
+          storage_user_state.state = {}
+      for storage_session in session_factory.query(StorageSession):
+        if storage_session.state:
+          _upsert_state_entries(
+              session_factory,
+              storage_session.app_name,
+              storage_session.user_id,
+              storage_session.id,
+              {},
+              {},
+              dict(storage_session.state),
+          )
+          migrated += len(storage_session.state)
+          storage_session.state = {}
       session_factory.commit()
-      session_factory.refresh(storage_session)
+    return migrated
+
+
+def _upsert_state_entries(
+    session_factory: DatabaseSessionFactory,
+    app_name: str,
+    user_id: str,
+    session_id: str,
+    app_state_delta: dict[str, Any],
+    user_state_delta: dict[str, Any],
+    session_state_delta: dict[str, Any],
+) -> None:
+  """Inserts or updates the state entries of the given deltas."""
+  rows = [
+      {
+          "app_name": app_name,
+          "scope": scope,
+          "user_id": scope_user_id,
+          "session_id": scope_session_id,
+          "key": key,
+          "value": value,
+      }
+      for scope, scope_user_id, scope_session_id, delta in (
+          (_APP_SCOPE, "", "", app_state_delta),
+          (_USER_SCOPE, user_id, "", user_state_delta),
+          (_SESSION_SCOPE, user_id, session_id, session_state_delta),
+      )
+      for key, value in delta.items()
+  ]
+  if not rows:
+    return
+
+  table = StorageStateEntry.__table__
+  dialect_name = session_factory.get_bind().dialect.name
+  if dialect_name in ("sqlite", "postgresql"):
+    insert = sqlite.insert if dialect_name == "sqlite" else postgresql.insert
+    stmt = insert(table).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[c.name for c in table.primary_key],
+        set_={"value": stmt.excluded.value, "update_time": func.now()},
+    )
+    session_factory.execute(stmt)
+  elif dialect_name == "mysql":
+    stmt = mysql.insert(table).values(rows)
+    stmt = stmt.on_duplicate_key_update(
+        value=stmt.inserted.value, update_time=func.now()
+    )
+    session_factory.execute(stmt)
+  else:
+    for row in rows:
+      session_factory.merge(StorageStateEntry(**row))
+
+
+def _load_state_entries(
+    session_factory: DatabaseSessionFactory,
+    app_name: str,
+    user_id: str,
+    session_id: str,
+    state_keys: Optional[list[str]] = None,
+) -> tuple[dict[str, Any], dict[str, Any], dict[str, Any]]:
+  """Loads the app, user and session state entries.
+
+  Args:
+    session_factory: The database session.
+    app_name: The name of the app.
+    user_id: The id of the user.
+    session_id: The id of the session.
+    state_keys: If set, only these prefixed keys are loaded. Scopes with no
+      requested keys are not queried at all.
+
+  Returns:
+    The app, user and session states, without prefixes.
+  """
+  scopes = [
+      (_APP_SCOPE, StorageStateEntry.scope == _APP_SCOPE),
+      (
+          _USER_SCOPE,
+          and_(
+              StorageStateEntry.scope == _USER_SCOPE,
+              StorageStateEntry.user_id == user_id,
+          ),
+      ),
+      (
+          _SESSION_SCOPE,
+          and_(
+              StorageStateEntry.scope == _SESSION_SCOPE,
+              StorageStateEntry.user_id == user_id,
+              StorageStateEntry.session_id == session_id,
+          ),
+      ),
+  ]
+  if state_keys is not None:
+    # Temp keys are never stored, so they are dropped here as well.
+    scope_keys = _extract_state_delta(dict.fromkeys(state_keys))
+    scopes = [
+        (scope, and_(condition, StorageStateEntry.key.in_(list(keys))))
+        for (scope, condition), keys in zip(scopes, scope_keys)
+        if keys
+    ]
+
+  states = {_APP_SCOPE: {}, _USER_SCOPE: {}, _SESSION_SCOPE: {}}
+  if scopes:
+    rows = session_factory.execute(
+        select(
+            StorageStateEntry.scope,
+            StorageStateEntry.key,
+            StorageStateEntry.value,
+        ).where(
+            StorageStateEntry.app_name == app_name,
+            or_(*(condition for _, condition in scopes)),
+        )
+    )
+    for scope, key, value in rows:
+      states[scope][key] = value
+  return states[_APP_SCOPE], states[_USER_SCOPE], states[_SESSION_SCOPE]
 
-      # Update timestamp with commit time
-      session.last_update_time = storage_session.update_time.timestamp()
 
-    # Also update the in-memory session
-    await super().append_event(session=session, event=event)
-    return event
+def _encode_cursor(timestamp: datetime, row_id: str) -> str:
+  # The stored datetime is encoded as is, so that it compares equal to itself.
+  return _session_util.encode_page_token(timestamp.isoformat(), row_id)
+
+
+def _decode_cursor(page_token: str) -> tuple[datetime, str]:
+  timestamp, row_id = _session_util.decode_page_token(page_token, str, str)
+  try:
+    return datetime.fromisoformat(timestamp), row_id
+  except ValueError as e:
+    raise ValueError(f"Invalid page token: {page_token!r}") from e
 
 
 def _extract_state_delta(state: dict[str, Any]):
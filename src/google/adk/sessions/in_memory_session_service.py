@@ -13,29 +13,88 @@
 # limitations under the License.
 from __future__ import annotations
 
+from collections import OrderedDict
 import copy
+import hashlib
 import logging
+import os
 import time
 from typing import Any
+from typing import AsyncGenerator
 from typing import Optional
 import uuid
 
+from pydantic import BaseModel
 from typing_extensions import override
 
+from . import _session_util
 from ..events.event import Event
 from .base_session_service import BaseSessionService
 from .base_session_service import GetSessionConfig
+from .base_session_service import ListEventsConfig
+from .base_session_service import ListEventsResponse
+from .base_session_service import ListSessionsConfig
 from .base_session_service import ListSessionsResponse
+from .base_session_service import paginate_events
 from .session import Session
 from .state import State
 
 logger = logging.getLogger('google_adk.' + __name__)
 
+_SessionKey = tuple[str, str, str]
+
+
+class SessionEvictionStats(BaseModel):
+  """Counters describing how the in-memory session store has been bounded."""
+
+  resident_sessions: int = 0
+  """The number of sessions currently held in memory."""
+  resident_bytes: int = 0
+  """The estimated size of the sessions held in memory."""
+  spilled_sessions: int = 0
+  """The number of sessions currently spilled to the local file store."""
+  evictions: int = 0
+  """The number of sessions evicted to stay within the memory budget."""
+  expirations: int = 0
+  """The number of sessions removed because their TTL elapsed."""
+  spills: int = 0
+  """The number of times a session was written to the local file store."""
+  restores: int = 0
+  """The number of times a spilled session was loaded back into memory."""
+
 
 class InMemorySessionService(BaseSessionService):
-  """An in-memory implementation of the session service."""
+  """An in-memory implementation of the session service.
+
+  By default the service keeps every session forever. For long running
+  processes it can be bounded: sessions that were not accessed for
+  `session_ttl_seconds` are removed, and once `max_sessions` or
+  `max_memory_bytes` is exceeded the least recently used sessions are evicted.
+  If `spill_dir` is set, evicted sessions are written to that directory and
+  transparently loaded back on the next access instead of being dropped.
+  """
 
-  def __init__(self):
+  def __init__(
+      self,
+      *,
+      max_sessions: Optional[int] = None,
+      max_memory_bytes: Optional[int] = None,
+      session_ttl_seconds: Optional[float] = None,
+      spill_dir: Optional[str] = None,
+  ):
+    """Initializes the in-memory session service.
+
+    Args:
+      max_sessions: The maximum number of sessions kept in memory. Unbounded if
+        not set.
+      max_memory_bytes: The memory budget for the sessions kept in memory. The
+        size of a session is estimated from its JSON serialization. Unbounded
+        if not set.
+      session_ttl_seconds: Sessions not accessed for this many seconds are
+        removed, including spilled ones. Never expire if not set.
+      spill_dir: The directory to spill evicted sessions to. If not set,
+        evicted sessions are dropped.
+    """
     # A map from app name to a map from user ID to a map from session ID to
     # session.
     self.sessions: dict[str, dict[str, dict[str, Session]]] = {}
@@ -44,6 +103,35 @@ class InMemorySessionService(BaseSessionService):
     # A map from app name to a map from key to the value.
     self.app_state: dict[str, dict[str, Any]] = {}
 
+    self.max_sessions = max_sessions
+    self.max_memory_bytes = max_memory_bytes
+    self.session_ttl_seconds = session_ttl_seconds
+    self.spill_dir = spill_dir
+    if spill_dir:
+      os.makedirs(spill_dir, exist_ok=True)
+
+    # Resident sessions in least recently used order, mapped to the time they
+    # were last accessed.
+    self._lru: OrderedDict[_SessionKey, float] = OrderedDict()
+    # Estimated sizes of resident sessions. Only tracked with a memory budget.
+    self._session_sizes: dict[_SessionKey, int] = {}
+    self._resident_bytes = 0
+    # Spilled sessions in eviction order, mapped to their last update time and
+    # the time they were last accessed.
+    self._spilled: OrderedDict[_SessionKey, tuple[float, float]] = OrderedDict()
+    self._stats = SessionEvictionStats()
+
+  @property
+  def eviction_stats(self) -> SessionEvictionStats:
+    """Returns a snapshot of the eviction metrics."""
+    return self._stats.model_copy(
+        update={
+            'resident_sessions': len(self._lru),
+            'resident_bytes': self._resident_bytes,
+            'spilled_sessions': len(self._spilled),
+        }
+    )
+
   @override
   async def create_session(
       self,
@@ -97,11 +185,11 @@ class InMemorySessionService(BaseSessionService):
         last_update_time=time.time(),
     )
 
-    if app_name not in self.sessions:
-      self.sessions[app_name] = {}
-    if user_id not in self.sessions[app_name]:
-      self.sessions[app_name][user_id] = {}
-    self.sessions[app_name][user_id][session_id] = session
+    self._expire_sessions()
+    key = (app_name, user_id, session_id)
+    self._discard_spilled(key)
+    self._store_session(key, session)
+    self._enforce_budget()
 
     copied_session = copy.deepcopy(session)
     return self._merge_state(app_name, user_id, copied_session)
@@ -146,21 +234,20 @@ class InMemorySessionService(BaseSessionService):
       session_id: str,
       config: Optional[GetSessionConfig] = None,
   ) -> Optional[Session]:
-    if app_name not in self.sessions:
+    self._expire_sessions()
+    session = self._get_storage_session(app_name, user_id, session_id)
+    if session is None:
       return None
-    if user_id not in self.sessions[app_name]:
-      return None
-    if session_id not in self.sessions[app_name][user_id]:
-      return None
-
-    session = self.sessions[app_name][user_id].get(session_id)
-    copied_session = copy.deepcopy(session)
+    events = session.events
+    if config and config.num_recent_events:
+      events = events[-config.num_recent_events :]
+    # Only copies the events that are returned.
+    copied_session = copy.deepcopy(
+        session.model_copy(update={'events': events})
+    )
+    self._enforce_budget()
 
     if config:
-      if config.num_recent_events:
-        copied_session.events = copied_session.events[
-            -config.num_recent_events :
-        ]
       if config.after_timestamp:
         i = len(copied_session.events) - 1
         while i >= 0:
@@ -170,7 +257,15 @@ class InMemorySessionService(BaseSessionService):
         if i >= 0:
           copied_session.events = copied_session.events[i + 1 :]
 
-    return self._merge_state(app_name, user_id, copied_session)
+    copied_session = self._merge_state(app_name, user_id, copied_session)
+    if config and config.state_keys is not None:
+      state_keys = set(config.state_keys)
+      copied_session.state = {
+          key: value
+          for key, value in copied_session.state.items()
+          if key in state_keys
+      }
+    return copied_session
 
   def _merge_state(
       self, app_name: str, user_id: str, copied_session: Session
@@ -195,6 +290,33 @@ class InMemorySessionService(BaseSessionService):
       ][key]
     return copied_session
 
+  @override
+  async def iter_events(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      before_timestamp: Optional[float] = None,
+  ) -> AsyncGenerator[Event, None]:
+    session = self._get_storage_session(app_name, user_id, session_id)
+    if session is None:
+      return
+    for event in reversed(session.events):
+      if before_timestamp is None or event.timestamp < before_timestamp:
+        yield copy.deepcopy(event)
+
+  @override
+  async def get_session_version(
+      self, *, app_name: str, user_id: str, session_id: str
+  ) -> Optional[str]:
+    session = self._get_storage_session(app_name, user_id, session_id)
+    if session is None:
+      return None
+    return _session_util.session_version(
+        session.last_update_time, len(session.events)
+    )
+
   @override
   async def list_sessions(
       self, *, app_name: str, user_id: str
@@ -210,20 +332,83 @@ class InMemorySessionService(BaseSessionService):
   def _list_sessions_impl(
       self, *, app_name: str, user_id: str
   ) -> ListSessionsResponse:
-    empty_response = ListSessionsResponse()
-    if app_name not in self.sessions:
-      return empty_response
-    if user_id not in self.sessions[app_name]:
-      return empty_response
-
+    self._expire_sessions()
     sessions_without_events = []
-    for session in self.sessions[app_name][user_id].values():
-      copied_session = copy.deepcopy(session)
-      copied_session.events = []
-      copied_session.state = {}
-      sessions_without_events.append(copied_session)
+    for session in self.sessions.get(app_name, {}).get(user_id, {}).values():
+      sessions_without_events.append(
+          Session(
+              app_name=session.app_name,
+              user_id=session.user_id,
+              id=session.id,
+              last_update_time=session.last_update_time,
+          )
+      )
+    for (
+        spilled_app_name,
+        spilled_user_id,
+        session_id,
+    ), (last_update_time, _) in self._spilled.items():
+      if spilled_app_name == app_name and spilled_user_id == user_id:
+        sessions_without_events.append(
+            Session(
+                app_name=app_name,
+                user_id=user_id,
+                id=session_id,
+                last_update_time=last_update_time,
+            )
+        )
     return ListSessionsResponse(sessions=sessions_without_events)
 
+  @override
+  async def list_sessions_page(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      config: Optional[ListSessionsConfig] = None,
+  ) -> ListSessionsResponse:
+    config = config or ListSessionsConfig()
+    page = await super().list_sessions_page(
+        app_name=app_name,
+        user_id=user_id,
+        config=config.model_copy(
+            update={'include_event_count': False, 'include_last_event': False}
+        ),
+    )
+    if config.include_event_count:
+      page.event_counts = {}
+    if not config.include_event_count and not config.include_last_event:
+      return page
+    for session in page.sessions:
+      storage_session = self._get_storage_session(app_name, user_id, session.id)
+      if storage_session is None:
+        continue
+      if config.include_event_count:
+        page.event_counts[session.id] = len(storage_session.events)
+      if config.include_last_event:
+        session.events = copy.deepcopy(storage_session.events[-1:])
+    self._enforce_budget()
+    return page
+
+  @override
+  async def list_events(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      config: Optional[ListEventsConfig] = None,
+  ) -> ListEventsResponse:
+    self._expire_sessions()
+    session = self._get_storage_session(app_name, user_id, session_id)
+    if session is None:
+      return ListEventsResponse()
+    response = paginate_events(session.events, config or ListEventsConfig())
+    self._enforce_budget()
+    # Only copies the events that are returned.
+    response.events = copy.deepcopy(response.events)
+    return response
+
   @override
   async def delete_session(
       self, *, app_name: str, user_id: str, session_id: str
@@ -243,15 +428,9 @@ class InMemorySessionService(BaseSessionService):
   def _delete_session_impl(
       self, *, app_name: str, user_id: str, session_id: str
   ) -> None:
-    if (
-        self._get_session_impl(
-            app_name=app_name, user_id=user_id, session_id=session_id
-        )
-        is None
-    ):
-      return
-
-    self.sessions[app_name][user_id].pop(session_id)
+    key = (app_name, user_id, session_id)
+    self._discard_spilled(key)
+    self._remove_session(key)
 
   @override
   async def append_event(self, session: Session, event: Event) -> Event:
@@ -269,14 +448,9 @@ class InMemorySessionService(BaseSessionService):
           f'Failed to append event to session {session_id}: {message}'
       )
 
-    if app_name not in self.sessions:
-      _warning(f'app_name {app_name} not in sessions')
-      return event
-    if user_id not in self.sessions[app_name]:
-      _warning(f'user_id {user_id} not in sessions[app_name]')
-      return event
-    if session_id not in self.sessions[app_name][user_id]:
-      _warning(f'session_id {session_id} not in sessions[app_name][user_id]')
+    storage_session = self._get_storage_session(app_name, user_id, session_id)
+    if storage_session is None:
+      _warning(f'session_id {session_id} not found for {app_name}/{user_id}')
       return event
 
     if event.actions and event.actions.state_delta:
@@ -291,9 +465,126 @@ class InMemorySessionService(BaseSessionService):
               key.removeprefix(State.USER_PREFIX)
           ] = event.actions.state_delta[key]
 
-    storage_session = self.sessions[app_name][user_id].get(session_id)
     await super().append_event(session=storage_session, event=event)
 
     storage_session.last_update_time = event.timestamp
+    storage_session.version += 1
+    session.version = storage_session.version
+
+    session_key = (app_name, user_id, session_id)
+    if self.max_memory_bytes is not None and session_key in self._session_sizes:
+      event_size = len(event.model_dump_json(exclude_none=True))
+      self._session_sizes[session_key] += event_size
+      self._resident_bytes += event_size
+    self._enforce_budget()
 
     return event
+
+  def _store_session(self, key: _SessionKey, session: Session) -> None:
+    """Stores a session in memory and marks it as most recently used."""
+    app_name, user_id, session_id = key
+    self.sessions.setdefault(app_name, {}).setdefault(user_id, {})[
+        session_id
+    ] = session
+    self._lru[key] = time.time()
+    self._lru.move_to_end(key)
+    if self.max_memory_bytes is not None:
+      session_size = len(session.model_dump_json(exclude_none=True))
+      self._resident_bytes += session_size - self._session_sizes.get(key, 0)
+      self._session_sizes[key] = session_size
+
+  def _remove_session(self, key: _SessionKey) -> Optional[Session]:
+    """Removes a session from memory and returns it if it was resident."""
+    app_name, user_id, session_id = key
+    self._lru.pop(key, None)
+    self._resident_bytes -= self._session_sizes.pop(key, 0)
+    user_sessions = self.sessions.get(app_name, {}).get(user_id)
+    if user_sessions is None:
+      return None
+    session = user_sessions.pop(session_id, None)
+    if not user_sessions:
+      self.sessions[app_name].pop(user_id)
+      if not self.sessions[app_name]:
+        self.sessions.pop(app_name)
+    return session
+
+  def _get_storage_session(
+      self, app_name: str, user_id: str, session_id: str
+  ) -> Optional[Session]:
+    """Returns the stored session, loading it back from disk if spilled."""
+    key = (app_name, user_id, session_id)
+    session = self.sessions.get(app_name, {}).get(user_id, {}).get(session_id)
+    if session is not None:
+      self._lru[key] = time.time()
+      self._lru.move_to_end(key)
+      return session
+    if key not in self._spilled:
+      return None
+
+    path = self._spill_path(key)
+    try:
+      with open(path, 'r', encoding='utf-8') as f:
+        session = Session.model_validate_json(f.read())
+    except FileNotFoundError:
+      logger.warning('Spilled session %s is missing from %s', session_id, path)
+      self._spilled.pop(key)
+      return None
+    self._discard_spilled(key)
+    self._store_session(key, session)
+    self._stats.restores += 1
+    return session
+
+  def _spill_path(self, key: _SessionKey) -> str:
+    digest = hashlib.sha256('/'.join(key).encode('utf-8')).hexdigest()
+    return os.path.join(self.spill_dir, f'{digest}.json')
+
+  def _discard_spilled(self, key: _SessionKey) -> None:
+    """Forgets a spilled session and removes its file."""
+    if self._spilled.pop(key, None) is None:
+      return
+    try:
+      os.remove(self._spill_path(key))
+    except FileNotFoundError:
+      pass
+
+  def _expire_sessions(self) -> None:
+    """Removes the sessions that have not been accessed within the TTL."""
+    if self.session_ttl_seconds is None:
+      return
+    deadline = time.time() - self.session_ttl_seconds
+    while self._lru:
+      key, last_access = next(iter(self._lru.items()))
+      if last_access >= deadline:
+        break
+      self._remove_session(key)
+      self._stats.expirations += 1
+    while self._spilled:
+      key, (_, last_access) = next(iter(self._spilled.items()))
+      if last_access >= deadline:
+        break
+      self._discard_spilled(key)
+      self._stats.expirations += 1
+
+  def _enforce_budget(self) -> None:
+    """Evicts least recently used sessions until the budget is met."""
+    # The most recently used session is always kept, even if it alone exceeds
+    # the memory budget.
+    while len(self._lru) > 1 and self._is_over_budget():
+      key, last_access = next(iter(self._lru.items()))
+      session = self._remove_session(key)
+      self._stats.evictions += 1
+      if self.spill_dir and session is not None:
+        tmp_path = self._spill_path(key) + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+          f.write(session.model_dump_json())
+        os.replace(tmp_path, self._spill_path(key))
+        self._spilled[key] = (session.last_update_time, last_access)
+        self._stats.spills += 1
+
+  def _is_over_budget(self) -> bool:
+    if self.max_sessions is not None and len(self._lru) > self.max_sessions:
+      return True
+    return (
+        self.max_memory_bytes is not None
+        and self._resident_bytes > self.max_memory_bytes
+    )
@@ -0,0 +1,746 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import asyncio
+import copy
+import logging
+import mmap
+import os
+import shutil
+import time
+from typing import Any
+from typing import AsyncGenerator
+from typing import BinaryIO
+from typing import NamedTuple
+from typing import Optional
+import urllib.parse
+import uuid
+
+from typing_extensions import override
+
+from . import _session_util
+from ..events.event import Event
+from .base_session_service import BaseSessionService
+from .base_session_service import GetSessionConfig
+from .base_session_service import ListSessionsResponse
+from .session import Session
+from .state import State
+
+logger = logging.getLogger('google_adk.' + __name__)
+
+# Each record is a line of `<type>\t<timestamp>\t<value>\n`, where the value
+# is compact JSON, or a base64 pickle if JSON doesn't restore it as is.
+_HEADER_RECORD = b'h'
+_EVENT_RECORD = b'e'
+_SNAPSHOT_RECORD = b's'
+_DELTA_RECORD = b'd'
+
+_SEGMENT_SUFFIX = '.log'
+_APP_STATE_FILE = 'app_state.log'
+_USER_STATE_FILE = 'user_state.log'
+_SESSION_INDEX_FILE = 'session_index.log'
+
+
+class _IndexEntry(NamedTuple):
+  """The location of an event record in the segments of a session."""
+
+  segment: int
+  offset: int
+  length: int
+  timestamp: float
+
+
+class _SessionLog:
+  """The in-memory index and state of a session log."""
+
+  def __init__(
+      self,
+      path: str,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      create_time: float,
+  ):
+    self.path = path
+    self.app_name = app_name
+    self.user_id = user_id
+    self.session_id = session_id
+    self.last_update_time = create_time
+    self.state: dict[str, Any] = {}
+    self.index: list[_IndexEntry] = []
+    self.segment = 0
+    self.segment_size = 0
+    self.events_since_snapshot = 0
+
+  def segment_path(self, segment: int) -> str:
+    return os.path.join(self.path, f'{segment:08d}{_SEGMENT_SUFFIX}')
+
+
+class _StateLog:
+  """A log of the deltas to a state, compacted periodically.
+
+  Besides the app and user states, the sessions of each user are indexed by a
+  state log, which maps the ID of each session to its last update time and
+  version.
+  """
+
+  def __init__(self, path: str):
+    self.path = path
+    self.state: dict[str, Any] = {}
+    self.records = 0
+
+
+class LogSessionService(BaseSessionService):
+  """A durable session service backed by append-only files on local disk.
+
+  Each session is a directory of segment files holding newline-delimited,
+  compact records: a header, state snapshots and events. Events are only ever
+  appended, and a snapshot of the session state is written every
+  `snapshot_interval` events and at the start of every segment, so a session
+  is opened by replaying the events after the last snapshot only. App and user
+  state are logs of deltas that are compacted into a single snapshot once they
+  exceed `compaction_threshold` records.
+
+  Sessions are indexed in memory the first time they are accessed, by the
+  offset of every event, so recent events and time ranges are read from
+  memory-mapped segments without reading whole files. The sessions of each
+  user are listed from an index kept in the same way as the user state.
+
+  Values that JSON doesn't restore as is, e.g. datetimes, are pickled, and
+  the records of a write are encoded before anything is changed, so a value
+  that can't be pickled fails the write without applying part of it.
+
+  Writes are flushed to the operating system immediately and fsynced in
+  batches, at most `sync_interval_seconds` apart, so a power loss can lose the
+  writes of the last interval. Call `sync` or `close` to force them to disk.
+
+  The files must only be written by one service instance at a time.
+  """
+
+  def __init__(
+      self,
+      root_dir: str,
+      *,
+      sync_interval_seconds: float = 0.05,
+      snapshot_interval: int = 100,
+      compaction_threshold: int = 1000,
+      max_segment_bytes: int = 8 * 1024 * 1024,
+  ):
+    """Initializes the service.
+
+    Args:
+      root_dir: The directory storing the sessions.
+      sync_interval_seconds: The maximum time between fsyncs of written
+        records. Zero fsyncs every write.
+      snapshot_interval: The number of events between two snapshots of the
+        session state.
+      compaction_threshold: The number of records after which an app or user
+        state log is compacted.
+      max_segment_bytes: The size after which a new segment is started.
+    """
+    self.root_dir = root_dir
+    self.sync_interval_seconds = sync_interval_seconds
+    self.snapshot_interval = snapshot_interval
+    self.compaction_threshold = compaction_threshold
+    self.max_segment_bytes = max_segment_bytes
+    os.makedirs(root_dir, exist_ok=True)
+
+    self._sessions: dict[tuple[str, str, str], _SessionLog] = {}
+    self._state_logs: dict[str, _StateLog] = {}
+    # Files written since the last sync, and the directories of new files.
+    self._handles: dict[str, BinaryIO] = {}
+    self._new_dirs: set[str] = set()
+    self._last_sync = time.monotonic()
+    self._sync_timer: Optional[asyncio.TimerHandle] = None
+
+  @override
+  async def create_session(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      state: Optional[dict[str, Any]] = None,
+      session_id: Optional[str] = None,
+  ) -> Session:
+    session_id = (
+        session_id.strip()
+        if session_id and session_id.strip()
+        else str(uuid.uuid4())
+    )
+    path = self._session_path(app_name, user_id, session_id)
+    if os.path.exists(path):
+      raise ValueError(f'Session {session_id} already exists.')
+
+    app_state_delta, user_state_delta, session_state = (
+        _session_util.split_state(state or {})
+    )
+    log = _SessionLog(path, app_name, user_id, session_id, time.time())
+    log.state = session_state
+    header_record = _encode_record(
+        _HEADER_RECORD,
+        log.last_update_time,
+        {'app_name': app_name, 'user_id': user_id, 'id': session_id},
+    )
+    snapshot_record = _encode_record(
+        _SNAPSHOT_RECORD, log.last_update_time, log.state
+    )
+    app_state_record = _encode_delta_record(app_state_delta)
+    user_state_record = _encode_delta_record(user_state_delta)
+    session_index = self._get_session_index(app_name, user_id)
+
+    os.makedirs(path)
+    self._new_dirs.add(os.path.dirname(path))
+    self._new_dirs.add(path)
+    self._write_record(log, header_record)
+    self._write_record(log, snapshot_record)
+    self._sessions[(app_name, user_id, session_id)] = log
+    self._update_state_log(
+        self._app_state_path(app_name), app_state_delta, app_state_record
+    )
+    self._update_state_log(
+        self._user_state_path(app_name, user_id),
+        user_state_delta,
+        user_state_record,
+    )
+    self._index_session(session_index, log)
+    self._schedule_sync()
+    return self._to_session(log, [], None)
+
+  @override
+  async def get_session(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      config: Optional[GetSessionConfig] = None,
+  ) -> Optional[Session]:
+    log = self._get_log(app_name, user_id, session_id)
+    if log is None:
+      return None
+
+    entries = log.index
+    if config and config.num_recent_events:
+      entries = entries[-config.num_recent_events :]
+    if config and config.after_timestamp:
+      i = len(entries) - 1
+      while i >= 0 and entries[i].timestamp >= config.after_timestamp:
+        i -= 1
+      entries = entries[i + 1 :]
+    return self._to_session(
+        log,
+        self._read_events(log, entries),
+        config.state_keys if config else None,
+    )
+
+  @override
+  async def iter_events(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      before_timestamp: Optional[float] = None,
+      page_size: int = 100,
+  ) -> AsyncGenerator[Event, None]:
+    log = self._get_log(app_name, user_id, session_id)
+    if log is None:
+      return
+    entries = [
+        entry
+        for entry in reversed(log.index)
+        if before_timestamp is None or entry.timestamp < before_timestamp
+    ]
+    for start in range(0, len(entries), page_size):
+      for event in self._read_events(log, entries[start : start + page_size]):
+        yield event
+
+  @override
+  async def get_session_version(
+      self, *, app_name: str, user_id: str, session_id: str
+  ) -> Optional[str]:
+    log = self._get_log(app_name, user_id, session_id)
+    if log is None:
+      return None
+    return _session_util.session_version(log.last_update_time, len(log.index))
+
+  @override
+  async def list_sessions(
+      self, *, app_name: str, user_id: str
+  ) -> ListSessionsResponse:
+    session_index = self._get_session_index(app_name, user_id)
+    return ListSessionsResponse(
+        sessions=[
+            Session(
+                app_name=app_name,
+                user_id=user_id,
+                id=session_id,
+                last_update_time=last_update_time,
+                version=version,
+            )
+            for session_id, (last_update_time, version) in sorted(
+                session_index.state.items()
+            )
+        ]
+    )
+
+  @override
+  async def delete_session(
+      self, *, app_name: str, user_id: str, session_id: str
+  ) -> None:
+    path = self._session_path(app_name, user_id, session_id)
+    for handle_path in [
+        p for p in self._handles if p.startswith(path + os.sep)
+    ]:
+      self._handles.pop(handle_path).close()
+    self._sessions.pop((app_name, user_id, session_id), None)
+    session_index = self._get_session_index(app_name, user_id)
+    if session_id in session_index.state:
+      self._update_state_log(
+          session_index.path,
+          {session_id: None},
+          _encode_delta_record({session_id: None}),
+      )
+      del session_index.state[session_id]
+    shutil.rmtree(path, ignore_errors=True)
+    self._schedule_sync()
+
+  @override
+  async def append_event(self, session: Session, event: Event) -> Event:
+    if event.partial:
+      return event
+    log = self._get_log(session.app_name, session.user_id, session.id)
+    if log is None:
+      logger.warning(
+          'Failed to append event to session %s: session not found.',
+          session.id,
+      )
+      return event
+
+    app_state_delta, user_state_delta, session_state_delta = (
+        _session_util.split_state(
+            event.actions.state_delta if event.actions else {}
+        )
+    )
+    event_record = _encode_record(_EVENT_RECORD, event.timestamp, event)
+    app_state_record = _encode_delta_record(app_state_delta)
+    user_state_record = _encode_delta_record(user_state_delta)
+    session_index = self._get_session_index(session.app_name, session.user_id)
+
+    await super().append_event(session=session, event=event)
+    self._update_state_log(
+        self._app_state_path(session.app_name),
+        app_state_delta,
+        app_state_record,
+    )
+    self._update_state_log(
+        self._user_state_path(session.app_name, session.user_id),
+        user_state_delta,
+        user_state_record,
+    )
+    log.state.update(copy.deepcopy(session_state_delta))
+
+    if log.segment_size >= self.max_segment_bytes:
+      # Starts a new segment with a snapshot, so that the state can be loaded
+      # from the last segment.
+      log.segment += 1
+      log.segment_size = 0
+      self._new_dirs.add(log.path)
+      self._write_snapshot(log)
+    offset, length = self._write_record(log, event_record)
+    log.index.append(_IndexEntry(log.segment, offset, length, event.timestamp))
+    log.events_since_snapshot += 1
+    if log.events_since_snapshot >= self.snapshot_interval:
+      self._write_snapshot(log)
+
+    log.last_update_time = event.timestamp
+    session.last_update_time = log.last_update_time
+    session.version = len(log.index)
+    self._index_session(session_index, log)
+    self._schedule_sync()
+    return event
+
+  def sync(self) -> None:
+    """Forces the written records to disk."""
+    if self._sync_timer is not None:
+      self._sync_timer.cancel()
+      self._sync_timer = None
+    for handle in self._handles.values():
+      os.fsync(handle.fileno())
+      handle.close()
+    self._handles.clear()
+    for path in self._new_dirs:
+      _fsync_dir(path)
+    self._new_dirs.clear()
+    self._last_sync = time.monotonic()
+
+  def close(self) -> None:
+    """Syncs the written records and releases the open files."""
+    self.sync()
+
+  def _schedule_sync(self) -> None:
+    """Syncs now if the interval has passed, or schedules a sync otherwise."""
+    if (
+        self.sync_interval_seconds <= 0
+        or time.monotonic() - self._last_sync >= self.sync_interval_seconds
+    ):
+      self.sync()
+      return
+    if self._sync_timer is not None:
+      return
+    try:
+      loop = asyncio.get_running_loop()
+    except RuntimeError:
+      self.sync()
+      return
+    self._sync_timer = loop.call_later(self.sync_interval_seconds, self.sync)
+
+  def _write(self, path: str, data: bytes) -> int:
+    """Appends data to a file, returning the offset it was written at."""
+    handle = self._handles.get(path)
+    if handle is None:
+      if not os.path.exists(path):
+        self._new_dirs.add(os.path.dirname(path))
+      handle = self._handles[path] = open(path, 'ab', buffering=0)
+    offset = handle.tell()
+    handle.write(data)
+    return offset
+
+  def _write_record(self, log: _SessionLog, data: bytes) -> tuple[int, int]:
+    """Appends an encoded record to the current segment of a session.
+
+    Returns:
+      The offset and length of the record's value.
+    """
+    offset = self._write(log.segment_path(log.segment), data)
+    log.segment_size = offset + len(data)
+    value_start = data.index(b'\t', 2) + 1
+    return offset + value_start, len(data) - value_start - 1
+
+  def _write_snapshot(self, log: _SessionLog) -> None:
+    self._write_record(
+        log, _encode_record(_SNAPSHOT_RECORD, log.last_update_time, log.state)
+    )
+    log.events_since_snapshot = 0
+
+  def _get_log(
+      self, app_name: str, user_id: str, session_id: str
+  ) -> Optional[_SessionLog]:
+    """Returns the index of a session, building it on first access."""
+    key = (app_name, user_id, session_id)
+    log = self._sessions.get(key)
+    if log is None:
+      path = self._session_path(app_name, user_id, session_id)
+      if not os.path.isdir(path):
+        return None
+      log = self._load_log(path, app_name, user_id, session_id)
+      self._sessions[key] = log
+    return log
+
+  def _load_log(
+      self, path: str, app_name: str, user_id: str, session_id: str
+  ) -> _SessionLog:
+    """Indexes the segments of a session and replays its latest state."""
+    segments = sorted(
+        int(name.removesuffix(_SEGMENT_SUFFIX))
+        for name in os.listdir(path)
+        if name.endswith(_SEGMENT_SUFFIX)
+    )
+    log = _SessionLog(path, app_name, user_id, session_id, 0.0)
+    snapshot = None
+    events_after_snapshot: list[_IndexEntry] = []
+    for segment in segments:
+      log.segment = segment
+      segment_path = log.segment_path(segment)
+      for record_type, timestamp, offset, length in _scan_records(segment_path):
+        log.last_update_time = timestamp
+        if record_type == _EVENT_RECORD:
+          entry = _IndexEntry(segment, offset, length, timestamp)
+          log.index.append(entry)
+          events_after_snapshot.append(entry)
+        elif record_type == _SNAPSHOT_RECORD:
+          snapshot = (segment, offset, length)
+          events_after_snapshot = []
+      log.segment_size = os.path.getsize(segment_path)
+
+    if snapshot is not None:
+      log.state = _session_util.decode_json_or_pickle(
+          _read_range(log.segment_path(snapshot[0]), *snapshot[1:])
+      )
+    for event in self._read_events(log, events_after_snapshot):
+      if event.actions and event.actions.state_delta:
+        log.state.update(
+            _session_util.split_state(event.actions.state_delta)[2]
+        )
+    log.events_since_snapshot = len(events_after_snapshot)
+    return log
+
+  def _read_events(
+      self, log: _SessionLog, entries: list[_IndexEntry]
+  ) -> list[Event]:
+    """Reads the events at the given index entries."""
+    events = []
+    mapped_segment = None
+    mapped = None
+    try:
+      for entry in entries:
+        if entry.segment != mapped_segment:
+          if mapped is not None:
+            mapped.close()
+          with open(log.segment_path(entry.segment), 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+          mapped_segment = entry.segment
+        events.append(
+            _session_util.decode_json_or_pickle(
+                mapped[entry.offset : entry.offset + entry.length],
+                Event.model_validate_json,
+            )
+        )
+    finally:
+      if mapped is not None:
+        mapped.close()
+    return events
+
+  def _to_session(
+      self,
+      log: _SessionLog,
+      events: list[Event],
+      state_keys: Optional[list[str]],
+  ) -> Session:
+    state = copy.deepcopy(log.state)
+    for prefix, path in (
+        (State.APP_PREFIX, self._app_state_path(log.app_name)),
+        (State.USER_PREFIX, self._user_state_path(log.app_name, log.user_id)),
+    ):
+      state.update(
+          _session_util.prefix_state(
+              prefix, copy.deepcopy(self._get_state_log(path).state)
+          )
+      )
+    if state_keys is not None:
+      state_keys = set(state_keys)
+      state = {key: value for key, value in state.items() if key in state_keys}
+    return Session(
+        app_name=log.app_name,
+        user_id=log.user_id,
+        id=log.session_id,
+        state=state,
+        events=events,
+        last_update_time=log.last_update_time,
+        version=len(log.index),
+    )
+
+  def _get_state_log(self, path: str) -> _StateLog:
+    state_log = self._state_logs.get(path)
+    if state_log is None:
+      state_log = self._state_logs[path] = _StateLog(path)
+      if os.path.exists(path):
+        for record_type, _, offset, length in _scan_records(path):
+          value = _session_util.decode_json_or_pickle(
+              _read_range(path, offset, length)
+          )
+          if record_type == _SNAPSHOT_RECORD:
+            state_log.state = value
+          else:
+            state_log.state.update(value)
+          state_log.records += 1
+    return state_log
+
+  def _update_state_log(
+      self,
+      path: str,
+      state_delta: dict[str, Any],
+      record: Optional[bytes],
+  ) -> None:
+    """Applies a delta to a state log.
+
+    Args:
+      path: The path of the state log.
+      state_delta: The delta.
+      record: The delta encoded by `_encode_delta_record`.
+    """
+    if not state_delta:
+      return
+    state_log = self._get_state_log(path)
+    state_log.state.update(copy.deepcopy(state_delta))
+    if state_log.records + 1 < self.compaction_threshold:
+      self._write(path, record)
+      state_log.records += 1
+      return
+
+    # Replaces the deltas with a snapshot of the state.
+    handle = self._handles.pop(path, None)
+    if handle is not None:
+      handle.close()
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+      f.write(_encode_record(_SNAPSHOT_RECORD, time.time(), state_log.state))
+      f.flush()
+      os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    self._new_dirs.add(os.path.dirname(path))
+    state_log.records = 1
+
+  def _get_session_index(self, app_name: str, user_id: str) -> _StateLog:
+    """Returns the index of the sessions of a user, building it if missing."""
+    path = self._session_index_path(app_name, user_id)
+    if path in self._state_logs:
+      return self._state_logs[path]
+    if os.path.exists(path):
+      session_index = self._get_state_log(path)
+      # Deleted sessions are logged as None.
+      for session_id in [
+          session_id
+          for session_id, entry in session_index.state.items()
+          if entry is None
+      ]:
+        del session_index.state[session_id]
+      return session_index
+
+    # Indexes the sessions written before the index was introduced.
+    sessions_path = os.path.dirname(self._session_path(app_name, user_id, '_'))
+    entries = {}
+    if os.path.isdir(sessions_path):
+      for entry in os.scandir(sessions_path):
+        if not entry.is_dir():
+          continue
+        session_id = urllib.parse.unquote(entry.name)
+        log = self._get_log(app_name, user_id, session_id)
+        entries[session_id] = [log.last_update_time, len(log.index)]
+    session_index = self._get_state_log(path)
+    self._update_state_log(path, entries, _encode_delta_record(entries))
+    return session_index
+
+  def _index_session(self, session_index: _StateLog, log: _SessionLog) -> None:
+    entry = {log.session_id: [log.last_update_time, len(log.index)]}
+    self._update_state_log(
+        session_index.path, entry, _encode_delta_record(entry)
+    )
+
+  def _app_path(self, app_name: str) -> str:
+    return os.path.join(self.root_dir, _encode_path_component(app_name))
+
+  def _app_state_path(self, app_name: str) -> str:
+    return os.path.join(self._app_path(app_name), _APP_STATE_FILE)
+
+  def _user_state_path(self, app_name: str, user_id: str) -> str:
+    return os.path.join(
+        self._app_path(app_name),
+        _encode_path_component(user_id),
+        _USER_STATE_FILE,
+    )
+
+  def _session_index_path(self, app_name: str, user_id: str) -> str:
+    return os.path.join(
+        self._app_path(app_name),
+        _encode_path_component(user_id),
+        _SESSION_INDEX_FILE,
+    )
+
+  def _session_path(self, app_name: str, user_id: str, session_id: str) -> str:
+    return os.path.join(
+        self._app_path(app_name),
+        _encode_path_component(user_id),
+        'sessions',
+        _encode_path_component(session_id),
+    )
+
+
+def _encode_record(record_type: bytes, timestamp: float, value: Any) -> bytes:
+  """Encodes a record, whose value is an event or an encodable value."""
+  if isinstance(value, Event):
+    value = _encode_event(value)
+  else:
+    value = _session_util.encode_json_or_pickle(value)
+  return b'%s\t%r\t%s\n' % (record_type, timestamp, value)
+
+
+def _encode_event(event: Event) -> bytes:
+  if _session_util.is_json_native(
+      event.actions.state_delta if event.actions else {}
+  ):
+    return event.model_dump_json(exclude_none=True).encode('utf-8')
+  return _session_util.encode_json_or_pickle(event)
+
+
+def _encode_delta_record(state_delta: dict[str, Any]) -> Optional[bytes]:
+  if not state_delta:
+    return None
+  return _encode_record(_DELTA_RECORD, time.time(), state_delta)
+
+
+def _scan_records(path: str):
+  """Yields the type, timestamp, value offset and value length of each record.
+
+  A torn record at the end of the file, left by a crash, is truncated.
+  """
+  size = os.path.getsize(path)
+  if not size:
+    return
+  with open(path, 'rb') as f:
+    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+  try:
+    position = 0
+    while position < size:
+      end = mapped.find(b'\n', position)
+      if end < 0:
+        logger.warning('Truncating a torn record at the end of %s', path)
+        mapped.close()
+        mapped = None
+        with open(path, 'r+b') as f:
+          f.truncate(position)
+        return
+      type_end = mapped.find(b'\t', position, end)
+      timestamp_end = mapped.find(b'\t', type_end + 1, end)
+      yield (
+          mapped[position:type_end],
+          float(mapped[type_end + 1 : timestamp_end]),
+          timestamp_end + 1,
+          end - timestamp_end - 1,
+      )
+      position = end + 1
+  finally:
+    if mapped is not None:
+      mapped.close()
+
+
+def _read_range(path: str, offset: int, length: int) -> bytes:
+  with open(path, 'rb') as f:
+    f.seek(offset)
+    return f.read(length)
+
+
+def _fsync_dir(path: str) -> None:
+  """Makes the creation of files in a directory durable."""
+  try:
+    fd = os.open(path, os.O_RDONLY)
+  except OSError:
+    return
+  try:
+    os.fsync(fd)
+  except OSError:
+    # Not supported on every platform.
+    pass
+  finally:
+    os.close(fd)
+
+
+def _encode_path_component(name: str) -> str:
+  """Encodes a name into a single, safe path component."""
+  encoded = urllib.parse.quote(name, safe='')
+  if encoded.startswith('.'):
+    encoded = '%2E' + encoded[1:]
+  return encoded
@@ -12,6 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from __future__ import annotations
+
 from typing import Any
 
 from pydantic import alias_generators
@@ -33,6 +35,7 @@ class Session(BaseModel):
     events: The events of the session, e.g. user input, model response, function
       call/response, etc.
     last_update_time: The last update time of the session.
+    version: The version of the session, incremented by every stored update.
   """
 
   model_config = ConfigDict(
@@ -56,3 +59,9 @@ class Session(BaseModel):
   call/response, etc."""
   last_update_time: float = 0.0
   """The last update time of the session."""
+  version: int = 0
+  """The version of the session, incremented by every stored update.
+
+  Session services use it to detect updates made through other session objects,
+  e.g. by another server.
+  """
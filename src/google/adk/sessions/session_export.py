@@ -0,0 +1,468 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Streaming bulk export and import of sessions.
+
+Sessions are exported as a sequence of flat records: a `session` record with
+the session state, followed by an `event` record for each of its events. The
+records are written as JSON Lines, or as the rows of a Parquet file, whose
+columns can be queried directly by analytics tools.
+"""
+
+from __future__ import annotations
+
+from abc import ABC
+from abc import abstractmethod
+import asyncio
+import json
+import logging
+from typing import Any
+from typing import Iterator
+from typing import Literal
+from typing import Optional
+from typing import Sequence
+
+from pydantic import BaseModel
+from typing_extensions import override
+
+from ..events.event import Event
+from .base_session_service import BaseSessionService
+from .base_session_service import GetSessionConfig
+from .base_session_service import ListEventsConfig
+from .base_session_service import ListSessionsConfig
+from .session import Session
+from .state import State
+
+logger = logging.getLogger('google_adk.' + __name__)
+
+ExportFormat = Literal['jsonl', 'parquet']
+
+_PARQUET_ROW_GROUP_SIZE = 1000
+_PARQUET_COLUMNS = (
+    'type',
+    'app_name',
+    'user_id',
+    'session_id',
+    'timestamp',
+    'event_id',
+    'author',
+    'data',
+)
+
+
+class SessionRecord(BaseModel):
+  """A record of an exported session or event."""
+
+  type: Literal['session', 'event']
+  app_name: str
+  user_id: str
+  session_id: str
+  timestamp: float
+  """The last update time of a session, or the timestamp of an event."""
+
+  event_id: Optional[str] = None
+  author: Optional[str] = None
+  data: dict[str, Any]
+  """The state of a session, or the JSON dump of an event."""
+
+
+class SessionTransferStats(BaseModel):
+  """Counters of an export or import."""
+
+  sessions: int = 0
+  """The number of exported or imported sessions."""
+
+  events: int = 0
+  """The number of exported or imported events."""
+
+  skipped_events: int = 0
+  """The number of events already in the target service of an import."""
+
+
+async def export_sessions(
+    session_service: BaseSessionService,
+    path: str,
+    *,
+    app_name: str,
+    user_ids: Sequence[str],
+    export_format: Optional[ExportFormat] = None,
+    page_size: int = 100,
+) -> SessionTransferStats:
+  """Exports the sessions of users to a file.
+
+  Sessions and events are read and written page by page, so the memory used
+  doesn't depend on the number or the size of the sessions.
+
+  Args:
+    session_service: The service to export the sessions from.
+    path: The path of the file to write.
+    app_name: The name of the app.
+    user_ids: The ids of the users whose sessions are exported.
+    export_format: The format of the file. Inferred from the extension of the
+      path by default.
+    page_size: The number of sessions and of events read at a time.
+
+  Returns:
+    The number of exported sessions and events.
+  """
+  stats = SessionTransferStats()
+  with _open_writer(path, export_format or _infer_format(path)) as writer:
+    for user_id in user_ids:
+      page_token = None
+      while True:
+        page = await session_service.list_sessions_page(
+            app_name=app_name,
+            user_id=user_id,
+            config=ListSessionsConfig(
+                page_size=page_size, page_token=page_token
+            ),
+        )
+        for listed_session in page.sessions:
+          exported = await _export_session(
+              session_service, writer, listed_session, page_size
+          )
+          if exported is not None:
+            stats.sessions += 1
+            stats.events += exported
+        page_token = page.next_page_token
+        if not page_token:
+          break
+  logger.info(
+      'Exported %d sessions and %d events to %s.',
+      stats.sessions,
+      stats.events,
+      path,
+  )
+  return stats
+
+
+async def _export_session(
+    session_service: BaseSessionService,
+    writer: _RecordWriter,
+    listed_session: Session,
+    page_size: int,
+) -> Optional[int]:
+  """Writes the records of a session, returning its number of events."""
+  session = await session_service.get_session(
+      app_name=listed_session.app_name,
+      user_id=listed_session.user_id,
+      session_id=listed_session.id,
+      config=GetSessionConfig(num_recent_events=1),
+  )
+  if session is None:
+    # Deleted since it was listed.
+    return None
+  writer.write(
+      SessionRecord(
+          type='session',
+          app_name=session.app_name,
+          user_id=session.user_id,
+          session_id=session.id,
+          timestamp=session.last_update_time,
+          data=session.state,
+      )
+  )
+  num_events = 0
+  page_token = None
+  while True:
+    page = await session_service.list_events(
+        app_name=session.app_name,
+        user_id=session.user_id,
+        session_id=session.id,
+        config=ListEventsConfig(page_size=page_size, page_token=page_token),
+    )
+    for event in page.events:
+      writer.write(
+          SessionRecord(
+              type='event',
+              app_name=session.app_name,
+              user_id=session.user_id,
+              session_id=session.id,
+              timestamp=event.timestamp,
+              event_id=event.id,
+              author=event.author,
+              data=event.model_dump(exclude_none=True, mode='json'),
+          )
+      )
+      num_events += 1
+    page_token = page.next_page_token
+    if not page_token:
+      return num_events
+
+
+async def import_sessions(
+    session_service: BaseSessionService,
+    path: str,
+    *,
+    app_name: Optional[str] = None,
+    export_format: Optional[ExportFormat] = None,
+    concurrency: int = 4,
+    queue_size: int = 100,
+) -> SessionTransferStats:
+  """Imports the sessions of an exported file into a session service.
+
+  Up to `concurrency` sessions are imported concurrently, with at most
+  `queue_size` events of each read ahead, so the memory used doesn't depend on
+  the size of the file.
+
+  Imports are resumable: sessions that already exist in the target service
+  are not created again, and their events that were already imported are
+  skipped, so an interrupted import can simply be run again.
+
+  Sessions are created with their exported state, and the app and user state
+  deltas of their events are not replayed, so the state shared by the
+  sessions of an app or user keeps its exported value.
+
+  Args:
+    session_service: The service to import the sessions into.
+    path: The path of the exported file.
+    app_name: If set, the sessions are imported into this app instead of the
+      one they were exported from, e.g. an Agent Engine id.
+    export_format: The format of the file. Inferred from the extension of the
+      path by default.
+    concurrency: The maximum number of sessions imported concurrently.
+    queue_size: The maximum number of events read ahead for each session.
+
+  Returns:
+    The number of imported sessions and events.
+  """
+  stats = SessionTransferStats()
+  slots = asyncio.Semaphore(concurrency)
+  tasks: list[asyncio.Task[None]] = []
+  queue: Optional[asyncio.Queue[Optional[SessionRecord]]] = None
+
+  async def import_session(
+      session_record: SessionRecord,
+      queue: asyncio.Queue[Optional[SessionRecord]],
+  ) -> None:
+    try:
+      await _import_session(session_service, session_record, queue, stats)
+    except Exception:
+      # Drains the queue so that the reader isn't blocked on it.
+      while await queue.get() is not None:
+        pass
+      raise
+    finally:
+      slots.release()
+
+  try:
+    for record in _read_records(path, export_format or _infer_format(path)):
+      if app_name is not None:
+        record.app_name = app_name
+      if record.type == 'session':
+        if queue is not None:
+          await queue.put(None)
+        await slots.acquire()
+        # Fails fast instead of reading the rest of the file.
+        for task in tasks:
+          if task.done() and task.exception():
+            raise task.exception()
+        queue = asyncio.Queue(maxsize=queue_size)
+        tasks.append(asyncio.create_task(import_session(record, queue)))
+      elif queue is None:
+        raise ValueError(f'Event {record.event_id} precedes its session.')
+      else:
+        await queue.put(record)
+    if queue is not None:
+      await queue.put(None)
+    await asyncio.gather(*tasks)
+  finally:
+    for task in tasks:
+      task.cancel()
+  logger.info(
+      'Imported %d sessions and %d events from %s, skipping %d events that'
+      ' were already imported.',
+      stats.sessions,
+      stats.events,
+      path,
+      stats.skipped_events,
+  )
+  return stats
+
+
+async def _import_session(
+    session_service: BaseSessionService,
+    session_record: SessionRecord,
+    queue: asyncio.Queue[Optional[SessionRecord]],
+    stats: SessionTransferStats,
+) -> None:
+  """Creates a session, or resumes its import, and appends its events."""
+  app_name = session_record.app_name
+  user_id = session_record.user_id
+  session_id = session_record.session_id
+  session = await session_service.get_session(
+      app_name=app_name,
+      user_id=user_id,
+      session_id=session_id,
+      config=GetSessionConfig(num_recent_events=1),
+  )
+  imported_event_ids = set()
+  if session is None:
+    session = await session_service.create_session(
+        app_name=app_name,
+        user_id=user_id,
+        state=session_record.data,
+        session_id=session_id,
+    )
+  else:
+    page_token = None
+    while True:
+      page = await session_service.list_events(
+          app_name=app_name,
+          user_id=user_id,
+          session_id=session_id,
+          config=ListEventsConfig(page_size=1000, page_token=page_token),
+      )
+      imported_event_ids.update(event.id for event in page.events)
+      page_token = page.next_page_token
+      if not page_token:
+        break
+  stats.sessions += 1
+
+  while (record := await queue.get()) is not None:
+    if record.event_id in imported_event_ids:
+      stats.skipped_events += 1
+      continue
+    event = Event.model_validate(record.data)
+    # The session is created with the exported app and user state, which the
+    # sessions of the app and user share. Replaying their deltas would leave
+    # them at the last value set by this session, rather than by any session.
+    event.actions.state_delta = {
+        key: value
+        for key, value in event.actions.state_delta.items()
+        if not key.startswith((State.APP_PREFIX, State.USER_PREFIX))
+    }
+    await session_service.append_event(session, event)
+    # The appended events are stored by the service and not needed here.
+    session.events.clear()
+    stats.events += 1
+
+
+def _infer_format(path: str) -> ExportFormat:
+  if path.endswith('.parquet'):
+    return 'parquet'
+  if path.endswith('.jsonl') or path.endswith('.json'):
+    return 'jsonl'
+  raise ValueError(
+      f'Cannot infer the format of {path}, please specify it explicitly.'
+  )
+
+
+class _RecordWriter(ABC):
+  """Writes records to a file."""
+
+  @abstractmethod
+  def write(self, record: SessionRecord) -> None:
+    """Writes a record."""
+
+  @abstractmethod
+  def close(self) -> None:
+    """Flushes the written records and closes the file."""
+
+  def __enter__(self) -> _RecordWriter:
+    return self
+
+  def __exit__(self, *exc_info) -> None:
+    self.close()
+
+
+class _JsonlWriter(_RecordWriter):
+
+  def __init__(self, path: str):
+    self._file = open(path, 'w', encoding='utf-8')
+
+  @override
+  def write(self, record: SessionRecord) -> None:
+    self._file.write(record.model_dump_json(exclude_none=True))
+    self._file.write('\n')
+
+  @override
+  def close(self) -> None:
+    self._file.close()
+
+
+class _ParquetWriter(_RecordWriter):
+  """Writes records as rows, with the data column as a JSON string."""
+
+  def __init__(self, path: str):
+    pa, pq = _import_pyarrow()
+    self._pa = pa
+    self._schema = pa.schema([
+        ('type', pa.string()),
+        ('app_name', pa.string()),
+        ('user_id', pa.string()),
+        ('session_id', pa.string()),
+        ('timestamp', pa.float64()),
+        ('event_id', pa.string()),
+        ('author', pa.string()),
+        ('data', pa.string()),
+    ])
+    self._writer = pq.ParquetWriter(path, self._schema)
+    self._rows: list[dict[str, Any]] = []
+
+  @override
+  def write(self, record: SessionRecord) -> None:
+    row = record.model_dump()
+    row['data'] = json.dumps(row['data'], separators=(',', ':'))
+    self._rows.append(row)
+    if len(self._rows) >= _PARQUET_ROW_GROUP_SIZE:
+      self._flush()
+
+  def _flush(self) -> None:
+    if self._rows:
+      self._writer.write_table(
+          self._pa.Table.from_pylist(self._rows, schema=self._schema)
+      )
+      self._rows = []
+
+  @override
+  def close(self) -> None:
+    self._flush()
+    self._writer.close()
+
+
+def _open_writer(path: str, export_format: ExportFormat) -> _RecordWriter:
+  if export_format == 'parquet':
+    return _ParquetWriter(path)
+  return _JsonlWriter(path)
+
+
+def _read_records(
+    path: str, export_format: ExportFormat
+) -> Iterator[SessionRecord]:
+  """Reads the records of a file one line, or one row group, at a time."""
+  if export_format == 'parquet':
+    _, pq = _import_pyarrow()
+    parquet_file = pq.ParquetFile(path)
+    for batch in parquet_file.iter_batches(columns=list(_PARQUET_COLUMNS)):
+      for row in batch.to_pylist():
+        row['data'] = json.loads(row['data'])
+        yield SessionRecord.model_validate(row)
+    return
+  with open(path, 'r', encoding='utf-8') as f:
+    for line in f:
+      if line.strip():
+        yield SessionRecord.model_validate_json(line)
+
+
+def _import_pyarrow():
+  try:
+    import pyarrow
+    import pyarrow.parquet
+  except ImportError as e:
+    raise ImportError(
+        'Parquet export and import require pyarrow, please install it via'
+        ' `pip install pyarrow`.'
+    ) from e
+  return pyarrow, pyarrow.parquet
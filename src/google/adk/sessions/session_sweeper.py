@@ -0,0 +1,389 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime
+from datetime import timedelta
+import logging
+from typing import Any
+from typing import Optional
+
+from google.genai import types
+from pydantic import BaseModel
+from pydantic import Field
+from sqlalchemy import and_
+from sqlalchemy import delete
+from sqlalchemy import func
+from sqlalchemy import or_
+from sqlalchemy import select
+from sqlalchemy import tuple_
+
+from ..artifacts.base_artifact_service import BaseArtifactService
+from ..events.event import Event
+from .database_session_service import _SESSION_SCOPE
+from .database_session_service import DatabaseSessionService
+from .database_session_service import StorageEvent
+from .database_session_service import StorageSession
+from .database_session_service import StorageStateEntry
+
+logger = logging.getLogger('google_adk.' + __name__)
+
+_SessionKey = tuple[str, str, str]
+
+
+class RetentionPolicy(BaseModel):
+  """How long sessions and events are kept."""
+
+  max_session_age_seconds: Optional[float] = Field(default=None, gt=0)
+  """Sessions not updated for longer than this are deleted with their events."""
+
+  max_events_per_session: Optional[int] = Field(default=None, ge=1)
+  """Only this many of the most recent events of each session are kept."""
+
+  batch_size: int = Field(default=500, ge=1)
+  """The maximum number of sessions, events or state entries deleted per
+  transaction."""
+
+
+class SweepStats(BaseModel):
+  """Counters of the records removed by a sweep."""
+
+  deleted_sessions: int = 0
+  """The number of sessions deleted because of their age."""
+
+  deleted_events: int = 0
+  """The number of events deleted, including those of deleted sessions."""
+
+  archived_events: int = 0
+  """The number of deleted events that were archived first."""
+
+
+class SessionSweeper:
+  """Enforces a retention policy on the sessions of a database.
+
+  Expired sessions and the oldest events of long sessions are deleted in
+  batches of at most `batch_size` rows, each in its own short transaction, so
+  the sweep doesn't hold locks that would block the service for long.
+
+  If an artifact service is given, the events are archived to it before they
+  are deleted. Each batch of events of a session is saved as a new version of
+  the `archive_filename` artifact of the session, in JSON Lines, and the events
+  are only deleted once it's saved.
+
+  Call `sweep` to run a single pass, e.g. from a cron job, or `start` to run
+  passes in the background every `interval_seconds`.
+  """
+
+  def __init__(
+      self,
+      session_service: DatabaseSessionService,
+      policy: RetentionPolicy,
+      *,
+      artifact_service: Optional[BaseArtifactService] = None,
+      archive_filename: str = 'archived_events.jsonl',
+      interval_seconds: float = 3600.0,
+  ):
+    """Initializes the sweeper.
+
+    Args:
+      session_service: The session service to sweep.
+      policy: The retention policy to enforce.
+      artifact_service: If set, the artifact service that deleted events are
+        archived to.
+      archive_filename: The artifact filename of the archived events.
+      interval_seconds: The time between two background sweeps.
+    """
+    self.session_service = session_service
+    self.policy = policy
+    self.artifact_service = artifact_service
+    self.archive_filename = archive_filename
+    self.interval_seconds = interval_seconds
+    self._task: Optional[asyncio.Task[None]] = None
+
+  def start(self) -> None:
+    """Starts sweeping in the background, on the running event loop."""
+    if self._task is None or self._task.done():
+      self._task = asyncio.create_task(self._run())
+
+  async def stop(self) -> None:
+    """Stops the background sweeps, waiting for the current batch."""
+    if self._task is None:
+      return
+    self._task.cancel()
+    try:
+      await self._task
+    except asyncio.CancelledError:
+      pass
+    self._task = None
+
+  async def _run(self) -> None:
+    while True:
+      try:
+        stats = await self.sweep()
+        logger.info(
+            'Session sweep deleted %d sessions and %d events.',
+            stats.deleted_sessions,
+            stats.deleted_events,
+        )
+      except Exception:  # pylint: disable=broad-exception-caught
+        logger.exception('Session sweep failed, retrying at the next interval.')
+      await asyncio.sleep(self.interval_seconds)
+
+  async def sweep(self) -> SweepStats:
+    """Runs a full pass of the retention policy.
+
+    Returns:
+      The number of deleted and archived records.
+    """
+    stats = SweepStats()
+    if self.policy.max_session_age_seconds is not None:
+      await self._delete_expired_sessions(stats)
+    if self.policy.max_events_per_session is not None:
+      await self._trim_sessions(stats)
+    return stats
+
+  async def _delete_expired_sessions(self, stats: SweepStats) -> None:
+    """Deletes the sessions not updated within the maximum age."""
+    with self.session_service.database_session_factory() as session_factory:
+      # Uses the clock of the database, which set the update times.
+      cutoff = session_factory.scalar(select(func.now())) - timedelta(
+          seconds=self.policy.max_session_age_seconds
+      )
+    while True:
+      with self.session_service.database_session_factory() as session_factory:
+        session_keys = session_factory.execute(
+            select(
+                StorageSession.app_name,
+                StorageSession.user_id,
+                StorageSession.id,
+            )
+            .where(StorageSession.update_time < cutoff)
+            .limit(self.policy.batch_size)
+        ).all()
+      if not session_keys:
+        return
+      for session_key in session_keys:
+        await self._delete_session(stats, tuple(session_key), cutoff)
+
+  async def _delete_session(
+      self, stats: SweepStats, session_key: _SessionKey, cutoff: datetime
+  ) -> None:
+    """Deletes an expired session, after its events and state in batches.
+
+    The session row is deleted last, so the deletes cascaded from it are empty
+    and every transaction deletes at most `batch_size` rows. A session updated
+    during its deletion is kept, without the events already deleted.
+    """
+    if not await self._delete_events(stats, session_key, cutoff=cutoff):
+      return
+    if not await self._delete_state_entries(session_key, cutoff):
+      return
+    app_name, user_id, session_id = session_key
+    with self.session_service.database_session_factory() as session_factory:
+      result = session_factory.execute(
+          delete(StorageSession).where(
+              StorageSession.app_name == app_name,
+              StorageSession.user_id == user_id,
+              StorageSession.id == session_id,
+              StorageSession.update_time < cutoff,
+          )
+      )
+      session_factory.commit()
+    if result.rowcount:
+      stats.deleted_sessions += 1
+
+  async def _delete_state_entries(
+      self, session_key: _SessionKey, cutoff: datetime
+  ) -> bool:
+    """Deletes the state entries of an expired session in batches.
+
+    Returns:
+      False if the session was updated since it expired, True otherwise.
+    """
+    app_name, user_id, session_id = session_key
+    session_state_filter = (
+        StorageStateEntry.scope == _SESSION_SCOPE,
+        StorageStateEntry.app_name == app_name,
+        StorageStateEntry.user_id == user_id,
+        StorageStateEntry.session_id == session_id,
+    )
+    while True:
+      with self.session_service.database_session_factory() as session_factory:
+        if not _lock_expired_session(session_factory, session_key, cutoff):
+          return False
+        keys = session_factory.scalars(
+            select(StorageStateEntry.key)
+            .where(*session_state_filter)
+            .limit(self.policy.batch_size)
+        ).all()
+        if not keys:
+          return True
+        session_factory.execute(
+            delete(StorageStateEntry).where(
+                *session_state_filter, StorageStateEntry.key.in_(keys)
+            )
+        )
+        session_factory.commit()
+      await asyncio.sleep(0)
+
+  async def _trim_sessions(self, stats: SweepStats) -> None:
+    """Deletes the oldest events of the sessions with too many events."""
+    max_events = self.policy.max_events_per_session
+    last_key = None
+    while True:
+      with self.session_service.database_session_factory() as session_factory:
+        session_key_columns = (
+            StorageEvent.app_name,
+            StorageEvent.user_id,
+            StorageEvent.session_id,
+        )
+        query = (
+            select(*session_key_columns)
+            .group_by(*session_key_columns)
+            .having(func.count() > max_events)
+            .order_by(*session_key_columns)
+            .limit(self.policy.batch_size)
+        )
+        if last_key is not None:
+          query = query.where(tuple_(*session_key_columns) > last_key)
+        session_keys = session_factory.execute(query).all()
+      if not session_keys:
+        return
+      for session_key in session_keys:
+        await self._delete_events(stats, tuple(session_key), keep=max_events)
+      last_key = tuple(session_keys[-1])
+
+  async def _delete_events(
+      self,
+      stats: SweepStats,
+      session_key: _SessionKey,
+      keep: int = 0,
+      cutoff: Optional[datetime] = None,
+  ) -> bool:
+    """Deletes the events of a session but the `keep` most recent ones.
+
+    Args:
+      stats: The counters to update.
+      session_key: The app name, user ID and ID of the session.
+      keep: The number of most recent events to keep.
+      cutoff: If set, the events are only deleted while the session was not
+        updated since this time.
+
+    Returns:
+      False if the session was updated since the cutoff, True otherwise.
+    """
+    first_kept = None
+    if keep:
+      with self.session_service.database_session_factory() as session_factory:
+        first_kept = session_factory.execute(
+            select(StorageEvent.timestamp, StorageEvent.id)
+            .where(*_session_filter(session_key))
+            .order_by(StorageEvent.timestamp.desc(), StorageEvent.id.desc())
+            .offset(keep - 1)
+            .limit(1)
+        ).first()
+      if first_kept is None:
+        return True
+
+    while True:
+      with self.session_service.database_session_factory() as session_factory:
+        if cutoff is not None and not _lock_expired_session(
+            session_factory, session_key, cutoff
+        ):
+          return False
+        query = select(StorageEvent).where(*_session_filter(session_key))
+        if first_kept is not None:
+          query = query.where(_before(*first_kept))
+        storage_events = session_factory.scalars(
+            query.order_by(StorageEvent.timestamp, StorageEvent.id).limit(
+                self.policy.batch_size
+            )
+        ).all()
+        if not storage_events:
+          return True
+        if self.artifact_service is not None:
+          await self._archive(
+              session_key, [e.to_event() for e in storage_events]
+          )
+          stats.archived_events += len(storage_events)
+        session_factory.execute(
+            delete(StorageEvent).where(
+                *_session_filter(session_key),
+                StorageEvent.id.in_([e.id for e in storage_events]),
+            )
+        )
+        session_factory.commit()
+      stats.deleted_events += len(storage_events)
+      # Lets the service serve requests between batches.
+      await asyncio.sleep(0)
+
+  async def _archive(
+      self, session_key: _SessionKey, events: list[Event]
+  ) -> None:
+    app_name, user_id, session_id = session_key
+    data = ''.join(
+        event.model_dump_json(exclude_none=True) + '\n' for event in events
+    )
+    await self.artifact_service.save_artifact(
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+        filename=self.archive_filename,
+        artifact=types.Part.from_bytes(
+            data=data.encode('utf-8'), mime_type='application/jsonl'
+        ),
+    )
+
+
+def _session_filter(session_key: _SessionKey) -> tuple[Any, ...]:
+  app_name, user_id, session_id = session_key
+  return (
+      StorageEvent.app_name == app_name,
+      StorageEvent.user_id == user_id,
+      StorageEvent.session_id == session_id,
+  )
+
+
+def _lock_expired_session(
+    session_factory: Any, session_key: _SessionKey, cutoff: datetime
+) -> bool:
+  """Locks the session row if the session was not updated since the cutoff.
+
+  The lock is held until the end of the transaction, so the session isn't
+  updated while a batch of its records is deleted.
+  """
+  app_name, user_id, session_id = session_key
+  return (
+      session_factory.scalar(
+          select(StorageSession.id)
+          .where(
+              StorageSession.app_name == app_name,
+              StorageSession.user_id == user_id,
+              StorageSession.id == session_id,
+              StorageSession.update_time < cutoff,
+          )
+          .with_for_update()
+      )
+      is not None
+  )
+
+
+def _before(timestamp: datetime, event_id: str) -> Any:
+  """Whether an event is ordered before the given one."""
+  return or_(
+      StorageEvent.timestamp < timestamp,
+      and_(StorageEvent.timestamp == timestamp, StorageEvent.id < event_id),
+  )
@@ -0,0 +1,395 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+from collections import OrderedDict
+import hashlib
+import itertools
+import logging
+import time
+from typing import Any
+from typing import AsyncGenerator
+from typing import Iterator
+from typing import Mapping
+from typing import Optional
+from typing import Sequence
+
+from sqlalchemy import delete
+from sqlalchemy import insert
+from sqlalchemy import select
+from typing_extensions import override
+
+from . import _session_util
+from ..events.event import Event
+from .base_session_service import BaseSessionService
+from .base_session_service import GetSessionConfig
+from .base_session_service import ListEventsConfig
+from .base_session_service import ListEventsResponse
+from .base_session_service import ListSessionsConfig
+from .base_session_service import ListSessionsResponse
+from .database_session_service import DatabaseSessionService
+from .database_session_service import StorageEvent
+from .database_session_service import StorageSession
+from .database_session_service import StorageStateEntry
+from .database_session_service import StorageUserState
+from .session import Session
+from .state import State
+
+logger = logging.getLogger('google_adk.' + __name__)
+
+
+class ShardedSessionService(BaseSessionService):
+  """A session service that shards sessions across several databases.
+
+  Sessions, and the user state stored with them, are placed on a shard chosen
+  by rendezvous hashing of (app_name, user_id), so adding a shard only moves
+  the users that hash to it; `rebalance` moves them. App state is shared by
+  all users, so it's kept on a designated primary database instead.
+
+  Reads of sessions and session lists can be served by read replicas of the
+  shards. For `max_replica_lag_seconds` after a write, the reads of that user
+  go to the shard itself, and sessions missing from a replica are read from the
+  shard as well.
+
+  Writes to the shard and to the primary are not atomic: an app state change
+  is written to the primary after its event has been stored on the shard.
+  """
+
+  def __init__(
+      self,
+      shards: Mapping[str, DatabaseSessionService],
+      *,
+      primary: DatabaseSessionService,
+      replicas: Optional[Mapping[str, Sequence[DatabaseSessionService]]] = None,
+      max_replica_lag_seconds: float = 5.0,
+  ):
+    """Initializes the sharded session service.
+
+    Args:
+      shards: The session services of the shards, by a stable shard name. The
+        names, not the order, determine where sessions are placed.
+      primary: The session service that stores the app state. It may also be
+        one of the shards.
+      replicas: The session services of the read replicas, by shard name.
+      max_replica_lag_seconds: How long after a write the reads of the same
+        user are not served by replicas.
+    """
+    if not shards:
+      raise ValueError('At least one shard is required.')
+    unknown_shards = set(replicas or {}) - set(shards)
+    if unknown_shards:
+      raise ValueError(f'Replicas of unknown shards: {sorted(unknown_shards)}')
+    self.shards = dict(shards)
+    self.primary = primary
+    for shard in self.shards.values():
+      # Keeps the shards from storing app state deltas of their own.
+      shard._store_app_state = shard is primary  # pylint: disable=protected-access
+    self.max_replica_lag_seconds = max_replica_lag_seconds
+    self._replicas: dict[str, Iterator[DatabaseSessionService]] = {
+        shard_name: itertools.cycle(shard_replicas)
+        for shard_name, shard_replicas in (replicas or {}).items()
+        if shard_replicas
+    }
+    # The last write time of recently written users, oldest first.
+    self._last_writes: OrderedDict[tuple[str, str], float] = OrderedDict()
+
+  def get_shard_name(self, app_name: str, user_id: str) -> str:
+    """Returns the name of the shard that stores the sessions of a user."""
+    return max(
+        self.shards,
+        key=lambda shard_name: _shard_weight(shard_name, app_name, user_id),
+    )
+
+  def _get_shard(self, app_name: str, user_id: str) -> DatabaseSessionService:
+    return self.shards[self.get_shard_name(app_name, user_id)]
+
+  def _get_reader(self, app_name: str, user_id: str) -> DatabaseSessionService:
+    """Returns a replica of the user's shard, unless the user just wrote."""
+    shard_name = self.get_shard_name(app_name, user_id)
+    replicas = self._replicas.get(shard_name)
+    if replicas is None:
+      return self.shards[shard_name]
+    last_write = self._last_writes.get((app_name, user_id))
+    if (
+        last_write is not None
+        and time.time() - last_write <= self.max_replica_lag_seconds
+    ):
+      return self.shards[shard_name]
+    return next(replicas)
+
+  def _record_write(self, app_name: str, user_id: str) -> None:
+    now = time.time()
+    key = (app_name, user_id)
+    self._last_writes[key] = now
+    self._last_writes.move_to_end(key)
+    # Forgets the writes that replicas have caught up with.
+    while self._last_writes:
+      oldest_key, oldest_write = next(iter(self._last_writes.items()))
+      if now - oldest_write <= self.max_replica_lag_seconds:
+        break
+      del self._last_writes[oldest_key]
+
+  @override
+  async def create_session(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      state: Optional[dict[str, Any]] = None,
+      session_id: Optional[str] = None,
+  ) -> Session:
+    app_state_delta, user_state, session_state = _session_util.split_state(
+        state or {}
+    )
+    shard_state = {
+        **_session_util.prefix_state(State.USER_PREFIX, user_state),
+        **session_state,
+    }
+    session = await self._get_shard(app_name, user_id).create_session(
+        app_name=app_name,
+        user_id=user_id,
+        state=shard_state,
+        session_id=session_id,
+    )
+    self._record_write(app_name, user_id)
+    await self.primary.update_app_state(app_name, app_state_delta)
+    await self._merge_app_state(session)
+    return session
+
+  @override
+  async def get_session(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      config: Optional[GetSessionConfig] = None,
+  ) -> Optional[Session]:
+    shard = self._get_shard(app_name, user_id)
+    reader = self._get_reader(app_name, user_id)
+    session = await reader.get_session(
+        app_name=app_name, user_id=user_id, session_id=session_id, config=config
+    )
+    if session is None and reader is not shard:
+      # The replica may not have the session yet.
+      session = await shard.get_session(
+          app_name=app_name,
+          user_id=user_id,
+          session_id=session_id,
+          config=config,
+      )
+    if session is not None:
+      await self._merge_app_state(
+          session, config.state_keys if config else None
+      )
+    return session
+
+  @override
+  async def iter_events(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      before_timestamp: Optional[float] = None,
+  ) -> AsyncGenerator[Event, None]:
+    async for event in self._get_shard(app_name, user_id).iter_events(
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+        before_timestamp=before_timestamp,
+    ):
+      yield event
+
+  @override
+  async def get_session_version(
+      self, *, app_name: str, user_id: str, session_id: str
+  ) -> Optional[str]:
+    return await self._get_shard(app_name, user_id).get_session_version(
+        app_name=app_name, user_id=user_id, session_id=session_id
+    )
+
+  @override
+  async def list_sessions(
+      self, *, app_name: str, user_id: str
+  ) -> ListSessionsResponse:
+    return await self._get_reader(app_name, user_id).list_sessions(
+        app_name=app_name, user_id=user_id
+    )
+
+  @override
+  async def list_sessions_page(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      config: Optional[ListSessionsConfig] = None,
+  ) -> ListSessionsResponse:
+    return await self._get_reader(app_name, user_id).list_sessions_page(
+        app_name=app_name, user_id=user_id, config=config
+    )
+
+  @override
+  async def list_events(
+      self,
+      *,
+      app_name: str,
+      user_id: str,
+      session_id: str,
+      config: Optional[ListEventsConfig] = None,
+  ) -> ListEventsResponse:
+    return await self._get_shard(app_name, user_id).list_events(
+        app_name=app_name,
+        user_id=user_id,
+        session_id=session_id,
+        config=config,
+    )
+
+  @override
+  async def delete_session(
+      self, *, app_name: str, user_id: str, session_id: str
+  ) -> None:
+    await self._get_shard(app_name, user_id).delete_session(
+        app_name=app_name, user_id=user_id, session_id=session_id
+    )
+    self._record_write(app_name, user_id)
+
+  @override
+  async def append_event(self, session: Session, event: Event) -> Event:
+    event = await self._get_shard(
+        session.app_name, session.user_id
+    ).append_event(session, event)
+    if event.partial:
+      return event
+    self._record_write(session.app_name, session.user_id)
+    if event.actions and event.actions.state_delta:
+      app_state_delta, _, _ = _session_util.split_state(
+          event.actions.state_delta
+      )
+      await self.primary.update_app_state(session.app_name, app_state_delta)
+    return event
+
+  async def _merge_app_state(
+      self, session: Session, state_keys: Optional[list[str]] = None
+  ) -> None:
+    """Replaces the app state of a session with the one of the primary."""
+    session.state = {
+        key: value
+        for key, value in session.state.items()
+        if not key.startswith(State.APP_PREFIX)
+    }
+    if state_keys is not None and not any(
+        key.startswith(State.APP_PREFIX) for key in state_keys
+    ):
+      return
+    app_state = await self.primary.get_app_state(session.app_name)
+    for key, value in app_state.items():
+      prefixed_key = State.APP_PREFIX + key
+      if state_keys is None or prefixed_key in state_keys:
+        session.state[prefixed_key] = value
+
+  def rebalance(self) -> int:
+    """Moves the sessions stored on other shards than their own.
+
+    Run it after changing the shards, while the moved users are not being
+    served. Each user is copied to its shard and then deleted from the old
+    one, and a partially moved user is copied again on the next run.
+
+    Returns:
+      The number of users that were moved.
+    """
+    moved = 0
+    for shard_name, shard in self.shards.items():
+      with shard.database_session_factory() as session_factory:
+        users = session_factory.execute(
+            select(StorageSession.app_name, StorageSession.user_id).distinct()
+        ).all()
+      for app_name, user_id in users:
+        target_name = self.get_shard_name(app_name, user_id)
+        if target_name == shard_name:
+          continue
+        logger.info(
+            'Moving user %s of app %s from shard %s to shard %s.',
+            user_id,
+            app_name,
+            shard_name,
+            target_name,
+        )
+        _move_user(shard, self.shards[target_name], app_name, user_id)
+        moved += 1
+    return moved
+
+
+_MOVE_BATCH_SIZE = 500
+"""The number of rows copied at a time when moving a user."""
+
+_USER_TABLES = (
+    StorageSession,
+    StorageEvent,
+    StorageUserState,
+    StorageStateEntry,
+)
+"""The tables holding the data of a user, in insertion order."""
+
+
+def _user_filter(table, app_name: str, user_id: str) -> list[Any]:
+  # App state entries have an empty user id, so they are never matched.
+  return [table.app_name == app_name, table.user_id == user_id]
+
+
+def _move_user(
+    source: DatabaseSessionService,
+    target: DatabaseSessionService,
+    app_name: str,
+    user_id: str,
+) -> None:
+  """Copies the sessions and state of a user to a shard, then deletes them.
+
+  The rows are copied in batches of `_MOVE_BATCH_SIZE`, so the memory used
+  doesn't depend on the number of sessions and events of the user.
+  """
+  with target.database_session_factory() as target_factory:
+    # Replaces the rows left by an interrupted move.
+    for table in reversed(_USER_TABLES):
+      target_factory.execute(
+          delete(table).where(*_user_filter(table, app_name, user_id))
+      )
+    with source.database_session_factory() as source_factory:
+      for table in _USER_TABLES:
+        result = source_factory.execute(
+            select(table.__table__)
+            .where(*_user_filter(table, app_name, user_id))
+            .execution_options(yield_per=_MOVE_BATCH_SIZE)
+        )
+        for rows in result.partitions():
+          target_factory.execute(
+              insert(table.__table__), [dict(row._mapping) for row in rows]
+          )
+    target_factory.commit()
+
+  with source.database_session_factory() as session_factory:
+    for table in reversed(_USER_TABLES):
+      session_factory.execute(
+          delete(table).where(*_user_filter(table, app_name, user_id))
+      )
+    session_factory.commit()
+
+
+def _shard_weight(shard_name: str, app_name: str, user_id: str) -> int:
+  """The rendezvous hashing weight of a shard for a user."""
+  digest = hashlib.sha256(
+      '\0'.join((shard_name, app_name, user_id)).encode('utf-8')
+  ).digest()
+  return int.from_bytes(digest[:8], 'big')
@@ -16,10 +16,12 @@ from __future__ import annotations
 import asyncio
 import logging
 import re
+import time
 from typing import Any
 from typing import Dict
 from typing import Optional
 import urllib.parse
+import weakref
 
 from dateutil import parser
 from google.genai import types
@@ -27,7 +29,6 @@ from typing_extensions import override
 
 from google import genai
 
-from . import _session_util
 from ..events.event import Event
 from ..events.event_actions import EventActions
 from .base_session_service import BaseSessionService
@@ -38,6 +39,15 @@ from .session import Session
 isoparse = parser.isoparse
 logger = logging.getLogger('google_adk.' + __name__)
 
+_LRO_INITIAL_DELAY_SECONDS = 0.1
+_LRO_MAX_DELAY_SECONDS = 2.0
+_LRO_TIMEOUT_SECONDS = 10.0
+
+_api_clients: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, dict[tuple[str, str], Any]
+] = weakref.WeakKeyDictionary()
+"""The pooled API clients of each event loop, by project and location."""
+
 
 class VertexAiSessionService(BaseSessionService):
   """Connects to the managed Vertex AI Session Service."""
@@ -82,25 +92,23 @@ class VertexAiSessionService(BaseSessionService):
     session_id = api_response['name'].split('/')[-3]
     operation_id = api_response['name'].split('/')[-1]
 
-    max_retry_attempt = 5
-    lro_response = None
-    while max_retry_attempt >= 0:
+    # Polls the operation with exponential backoff.
+    deadline = time.monotonic() + _LRO_TIMEOUT_SECONDS
+    delay = _LRO_INITIAL_DELAY_SECONDS
+    while True:
       lro_response = await api_client.async_request(
           http_method='GET',
           path=f'operations/{operation_id}',
           request_dict={},
       )
-
       if lro_response.get('done', None):
         break
-
-      await asyncio.sleep(1)
-      max_retry_attempt -= 1
-
-    if lro_response is None or not lro_response.get('done', None):
-      raise TimeoutError(
-          f'Timeout waiting for operation {operation_id} to complete.'
-      )
+      if time.monotonic() + delay > deadline:
+        raise TimeoutError(
+            f'Timeout waiting for operation {operation_id} to complete.'
+        )
+      await asyncio.sleep(delay)
+      delay = min(delay * 2, _LRO_MAX_DELAY_SECONDS)
 
     # Get session resource
     get_session_api_response = await api_client.async_request(
@@ -132,13 +140,20 @@ class VertexAiSessionService(BaseSessionService):
   ) -> Optional[Session]:
     reasoning_engine_id = _parse_reasoning_engine_id(app_name)
 
-    # Get session resource
     api_client = _get_api_client(self.project, self.location)
-    get_session_api_response = await api_client.async_request(
-        http_method='GET',
-        path=f'reasoningEngines/{reasoning_engine_id}/sessions/{session_id}',
-        request_dict={},
+    # The first page of events is fetched along with the session resource.
+    events_task = asyncio.create_task(
+        _list_events_page(api_client, reasoning_engine_id, session_id)
     )
+    try:
+      get_session_api_response = await api_client.async_request(
+          http_method='GET',
+          path=f'reasoningEngines/{reasoning_engine_id}/sessions/{session_id}',
+          request_dict={},
+      )
+    except BaseException:
+      events_task.cancel()
+      raise
 
     session_id = get_session_api_response['name'].split('/')[-1]
     update_timestamp = isoparse(
@@ -152,32 +167,36 @@ class VertexAiSessionService(BaseSessionService):
         last_update_time=update_timestamp,
     )
 
-    list_events_api_response = await api_client.async_request(
-        http_method='GET',
-        path=f'reasoningEngines/{reasoning_engine_id}/sessions/{session_id}/events',
-        request_dict={},
-    )
-
+    list_events_api_response = await events_task
     # Handles empty response case
     if list_events_api_response.get('httpHeaders', None):
-      return session
+      list_events_api_response = {'sessionEvents': []}
 
-    session.events += [
-        _from_api_event(event)
-        for event in list_events_api_response['sessionEvents']
-    ]
-
-    while list_events_api_response.get('nextPageToken', None):
-      page_token = list_events_api_response.get('nextPageToken', None)
-      list_events_api_response = await api_client.async_request(
-          http_method='GET',
-          path=f'reasoningEngines/{reasoning_engine_id}/sessions/{session_id}/events?pageToken={page_token}',
-          request_dict={},
-      )
-      session.events += [
-          _from_api_event(event)
-          for event in list_events_api_response['sessionEvents']
-      ]
+    next_page_task = None
+    try:
+      while True:
+        # Requests the next page before converting the current one.
+        page_token = list_events_api_response.get('nextPageToken', None)
+        next_page_task = (
+            asyncio.create_task(
+                _list_events_page(
+                    api_client, reasoning_engine_id, session_id, page_token
+                )
+            )
+            if page_token
+            else None
+        )
+        session.events += [
+            _from_api_event(event)
+            for event in list_events_api_response['sessionEvents']
+        ]
+        if next_page_task is None:
+          break
+        list_events_api_response = await next_page_task
+    finally:
+      # Drops the prefetched page if the current one failed to convert.
+      if next_page_task is not None:
+        next_page_task.cancel()
 
     session.events = [
         event for event in session.events if event.timestamp <= update_timestamp
@@ -196,6 +215,13 @@ class VertexAiSessionService(BaseSessionService):
           i -= 1
         if i >= 0:
           session.events = session.events[i:]
+      if config.state_keys is not None:
+        state_keys = set(config.state_keys)
+        session.state = {
+            key: value
+            for key, value in session.state.items()
+            if key in state_keys
+        }
 
     return session
 
@@ -264,13 +290,41 @@ class VertexAiSessionService(BaseSessionService):
 
 
 def _get_api_client(project: str, location: str):
-  """Instantiates an API client for the given project and location.
+  """Returns an API client for the given project and location.
 
-  It needs to be instantiated inside each request so that the event loop
-  management.
+  Clients are pooled per event loop, as their connections are bound to the loop
+  they were first used in.
   """
-  client = genai.Client(vertexai=True, project=project, location=location)
-  return client._api_client
+  try:
+    loop = asyncio.get_running_loop()
+  except RuntimeError:
+    loop = None
+  if loop is None:
+    client = genai.Client(vertexai=True, project=project, location=location)
+    return client._api_client
+
+  clients = _api_clients.setdefault(loop, {})
+  api_client = clients.get((project, location))
+  if api_client is None:
+    client = genai.Client(vertexai=True, project=project, location=location)
+    api_client = clients[(project, location)] = client._api_client
+  return api_client
+
+
+async def _list_events_page(
+    api_client,
+    reasoning_engine_id: str,
+    session_id: str,
+    page_token: Optional[str] = None,
+) -> Dict[str, Any]:
+  path = f'reasoningEngines/{reasoning_engine_id}/sessions/{session_id}/events'
+  if page_token:
+    path += f'?pageToken={page_token}'
+  return await api_client.async_request(
+      http_method='GET',
+      path=path,
+      request_dict={},
+  )
 
 
 def _convert_event_to_json(event: Event) -> Dict[str, Any]:
@@ -339,34 +393,33 @@ def _from_api_event(api_event: Dict[str, Any]) -> Event:
         ),
     )
 
-  event = Event(
+  event_metadata = api_event.get('eventMetadata', None) or {}
+  long_running_tool_ids_list = event_metadata.get('longRunningToolIds', None)
+
+  # Content and grounding metadata are only validated when accessed.
+  return Event.with_lazy_fields(
+      {
+          'content': api_event.get('content', None),
+          'grounding_metadata': event_metadata.get('groundingMetadata', None),
+      },
       id=api_event['name'].split('/')[-1],
       invocation_id=api_event['invocationId'],
       author=api_event['author'],
       actions=event_actions,
-      content=_session_util.decode_content(api_event.get('content', None)),
       timestamp=isoparse(api_event['timestamp']).timestamp(),
       error_code=api_event.get('errorCode', None),
       error_message=api_event.get('errorMessage', None),
+      partial=event_metadata.get('partial', None),
+      turn_complete=event_metadata.get('turnComplete', None),
+      interrupted=event_metadata.get('interrupted', None),
+      branch=event_metadata.get('branch', None),
+      long_running_tool_ids=(
+          set(long_running_tool_ids_list)
+          if long_running_tool_ids_list
+          else None
+      ),
   )
 
-  if api_event.get('eventMetadata', None):
-    long_running_tool_ids_list = api_event['eventMetadata'].get(
-        'longRunningToolIds', None
-    )
-    event.partial = api_event['eventMetadata'].get('partial', None)
-    event.turn_complete = api_event['eventMetadata'].get('turnComplete', None)
-    event.interrupted = api_event['eventMetadata'].get('interrupted', None)
-    event.branch = api_event['eventMetadata'].get('branch', None)
-    event.grounding_metadata = _session_util.decode_grounding_metadata(
-        api_event['eventMetadata'].get('groundingMetadata', None)
-    )
-    event.long_running_tool_ids = (
-        set(long_running_tool_ids_list) if long_running_tool_ids_list else None
-    )
-
-  return event
-
 
 def _parse_reasoning_engine_id(app_name: str):
   if app_name.isdigit():
@@ -25,6 +25,7 @@ from .load_artifacts_tool import load_artifacts_tool as load_artifacts
 from .load_memory_tool import load_memory_tool as load_memory
 from .long_running_tool import LongRunningFunctionTool
 from .preload_memory_tool import preload_memory_tool as preload_memory
+from .read_tool_response_tool import read_tool_response_tool as read_tool_response
 from .tool_context import ToolContext
 from .transfer_to_agent_tool import transfer_to_agent
 from .url_context_tool import url_context
@@ -45,6 +46,7 @@ __all__ = [
     'load_memory',
     'LongRunningFunctionTool',
     'preload_memory',
+    'read_tool_response',
     'ToolContext',
     'transfer_to_agent',
 ]
@@ -41,6 +41,25 @@ class BaseTool(ABC):
   """Whether the tool is a long running operation, which typically returns a
   resource id first and finishes the operation later."""
 
+  llm_request_reads: Optional[frozenset[str]] = None
+  """The parts of the LLM request `process_llm_request` reads.
+
+  See `BaseLlmRequestProcessor.reads`. None means the parts read by the
+  default implementation if it's not overridden, or any part.
+  """
+
+  llm_request_writes: Optional[frozenset[str]] = None
+  """The parts of the LLM request `process_llm_request` writes.
+
+  See `BaseLlmRequestProcessor.writes`. None means the parts written by the
+  default implementation if it's not overridden, or any part.
+  """
+
+  max_response_chars: Optional[int] = None
+  """If set, responses larger than this are saved as artifacts, and the model
+  gets a truncated preview of them instead. Overrides
+  `RunConfig.max_function_response_chars`."""
+
   def __init__(self, *, name, description, is_long_running: bool = False):
     self.name = name
     self.description = description
@@ -33,6 +33,9 @@ class EnterpriseWebSearchTool(BaseTool):
   https://cloud.google.com/vertex-ai/generative-ai/docs/grounding/web-grounding-enterprise.
   """
 
+  llm_request_reads = frozenset({'model', 'config.tools'})
+  llm_request_writes = frozenset({'config.tools'})
+
   def __init__(self):
     """Initializes the Vertex AI Search tool."""
     # Name and description are not used because this is a model built-in tool.
@@ -37,6 +37,9 @@ class ExampleTool(BaseTool):
     examples: The examples to add to the LLM request.
   """
 
+  llm_request_reads = frozenset({'model'})
+  llm_request_writes = frozenset({'config.system_instruction'})
+
   def __init__(self, examples: Union[list[Example], BaseExampleProvider]):
     # Name and description are not used because this tool only changes
     # llm_request.
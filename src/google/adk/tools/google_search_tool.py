@@ -33,6 +33,9 @@ class GoogleSearchTool(BaseTool):
   local code execution.
   """
 
+  llm_request_reads = frozenset({'model', 'config.tools'})
+  llm_request_writes = frozenset({'config.tools'})
+
   def __init__(self):
     # Name and description are not used because this is a model built-in tool.
     super().__init__(name='google_search', description='google_search')
@@ -31,6 +31,11 @@ if TYPE_CHECKING:
 class LoadArtifactsTool(BaseTool):
   """A tool that loads the artifacts and adds them to the session."""
 
+  llm_request_reads = frozenset({'contents'})
+  llm_request_writes = frozenset(
+      {'config.tools', 'tools_dict', 'config.system_instruction', 'contents'}
+  )
+
   def __init__(self):
     super().__init__(
         name='load_artifacts',
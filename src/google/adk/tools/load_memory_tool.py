@@ -54,6 +54,11 @@ class LoadMemoryTool(FunctionTool):
   NOTE: Currently this tool only uses text part from the memory.
   """
 
+  llm_request_reads = frozenset()
+  llm_request_writes = frozenset(
+      {'config.tools', 'tools_dict', 'config.system_instruction'}
+  )
+
   def __init__(self):
     super().__init__(load_memory)
 
@@ -32,6 +32,9 @@ class PreloadMemoryTool(BaseTool):
   NOTE: Currently this tool only uses text part from the memory.
   """
 
+  llm_request_reads = frozenset()
+  llm_request_writes = frozenset({'config.system_instruction'})
+
   def __init__(self):
     # Name and description are not used because this tool only
     # changes llm_request.
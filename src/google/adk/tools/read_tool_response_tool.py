@@ -0,0 +1,142 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from __future__ import annotations
+
+import json
+from typing import Any
+from typing import TYPE_CHECKING
+import uuid
+
+from google.genai import types
+from typing_extensions import override
+
+from .base_tool import BaseTool
+
+if TYPE_CHECKING:
+  from .tool_context import ToolContext
+
+_DEFAULT_PAGE_CHARS = 10000
+_MIME_TYPE = 'application/json'
+_HANDLE_PREFIX = 'tool_response_'
+
+
+async def offload_function_response(
+    function_response: dict[str, Any],
+    *,
+    tool_name: str,
+    tool_context: ToolContext,
+    max_chars: int,
+) -> dict[str, Any]:
+  """Saves a function response larger than a size as an artifact.
+
+  Args:
+    function_response: The response of the tool.
+    tool_name: The name of the tool.
+    tool_context: The context of the tool call.
+    max_chars: The size above which the response is offloaded, in characters
+      of its JSON serialization.
+
+  Returns:
+    The response itself if it's small enough. Otherwise, a truncated preview
+    of it with the handle of the artifact, which the model can page through
+    with the `read_tool_response` tool.
+  """
+  text = json.dumps(function_response, ensure_ascii=False, default=str)
+  if len(text) <= max_chars:
+    return function_response
+  call_id = tool_context.function_call_id or uuid.uuid4().hex
+  handle = f'{_HANDLE_PREFIX}{tool_name}_{call_id}.json'
+  await tool_context.save_artifact(
+      handle,
+      types.Part.from_bytes(data=text.encode('utf-8'), mime_type=_MIME_TYPE),
+  )
+  return {
+      'truncated': True,
+      'handle': handle,
+      'total_chars': len(text),
+      'preview': text[:max_chars],
+      'next_offset': max_chars,
+      'note': (
+          'The response is too large and was truncated. Call'
+          ' `read_tool_response` with the handle and next_offset to read'
+          ' the rest of it.'
+      ),
+  }
+
+
+class ReadToolResponseTool(BaseTool):
+  """A tool that pages through function responses that were offloaded."""
+
+  def __init__(self):
+    super().__init__(
+        name='read_tool_response',
+        description=(
+            'Reads a part of a truncated tool response, by its handle,'
+            ' starting at the given offset.'
+        ),
+    )
+
+  def _get_declaration(self) -> types.FunctionDeclaration | None:
+    return types.FunctionDeclaration(
+        name=self.name,
+        description=self.description,
+        parameters=types.Schema(
+            type=types.Type.OBJECT,
+            properties={
+                'handle': types.Schema(type=types.Type.STRING),
+                'offset': types.Schema(type=types.Type.INTEGER),
+                'max_chars': types.Schema(type=types.Type.INTEGER),
+            },
+            required=['handle'],
+        ),
+    )
+
+  @override
+  async def run_async(
+      self, *, args: dict[str, Any], tool_context: ToolContext
+  ) -> Any:
+    handle = args.get('handle', '')
+    not_found = {'error': f'No tool response found for handle {handle}.'}
+    # Only offloaded responses can be read, not any artifact of the session.
+    if not isinstance(handle, str) or not handle.startswith(_HANDLE_PREFIX):
+      return not_found
+    try:
+      offset = max(int(args.get('offset') or 0), 0)
+      max_chars = max(int(args.get('max_chars') or _DEFAULT_PAGE_CHARS), 1)
+    except (TypeError, ValueError):
+      return {'error': 'The offset and max_chars must be integers.'}
+    artifact = await tool_context.load_artifact(handle)
+    if (
+        not artifact
+        or not artifact.inline_data
+        or artifact.inline_data.mime_type != _MIME_TYPE
+    ):
+      return not_found
+    try:
+      text = artifact.inline_data.data.decode('utf-8')
+    except UnicodeDecodeError:
+      return {'error': f'The tool response {handle} is not valid UTF-8.'}
+    page = text[offset : offset + max_chars]
+    response = {
+        'handle': handle,
+        'total_chars': len(text),
+        'content': page,
+    }
+    if offset + len(page) < len(text):
+      response['next_offset'] = offset + len(page)
+    return response
+
+
+read_tool_response_tool = ReadToolResponseTool()
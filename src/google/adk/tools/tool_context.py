@@ -73,18 +73,24 @@ class ToolContext(CallbackContext):
     """Lists the filenames of the artifacts attached to the current session."""
     if self._invocation_context.artifact_service is None:
       raise ValueError('Artifact service is not initialized.')
-    return await self._invocation_context.artifact_service.list_artifact_keys(
-        app_name=self._invocation_context.app_name,
-        user_id=self._invocation_context.user_id,
-        session_id=self._invocation_context.session.id,
+    return await self._invocation_context.lookup_cache.get_or_load(
+        ('artifact_keys',),
+        lambda: self._invocation_context.artifact_service.list_artifact_keys(
+            app_name=self._invocation_context.app_name,
+            user_id=self._invocation_context.user_id,
+            session_id=self._invocation_context.session.id,
+        ),
     )
 
   async def search_memory(self, query: str) -> SearchMemoryResponse:
     """Searches the memory of the current user."""
     if self._invocation_context.memory_service is None:
       raise ValueError('Memory service is not available.')
-    return await self._invocation_context.memory_service.search_memory(
-        app_name=self._invocation_context.app_name,
-        user_id=self._invocation_context.user_id,
-        query=query,
+    return await self._invocation_context.lookup_cache.get_or_load(
+        ('memory', query),
+        lambda: self._invocation_context.memory_service.search_memory(
+            app_name=self._invocation_context.app_name,
+            user_id=self._invocation_context.user_id,
+            query=query,
+        ),
     )
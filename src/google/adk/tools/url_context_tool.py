@@ -33,6 +33,9 @@ class UrlContextTool(BaseTool):
   local code execution.
   """
 
+  llm_request_reads = frozenset({'model', 'config.tools'})
+  llm_request_writes = frozenset({'config.tools'})
+
   def __init__(self):
     # Name and description are not used because this is a model built-in tool.
     super().__init__(name='url_context', description='url_context')
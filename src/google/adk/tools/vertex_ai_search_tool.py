@@ -35,6 +35,9 @@ class VertexAiSearchTool(BaseTool):
     search_engine_id: The Vertex AI search engine resource ID.
   """
 
+  llm_request_reads = frozenset({'model', 'config.tools'})
+  llm_request_writes = frozenset({'config.tools'})
+
   def __init__(
       self,
       *,
@@ -0,0 +1,74 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Compares the compact event actions codec with pickle.
+
+Usage:
+  python -m tests.benchmarks.event_actions_codec_benchmark
+"""
+
+import pickle
+import sys
+import timeit
+
+from google.adk.events import EventActions
+from google.adk.sessions import _session_util
+
+_ITERATIONS = 2000
+
+_PAYLOADS = {
+    'empty': EventActions(),
+    'small': EventActions(
+        state_delta={'user:name': 'Alice', 'counter': 3},
+        artifact_delta={'report.pdf': 1},
+    ),
+    'large': EventActions(
+        state_delta={
+            f'key_{i}': {'text': f'{i} lorem ipsum ' * 20, 'index': i}
+            for i in range(100)
+        }
+    ),
+}
+
+
+def _report(name: str, encode, decode) -> None:
+  for payload_name, actions in _PAYLOADS.items():
+    data = encode(actions)
+    encode_seconds = timeit.timeit(lambda: encode(actions), number=_ITERATIONS)
+    decode_seconds = timeit.timeit(lambda: decode(data), number=_ITERATIONS)
+    print(
+        f'{name:>8} {payload_name:>6}: {len(data):>8} bytes,'
+        f' write {_ITERATIONS / encode_seconds:>10.0f}/s,'
+        f' read {_ITERATIONS / decode_seconds:>10.0f}/s'
+    )
+
+
+def main() -> None:
+  _report('pickle', pickle.dumps, pickle.loads)
+  _report(
+      'compact',
+      _session_util.encode_event_actions,
+      _session_util.decode_event_actions,
+  )
+  # Same codec with compression disabled.
+  _session_util.COMPRESSION_THRESHOLD_BYTES = sys.maxsize
+  _report(
+      'json',
+      _session_util.encode_event_actions,
+      _session_util.decode_event_actions,
+  )
+
+
+if __name__ == '__main__':
+  main()
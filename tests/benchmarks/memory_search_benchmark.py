@@ -0,0 +1,81 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Measures the search latency of InMemoryMemoryService by corpus size.
+
+Usage:
+  python -m tests.benchmarks.memory_search_benchmark
+"""
+
+import asyncio
+import random
+import timeit
+
+from google.adk.events import Event
+from google.adk.memory import InMemoryMemoryService
+from google.adk.sessions import Session
+from google.genai import types
+
+_ITERATIONS = 200
+_EVENTS_PER_SESSION = 100
+_VOCABULARY = [f'word{i}' for i in range(5000)]
+
+
+def _session(index: int, rng: random.Random) -> Session:
+  events = []
+  for _ in range(_EVENTS_PER_SESSION):
+    text = ' '.join(rng.choices(_VOCABULARY, k=30))
+    events.append(
+        Event(
+            author='user',
+            content=types.Content(role='user', parts=[types.Part(text=text)]),
+        )
+    )
+  if index == 0:
+    # A rare word, in the same number of events whatever the corpus size.
+    for event in events[:10]:
+      event.content.parts[0].text += ' needle'
+  return Session(
+      id=f'session_{index}', app_name='app', user_id='user', events=events
+  )
+
+
+def main() -> None:
+  loop = asyncio.new_event_loop()
+  rng = random.Random(0)
+  memory_service = InMemoryMemoryService()
+  num_sessions = 0
+  for target in (10, 100, 1000):
+    while num_sessions < target:
+      loop.run_until_complete(
+          memory_service.add_session_to_memory(_session(num_sessions, rng))
+      )
+      num_sessions += 1
+    for query in ('needle', 'word7'):
+      seconds = timeit.timeit(
+          lambda: loop.run_until_complete(
+              memory_service.search_memory(
+                  app_name='app', user_id='user', query=query
+              )
+          ),
+          number=_ITERATIONS,
+      )
+      print(
+          f'{num_sessions * _EVENTS_PER_SESSION:>8} events, {query!r:>16}:'
+          f' {seconds / _ITERATIONS * 1e3:8.3f} ms/query'
+      )
+
+
+if __name__ == '__main__':
+  main()
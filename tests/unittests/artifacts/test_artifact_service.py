@@ -15,10 +15,12 @@
 """Tests for the artifact service."""
 
 import enum
+import threading
 from typing import Optional
 from typing import Union
 from unittest import mock
 
+from google.adk.artifacts import FileArtifactService
 from google.adk.artifacts import GcsArtifactService
 from google.adk.artifacts import InMemoryArtifactService
 from google.genai import types
@@ -30,6 +32,7 @@ Enum = enum.Enum
 class ArtifactServiceType(Enum):
   IN_MEMORY = "IN_MEMORY"
   GCS = "GCS"
+  FILE = "FILE"
 
 
 class MockBlob:
@@ -69,9 +72,20 @@ class MockBlob:
     if content_type:
       self.content_type = content_type
 
-  def download_as_bytes(self) -> bytes:
+  @property
+  def size(self) -> Optional[int]:
+    """Mocks the size of the blob."""
+    return None if self.content is None else len(self.content)
+
+  def download_as_bytes(
+      self, start: Optional[int] = None, end: Optional[int] = None
+  ) -> bytes:
     """Mocks downloading the blob's content as bytes.
 
+    Args:
+        start: The first byte to download (optional).
+        end: The last byte to download, inclusive (optional).
+
     Returns:
         bytes: The content of the blob as bytes.
 
@@ -80,7 +94,18 @@ class MockBlob:
     """
     if self.content is None:
       return b""
-    return self.content
+    end = None if end is None else end + 1
+    return self.content[start:end]
+
+  def open(
+      self,
+      mode: str,
+      chunk_size: Optional[int] = None,
+      content_type: Optional[str] = None,
+  ) -> "MockBlobWriter":
+    """Mocks opening the blob for writing."""
+    assert mode == "wb"
+    return MockBlobWriter(self, content_type)
 
   def delete(self) -> None:
     """Mocks deleting a blob."""
@@ -88,6 +113,23 @@ class MockBlob:
     self.content_type = None
 
 
+class MockBlobWriter:
+  """Mocks a GCS BlobWriter, which creates the blob once closed."""
+
+  def __init__(self, blob: MockBlob, content_type: Optional[str]) -> None:
+    self.blob = blob
+    self.content_type = content_type
+    self.chunks: list[bytes] = []
+
+  def write(self, chunk: bytes) -> None:
+    self.chunks.append(chunk)
+
+  def close(self) -> None:
+    self.blob.upload_from_string(
+        b"".join(self.chunks), content_type=self.content_type
+    )
+
+
 class MockBucket:
   """Mocks a GCS Bucket object."""
 
@@ -113,6 +155,13 @@ class MockBucket:
       self.blobs[blob_name] = MockBlob(blob_name)
     return self.blobs[blob_name]
 
+  def get_blob(self, blob_name: str) -> Optional[MockBlob]:
+    """Mocks getting an existing Blob object with its metadata."""
+    blob = self.blobs.get(blob_name)
+    if blob is None or blob.content is None:
+      return None
+    return blob
+
 
 class MockClient:
   """Mocks the GCS Client."""
@@ -145,10 +194,13 @@ def mock_gcs_artifact_service():
 
 def get_artifact_service(
     service_type: ArtifactServiceType = ArtifactServiceType.IN_MEMORY,
+    root_dir: Optional[str] = None,
 ):
   """Creates an artifact service for testing."""
   if service_type == ArtifactServiceType.GCS:
     return mock_gcs_artifact_service()
+  if service_type == ArtifactServiceType.FILE:
+    return FileArtifactService(root_dir)
   return InMemoryArtifactService()
 
 
@@ -278,3 +330,122 @@ async def test_list_versions(service_type):
   )
 
   assert response_versions == list(range(3))
+
+
+@pytest.mark.asyncio
+async def test_gcs_calls_do_not_block_the_event_loop():
+  """Tests that GCS calls run in threads, with concurrent listings."""
+  artifact_service = mock_gcs_artifact_service()
+  storage_client = artifact_service.storage_client
+  list_blobs = storage_client.list_blobs
+  # Both listings must be running at the same time to cross the barrier.
+  barrier = threading.Barrier(2, timeout=5)
+  loop_thread = threading.current_thread()
+  threads = []
+
+  def blocking_list_blobs(bucket, prefix=None):
+    threads.append(threading.current_thread())
+    barrier.wait()
+    return list_blobs(bucket, prefix=prefix)
+
+  await artifact_service.save_artifact(
+      app_name="app0",
+      user_id="user0",
+      session_id="123",
+      filename="user:file",
+      artifact=types.Part.from_bytes(data=b"data", mime_type="text/plain"),
+  )
+  storage_client.list_blobs = blocking_list_blobs
+
+  assert await artifact_service.list_artifact_keys(
+      app_name="app0", user_id="user0", session_id="123"
+  ) == ["user:file"]
+  assert len(threads) == 2
+  assert loop_thread not in threads
+
+
+async def _chunks(*chunks: bytes):
+  for chunk in chunks:
+    yield chunk
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("service_type", list(ArtifactServiceType))
+async def test_save_and_read_chunks(service_type, tmp_path):
+  """Tests streaming an artifact in and out, in chunks."""
+  artifact_service = get_artifact_service(service_type, str(tmp_path))
+  key = dict(app_name="app0", user_id="user0", session_id="123")
+
+  version = await artifact_service.save_artifact_chunks(
+      **key,
+      filename="video.mp4",
+      chunks=_chunks(b"0123", b"4567", b"89"),
+      mime_type="video/mp4",
+  )
+
+  assert version == 0
+  assert await artifact_service.load_artifact(
+      **key, filename="video.mp4"
+  ) == types.Part.from_bytes(data=b"0123456789", mime_type="video/mp4")
+  assert [
+      chunk
+      async for chunk in artifact_service.read_artifact_chunks(
+          **key, filename="video.mp4", chunk_size=4
+      )
+  ] == [b"0123", b"4567", b"89"]
+  assert [
+      chunk
+      async for chunk in artifact_service.read_artifact_chunks(
+          **key, filename="video.mp4", offset=3, length=5, chunk_size=3
+      )
+  ] == [b"345", b"67"]
+  assert [
+      chunk
+      async for chunk in artifact_service.read_artifact_chunks(
+          **key, filename="video.mp4", offset=20
+      )
+  ] == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("service_type", list(ArtifactServiceType))
+async def test_get_artifact_metadata(service_type, tmp_path):
+  """Tests getting the metadata of an artifact."""
+  artifact_service = get_artifact_service(service_type, str(tmp_path))
+  key = dict(app_name="app0", user_id="user0", session_id="123")
+  for data in (b"short", b"longer data"):
+    await artifact_service.save_artifact(
+        **key,
+        filename="file",
+        artifact=types.Part.from_bytes(data=data, mime_type="text/plain"),
+    )
+
+  metadata = await artifact_service.get_artifact_metadata(
+      **key, filename="file"
+  )
+  first_metadata = await artifact_service.get_artifact_metadata(
+      **key, filename="file", version=0
+  )
+
+  assert (metadata.version, metadata.size, metadata.mime_type) == (
+      1,
+      11,
+      "text/plain",
+  )
+  assert (first_metadata.version, first_metadata.size) == (0, 5)
+  assert not await artifact_service.get_artifact_metadata(
+      **key, filename="missing"
+  )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("service_type", list(ArtifactServiceType))
+async def test_read_chunks_of_missing_artifact(service_type, tmp_path):
+  """Tests reading an artifact that doesn't exist."""
+  artifact_service = get_artifact_service(service_type, str(tmp_path))
+
+  with pytest.raises(ValueError):
+    async for _ in artifact_service.read_artifact_chunks(
+        app_name="app0", user_id="user0", session_id="123", filename="missing"
+    ):
+      pass
@@ -0,0 +1,81 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from google.adk.artifacts import InMemoryArtifactService
+from google.adk.artifacts.blob_references import externalize_blobs
+from google.adk.artifacts.blob_references import parse_artifact_uri
+from google.adk.artifacts.blob_references import resolve_blob_references
+from google.adk.artifacts.blob_references import to_artifact_uri
+from google.genai import types
+import pytest
+
+_SCOPE = {'app_name': 'app', 'user_id': 'user', 'session_id': 'session'}
+
+
+def test_artifact_uri_round_trip():
+  uri = to_artifact_uri('user:a file?.png', 3)
+  assert parse_artifact_uri(uri) == ('user:a file?.png', 3)
+  assert parse_artifact_uri('gs://bucket/file.png') is None
+  assert parse_artifact_uri('artifact:file.png') is None
+  assert parse_artifact_uri(None) is None
+
+
+@pytest.mark.asyncio
+async def test_externalize_and_resolve_blobs():
+  artifact_service = InMemoryArtifactService()
+  large = types.Part.from_bytes(data=b'x' * 100, mime_type='image/png')
+  small = types.Part.from_bytes(data=b'x' * 10, mime_type='image/png')
+  content = types.Content(
+      role='user', parts=[types.Part(text='look'), large, small]
+  )
+
+  moved = await externalize_blobs(
+      content,
+      artifact_service=artifact_service,
+      filename_prefix='blob_event',
+      max_inline_bytes=50,
+      **_SCOPE,
+  )
+
+  assert moved == 1
+  assert content.parts[1].inline_data is None
+  assert content.parts[1].file_data.mime_type == 'image/png'
+  assert parse_artifact_uri(content.parts[1].file_data.file_uri) == (
+      'blob_event_1',
+      0,
+  )
+  assert content.parts[2] == small
+
+  copy = content.model_copy(deep=True)
+  await resolve_blob_references(
+      [copy], artifact_service=artifact_service, **_SCOPE
+  )
+  assert copy.parts[1].inline_data.data == large.inline_data.data
+  assert copy.parts[1].inline_data.mime_type == 'image/png'
+  # The original content keeps the reference.
+  assert content.parts[1].inline_data is None
+
+
+@pytest.mark.asyncio
+async def test_resolve_keeps_missing_references():
+  part = types.Part(
+      file_data=types.FileData(
+          file_uri=to_artifact_uri('missing', 0), mime_type='image/png'
+      )
+  )
+  content = types.Content(role='user', parts=[part])
+  await resolve_blob_references(
+      [content], artifact_service=InMemoryArtifactService(), **_SCOPE
+  )
+  assert content.parts == [part]
@@ -0,0 +1,196 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the cached artifact service."""
+
+from google.adk.artifacts import CachedArtifactService
+from google.adk.artifacts import InMemoryArtifactService
+from google.genai import types
+import pytest
+
+APP_NAME = "app0"
+USER_ID = "user0"
+SESSION_ID = "123"
+
+
+def _artifact(data: bytes) -> types.Part:
+  return types.Part.from_bytes(data=data, mime_type="text/plain")
+
+
+async def _save(service, filename, artifact, session_id=SESSION_ID):
+  return await service.save_artifact(
+      app_name=APP_NAME,
+      user_id=USER_ID,
+      session_id=session_id,
+      filename=filename,
+      artifact=artifact,
+  )
+
+
+async def _load(service, filename, version=None, session_id=SESSION_ID):
+  return await service.load_artifact(
+      app_name=APP_NAME,
+      user_id=USER_ID,
+      session_id=session_id,
+      filename=filename,
+      version=version,
+  )
+
+
+@pytest.mark.asyncio
+async def test_versions_are_loaded_once(mocker):
+  inner = InMemoryArtifactService()
+  await _save(inner, "file", _artifact(b"v0"))
+  await _save(inner, "file", _artifact(b"v1"))
+  service = CachedArtifactService(inner)
+  load_spy = mocker.spy(InMemoryArtifactService, "load_artifact")
+  list_spy = mocker.spy(InMemoryArtifactService, "list_versions")
+
+  for _ in range(3):
+    assert await _load(service, "file", version=0) == _artifact(b"v0")
+    assert await _load(service, "file") == _artifact(b"v1")
+
+  assert load_spy.call_count == 2
+  assert list_spy.call_count == 1
+  assert service.cache_stats.hits == 4
+  assert service.cache_stats.misses == 2
+
+
+@pytest.mark.asyncio
+async def test_save_updates_the_latest_version(mocker):
+  service = CachedArtifactService(InMemoryArtifactService())
+  load_spy = mocker.spy(InMemoryArtifactService, "load_artifact")
+
+  await _save(service, "file", _artifact(b"v0"))
+  assert await _load(service, "file") == _artifact(b"v0")
+  await _save(service, "file", _artifact(b"v1"))
+
+  assert await _load(service, "file") == _artifact(b"v1")
+  assert load_spy.call_count == 0
+
+
+@pytest.mark.asyncio
+async def test_latest_version_expires(mocker):
+  inner = InMemoryArtifactService()
+  service = CachedArtifactService(inner, latest_version_ttl_seconds=0)
+  await _save(service, "file", _artifact(b"v0"))
+
+  # Saved by another instance of the service.
+  await _save(inner, "file", _artifact(b"v1"))
+
+  assert await _load(service, "file") == _artifact(b"v1")
+
+
+@pytest.mark.asyncio
+async def test_loaded_artifacts_are_copies():
+  service = CachedArtifactService(InMemoryArtifactService())
+  await _save(service, "file", _artifact(b"data"))
+
+  loaded = await _load(service, "file")
+  loaded.inline_data.data = b"modified"
+
+  assert await _load(service, "file") == _artifact(b"data")
+
+
+@pytest.mark.asyncio
+async def test_memory_cache_is_bounded(mocker):
+  inner = InMemoryArtifactService()
+  for i in range(3):
+    await _save(inner, f"file{i}", _artifact(bytes(10)))
+  service = CachedArtifactService(inner, max_memory_bytes=25)
+  load_spy = mocker.spy(InMemoryArtifactService, "load_artifact")
+
+  for i in range(3):
+    await _load(service, f"file{i}", version=0)
+  # file0 was evicted to cache file2.
+  await _load(service, "file1", version=0)
+  await _load(service, "file0", version=0)
+
+  assert load_spy.call_count == 4
+
+
+@pytest.mark.asyncio
+async def test_disk_cache_outlives_the_service(tmp_path, mocker):
+  inner = InMemoryArtifactService()
+  await _save(inner, "user:file", _artifact(b"data"))
+  await _load(
+      CachedArtifactService(inner, cache_dir=str(tmp_path)),
+      "user:file",
+      version=0,
+  )
+  load_spy = mocker.spy(InMemoryArtifactService, "load_artifact")
+
+  service = CachedArtifactService(inner, cache_dir=str(tmp_path))
+
+  assert await _load(
+      service, "user:file", version=0, session_id="other_session"
+  ) == _artifact(b"data")
+  assert load_spy.call_count == 0
+  assert service.cache_stats.disk_hits == 1
+
+
+@pytest.mark.asyncio
+async def test_disk_cache_is_bounded(tmp_path):
+  service = CachedArtifactService(
+      InMemoryArtifactService(),
+      max_memory_bytes=0,
+      cache_dir=str(tmp_path),
+      max_disk_bytes=300,
+  )
+
+  for i in range(5):
+    await _save(service, f"file{i}", _artifact(bytes(100)))
+
+  assert sum(path.stat().st_size for path in tmp_path.iterdir()) <= 300
+  assert len(list(tmp_path.iterdir())) == 2
+
+
+@pytest.mark.asyncio
+async def test_delete_drops_cached_versions(tmp_path):
+  service = CachedArtifactService(
+      InMemoryArtifactService(), cache_dir=str(tmp_path)
+  )
+  await _save(service, "file", _artifact(b"old"))
+
+  await service.delete_artifact(
+      app_name=APP_NAME, user_id=USER_ID, session_id=SESSION_ID, filename="file"
+  )
+
+  assert not await _load(service, "file")
+  assert not await _load(service, "file", version=0)
+  await _save(service, "file", _artifact(b"new"))
+  assert await _load(service, "file", version=0) == _artifact(b"new")
+  assert not list(tmp_path.glob("*.tmp"))
+
+
+@pytest.mark.asyncio
+async def test_read_chunks_from_the_cache(mocker):
+  service = CachedArtifactService(InMemoryArtifactService())
+  await _save(service, "file", _artifact(b"0123456789"))
+  read_spy = mocker.spy(InMemoryArtifactService, "read_artifact_chunks")
+
+  chunks = [
+      chunk
+      async for chunk in service.read_artifact_chunks(
+          app_name=APP_NAME,
+          user_id=USER_ID,
+          session_id=SESSION_ID,
+          filename="file",
+          offset=2,
+          chunk_size=4,
+      )
+  ]
+
+  assert chunks == [b"2345", b"6789"]
+  assert read_spy.call_count == 0
@@ -0,0 +1,161 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the file artifact service."""
+
+import asyncio
+import os
+
+from google.adk.artifacts import FileArtifactService
+from google.genai import types
+import pytest
+
+APP_NAME = "app0"
+USER_ID = "user0"
+SESSION_ID = "123"
+
+
+def _num_blobs(root_dir) -> int:
+  return sum(
+      len(names) for _, _, names in os.walk(os.path.join(root_dir, "blobs"))
+  )
+
+
+async def _save(service, filename, artifact, session_id=SESSION_ID):
+  return await service.save_artifact(
+      app_name=APP_NAME,
+      user_id=USER_ID,
+      session_id=session_id,
+      filename=filename,
+      artifact=artifact,
+  )
+
+
+async def _load(service, filename, version=None, session_id=SESSION_ID):
+  return await service.load_artifact(
+      app_name=APP_NAME,
+      user_id=USER_ID,
+      session_id=session_id,
+      filename=filename,
+      version=version,
+  )
+
+
+@pytest.mark.asyncio
+async def test_save_load_versions(tmp_path):
+  service = FileArtifactService(str(tmp_path))
+  first = types.Part.from_bytes(data=b"first", mime_type="text/plain")
+  second = types.Part.from_bytes(data=b"second", mime_type="image/png")
+
+  assert await _save(service, "file.txt", first) == 0
+  assert await _save(service, "file.txt", second) == 1
+
+  assert await _load(service, "file.txt") == second
+  assert await _load(service, "file.txt", version=0) == first
+  assert not await _load(service, "file.txt", version=2)
+  assert await service.list_versions(
+      app_name=APP_NAME,
+      user_id=USER_ID,
+      session_id=SESSION_ID,
+      filename="file.txt",
+  ) == [0, 1]
+
+
+@pytest.mark.asyncio
+async def test_text_artifact(tmp_path):
+  service = FileArtifactService(str(tmp_path))
+
+  await _save(service, "notes", types.Part(text="some notes"))
+
+  assert await _load(service, "notes") == types.Part(text="some notes")
+
+
+@pytest.mark.asyncio
+async def test_identical_contents_are_stored_once(tmp_path):
+  service = FileArtifactService(str(tmp_path))
+  artifact = types.Part.from_bytes(data=b"same bytes", mime_type="text/plain")
+
+  await _save(service, "a", artifact)
+  await _save(service, "a", artifact)
+  await _save(service, "b", artifact, session_id="other_session")
+
+  assert _num_blobs(tmp_path) == 1
+  assert await _load(service, "b", session_id="other_session") == artifact
+
+
+@pytest.mark.asyncio
+async def test_persists_across_instances(tmp_path):
+  artifact = types.Part.from_bytes(data=b"data", mime_type="text/plain")
+  await _save(FileArtifactService(str(tmp_path)), "file", artifact)
+
+  service = FileArtifactService(str(tmp_path))
+
+  assert await _load(service, "file") == artifact
+  assert await _save(service, "file", artifact) == 1
+
+
+@pytest.mark.asyncio
+async def test_list_keys_with_user_namespace(tmp_path):
+  service = FileArtifactService(str(tmp_path))
+  artifact = types.Part.from_bytes(data=b"data", mime_type="text/plain")
+  filenames = ["../escape", "dir/file.txt", "user:profile.json"]
+
+  for filename in filenames:
+    await _save(service, filename, artifact)
+  await _save(service, "other", artifact, session_id="other_session")
+
+  assert (
+      await service.list_artifact_keys(
+          app_name=APP_NAME, user_id=USER_ID, session_id=SESSION_ID
+      )
+      == filenames
+  )
+  assert await service.list_artifact_keys(
+      app_name=APP_NAME, user_id=USER_ID, session_id="other_session"
+  ) == ["other", "user:profile.json"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_saves_get_distinct_versions(tmp_path):
+  service = FileArtifactService(str(tmp_path))
+
+  versions = await asyncio.gather(*(
+      _save(
+          service,
+          "file",
+          types.Part.from_bytes(data=bytes([i]), mime_type="text/plain"),
+      )
+      for i in range(10)
+  ))
+
+  assert sorted(versions) == list(range(10))
+
+
+@pytest.mark.asyncio
+async def test_delete_and_collect_garbage(tmp_path):
+  service = FileArtifactService(str(tmp_path))
+  shared = types.Part.from_bytes(data=b"shared", mime_type="text/plain")
+  own = types.Part.from_bytes(data=b"own", mime_type="text/plain")
+  await _save(service, "a", shared)
+  await _save(service, "a", own)
+  await _save(service, "b", shared)
+
+  await service.delete_artifact(
+      app_name=APP_NAME, user_id=USER_ID, session_id=SESSION_ID, filename="a"
+  )
+
+  assert not await _load(service, "a")
+  assert service.collect_garbage() == 1
+  assert _num_blobs(tmp_path) == 1
+  assert await _load(service, "b") == shared
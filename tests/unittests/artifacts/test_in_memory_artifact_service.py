@@ -0,0 +1,149 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the in-memory artifact service."""
+
+from google.adk.artifacts import InMemoryArtifactService
+from google.genai import types
+import pytest
+
+APP_NAME = "app0"
+USER_ID = "user0"
+SESSION_ID = "123"
+
+
+def _artifact(data: bytes) -> types.Part:
+  return types.Part.from_bytes(data=data, mime_type="text/plain")
+
+
+async def _save(service, filename, artifact, session_id=SESSION_ID):
+  return await service.save_artifact(
+      app_name=APP_NAME,
+      user_id=USER_ID,
+      session_id=session_id,
+      filename=filename,
+      artifact=artifact,
+  )
+
+
+async def _load(service, filename, version=None, session_id=SESSION_ID):
+  return await service.load_artifact(
+      app_name=APP_NAME,
+      user_id=USER_ID,
+      session_id=session_id,
+      filename=filename,
+      version=version,
+  )
+
+
+async def _list_versions(service, filename):
+  return await service.list_versions(
+      app_name=APP_NAME,
+      user_id=USER_ID,
+      session_id=SESSION_ID,
+      filename=filename,
+  )
+
+
+async def _list_keys(service, session_id=SESSION_ID):
+  return await service.list_artifact_keys(
+      app_name=APP_NAME, user_id=USER_ID, session_id=session_id
+  )
+
+
+@pytest.mark.asyncio
+async def test_list_keys_is_scoped_to_the_session():
+  service = InMemoryArtifactService()
+  await _save(service, "a", _artifact(b"a"))
+  await _save(service, "user:shared", _artifact(b"shared"))
+  await _save(service, "b", _artifact(b"b"), session_id="other_session")
+  await service.save_artifact(
+      app_name=APP_NAME,
+      user_id="other_user",
+      session_id=SESSION_ID,
+      filename="c",
+      artifact=_artifact(b"c"),
+  )
+
+  assert await _list_keys(service) == ["a", "user:shared"]
+  assert await _list_keys(service, "other_session") == ["b", "user:shared"]
+  assert await _list_keys(service, "unknown_session") == ["user:shared"]
+
+
+@pytest.mark.asyncio
+async def test_delete_cleans_up_the_index():
+  service = InMemoryArtifactService()
+  await _save(service, "a", _artifact(b"a"))
+
+  await service.delete_artifact(
+      app_name=APP_NAME, user_id=USER_ID, session_id=SESSION_ID, filename="a"
+  )
+
+  assert await _list_keys(service) == []
+  assert not service.artifacts
+  assert not service._index
+
+
+@pytest.mark.asyncio
+async def test_max_versions_per_file():
+  service = InMemoryArtifactService(max_versions_per_file=2)
+
+  versions = [
+      await _save(service, "a", _artifact(bytes([i]))) for i in range(4)
+  ]
+
+  assert versions == [0, 1, 2, 3]
+  assert await _list_versions(service, "a") == [2, 3]
+  assert not await _load(service, "a", version=1)
+  assert await _load(service, "a", version=2) == _artifact(bytes([2]))
+  assert await _load(service, "a") == _artifact(bytes([3]))
+
+
+@pytest.mark.asyncio
+async def test_max_total_bytes_evicts_the_least_recently_used_files():
+  service = InMemoryArtifactService(max_total_bytes=30)
+  await _save(service, "a", _artifact(bytes(10)))
+  await _save(service, "b", _artifact(bytes(10)))
+  await _save(service, "c", _artifact(bytes(10)))
+  # Loading "a" makes "b" the least recently used file.
+  await _load(service, "a")
+
+  await _save(service, "d", _artifact(bytes(10)))
+
+  assert await _list_keys(service) == ["a", "c", "d"]
+
+
+@pytest.mark.asyncio
+async def test_max_total_bytes_keeps_the_latest_version():
+  service = InMemoryArtifactService(max_total_bytes=15)
+  await _save(service, "a", _artifact(bytes(10)))
+
+  assert await _save(service, "a", _artifact(bytes(10))) == 1
+  assert await _save(service, "a", _artifact(bytes(20))) == 2
+
+  assert await _list_versions(service, "a") == [2]
+  assert await _load(service, "a") == _artifact(bytes(20))
+
+
+@pytest.mark.asyncio
+async def test_indexes_the_initial_artifacts():
+  service = InMemoryArtifactService(
+      artifacts={
+          f"{APP_NAME}/{USER_ID}/{SESSION_ID}/dir/a": [_artifact(b"a")],
+          f"{APP_NAME}/{USER_ID}/user/user:b": [_artifact(b"b")],
+      }
+  )
+
+  assert await _list_keys(service) == ["dir/a", "user:b"]
+  assert await _save(service, "dir/a", _artifact(b"a2")) == 1
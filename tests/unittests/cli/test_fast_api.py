@@ -30,7 +30,9 @@ from google.adk.evaluation.eval_result import EvalSetResult
 from google.adk.evaluation.eval_set import EvalSet
 from google.adk.events import Event
 from google.adk.runners import Runner
+from google.adk.sessions.base_session_service import ListEventsResponse
 from google.adk.sessions.base_session_service import ListSessionsResponse
+from google.adk.sessions.session import Session
 from google.genai import types
 from pydantic import BaseModel
 import pytest
@@ -209,7 +211,7 @@ def mock_session_service():
   # Mock session service class that operates on the in-memory database
   class MockSessionService:
 
-    async def get_session(self, app_name, user_id, session_id):
+    async def get_session(self, app_name, user_id, session_id, config=None):
       """Retrieve a session by ID."""
       if (
           app_name in session_data
@@ -253,6 +255,43 @@ def mock_session_service():
           sessions=list(session_data[app_name][user_id].values())
       )
 
+    async def list_sessions_page(self, app_name, user_id, config):
+      """List a page of sessions for a user."""
+      sessions = [
+          Session(app_name=app_name, user_id=user_id, id=session_id)
+          for session_id in sorted(
+              session_data.get(app_name, {}).get(user_id, {})
+          )
+      ]
+      start = int(config.page_token) if config.page_token else 0
+      end = start + config.page_size
+      return ListSessionsResponse(
+          sessions=sessions[start:end],
+          next_page_token=str(end) if end < len(sessions) else None,
+          event_counts=(
+              {session.id: 0 for session in sessions[start:end]}
+              if config.include_event_count
+              else None
+          ),
+      )
+
+    async def get_session_version(self, app_name, user_id, session_id):
+      """Get the version of a session."""
+      session = await self.get_session(app_name, user_id, session_id)
+      return "0" if session else None
+
+    async def list_events(self, app_name, user_id, session_id, config):
+      """List a page of the events of a session."""
+      if config.page_token == "invalid":
+        raise ValueError("Invalid page token")
+      return ListEventsResponse(
+          events=[
+              event
+              for event in [_event_1(), _event_2(), _event_3()]
+              if config.matches(event)
+          ]
+      )
+
     async def delete_session(self, app_name, user_id, session_id):
       """Delete a session."""
       if (
@@ -590,6 +629,50 @@ def test_list_sessions(test_app, create_test_session):
   logger.info(f"Listed {len(data)} sessions")
 
 
+def test_list_sessions_page(test_app, create_test_session):
+  """Test listing the sessions of a user page by page."""
+  info = create_test_session
+  url = f"/apps/{info['app_name']}/users/{info['user_id']}/sessions"
+  test_app.post(url)
+
+  response = test_app.get(
+      url, params={"page_size": 1, "include_event_count": True}
+  )
+  assert response.status_code == 200
+  data = response.json()
+  assert len(data["sessions"]) == 1
+  assert data["eventCounts"] == {data["sessions"][0]["id"]: 0}
+
+  response = test_app.get(url, params={"page_token": data["nextPageToken"]})
+  assert response.status_code == 200
+  data = response.json()
+  assert len(data["sessions"]) == 1
+  assert "nextPageToken" not in data
+
+  response = test_app.get(url, params={"page_token": "invalid"})
+  assert response.status_code == 400
+
+
+def test_list_events(test_app, create_test_session):
+  """Test listing the events of a session with filters."""
+  info = create_test_session
+  url = f"/apps/{info['app_name']}/users/{info['user_id']}/sessions/{info['session_id']}/events"
+
+  response = test_app.get(url)
+  assert response.status_code == 200
+  assert len(response.json()["events"]) == 3
+
+  response = test_app.get(url, params={"author": "unknown"})
+  assert response.status_code == 200
+  assert response.json()["events"] == []
+
+  response = test_app.get(url, params={"page_token": "invalid"})
+  assert response.status_code == 400
+
+  url = f"/apps/{info['app_name']}/users/{info['user_id']}/sessions/missing/events"
+  assert test_app.get(url).status_code == 404
+
+
 def test_delete_session(test_app, create_test_session):
   """Test deleting a session."""
   info = create_test_session
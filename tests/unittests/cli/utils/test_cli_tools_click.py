@@ -14,9 +14,9 @@
 
 """Tests for utilities in cli_tool_click."""
 
-
 from __future__ import annotations
 
+import asyncio
 import builtins
 from pathlib import Path
 from types import SimpleNamespace
@@ -237,6 +237,28 @@ def test_cli_api_server_invokes_uvicorn(
   assert _patch_uvicorn.calls, "uvicorn.Server.run must be called"
 
 
+def test_cli_api_server_caches_sessions_on_request(
+    tmp_path: Path, _patch_uvicorn: _Recorder, monkeypatch: pytest.MonkeyPatch
+) -> None:
+  """`adk api_server` should only cache the sessions with --cache_sessions."""
+  agents_dir = tmp_path / "agents_api"
+  agents_dir.mkdir()
+  app_kwargs = []
+  monkeypatch.setattr(
+      cli_tools_click,
+      "get_fast_api_app",
+      lambda **k: app_kwargs.append(k) or object(),
+  )
+  runner = CliRunner()
+
+  runner.invoke(cli_tools_click.main, ["api_server", str(agents_dir)])
+  runner.invoke(
+      cli_tools_click.main, ["api_server", "--cache_sessions", str(agents_dir)]
+  )
+
+  assert [k["cache_sessions"] for k in app_kwargs] == [False, True]
+
+
 def test_cli_eval_success_path(
     tmp_path: Path, monkeypatch: pytest.MonkeyPatch
 ) -> None:
@@ -371,3 +393,38 @@ def test_cli_eval_success_path(
   assert "Eval Run Summary" in result.output
   assert "Tests passed: 1" in result.output
   assert "Tests failed: 1" in result.output
+
+
+def test_cli_sessions_export_and_import(tmp_path: Path) -> None:
+  """`adk sessions export` and `import` should copy sessions between DBs."""
+  from google.adk.sessions import DatabaseSessionService
+
+  source_url = f"sqlite:///{tmp_path / 'source.db'}"
+  target_url = f"sqlite:///{tmp_path / 'target.db'}"
+  source = DatabaseSessionService(source_url)
+  for user_id in ("user_1", "user_2"):
+    asyncio.run(
+        source.create_session(
+            app_name="my_app", user_id=user_id, state={"key": user_id}
+        )
+    )
+  path = str(tmp_path / "sessions.jsonl")
+
+  runner = CliRunner()
+  result = runner.invoke(
+      cli_tools_click.main,
+      ["sessions", "export", "--session_db_url", source_url, "my_app", path],
+  )
+  assert result.exit_code == 0, result.output
+  result = runner.invoke(
+      cli_tools_click.main,
+      ["sessions", "import", "--session_db_url", target_url, path],
+  )
+  assert result.exit_code == 0, result.output
+
+  target = DatabaseSessionService(target_url)
+  for user_id in ("user_1", "user_2"):
+    response = asyncio.run(
+        target.list_sessions(app_name="my_app", user_id=user_id)
+    )
+    assert len(response.sessions) == 1
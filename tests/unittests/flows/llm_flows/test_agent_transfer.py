@@ -15,8 +15,10 @@
 from google.adk.agents.llm_agent import Agent
 from google.adk.agents.loop_agent import LoopAgent
 from google.adk.agents.sequential_agent import SequentialAgent
+from google.adk.events.event import Event
 from google.adk.tools import exit_loop
 from google.genai.types import Part
+import pytest
 
 from ... import testing_utils
 
@@ -62,6 +64,52 @@ def test_auto_to_auto():
   ]
 
 
+@pytest.mark.asyncio
+async def test_auto_to_auto_with_partial_history():
+  response = [
+      transfer_call_part('sub_agent_1'),
+      'response1',
+      'response2',
+  ]
+  mockModel = testing_utils.MockModel.create(responses=response)
+  # root (auto) - sub_agent_1 (auto), both only read the latest event.
+  sub_agent_1 = Agent(name='sub_agent_1', model=mockModel, max_history_events=1)
+  root_agent = Agent(
+      name='root_agent',
+      model=mockModel,
+      sub_agents=[sub_agent_1],
+      max_history_events=1,
+  )
+
+  runner = testing_utils.InMemoryRunner(root_agent)
+
+  assert testing_utils.simplify_events(await runner.run_async('test1')) == [
+      ('root_agent', transfer_call_part('sub_agent_1')),
+      ('root_agent', TRANSFER_RESPONSE_PART),
+      ('sub_agent_1', 'response1'),
+  ]
+
+  # The only loaded event is from an unknown agent, so the runner has to look
+  # further back in the history to find the current agent.
+  session = runner.session
+  await runner.runner.session_service.append_event(
+      session,
+      Event(
+          author='unknown_agent',
+          invocation_id='unknown_invocation',
+          timestamp=session.events[-1].timestamp + 1,
+      ),
+  )
+
+  assert testing_utils.simplify_events(await runner.run_async('test2')) == [
+      ('sub_agent_1', 'response2'),
+  ]
+  # Only the latest event is sent to the model.
+  assert testing_utils.simplify_contents(mockModel.requests[-1].contents) == [
+      ('user', 'test2')
+  ]
+
+
 def test_auto_to_single():
   response = [
       transfer_call_part('sub_agent_1'),
@@ -311,3 +359,37 @@ def test_auto_to_loop():
   assert testing_utils.simplify_events(runner.run('test2')) == [
       ('root_agent', 'response5'),
   ]
+
+
+@pytest.mark.asyncio
+async def test_root_replied_last_with_partial_history():
+  response = [
+      transfer_call_part('sub_agent_1'),
+      'response1',
+      transfer_call_part('root_agent'),
+      'response2',
+      'response3',
+  ]
+  mockModel = testing_utils.MockModel.create(responses=response)
+  # root (auto) - sub_agent_1 (auto), both only read the latest event.
+  sub_agent_1 = Agent(name='sub_agent_1', model=mockModel, max_history_events=1)
+  root_agent = Agent(
+      name='root_agent',
+      model=mockModel,
+      sub_agents=[sub_agent_1],
+      max_history_events=1,
+  )
+  runner = testing_utils.InMemoryRunner(root_agent)
+  await runner.run_async('test1')
+
+  assert testing_utils.simplify_events(await runner.run_async('test2')) == [
+      ('sub_agent_1', transfer_call_part('root_agent')),
+      ('sub_agent_1', TRANSFER_RESPONSE_PART),
+      ('root_agent', 'response2'),
+  ]
+
+  # The root agent replied last, so the older events of sub_agent_1 are not
+  # looked up.
+  assert testing_utils.simplify_events(await runner.run_async('test3')) == [
+      ('root_agent', 'response3'),
+  ]
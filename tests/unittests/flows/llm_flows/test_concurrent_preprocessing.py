@@ -0,0 +1,167 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+from google.adk.agents import Agent
+from google.adk.events.event import Event
+from google.adk.flows.llm_flows._concurrent_preprocessing import PreprocessingStep
+from google.adk.flows.llm_flows._concurrent_preprocessing import run_steps
+from google.adk.flows.llm_flows._concurrent_preprocessing import tool_step
+from google.adk.flows.llm_flows.single_flow import SingleFlow
+from google.adk.models.llm_request import LlmRequest
+from google.adk.tools.function_tool import FunctionTool
+from google.adk.tools.google_search_tool import google_search
+import pytest
+
+from ... import testing_utils
+
+
+def _step(name, log, reads, writes, delay=0.0):
+  async def run():
+    log.append(f'start {name}')
+    await asyncio.sleep(delay)
+    log.append(f'end {name}')
+    yield Event(author=name)
+
+  return PreprocessingStep(
+      reads=None if reads is None else frozenset(reads),
+      writes=None if writes is None else frozenset(writes),
+      run=run,
+  )
+
+
+async def _iterate(steps):
+  for step in steps:
+    yield step
+
+
+async def _run(steps):
+  return [event.author async for event in run_steps(_iterate(steps))]
+
+
+@pytest.mark.asyncio
+async def test_independent_steps_overlap():
+  log = []
+  steps = [
+      _step('a', log, [], ['contents'], delay=0.02),
+      _step('b', log, [], ['config.system_instruction'], delay=0.01),
+  ]
+
+  authors = await _run(steps)
+
+  assert log == ['start a', 'start b', 'end b', 'end a']
+  assert authors == ['a', 'b']
+
+
+@pytest.mark.asyncio
+async def test_conflicting_steps_keep_their_order():
+  log = []
+  steps = [
+      _step('a', log, [], ['config'], delay=0.02),
+      _step('b', log, ['config.tools'], ['contents']),
+      _step('c', log, [], ['contents']),
+  ]
+
+  authors = await _run(steps)
+
+  assert log == ['start a', 'end a', 'start b', 'end b', 'start c', 'end c']
+  assert authors == ['a', 'b', 'c']
+
+
+@pytest.mark.asyncio
+async def test_barrier_runs_alone():
+  log = []
+  steps = [
+      _step('a', log, [], ['contents'], delay=0.01),
+      _step('barrier', log, None, None),
+      _step('b', log, [], ['config.system_instruction']),
+  ]
+
+  authors = await _run(steps)
+
+  assert log == [
+      'start a',
+      'end a',
+      'start barrier',
+      'end barrier',
+      'start b',
+      'end b',
+  ]
+  assert authors == ['a', 'barrier', 'b']
+
+
+@pytest.mark.asyncio
+async def test_events_are_yielded_in_step_order():
+  log = []
+  steps = [
+      _step(str(i), log, [], [f'part{i}'], delay=0.001 * (5 - i))
+      for i in range(5)
+  ]
+
+  authors = await _run(steps)
+
+  assert authors == ['0', '1', '2', '3', '4']
+
+
+@pytest.mark.asyncio
+async def test_tool_step_declarations():
+  def func():
+    pass
+
+  invocation_context = await testing_utils.create_invocation_context(
+      Agent(name='agent', model='gemini-2.0-flash')
+  )
+  llm_request = LlmRequest()
+
+  function_step = tool_step(FunctionTool(func), invocation_context, llm_request)
+  search_step = tool_step(google_search, invocation_context, llm_request)
+
+  assert function_step.reads == frozenset()
+  assert function_step.writes == frozenset({'config.tools', 'tools_dict'})
+  assert search_step.reads == frozenset({'model', 'config.tools'})
+  assert search_step.writes == frozenset({'config.tools'})
+
+
+@pytest.mark.asyncio
+async def test_preprocess_builds_the_same_request():
+  def tool_a():
+    pass
+
+  def tool_b():
+    pass
+
+  agent = Agent(
+      name='agent',
+      model=testing_utils.MockModel.create(responses=['response']),
+      instruction='Be concise.',
+      tools=[tool_a, tool_b],
+  )
+  invocation_context = await testing_utils.create_invocation_context(
+      agent, user_content='hello'
+  )
+  llm_request = LlmRequest()
+
+  async for _ in SingleFlow()._preprocess_async(
+      invocation_context, llm_request
+  ):
+    pass
+
+  assert 'Be concise.' in llm_request.config.system_instruction
+  assert list(llm_request.tools_dict) == ['tool_a', 'tool_b']
+  assert [
+      declaration.name
+      for declaration in llm_request.config.tools[0].function_declarations
+  ] == ['tool_a', 'tool_b']
+  assert llm_request.contents[-1].parts[0].text == 'hello'
@@ -559,3 +559,78 @@ def test_function_get_auth_response_partial():
   assert parts[0].function_response.response == {'result': None}
   assert parts[1].function_response.name == 'call_external_api2'
   assert parts[1].function_response.response == {'result': 2}
+
+
+def test_function_get_auth_response_with_partial_history():
+  responses = [
+      [function_call('id_1', 'call_external_api', {})],
+      [types.Part.from_text(text='response1')],
+      [types.Part.from_text(text='response2')],
+  ]
+  mock_model = testing_utils.MockModel.create(responses=responses)
+  auth_config = AuthConfig(
+      auth_scheme=OAuth2(
+          flows=OAuthFlows(
+              authorizationCode=OAuthFlowAuthorizationCode(
+                  authorizationUrl='https://accounts.google.com/o/oauth2/auth',
+                  tokenUrl='https://oauth2.googleapis.com/token',
+                  scopes={
+                      'https://www.googleapis.com/auth/calendar': 'Calendar'
+                  },
+              )
+          )
+      ),
+      raw_auth_credential=AuthCredential(
+          auth_type=AuthCredentialTypes.OAUTH2,
+          oauth2=OAuth2Auth(
+              client_id='oauth_client_id',
+              client_secret='oauth_client_secret',
+          ),
+      ),
+  )
+  auth_response = auth_config.model_copy(deep=True)
+  auth_response.exchanged_auth_credential = AuthCredential(
+      auth_type=AuthCredentialTypes.OAUTH2,
+      oauth2=OAuth2Auth(
+          client_id='oauth_client_id',
+          client_secret='oauth_client_secret',
+          access_token='token',
+      ),
+  )
+
+  def call_external_api(tool_context: ToolContext) -> int:
+    if not tool_context.get_auth_response(auth_config):
+      tool_context.request_credential(auth_config)
+      return
+    return 1
+
+  # The agent only reads the latest event, so the events of the function
+  # calls are not in the loaded history when the auth response is sent.
+  agent = Agent(
+      name='root_agent',
+      model=mock_model,
+      tools=[call_external_api],
+      max_history_events=1,
+  )
+  runner = testing_utils.InMemoryRunner(agent)
+  runner.run('test')
+  request_euc_function_call = (
+      runner.session.events[-3].content.parts[0].function_call
+  )
+  function_response = types.FunctionResponse(
+      name=request_euc_function_call.name,
+      response=auth_response.model_dump(),
+  )
+  function_response.id = request_euc_function_call.id
+
+  runner.run(
+      new_message=types.Content(
+          role='user',
+          parts=[types.Part(function_response=function_response)],
+      ),
+  )
+
+  # The original function call is resumed with the auth response.
+  parts = mock_model.requests[-1].contents[-1].parts
+  assert parts[0].function_response.name == 'call_external_api'
+  assert parts[0].function_response.response == {'result': 1}
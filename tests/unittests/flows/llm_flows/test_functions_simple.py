@@ -17,6 +17,7 @@ from typing import AsyncGenerator
 from typing import Callable
 
 from google.adk.agents import Agent
+from google.adk.tools import read_tool_response
 from google.adk.tools import ToolContext
 from google.adk.tools.function_tool import FunctionTool
 from google.genai import types
@@ -256,3 +257,61 @@ def test_function_call_id():
           assert part.function_response.id is None
   assert events[0].content.parts[0].function_call.id.startswith('adk-')
   assert events[1].content.parts[0].function_response.id.startswith('adk-')
+
+
+@pytest.mark.parametrize('register_read_tool_response', [True, False])
+def test_large_function_response_is_offloaded(register_read_tool_response):
+  large_text = 'x' * 150
+  responses = [
+      types.Part.from_function_call(name='large_result', args={}),
+      types.Part.from_function_call(
+          name='read_tool_response',
+          args={
+              'handle': 'tool_response_large_result_call_1.json',
+              'offset': 100,
+          },
+      ),
+      'response1',
+  ]
+  mock_model = testing_utils.MockModel.create(responses=responses)
+  mock_model.responses[0].content.parts[0].function_call.id = 'call_1'
+
+  def large_result() -> str:
+    return large_text
+
+  tool = FunctionTool(func=large_result)
+  tool.max_response_chars = 100
+  agent = Agent(
+      name='root_agent',
+      model=mock_model,
+      tools=[tool, read_tool_response]
+      if register_read_tool_response
+      else [tool],
+  )
+  runner = testing_utils.InMemoryRunner(agent)
+  events = runner.run('test')
+
+  # The tool reading the offloaded responses is declared once.
+  assert [
+      declaration.name
+      for declaration in (
+          mock_model.requests[0].config.tools[0].function_declarations
+      )
+  ] == ['large_result', 'read_tool_response']
+
+  offloaded = events[1].content.parts[0].function_response.response
+  assert offloaded['truncated']
+  assert offloaded['handle'] == 'tool_response_large_result_call_1.json'
+  assert offloaded['total_chars'] == len(f'{{"result": "{large_text}"}}')
+  assert offloaded['preview'] == f'{{"result": "{large_text}'[:100]
+  assert offloaded['next_offset'] == 100
+  assert events[1].actions.artifact_delta == {
+      'tool_response_large_result_call_1.json': 0
+  }
+
+  page = events[3].content.parts[0].function_response.response
+  assert page['content'] == f'{{"result": "{large_text}"}}'[100:]
+  assert 'next_offset' not in page
+  assert testing_utils.simplify_events(events[-1:]) == [
+      ('root_agent', 'response1')
+  ]
@@ -13,7 +13,10 @@
 # limitations under the License.
 
 from google.adk.agents import Agent
+from google.adk.agents.run_config import RunConfig
 from google.adk.tools import ToolContext
+from google.adk.tools.long_running_tool import LongRunningFunctionTool
+from google.genai import types
 from google.genai.types import Part
 from pydantic import BaseModel
 
@@ -45,3 +48,97 @@ def test_output_schema():
   assert mockModel.requests[0].config.response_schema == CustomOutput
   assert mockModel.requests[0].config.response_mime_type == 'application/json'
   assert mockModel.requests[0].config.labels == {'adk_agent_name': 'root_agent'}
+
+
+def test_max_history_events():
+  mockModel = testing_utils.MockModel.create(
+      responses=['response1', 'response2', 'response3']
+  )
+  root_agent = Agent(
+      name='root_agent',
+      model=mockModel,
+      max_history_events=2,
+  )
+
+  runner = testing_utils.InMemoryRunner(root_agent)
+  runner.run('test1')
+  runner.run('test2')
+  runner.run('test3')
+
+  assert root_agent.get_required_history() == 2
+  assert testing_utils.simplify_contents(mockModel.requests[2].contents) == [
+      ('model', 'response2'),
+      ('user', 'test3'),
+  ]
+
+
+def test_max_inline_blob_bytes():
+  mockModel = testing_utils.MockModel.create(responses=['response1'])
+  root_agent = Agent(name='root_agent', model=mockModel)
+  runner = testing_utils.InMemoryRunner(root_agent)
+  image = Part.from_bytes(data=b'x' * 100, mime_type='image/png')
+
+  events = list(
+      runner.runner.run(
+          user_id=runner.session.user_id,
+          session_id=runner.session.id,
+          new_message=types.Content(
+              role='user', parts=[Part(text='hi'), image]
+          ),
+          run_config=RunConfig(max_inline_blob_bytes=50),
+      )
+  )
+
+  assert testing_utils.simplify_events(events) == [
+      ('root_agent', 'response1'),
+  ]
+  # The session only keeps a reference to the image.
+  user_event = runner.session.events[0]
+  assert user_event.content.parts[1].inline_data is None
+  assert user_event.content.parts[1].file_data.file_uri.startswith('artifact:')
+  # The model still receives the image.
+  assert mockModel.requests[0].contents[0].parts[1] == image
+
+
+def test_max_history_events_keeps_the_function_calls():
+  responses = [
+      types.Part.from_function_call(name='increase_by_one', args={'x': 1}),
+      'response1',
+      'response2',
+  ]
+  mockModel = testing_utils.MockModel.create(responses=responses)
+
+  def increase_by_one(x: int) -> dict:
+    return {'status': 'pending'}
+
+  root_agent = Agent(
+      name='root_agent',
+      model=mockModel,
+      tools=[LongRunningFunctionTool(func=increase_by_one)],
+      max_history_events=1,
+  )
+  runner = testing_utils.InMemoryRunner(root_agent)
+  events = runner.run('test1')
+
+  # Only the latest event is loaded, but the function response needs its
+  # function call, which is loaded from the history.
+  result_response = types.Part.from_function_response(
+      name='increase_by_one', response={'result': 2}
+  )
+  result_response.function_response.id = (
+      events[0].content.parts[0].function_call.id
+  )
+  runner.run(testing_utils.UserContent(result_response))
+
+  assert testing_utils.simplify_contents(mockModel.requests[-1].contents) == [
+      (
+          'model',
+          types.Part.from_function_call(name='increase_by_one', args={'x': 1}),
+      ),
+      (
+          'user',
+          types.Part.from_function_response(
+              name='increase_by_one', response={'result': 2}
+          ),
+      ),
+  ]
@@ -0,0 +1,123 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from google.adk.events import Event
+from google.adk.memory import InMemoryMemoryService
+from google.adk.sessions import Session
+from google.genai import types
+import pytest
+
+
+def _event(text: str, timestamp: float = 0.0) -> Event:
+  return Event(
+      author='user',
+      content=types.Content(role='user', parts=[types.Part(text=text)]),
+      timestamp=timestamp,
+  )
+
+
+def _session(session_id: str, texts: list[str]) -> Session:
+  return Session(
+      id=session_id,
+      app_name='my_app',
+      user_id='user',
+      events=[_event(text, i) for i, text in enumerate(texts)],
+  )
+
+
+async def _search(memory_service: InMemoryMemoryService, query: str):
+  response = await memory_service.search_memory(
+      app_name='my_app', user_id='user', query=query
+  )
+  return [memory.content.parts[0].text for memory in response.memories]
+
+
+@pytest.mark.asyncio
+async def test_search_ranks_by_bm25():
+  memory_service = InMemoryMemoryService()
+  await memory_service.add_session_to_memory(
+      _session(
+          'session',
+          [
+              'I like tea.',
+              'My favorite drink is coffee, coffee every morning.',
+              'Coffee shops are crowded.',
+              'The weather is nice.',
+          ],
+      )
+  )
+
+  assert await _search(memory_service, 'COFFEE drink') == [
+      'My favorite drink is coffee, coffee every morning.',
+      'Coffee shops are crowded.',
+  ]
+  assert await _search(memory_service, 'snow') == []
+  assert (
+      await memory_service.search_memory(
+          app_name='my_app', user_id='other', query='coffee'
+      )
+  ).memories == []
+
+
+@pytest.mark.asyncio
+async def test_search_returns_top_k():
+  memory_service = InMemoryMemoryService(top_k=2)
+  await memory_service.add_session_to_memory(
+      _session('session', [f'note {i}' for i in range(5)])
+  )
+
+  # Equal scores are ranked by recency.
+  assert await _search(memory_service, 'note') == ['note 4', 'note 3']
+
+
+@pytest.mark.asyncio
+async def test_search_tokenizes_unicode():
+  memory_service = InMemoryMemoryService()
+  await memory_service.add_session_to_memory(
+      _session('session', ['Der Straßenbahn fährt nach Zürich.', 'Привет мир'])
+  )
+
+  assert await _search(memory_service, 'zürich') == [
+      'Der Straßenbahn fährt nach Zürich.'
+  ]
+  assert await _search(memory_service, 'МИР') == ['Привет мир']
+
+
+@pytest.mark.asyncio
+async def test_adding_a_session_again_updates_the_index():
+  memory_service = InMemoryMemoryService()
+  session = _session('session', ['first apple'])
+  await memory_service.add_session_to_memory(session)
+  session.events.append(_event('second apple', 1))
+  await memory_service.add_session_to_memory(session)
+  await memory_service.add_session_to_memory(
+      _session('other_session', ['third apple'])
+  )
+
+  assert sorted(await _search(memory_service, 'apple')) == [
+      'first apple',
+      'second apple',
+      'third apple',
+  ]
+
+  # A session with only its recent events keeps the older memories.
+  session.events.pop(0)
+  session.events.append(_event('fourth apple', 2))
+  await memory_service.add_session_to_memory(session)
+  assert sorted(await _search(memory_service, 'apple')) == [
+      'first apple',
+      'fourth apple',
+      'second apple',
+      'third apple',
+  ]
@@ -0,0 +1,220 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from google.adk.events import Event
+from google.adk.sessions import Session
+from google.genai import types
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from google.adk.memory.local_vector_memory_service import LocalVectorMemoryService  # isort: skip
+
+_TOPICS = ['coffee', 'weather', 'travel', 'music']
+
+
+def _embed(texts: list[str]) -> list[list[float]]:
+  """Embeds texts as the counts of the topics they mention."""
+  return [
+      [float(text.lower().count(topic)) for topic in _TOPICS] for text in texts
+  ]
+
+
+def _event(text: str, timestamp: float = 0.0) -> Event:
+  return Event(
+      author='user',
+      content=types.Content(role='user', parts=[types.Part(text=text)]),
+      timestamp=timestamp,
+  )
+
+
+def _session(session_id: str, texts: list[str]) -> Session:
+  return Session(
+      id=session_id,
+      app_name='my_app',
+      user_id='user',
+      events=[_event(text, i) for i, text in enumerate(texts)],
+  )
+
+
+async def _search(memory_service, query: str) -> list[str]:
+  response = await memory_service.search_memory(
+      app_name='my_app', user_id='user', query=query
+  )
+  return [memory.content.parts[0].text for memory in response.memories]
+
+
+@pytest.mark.asyncio
+async def test_search_returns_most_similar_events(tmp_path):
+  memory_service = LocalVectorMemoryService(str(tmp_path), _embed, top_k=2)
+  await memory_service.add_session_to_memory(
+      _session(
+          'session',
+          [
+              'I drink coffee every day',
+              'The weather is sunny',
+              'Coffee and music',
+              'Travel plans',
+          ],
+      )
+  )
+
+  assert await _search(memory_service, 'coffee') == [
+      'I drink coffee every day',
+      'Coffee and music',
+  ]
+  assert (await _search(memory_service, 'weather forecast'))[0] == (
+      'The weather is sunny'
+  )
+  assert (
+      await memory_service.search_memory(
+          app_name='my_app', user_id='other', query='coffee'
+      )
+  ).memories == []
+
+
+@pytest.mark.asyncio
+async def test_memories_persist_across_restarts(tmp_path):
+  memory_service = LocalVectorMemoryService(str(tmp_path), _embed, top_k=1)
+  session = _session('session', ['coffee', 'weather'])
+  await memory_service.add_session_to_memory(session)
+  session.events.append(_event('travel', 2))
+  await memory_service.add_session_to_memory(session)
+  memory_service.close()
+
+  memory_service = LocalVectorMemoryService(str(tmp_path), _embed, top_k=1)
+  assert await _search(memory_service, 'travel') == ['travel']
+  response = await memory_service.search_memory(
+      app_name='my_app', user_id='user', query='coffee'
+  )
+  assert response.memories[0].author == 'user'
+
+  # Only the new events are embedded again.
+  embedded = []
+
+  def embed(texts):
+    embedded.extend(texts)
+    return _embed(texts)
+
+  memory_service.embedder = embed
+  session.events.append(_event('music', 3))
+  await memory_service.add_session_to_memory(session)
+  assert embedded == ['music']
+
+
+@pytest.mark.asyncio
+async def test_deleted_memories_are_not_returned(tmp_path):
+  memory_service = LocalVectorMemoryService(str(tmp_path), _embed, top_k=None)
+  session = _session('session', ['coffee', 'coffee coffee weather'])
+  await memory_service.add_session_to_memory(session)
+  await memory_service.add_session_to_memory(
+      _session('other_session', ['coffee music'])
+  )
+
+  # A session with only its recent events keeps the older memories.
+  session.events.pop(0)
+  await memory_service.add_session_to_memory(session)
+  assert sorted(await _search(memory_service, 'coffee')) == [
+      'coffee',
+      'coffee coffee weather',
+      'coffee music',
+  ]
+
+  await memory_service.delete_session_from_memory(
+      app_name='my_app', user_id='user', session_id='session'
+  )
+  memory_service.close()
+  memory_service = LocalVectorMemoryService(str(tmp_path), _embed, top_k=None)
+  assert await _search(memory_service, 'coffee') == ['coffee music']
+
+
+@pytest.mark.asyncio
+async def test_deleted_session_is_added_again_after_a_restart(tmp_path):
+  memory_service = LocalVectorMemoryService(str(tmp_path), _embed, top_k=1)
+  await memory_service.add_session_to_memory(
+      _session('session', ['coffee', 'weather'])
+  )
+  await memory_service.delete_session_from_memory(
+      app_name='my_app', user_id='user', session_id='session'
+  )
+  memory_service.close()
+
+  memory_service = LocalVectorMemoryService(str(tmp_path), _embed, top_k=1)
+  await memory_service.add_session_to_memory(
+      _session('session', ['travel', 'music'])
+  )
+
+  assert await _search(memory_service, 'travel') == ['travel']
+  assert await _search(memory_service, 'music') == ['music']
+
+
+@pytest.mark.asyncio
+async def test_deletes_compact_the_files(tmp_path):
+  memory_service = LocalVectorMemoryService(str(tmp_path), _embed, top_k=1)
+  texts = [f'coffee {"weather " * (i % 3)}' for i in range(1500)]
+  await memory_service.add_session_to_memory(_session('old', texts))
+  await memory_service.add_session_to_memory(_session('new', ['music']))
+  await memory_service.delete_session_from_memory(
+      app_name='my_app', user_id='user', session_id='old'
+  )
+
+  user_dir = tmp_path / 'my_app' / 'user'
+  assert sorted(p.name for p in user_dir.iterdir()) == [
+      'entries.1.jsonl',
+      'meta.json',
+      'vectors.1.f32',
+  ]
+  assert await _search(memory_service, 'music') == ['music']
+  assert await _search(memory_service, 'coffee') == ['music']
+
+
+@pytest.mark.asyncio
+async def test_coarse_index(tmp_path):
+  rng = np.random.default_rng(0)
+  vectors = rng.normal(size=(400, 8)).astype(np.float32)
+  texts = [str(i) for i in range(len(vectors))]
+
+  def embed(batch: list[str]):
+    return np.stack([
+        vectors[int(text)] if text.isdigit() else vectors[int(text[1:])] * 2
+        for text in batch
+    ])
+
+  memory_service = LocalVectorMemoryService(
+      str(tmp_path), embed, top_k=1, num_lists=4, num_probes=1, chunk_rows=64
+  )
+  await memory_service.add_session_to_memory(_session('session', texts))
+  assert (tmp_path / 'my_app' / 'user' / 'centroids.npy').exists()
+
+  # A query is in the list of its own vector, which is the most similar.
+  for i in range(0, len(vectors), 37):
+    assert await _search(memory_service, f'q{i}') == [str(i)]
+
+  memory_service.close()
+  memory_service = LocalVectorMemoryService(
+      str(tmp_path), embed, top_k=1, num_lists=4, num_probes=1
+  )
+  assert await _search(memory_service, 'q5') == ['5']
+
+
+@pytest.mark.asyncio
+async def test_async_embedder(tmp_path):
+  async def embed(texts):
+    return _embed(texts)
+
+  memory_service = LocalVectorMemoryService(str(tmp_path), embed, top_k=1)
+  await memory_service.add_session_to_memory(
+      _session('session', ['coffee', 'music'])
+  )
+  assert await _search(memory_service, 'music') == ['music']
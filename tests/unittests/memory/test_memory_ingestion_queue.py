@@ -0,0 +1,145 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+from google.adk.agents import Agent
+from google.adk.events import Event
+from google.adk.memory import InMemoryMemoryService
+from google.adk.memory import MemoryIngestionQueue
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.adk.sessions import Session
+from google.genai import types
+import pytest
+
+from .. import testing_utils
+
+
+class _RecordingMemoryService(InMemoryMemoryService):
+
+  def __init__(self):
+    super().__init__()
+    self.batches: list[list[str]] = []
+
+  async def add_sessions_to_memory(self, sessions):
+    self.batches.append([session.id for session in sessions])
+    await super().add_sessions_to_memory(sessions)
+
+
+def _session(session_id: str, texts: list[str]) -> Session:
+  return Session(
+      id=session_id,
+      app_name='my_app',
+      user_id='user',
+      events=[
+          Event(
+              author='user',
+              content=types.Content(role='user', parts=[types.Part(text=text)]),
+              timestamp=i,
+          )
+          for i, text in enumerate(texts)
+      ],
+  )
+
+
+@pytest.mark.asyncio
+async def test_sessions_are_coalesced_and_batched():
+  memory_service = _RecordingMemoryService()
+  queue = MemoryIngestionQueue(
+      memory_service, batch_size=2, flush_interval_seconds=60
+  )
+  session = _session('a', ['apple'])
+  queue.enqueue(session)
+  queue.enqueue(_session('b', ['banana']))
+  session.events.append(_session('a', ['', 'avocado']).events[1])
+  queue.enqueue(session)
+  queue.enqueue(_session('c', ['cherry']))
+  assert queue.num_pending == 3
+  assert memory_service.batches == []
+
+  await queue.close()
+
+  assert memory_service.batches == [['b', 'a'], ['c']]
+  response = await memory_service.search_memory(
+      app_name='my_app', user_id='user', query='avocado apple cherry'
+  )
+  assert len(response.memories) == 3
+
+
+@pytest.mark.asyncio
+async def test_sessions_are_ingested_in_the_background():
+  memory_service = _RecordingMemoryService()
+  queue = MemoryIngestionQueue(memory_service, flush_interval_seconds=0)
+  queue.enqueue(_session('a', ['apple']))
+  while memory_service.batches != [['a']]:
+    await asyncio.sleep(0.01)
+  assert queue.num_pending == 0
+  await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_batches_are_retried(mocker):
+  memory_service = _RecordingMemoryService()
+  add_sessions_to_memory = mocker.patch.object(
+      InMemoryMemoryService,
+      'add_sessions_to_memory',
+      side_effect=[RuntimeError('unavailable'), None],
+  )
+  queue = MemoryIngestionQueue(memory_service, flush_interval_seconds=60)
+  queue.enqueue(_session('a', ['apple']))
+
+  await queue.flush()
+  assert queue.num_pending == 1
+  await queue.flush()
+
+  assert add_sessions_to_memory.call_count == 2
+  assert memory_service.batches == [['a'], ['a']]
+  assert queue.num_pending == 0
+  await queue.close()
+
+
+@pytest.mark.asyncio
+async def test_runner_enqueues_sessions():
+  memory_service = _RecordingMemoryService()
+  queue = MemoryIngestionQueue(memory_service, flush_interval_seconds=60)
+  runner = Runner(
+      app_name='my_app',
+      agent=Agent(
+          name='root_agent',
+          model=testing_utils.MockModel.create(responses=['hello back']),
+      ),
+      session_service=InMemorySessionService(),
+      memory_service=memory_service,
+      memory_ingestion_queue=queue,
+  )
+  session = await runner.session_service.create_session(
+      app_name='my_app', user_id='user'
+  )
+  async for _ in runner.run_async(
+      user_id='user',
+      session_id=session.id,
+      new_message=types.Content(role='user', parts=[types.Part(text='hello')]),
+  ):
+    pass
+  assert queue.num_pending == 1
+
+  await queue.close()
+  response = await memory_service.search_memory(
+      app_name='my_app', user_id='user', query='hello'
+  )
+  assert sorted(m.content.parts[0].text for m in response.memories) == [
+      'hello',
+      'hello back',
+  ]
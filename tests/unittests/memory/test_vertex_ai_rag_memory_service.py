@@ -0,0 +1,137 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+
+from google.adk.events import Event
+from google.adk.sessions import Session
+from google.genai import types
+import pytest
+
+vertex_ai_rag_memory_service = pytest.importorskip(
+    'google.adk.memory.vertex_ai_rag_memory_service'
+)
+
+
+def _event(text: str, timestamp: float) -> Event:
+  return Event(
+      author='user',
+      content=types.Content(role='user', parts=[types.Part(text=text)]),
+      timestamp=timestamp,
+  )
+
+
+@pytest.mark.asyncio
+async def test_only_new_events_are_uploaded(mocker):
+  uploads = []
+
+  def upload_file(corpus_name, path, display_name):
+    with open(path, 'r') as f:
+      texts = [json.loads(line)['text'] for line in f.read().splitlines()]
+    uploads.append((display_name, texts))
+
+  mocker.patch.object(
+      vertex_ai_rag_memory_service.rag, 'upload_file', side_effect=upload_file
+  )
+  memory_service = vertex_ai_rag_memory_service.VertexAiRagMemoryService(
+      rag_corpus='corpus'
+  )
+  session = Session(
+      id='session',
+      app_name='my_app',
+      user_id='user',
+      events=[_event('first', 1), _event('second', 2)],
+  )
+
+  await memory_service.add_session_to_memory(session)
+  await memory_service.add_session_to_memory(session)
+  session.events.append(_event('third', 2))
+  session.events.append(_event('fourth', 3))
+  await memory_service.add_session_to_memory(session)
+
+  assert uploads == [
+      ('my_app.user.session', ['first', 'second']),
+      ('my_app.user.session', ['third', 'fourth']),
+  ]
+
+
+@pytest.mark.asyncio
+async def test_sessions_of_a_user_are_uploaded_together(mocker):
+  uploads = []
+
+  def upload_file(corpus_name, path, display_name):
+    with open(path, 'r') as f:
+      lines = [json.loads(line) for line in f.read().splitlines()]
+    uploads.append((
+        corpus_name,
+        display_name.rsplit('.', 1)[0],
+        [(line['session_id'], line['text']) for line in lines],
+    ))
+
+  mocker.patch.object(
+      vertex_ai_rag_memory_service.rag, 'upload_file', side_effect=upload_file
+  )
+  memory_service = vertex_ai_rag_memory_service.VertexAiRagMemoryService(
+      rag_corpus='corpus'
+  )
+
+  await memory_service.add_sessions_to_memory([
+      Session(
+          id=session_id,
+          app_name='my_app',
+          user_id=user_id,
+          events=[_event(f'{session_id} text', 1)],
+      )
+      for session_id, user_id in (('a', 'user'), ('b', 'other'), ('c', 'user'))
+  ])
+
+  assert uploads == [
+      ('corpus', 'my_app.user', [('a', 'a text'), ('c', 'c text')]),
+      ('corpus', 'my_app.other', [('b', 'b text')]),
+  ]
+
+
+@pytest.mark.asyncio
+async def test_search_attributes_lines_to_their_sessions(mocker):
+  contexts = [
+      mocker.Mock(
+          source_display_name='my_app.user.batch',
+          text=json.dumps({
+              'author': 'user',
+              'timestamp': 1,
+              'text': text,
+              'session_id': session_id,
+          }),
+      )
+      for session_id, text in (('a', 'apple'), ('c', 'cherry'))
+  ]
+  mocker.patch.object(
+      vertex_ai_rag_memory_service.rag,
+      'retrieval_query',
+      return_value=mocker.Mock(contexts=mocker.Mock(contexts=contexts)),
+  )
+  memory_service = vertex_ai_rag_memory_service.VertexAiRagMemoryService(
+      rag_corpus='corpus'
+  )
+
+  response = await memory_service.search_memory(
+      app_name='my_app', user_id='user', query='fruit'
+  )
+
+  # The events have the same timestamp, but aren't merged as they are from
+  # different sessions.
+  assert [memory.content.parts[0].text for memory in response.memories] == [
+      'apple',
+      'cherry',
+  ]
@@ -0,0 +1,147 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from google.adk.events import Event
+from google.adk.events import EventActions
+from google.adk.sessions import CachedSessionService
+from google.adk.sessions import DatabaseSessionService
+from google.adk.sessions import InMemorySessionService
+from google.adk.sessions.base_session_service import GetSessionConfig
+from google.genai import types
+import pytest
+
+
+def _text_event(text: str, **kwargs) -> Event:
+  return Event(
+      invocation_id='invocation',
+      author='user',
+      content=types.Content(role='user', parts=[types.Part(text=text)]),
+      **kwargs,
+  )
+
+
+@pytest.fixture(params=['in_memory', 'database'])
+def backend(request):
+  if request.param == 'database':
+    return DatabaseSessionService('sqlite:///:memory:')
+  return InMemorySessionService()
+
+
+@pytest.mark.asyncio
+async def test_get_session_is_served_from_cache(backend):
+  session_service = CachedSessionService(backend)
+  session = await session_service.create_session(
+      app_name='my_app', user_id='user', state={'app:a': 1, 'b': 2}
+  )
+  await session_service.append_event(
+      session,
+      _text_event('hello', actions=EventActions(state_delta={'user:c': 3})),
+  )
+
+  cached_session = await session_service.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  loaded_session = await backend.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  assert session_service.cache_stats.hits == 1
+  assert session_service.cache_stats.misses == 0
+  assert cached_session.state == loaded_session.state
+  assert cached_session.state == {'app:a': 1, 'b': 2, 'user:c': 3}
+  assert [e.content for e in cached_session.events] == [
+      e.content for e in loaded_session.events
+  ]
+
+  # Callers get copies of the cached session.
+  cached_session.state['b'] = 'changed'
+  cached_session.events.clear()
+  cached_session = await session_service.get_session(
+      app_name='my_app',
+      user_id='user',
+      session_id=session.id,
+      config=GetSessionConfig(num_recent_events=1, state_keys=['b']),
+  )
+  assert cached_session.state == {'b': 2}
+  assert len(cached_session.events) == 1
+
+
+@pytest.mark.asyncio
+async def test_shared_state_is_seen_by_all_cached_sessions(backend):
+  session_service = CachedSessionService(backend)
+  session_1 = await session_service.create_session(
+      app_name='my_app', user_id='user'
+  )
+  session_2 = await session_service.create_session(
+      app_name='my_app', user_id='user'
+  )
+  await session_service.append_event(
+      session_1,
+      _text_event('hello', actions=EventActions(state_delta={'app:a': 1})),
+  )
+
+  cached_session = await session_service.get_session(
+      app_name='my_app', user_id='user', session_id=session_2.id
+  )
+  assert cached_session.state == {'app:a': 1}
+  assert session_service.cache_stats.hits == 1
+
+
+@pytest.mark.asyncio
+async def test_changes_through_the_backend_invalidate_the_cache(backend):
+  session_service = CachedSessionService(backend)
+  session = await session_service.create_session(
+      app_name='my_app', user_id='user'
+  )
+
+  # Another replica appends to the session.
+  other_session = await backend.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  await backend.append_event(other_session, _text_event('from elsewhere'))
+
+  loaded_session = await session_service.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  assert session_service.cache_stats.invalidations == 1
+  assert session_service.cache_stats.misses == 1
+  assert len(loaded_session.events) == 1
+
+  # The reloaded session is cached again.
+  await session_service.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  assert session_service.cache_stats.hits == 1
+
+
+@pytest.mark.asyncio
+async def test_sessions_are_evicted_and_deleted():
+  session_service = CachedSessionService(
+      InMemorySessionService(), max_sessions=1
+  )
+  session_1 = await session_service.create_session(
+      app_name='my_app', user_id='user'
+  )
+  await session_service.create_session(app_name='my_app', user_id='user')
+
+  assert await session_service.get_session(
+      app_name='my_app', user_id='user', session_id=session_1.id
+  )
+  assert session_service.cache_stats.misses == 1
+
+  await session_service.delete_session(
+      app_name='my_app', user_id='user', session_id=session_1.id
+  )
+  assert not await session_service.get_session(
+      app_name='my_app', user_id='user', session_id=session_1.id
+  )
@@ -0,0 +1,433 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import copy
+from datetime import datetime
+from datetime import timezone
+import pickle
+from typing import Any
+
+from fastapi.openapi.models import OAuth2
+from fastapi.openapi.models import OAuthFlowAuthorizationCode
+from fastapi.openapi.models import OAuthFlows
+from google.adk.auth.auth_credential import AuthCredential
+from google.adk.auth.auth_credential import AuthCredentialTypes
+from google.adk.auth.auth_credential import OAuth2Auth
+from google.adk.auth.auth_tool import AuthConfig
+from google.adk.events import Event
+from google.adk.events import EventActions
+from google.adk.sessions import _session_util
+from google.adk.sessions import DatabaseSessionService
+from google.adk.sessions.base_session_service import SessionConflictError
+from google.adk.sessions.database_session_service import StorageEvent
+from google.genai import types
+import pytest
+from sqlalchemy import select
+from sqlalchemy import text
+from sqlalchemy import type_coerce
+from sqlalchemy import update
+from sqlalchemy.types import LargeBinary
+
+
+class _Opaque:
+  """A value that can only be pickled."""
+
+  def __init__(self, value: int):
+    self.value = value
+
+  def __eq__(self, other):
+    return isinstance(other, _Opaque) and other.value == self.value
+
+
+def _auth_config() -> AuthConfig:
+  return AuthConfig(
+      auth_scheme=OAuth2(
+          flows=OAuthFlows(
+              authorizationCode=OAuthFlowAuthorizationCode(
+                  authorizationUrl='https://example.com/oauth2/authorize',
+                  tokenUrl='https://example.com/oauth2/token',
+                  scopes={'read': 'Read access'},
+              )
+          )
+      ),
+      raw_auth_credential=AuthCredential(
+          auth_type=AuthCredentialTypes.OAUTH2,
+          oauth2=OAuth2Auth(client_id='id', client_secret='secret'),
+      ),
+  )
+
+
+def test_encode_event_actions_round_trip():
+  actions = EventActions(
+      skip_summarization=True,
+      state_delta={'key': {'nested': [1, 2.5, None]}, 'app:key': 'value'},
+      artifact_delta={'file': 3},
+      transfer_to_agent='agent',
+      requested_auth_configs={'call_id': _auth_config()},
+  )
+
+  data = _session_util.encode_event_actions(actions)
+
+  assert _session_util.is_compact_event_actions(data)
+  assert data[1:2] == b'j'
+  assert _session_util.decode_event_actions(data) == actions
+
+
+def test_encode_event_actions_falls_back_to_pickle():
+  actions = EventActions(state_delta={'temp:value': _Opaque(1)})
+
+  data = _session_util.encode_event_actions(actions)
+
+  assert data[1:2] == b'p'
+  assert _session_util.decode_event_actions(data) == actions
+
+
+def test_encode_event_actions_keeps_non_json_values():
+  actions = EventActions(
+      state_delta={
+          'time': datetime(2025, 1, 1, tzinfo=timezone.utc),
+          'pair': (1, 2),
+          'by_id': {1: 'one'},
+          'nested': {'values': [float('inf')]},
+      }
+  )
+
+  data = _session_util.encode_event_actions(actions)
+
+  assert data[1:2] == b'p'
+  decoded = _session_util.decode_event_actions(data)
+  assert decoded == actions
+  assert decoded.state_delta['pair'] == (1, 2)
+  assert decoded.state_delta['by_id'] == {1: 'one'}
+
+
+def test_encode_large_event_actions_is_compressed():
+  pytest.importorskip('zstandard')
+  actions = EventActions(state_delta={'key': 'x' * 100_000})
+
+  data = _session_util.encode_event_actions(actions)
+
+  assert data[1:2] == b'z'
+  assert len(data) < 10_000
+  assert _session_util.decode_event_actions(data) == actions
+
+
+def test_decode_legacy_pickled_event_actions():
+  actions = EventActions(state_delta={'key': 'value'}, escalate=True)
+
+  data = pickle.dumps(actions)
+
+  assert not _session_util.is_compact_event_actions(data)
+  assert _session_util.decode_event_actions(data) == actions
+
+
+@pytest.mark.asyncio
+async def test_migrate_event_actions():
+  session_service = DatabaseSessionService('sqlite:///:memory:')
+  session = await session_service.create_session(
+      app_name='my_app', user_id='user'
+  )
+  events = [
+      Event(
+          author='user',
+          actions=EventActions(state_delta={'key': i}),
+          timestamp=i,
+      )
+      for i in range(1, 6)
+  ]
+  for event in events:
+    await session_service.append_event(session, event)
+
+  # Store the first events the way older versions did.
+  table = StorageEvent.__table__
+  with session_service.database_session_factory() as session_factory:
+    for event in events[:3]:
+      session_factory.execute(
+          update(table)
+          .where(table.c.id == event.id)
+          .values(actions=type_coerce(pickle.dumps(event.actions), LargeBinary))
+      )
+    session_factory.commit()
+
+  session = await session_service.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  assert [event.actions for event in session.events] == [
+      event.actions for event in events
+  ]
+
+  assert session_service.migrate_event_actions(batch_size=2) == 3
+  assert session_service.migrate_event_actions(batch_size=2) == 0
+
+  with session_service.database_session_factory() as session_factory:
+    raw_actions = session_factory.execute(
+        select(type_coerce(table.c.actions, LargeBinary))
+    ).scalars()
+    assert all(_session_util.is_compact_event_actions(a) for a in raw_actions)
+
+  session = await session_service.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  assert [event.actions for event in session.events] == [
+      event.actions for event in events
+  ]
+
+
+@pytest.mark.asyncio
+async def test_get_session_hydrates_events_lazily():
+  session_service = DatabaseSessionService('sqlite:///:memory:')
+  session = await session_service.create_session(
+      app_name='my_app', user_id='user'
+  )
+  event = Event(
+      invocation_id='invocation',
+      author='user',
+      content=types.Content(role='user', parts=[types.Part(text='text')]),
+      grounding_metadata=types.GroundingMetadata(web_search_queries=['q']),
+  )
+  await session_service.append_event(session, event)
+
+  session = await session_service.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  loaded_event = session.events[0]
+  assert 'content' not in loaded_event.__dict__
+  assert 'grounding_metadata' not in loaded_event.__dict__
+  assert loaded_event.author == 'user'
+
+  copied_event = copy.deepcopy(loaded_event)
+  assert loaded_event.content == event.content
+  assert 'content' in loaded_event.__dict__
+  assert 'grounding_metadata' not in loaded_event.__dict__
+
+  # Copies hydrate independently, and serialization hydrates all fields.
+  assert 'content' not in copied_event.__dict__
+  fields = {'content', 'grounding_metadata'}
+  assert copied_event.model_dump_json(include=fields) == event.model_dump_json(
+      include=fields
+  )
+  assert copied_event.grounding_metadata == event.grounding_metadata
+
+
+@pytest.mark.asyncio
+async def test_iter_events_pages_through_ties():
+  session_service = DatabaseSessionService('sqlite:///:memory:')
+  session = await session_service.create_session(
+      app_name='my_app', user_id='user'
+  )
+  # Events sharing a timestamp are split across pages.
+  for i, timestamp in enumerate([1, 2, 2, 2, 3]):
+    await session_service.append_event(
+        session,
+        Event(id=f'event_{i}', author='user', timestamp=timestamp),
+    )
+
+  events = [
+      event
+      async for event in session_service.iter_events(
+          app_name='my_app',
+          user_id='user',
+          session_id=session.id,
+          page_size=2,
+      )
+  ]
+  assert [event.id for event in events] == [
+      'event_4',
+      'event_3',
+      'event_2',
+      'event_1',
+      'event_0',
+  ]
+
+
+@pytest.mark.asyncio
+async def test_migrate_state_to_entries():
+  session_service = DatabaseSessionService('sqlite:///:memory:')
+  session = await session_service.create_session(
+      app_name='my_app',
+      user_id='user',
+      state={'app:a': 1, 'user:b': [2], 'c': {'d': 3}},
+  )
+
+  assert session_service.migrate_state_to_entries() == 3
+  assert session_service.migrate_state_to_entries() == 0
+
+  session_service.per_key_state = True
+  loaded_session = await session_service.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  assert loaded_session.state == session.state
+
+  await session_service.append_event(
+      loaded_session,
+      Event(
+          invocation_id='invocation',
+          author='user',
+          actions=EventActions(state_delta={'app:a': 4, 'c': None}),
+      ),
+  )
+  loaded_session = await session_service.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  assert loaded_session.state == {'app:a': 4, 'user:b': [2], 'c': None}
+
+
+def _state_event(state_delta: dict[str, Any]) -> Event:
+  return Event(
+      invocation_id='invocation',
+      author='user',
+      actions=EventActions(state_delta=state_delta),
+  )
+
+
+@pytest.mark.asyncio
+async def test_append_event_rebases_onto_concurrent_appends(tmp_path):
+  db_url = f'sqlite:///{tmp_path / "sessions.db"}'
+  replica_1 = DatabaseSessionService(db_url)
+  replica_2 = DatabaseSessionService(db_url)
+  session = await replica_1.create_session(app_name='my_app', user_id='user')
+  session_1 = await replica_1.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  session_2 = await replica_2.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+
+  event_1 = await replica_1.append_event(session_1, _state_event({'a': 1}))
+  event_2 = await replica_2.append_event(session_2, _state_event({'b': 2}))
+
+  # The second append was rebased onto the first one.
+  assert [e.id for e in session_2.events] == [event_1.id, event_2.id]
+  assert session_2.state == {'a': 1, 'b': 2}
+  assert session_2.version == 2
+  stored_session = await replica_1.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  assert [e.id for e in stored_session.events] == [event_1.id, event_2.id]
+  assert stored_session.state == {'a': 1, 'b': 2}
+  assert stored_session.version == 2
+
+  # An append changing a key that was concurrently changed is rejected.
+  await replica_2.append_event(session_2, _state_event({'a': 3}))
+  with pytest.raises(SessionConflictError):
+    await replica_1.append_event(session_1, _state_event({'a': 4}))
+  stored_session = await replica_1.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  assert stored_session.state == {'a': 3, 'b': 2}
+  assert len(stored_session.events) == 3
+
+
+@pytest.mark.asyncio
+async def test_rebase_finds_events_from_writers_with_skewed_clocks(tmp_path):
+  db_url = f'sqlite:///{tmp_path / "sessions.db"}'
+  replica_1 = DatabaseSessionService(db_url)
+  replica_2 = DatabaseSessionService(db_url)
+  session = await replica_1.create_session(app_name='my_app', user_id='user')
+  first_event = _state_event({'a': 1})
+  first_event.timestamp = 100
+  await replica_1.append_event(session, first_event)
+  session_1 = await replica_1.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  session_2 = await replica_2.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+
+  # The clock of the second writer is behind the one of the first.
+  skewed_event = _state_event({'b': 2})
+  skewed_event.timestamp = 10
+  await replica_2.append_event(session_2, skewed_event)
+  event = await replica_1.append_event(session_1, _state_event({'c': 3}))
+
+  assert [e.id for e in session_1.events] == [
+      first_event.id,
+      skewed_event.id,
+      event.id,
+  ]
+  assert session_1.state == {'a': 1, 'b': 2, 'c': 3}
+  assert session_1.version == 3
+
+
+@pytest.mark.asyncio
+async def test_concurrent_appends_in_one_process():
+  session_service = DatabaseSessionService('sqlite:///:memory:')
+  session = await session_service.create_session(
+      app_name='my_app', user_id='user'
+  )
+  sessions = [
+      await session_service.get_session(
+          app_name='my_app', user_id='user', session_id=session.id
+      )
+      for _ in range(5)
+  ]
+
+  await asyncio.gather(*(
+      session_service.append_event(s, _state_event({f'key_{i}': i}))
+      for i, s in enumerate(sessions)
+  ))
+
+  stored_session = await session_service.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  assert len(stored_session.events) == 5
+  assert stored_session.state == {f'key_{i}': i for i in range(5)}
+  assert stored_session.version == 5
+
+
+@pytest.mark.asyncio
+async def test_adds_version_column_to_existing_tables(tmp_path):
+  db_url = f'sqlite:///{tmp_path / "sessions.db"}'
+  session_service = DatabaseSessionService(db_url)
+  session = await session_service.create_session(
+      app_name='my_app', user_id='user'
+  )
+  with session_service.db_engine.begin() as connection:
+    connection.execute(text('ALTER TABLE sessions DROP COLUMN version'))
+    connection.execute(text('ALTER TABLE events DROP COLUMN session_version'))
+
+  session_service = DatabaseSessionService(db_url)
+  loaded_session = await session_service.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  assert loaded_session.version == 0
+  await session_service.append_event(loaded_session, _state_event({'a': 1}))
+  assert loaded_session.version == 1
+
+
+@pytest.mark.asyncio
+async def test_lazy_fields_are_set():
+  session_service = DatabaseSessionService('sqlite:///:memory:')
+  session = await session_service.create_session(
+      app_name='my_app', user_id='user'
+  )
+  event = Event(
+      invocation_id='invocation',
+      author='user',
+      content=types.Content(role='user', parts=[types.Part(text='text')]),
+  )
+  await session_service.append_event(session, event)
+
+  session = await session_service.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  loaded_event = copy.deepcopy(session.events[0])
+  assert 'content' not in loaded_event.__dict__
+  assert 'content' in loaded_event.model_fields_set
+  assert (
+      loaded_event.model_dump(exclude_unset=True)['content']
+      == event.model_dump(exclude_unset=True)['content']
+  )
+  assert "text='text'" in repr(session.events[0])
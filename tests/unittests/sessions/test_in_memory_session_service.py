@@ -0,0 +1,178 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+from unittest import mock
+
+from google.adk.events import Event
+from google.adk.events import EventActions
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+import pytest
+
+
+def _text_event(text: str) -> Event:
+  return Event(
+      invocation_id='invocation',
+      author='user',
+      content=types.Content(role='user', parts=[types.Part(text=text)]),
+  )
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction_without_spill_drops_sessions():
+  session_service = InMemorySessionService(max_sessions=2)
+  for i in range(3):
+    await session_service.create_session(
+        app_name='my_app', user_id='user', session_id=f's{i}'
+    )
+
+  # Touch s1 so that s2 becomes the least recently used one.
+  await session_service.get_session(
+      app_name='my_app', user_id='user', session_id='s1'
+  )
+  await session_service.create_session(
+      app_name='my_app', user_id='user', session_id='s3'
+  )
+
+  assert not await session_service.get_session(
+      app_name='my_app', user_id='user', session_id='s0'
+  )
+  assert not await session_service.get_session(
+      app_name='my_app', user_id='user', session_id='s2'
+  )
+  assert await session_service.get_session(
+      app_name='my_app', user_id='user', session_id='s1'
+  )
+  stats = session_service.eviction_stats
+  assert stats.evictions == 2
+  assert stats.resident_sessions == 2
+  assert stats.spilled_sessions == 0
+
+
+@pytest.mark.asyncio
+async def test_spilled_session_is_restored(tmp_path):
+  session_service = InMemorySessionService(
+      max_sessions=1, spill_dir=str(tmp_path)
+  )
+  session = await session_service.create_session(
+      app_name='my_app', user_id='user', session_id='s0', state={'k': 'v'}
+  )
+  await session_service.append_event(session, _text_event('hello'))
+  await session_service.create_session(
+      app_name='my_app', user_id='user', session_id='s1'
+  )
+
+  assert session_service.eviction_stats.spilled_sessions == 1
+  assert len(os.listdir(tmp_path)) == 1
+  list_response = await session_service.list_sessions(
+      app_name='my_app', user_id='user'
+  )
+  assert {s.id for s in list_response.sessions} == {'s0', 's1'}
+
+  restored = await session_service.get_session(
+      app_name='my_app', user_id='user', session_id='s0'
+  )
+  assert restored == session
+  stats = session_service.eviction_stats
+  assert stats.spills == 2
+  assert stats.restores == 1
+  assert stats.spilled_sessions == 1
+
+  # Appending to a spilled session restores it first.
+  await session_service.append_event(restored, _text_event('again'))
+  restored = await session_service.get_session(
+      app_name='my_app', user_id='user', session_id='s0'
+  )
+  assert len(restored.events) == 2
+
+  await session_service.delete_session(
+      app_name='my_app', user_id='user', session_id='s1'
+  )
+  assert session_service.eviction_stats.spilled_sessions == 0
+  assert not os.listdir(tmp_path)
+
+
+@pytest.mark.asyncio
+async def test_memory_budget_eviction():
+  session_service = InMemorySessionService(max_memory_bytes=2000)
+  session = await session_service.create_session(
+      app_name='my_app', user_id='user', session_id='s0'
+  )
+  await session_service.append_event(session, _text_event('x' * 1500))
+  await session_service.create_session(
+      app_name='my_app', user_id='user', session_id='s1'
+  )
+  session = await session_service.get_session(
+      app_name='my_app', user_id='user', session_id='s1'
+  )
+  await session_service.append_event(session, _text_event('y' * 1500))
+
+  assert not await session_service.get_session(
+      app_name='my_app', user_id='user', session_id='s0'
+  )
+  stats = session_service.eviction_stats
+  assert stats.evictions == 1
+  assert stats.resident_bytes <= 2000
+
+
+@pytest.mark.asyncio
+async def test_session_ttl_expiration(tmp_path):
+  session_service = InMemorySessionService(
+      session_ttl_seconds=60, max_sessions=1, spill_dir=str(tmp_path)
+  )
+  with mock.patch('time.time', return_value=1000.0):
+    await session_service.create_session(
+        app_name='my_app', user_id='user', session_id='s0'
+    )
+    await session_service.create_session(
+        app_name='my_app', user_id='user', session_id='s1'
+    )
+  with mock.patch('time.time', return_value=1030.0):
+    assert await session_service.get_session(
+        app_name='my_app', user_id='user', session_id='s1'
+    )
+  with mock.patch('time.time', return_value=1070.0):
+    # s0 was spilled and is now expired, s1 was accessed recently.
+    assert not await session_service.get_session(
+        app_name='my_app', user_id='user', session_id='s0'
+    )
+    assert await session_service.get_session(
+        app_name='my_app', user_id='user', session_id='s1'
+    )
+
+  stats = session_service.eviction_stats
+  assert stats.expirations == 1
+  assert not os.listdir(tmp_path)
+
+
+@pytest.mark.asyncio
+async def test_user_and_app_state_survive_eviction():
+  session_service = InMemorySessionService(max_sessions=1)
+  session = await session_service.create_session(
+      app_name='my_app', user_id='user', session_id='s0'
+  )
+  await session_service.append_event(
+      session,
+      Event(
+          author='user',
+          actions=EventActions(
+              state_delta={'app:key': 'app', 'user:key': 'user'}
+          ),
+      ),
+  )
+  session = await session_service.create_session(
+      app_name='my_app', user_id='user', session_id='s1'
+  )
+  assert session.state == {'app:key': 'app', 'user:key': 'user'}
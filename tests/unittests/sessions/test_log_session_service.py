@@ -0,0 +1,338 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import datetime
+import os
+import threading
+
+from google.adk.events import Event
+from google.adk.events import EventActions
+from google.adk.sessions import LogSessionService
+from google.adk.sessions.base_session_service import GetSessionConfig
+from google.genai import types
+import pytest
+
+
+def _text_event(text: str, timestamp: float, **kwargs) -> Event:
+  return Event(
+      invocation_id='invocation',
+      author='user',
+      content=types.Content(role='user', parts=[types.Part(text=text)]),
+      timestamp=timestamp,
+      **kwargs,
+  )
+
+
+@pytest.mark.asyncio
+async def test_sessions_survive_reopening(tmp_path):
+  session_service = LogSessionService(str(tmp_path))
+  session = await session_service.create_session(
+      app_name='my_app',
+      user_id='user/1',
+      session_id='.session',
+      state={'app:a': 1, 'user:b': 2, 'c': 3, 'temp:d': 4},
+  )
+  await session_service.append_event(
+      session,
+      _text_event(
+          'hello',
+          1.0,
+          actions=EventActions(state_delta={'c': 4, 'user:b': 5}),
+      ),
+  )
+  await session_service.append_event(
+      session,
+      Event(
+          invocation_id='invocation',
+          author='model',
+          content=types.Content(
+              role='model',
+              parts=[
+                  types.Part.from_bytes(data=b'\x00\x01', mime_type='image/png')
+              ],
+          ),
+          timestamp=2.0,
+      ),
+  )
+  session_service.close()
+
+  session_service = LogSessionService(str(tmp_path))
+  loaded_session = await session_service.get_session(
+      app_name='my_app', user_id='user/1', session_id='.session'
+  )
+  assert loaded_session.state == {'app:a': 1, 'user:b': 5, 'c': 4}
+  assert loaded_session.events == session.events
+  assert loaded_session.last_update_time == 2.0
+  assert loaded_session.version == 2
+  assert await session_service.get_session_version(
+      app_name='my_app', user_id='user/1', session_id='.session'
+  ) == await session_service.get_session_version(
+      app_name='my_app', user_id='user/1', session_id='.session'
+  )
+
+  response = await session_service.list_sessions(
+      app_name='my_app', user_id='user/1'
+  )
+  assert [s.id for s in response.sessions] == ['.session']
+  assert not response.sessions[0].events
+
+  await session_service.delete_session(
+      app_name='my_app', user_id='user/1', session_id='.session'
+  )
+  assert not await session_service.get_session(
+      app_name='my_app', user_id='user/1', session_id='.session'
+  )
+  await session_service.create_session(
+      app_name='my_app', user_id='user/1', session_id='s'
+  )
+  with pytest.raises(ValueError):
+    await session_service.create_session(
+        app_name='my_app', user_id='user/1', session_id='s'
+    )
+  session_service.close()
+
+
+@pytest.mark.asyncio
+async def test_recent_events_are_read_from_the_index(tmp_path):
+  session_service = LogSessionService(
+      str(tmp_path), snapshot_interval=3, max_segment_bytes=512
+  )
+  session = await session_service.create_session(
+      app_name='my_app', user_id='user', session_id='session'
+  )
+  for i in range(20):
+    await session_service.append_event(
+        session,
+        _text_event(
+            f'event {i}', float(i), actions=EventActions(state_delta={'i': i})
+        ),
+    )
+  session_service.close()
+  session_dir = tmp_path / 'my_app' / 'user' / 'sessions' / 'session'
+  assert len(os.listdir(session_dir)) > 1
+
+  session_service = LogSessionService(str(tmp_path))
+  session = await session_service.get_session(
+      app_name='my_app',
+      user_id='user',
+      session_id='session',
+      config=GetSessionConfig(num_recent_events=3),
+  )
+  assert [e.timestamp for e in session.events] == [17.0, 18.0, 19.0]
+  assert session.state == {'i': 19}
+
+  session = await session_service.get_session(
+      app_name='my_app',
+      user_id='user',
+      session_id='session',
+      config=GetSessionConfig(after_timestamp=15.0, state_keys=[]),
+  )
+  assert [e.timestamp for e in session.events] == [15.0, 16.0, 17.0, 18.0, 19.0]
+  assert session.state == {}
+
+  events = [
+      event
+      async for event in session_service.iter_events(
+          app_name='my_app',
+          user_id='user',
+          session_id='session',
+          before_timestamp=3.0,
+      )
+  ]
+  assert [e.timestamp for e in events] == [2.0, 1.0, 0.0]
+  session_service.close()
+
+
+@pytest.mark.asyncio
+async def test_torn_records_are_truncated(tmp_path):
+  session_service = LogSessionService(str(tmp_path))
+  session = await session_service.create_session(
+      app_name='my_app', user_id='user', session_id='session'
+  )
+  await session_service.append_event(session, _text_event('hello', 1.0))
+  session_service.close()
+  segment = (
+      tmp_path / 'my_app' / 'user' / 'sessions' / 'session' / '00000000.log'
+  )
+  with open(segment, 'ab') as f:
+    f.write(b'e\t2.0\t{"author":')
+
+  session_service = LogSessionService(str(tmp_path))
+  session = await session_service.get_session(
+      app_name='my_app', user_id='user', session_id='session'
+  )
+  assert len(session.events) == 1
+  await session_service.append_event(session, _text_event('again', 3.0))
+  session_service.close()
+
+  session_service = LogSessionService(str(tmp_path))
+  session = await session_service.get_session(
+      app_name='my_app', user_id='user', session_id='session'
+  )
+  assert [e.timestamp for e in session.events] == [1.0, 3.0]
+  session_service.close()
+
+
+@pytest.mark.asyncio
+async def test_state_logs_are_compacted(tmp_path):
+  session_service = LogSessionService(str(tmp_path), compaction_threshold=5)
+  session = await session_service.create_session(
+      app_name='my_app', user_id='user'
+  )
+  for i in range(12):
+    await session_service.append_event(
+        session,
+        _text_event(
+            'hello', float(i), actions=EventActions(state_delta={'app:i': i})
+        ),
+    )
+  session_service.close()
+  with open(tmp_path / 'my_app' / 'app_state.log', 'rb') as f:
+    assert len(f.readlines()) < 5
+
+  session_service = LogSessionService(str(tmp_path))
+  session = await session_service.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+  assert session.state == {'app:i': 11}
+  session_service.close()
+
+
+@pytest.mark.asyncio
+async def test_append_event_to_deleted_session(tmp_path):
+  session_service = LogSessionService(str(tmp_path))
+  session = await session_service.create_session(
+      app_name='my_app', user_id='user', state={'a': 1}
+  )
+  await session_service.delete_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+
+  await session_service.append_event(
+      session,
+      _text_event('hello', 1.0, actions=EventActions(state_delta={'a': 2})),
+  )
+
+  # The session the event was not stored in is left unchanged.
+  assert not session.events
+  assert session.state == {'a': 1}
+  session_service.close()
+
+
+@pytest.mark.asyncio
+async def test_values_json_does_not_restore_are_pickled(tmp_path):
+  now = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+  session_service = LogSessionService(str(tmp_path), snapshot_interval=1)
+  session = await session_service.create_session(
+      app_name='my_app',
+      user_id='user',
+      session_id='session',
+      state={'created': now, 'app:pair': (1, 2)},
+  )
+  await session_service.append_event(
+      session,
+      _text_event(
+          'hello',
+          1.0,
+          actions=EventActions(state_delta={'ids': {1: 'a'}, 'user:now': now}),
+      ),
+  )
+  session_service.close()
+
+  session_service = LogSessionService(str(tmp_path))
+  loaded_session = await session_service.get_session(
+      app_name='my_app', user_id='user', session_id='session'
+  )
+  assert loaded_session.state == {
+      'created': now,
+      'app:pair': (1, 2),
+      'ids': {1: 'a'},
+      'user:now': now,
+  }
+  assert loaded_session.events == session.events
+  session_service.close()
+
+
+@pytest.mark.asyncio
+async def test_values_that_cannot_be_encoded_change_nothing(tmp_path):
+  session_service = LogSessionService(str(tmp_path))
+  session = await session_service.create_session(
+      app_name='my_app', user_id='user', session_id='session'
+  )
+
+  with pytest.raises(TypeError):
+    await session_service.append_event(
+        session,
+        _text_event(
+            'hello',
+            1.0,
+            actions=EventActions(
+                state_delta={'lock': threading.Lock(), 'app:a': 1, 'b': 2}
+            ),
+        ),
+    )
+  with pytest.raises(TypeError):
+    await session_service.create_session(
+        app_name='my_app',
+        user_id='user',
+        session_id='other_session',
+        state={'lock': threading.Lock(), 'app:a': 1},
+    )
+
+  assert not session.events
+  assert not session.state
+  session_service.close()
+  session_service = LogSessionService(str(tmp_path))
+  loaded_session = await session_service.get_session(
+      app_name='my_app', user_id='user', session_id='session'
+  )
+  assert not loaded_session.events
+  assert not loaded_session.state
+  assert not os.path.exists(
+      tmp_path / 'my_app' / 'user' / 'sessions' / 'other_session'
+  )
+  session_service.close()
+
+
+@pytest.mark.asyncio
+async def test_sessions_are_listed_from_the_index(tmp_path, mocker):
+  session_service = LogSessionService(str(tmp_path))
+  for session_id in ('a', 'b', 'c'):
+    session = await session_service.create_session(
+        app_name='my_app', user_id='user', session_id=session_id
+    )
+  await session_service.append_event(session, _text_event('hello', 1.0))
+  await session_service.delete_session(
+      app_name='my_app', user_id='user', session_id='b'
+  )
+  session_service.close()
+
+  session_service = LogSessionService(str(tmp_path))
+  load_spy = mocker.spy(session_service, '_load_log')
+  response = await session_service.list_sessions(
+      app_name='my_app', user_id='user'
+  )
+  assert [(s.id, s.version) for s in response.sessions] == [('a', 0), ('c', 1)]
+  assert response.sessions[1].last_update_time == 1.0
+  assert load_spy.call_count == 0
+  session_service.close()
+
+  # Sessions written without an index are indexed once.
+  os.remove(tmp_path / 'my_app' / 'user' / 'session_index.log')
+  session_service = LogSessionService(str(tmp_path))
+  response = await session_service.list_sessions(
+      app_name='my_app', user_id='user'
+  )
+  assert [(s.id, s.version) for s in response.sessions] == [('a', 0), ('c', 1)]
+  session_service.close()
@@ -0,0 +1,177 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from google.adk.events import Event
+from google.adk.events import EventActions
+from google.adk.sessions import DatabaseSessionService
+from google.adk.sessions import InMemorySessionService
+from google.adk.sessions.session_export import export_sessions
+from google.adk.sessions.session_export import import_sessions
+from google.genai import types
+import pytest
+
+
+async def _create_sessions(session_service, num_sessions=3, num_events=4):
+  sessions = []
+  for user_id in ('user_1', 'user_2'):
+    for i in range(num_sessions):
+      session = await session_service.create_session(
+          app_name='my_app',
+          user_id=user_id,
+          state={'i': i, 'user:name': user_id},
+      )
+      for j in range(num_events):
+        await session_service.append_event(
+            session,
+            Event(
+                invocation_id=f'invocation_{j}',
+                author='user',
+                timestamp=j + 1,
+                content=types.Content(
+                    role='user',
+                    parts=[
+                        types.Part(text=f'event {j}'),
+                        types.Part.from_bytes(
+                            data=b'\x00\xff', mime_type='image/png'
+                        ),
+                    ],
+                ),
+                actions=EventActions(state_delta={'j': j}),
+            ),
+        )
+      sessions.append(session)
+  return sessions
+
+
+async def _assert_sessions_imported(session_service, sessions):
+  for session in sessions:
+    imported_session = await session_service.get_session(
+        app_name=session.app_name,
+        user_id=session.user_id,
+        session_id=session.id,
+    )
+    assert imported_session.state == session.state
+    assert len(imported_session.events) == len(session.events)
+    for imported_event, event in zip(imported_session.events, session.events):
+      assert imported_event.id == event.id
+      assert imported_event.timestamp == event.timestamp
+      assert imported_event.content == event.content
+      assert imported_event.actions == event.actions
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('file_name', ['sessions.jsonl', 'sessions.parquet'])
+async def test_export_and_import_sessions(tmp_path, file_name):
+  if file_name.endswith('.parquet'):
+    pytest.importorskip('pyarrow')
+  source = InMemorySessionService()
+  sessions = await _create_sessions(source)
+  path = str(tmp_path / file_name)
+
+  stats = await export_sessions(
+      source,
+      path,
+      app_name='my_app',
+      user_ids=['user_1', 'user_2', 'unknown'],
+      page_size=2,
+  )
+  assert stats.sessions == 6
+  assert stats.events == 24
+
+  target = DatabaseSessionService('sqlite:///:memory:')
+  stats = await import_sessions(target, path, concurrency=2, queue_size=1)
+  assert stats.sessions == 6
+  assert stats.events == 24
+  await _assert_sessions_imported(target, sessions)
+
+
+@pytest.mark.asyncio
+async def test_import_resumes_partial_imports(tmp_path):
+  source = InMemorySessionService()
+  sessions = await _create_sessions(source)
+  path = str(tmp_path / 'sessions.jsonl')
+  await export_sessions(
+      source, path, app_name='my_app', user_ids=['user_1', 'user_2']
+  )
+
+  # Only the first session and two of its events were imported.
+  with open(path) as f:
+    lines = f.readlines()
+  partial_path = str(tmp_path / 'partial.jsonl')
+  with open(partial_path, 'w') as f:
+    f.writelines(lines[:3])
+  target = InMemorySessionService()
+  await import_sessions(target, partial_path)
+
+  stats = await import_sessions(target, path)
+  assert stats.sessions == 6
+  assert stats.events == 22
+  assert stats.skipped_events == 2
+  await _assert_sessions_imported(target, sessions)
+
+
+@pytest.mark.asyncio
+async def test_import_keeps_the_shared_state(tmp_path):
+  source = InMemorySessionService()
+  for i in range(2):
+    session = await source.create_session(app_name='my_app', user_id='user')
+    for j in range(3):
+      await source.append_event(
+          session,
+          Event(
+              author='user',
+              timestamp=i * 3 + j + 1,
+              actions=EventActions(
+                  state_delta={
+                      'app:c': i * 3 + j,
+                      'user:c': i * 3 + j,
+                      'c': j,
+                  }
+              ),
+          ),
+      )
+  path = str(tmp_path / 'sessions.jsonl')
+  await export_sessions(source, path, app_name='my_app', user_ids=['user'])
+
+  target = DatabaseSessionService('sqlite:///:memory:')
+  await import_sessions(target, path)
+
+  sessions = await target.list_sessions(app_name='my_app', user_id='user')
+  assert len(sessions.sessions) == 2
+  for session in sessions.sessions:
+    session = await target.get_session(
+        app_name='my_app', user_id='user', session_id=session.id
+    )
+    assert session.state == {'app:c': 5, 'user:c': 5, 'c': 2}
+
+
+@pytest.mark.asyncio
+async def test_import_into_another_app(tmp_path):
+  source = InMemorySessionService()
+  session = await source.create_session(app_name='my_app', user_id='user')
+  await source.append_event(session, Event(author='user', timestamp=1))
+  path = str(tmp_path / 'sessions.jsonl')
+  await export_sessions(source, path, app_name='my_app', user_ids=['user'])
+
+  target = InMemorySessionService()
+  await import_sessions(target, path, app_name='other_app')
+  imported_session = await target.get_session(
+      app_name='other_app', user_id='user', session_id=session.id
+  )
+  assert len(imported_session.events) == 1
+
+  with pytest.raises(ValueError):
+    await export_sessions(
+        source, str(tmp_path / 'sessions.csv'), app_name='my_app', user_ids=[]
+    )
@@ -16,9 +16,12 @@ import enum
 
 from google.adk.events import Event
 from google.adk.events import EventActions
+from google.adk.sessions import _session_util
 from google.adk.sessions import DatabaseSessionService
 from google.adk.sessions import InMemorySessionService
 from google.adk.sessions.base_session_service import GetSessionConfig
+from google.adk.sessions.base_session_service import ListEventsConfig
+from google.adk.sessions.base_session_service import ListSessionsConfig
 from google.genai import types
 import pytest
 
@@ -26,6 +29,7 @@ import pytest
 class SessionServiceType(enum.Enum):
   IN_MEMORY = 'IN_MEMORY'
   DATABASE = 'DATABASE'
+  DATABASE_PER_KEY_STATE = 'DATABASE_PER_KEY_STATE'
 
 
 def get_session_service(
@@ -34,13 +38,13 @@ def get_session_service(
   """Creates a session service for testing."""
   if service_type == SessionServiceType.DATABASE:
     return DatabaseSessionService('sqlite:///:memory:')
+  if service_type == SessionServiceType.DATABASE_PER_KEY_STATE:
+    return DatabaseSessionService('sqlite:///:memory:', per_key_state=True)
   return InMemorySessionService()
 
 
 @pytest.mark.asyncio
-@pytest.mark.parametrize(
-    'service_type', [SessionServiceType.IN_MEMORY, SessionServiceType.DATABASE]
-)
+@pytest.mark.parametrize('service_type', list(SessionServiceType))
 async def test_get_empty_session(service_type):
   session_service = get_session_service(service_type)
   assert not await session_service.get_session(
@@ -49,9 +53,7 @@ async def test_get_empty_session(service_type):
 
 
 @pytest.mark.asyncio
-@pytest.mark.parametrize(
-    'service_type', [SessionServiceType.IN_MEMORY, SessionServiceType.DATABASE]
-)
+@pytest.mark.parametrize('service_type', list(SessionServiceType))
 async def test_create_get_session(service_type):
   session_service = get_session_service(service_type)
   app_name = 'my_app'
@@ -86,9 +88,7 @@ async def test_create_get_session(service_type):
 
 
 @pytest.mark.asyncio
-@pytest.mark.parametrize(
-    'service_type', [SessionServiceType.IN_MEMORY, SessionServiceType.DATABASE]
-)
+@pytest.mark.parametrize('service_type', list(SessionServiceType))
 async def test_create_and_list_sessions(service_type):
   session_service = get_session_service(service_type)
   app_name = 'my_app'
@@ -109,9 +109,7 @@ async def test_create_and_list_sessions(service_type):
 
 
 @pytest.mark.asyncio
-@pytest.mark.parametrize(
-    'service_type', [SessionServiceType.IN_MEMORY, SessionServiceType.DATABASE]
-)
+@pytest.mark.parametrize('service_type', list(SessionServiceType))
 async def test_session_state(service_type):
   session_service = get_session_service(service_type)
   app_name = 'my_app'
@@ -189,9 +187,7 @@ async def test_session_state(service_type):
 
 
 @pytest.mark.asyncio
-@pytest.mark.parametrize(
-    'service_type', [SessionServiceType.IN_MEMORY, SessionServiceType.DATABASE]
-)
+@pytest.mark.parametrize('service_type', list(SessionServiceType))
 async def test_create_new_session_will_merge_states(service_type):
   session_service = get_session_service(service_type)
   app_name = 'my_app'
@@ -235,9 +231,7 @@ async def test_create_new_session_will_merge_states(service_type):
 
 
 @pytest.mark.asyncio
-@pytest.mark.parametrize(
-    'service_type', [SessionServiceType.IN_MEMORY, SessionServiceType.DATABASE]
-)
+@pytest.mark.parametrize('service_type', list(SessionServiceType))
 async def test_append_event_bytes(service_type):
   session_service = get_session_service(service_type)
   app_name = 'my_app'
@@ -276,9 +270,7 @@ async def test_append_event_bytes(service_type):
 
 
 @pytest.mark.asyncio
-@pytest.mark.parametrize(
-    'service_type', [SessionServiceType.IN_MEMORY, SessionServiceType.DATABASE]
-)
+@pytest.mark.parametrize('service_type', list(SessionServiceType))
 async def test_append_event_complete(service_type):
   session_service = get_session_service(service_type)
   app_name = 'my_app'
@@ -316,9 +308,7 @@ async def test_append_event_complete(service_type):
 
 
 @pytest.mark.asyncio
-@pytest.mark.parametrize(
-    'service_type', [SessionServiceType.IN_MEMORY, SessionServiceType.DATABASE]
-)
+@pytest.mark.parametrize('service_type', list(SessionServiceType))
 async def test_get_session_with_config(service_type):
   session_service = get_session_service(service_type)
   app_name = 'my_app'
@@ -377,3 +367,229 @@ async def test_get_session_with_config(service_type):
   )
   events = session.events
   assert len(events) == num_test_events - after_timestamp + 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('service_type', list(SessionServiceType))
+async def test_iter_events(service_type):
+  session_service = get_session_service(service_type)
+  app_name = 'my_app'
+  user_id = 'user'
+
+  session = await session_service.create_session(
+      app_name=app_name, user_id=user_id
+  )
+  for i in range(1, 6):
+    await session_service.append_event(
+        session, Event(author='user', timestamp=i)
+    )
+
+  events = [
+      event
+      async for event in session_service.iter_events(
+          app_name=app_name, user_id=user_id, session_id=session.id
+      )
+  ]
+  assert [event.timestamp for event in events] == [5, 4, 3, 2, 1]
+
+  events = [
+      event
+      async for event in session_service.iter_events(
+          app_name=app_name,
+          user_id=user_id,
+          session_id=session.id,
+          before_timestamp=3,
+      )
+  ]
+  assert [event.timestamp for event in events] == [2, 1]
+
+  events = [
+      event
+      async for event in session_service.iter_events(
+          app_name=app_name, user_id=user_id, session_id='missing'
+      )
+  ]
+  assert not events
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('service_type', list(SessionServiceType))
+async def test_list_sessions_page(service_type):
+  session_service = get_session_service(service_type)
+  app_name = 'my_app'
+  user_id = 'user'
+
+  session_ids = []
+  for i in range(5):
+    session = await session_service.create_session(
+        app_name=app_name, user_id=user_id, state={'i': i}
+    )
+    for j in range(i):
+      await session_service.append_event(
+          session, Event(author='user', timestamp=j + 1)
+      )
+    session_ids.append(session.id)
+
+  listed_session_ids = []
+  page_token = None
+  while True:
+    response = await session_service.list_sessions_page(
+        app_name=app_name,
+        user_id=user_id,
+        config=ListSessionsConfig(
+            page_size=2,
+            page_token=page_token,
+            include_event_count=True,
+            include_last_event=True,
+        ),
+    )
+    assert len(response.sessions) <= 2
+    for session in response.sessions:
+      i = session_ids.index(session.id)
+      assert not session.state
+      assert response.event_counts[session.id] == i
+      assert [event.timestamp for event in session.events] == ([i] if i else [])
+    listed_session_ids.extend(session.id for session in response.sessions)
+    page_token = response.next_page_token
+    if not page_token:
+      break
+  assert sorted(listed_session_ids) == sorted(session_ids)
+
+  response = await session_service.list_sessions_page(
+      app_name=app_name, user_id=user_id
+  )
+  assert len(response.sessions) == 5
+  assert response.event_counts is None
+  assert all(not session.events for session in response.sessions)
+  assert response.next_page_token is None
+
+  with pytest.raises(ValueError):
+    await session_service.list_sessions_page(
+        app_name=app_name,
+        user_id=user_id,
+        config=ListSessionsConfig(page_token='invalid'),
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('service_type', list(SessionServiceType))
+@pytest.mark.parametrize(
+    'page_token',
+    [
+        _session_util.encode_page_token('not a timestamp', 'id'),
+        _session_util.encode_page_token(None, 'id'),
+        _session_util.encode_page_token(1.0, 2),
+        _session_util.encode_page_token(1.0),
+        _session_util.encode_page_token(1.0, 'id', 'extra'),
+    ],
+)
+async def test_invalid_page_tokens(service_type, page_token):
+  session_service = get_session_service(service_type)
+  session = await session_service.create_session(
+      app_name='my_app', user_id='user'
+  )
+  await session_service.append_event(session, Event(author='user', timestamp=1))
+
+  with pytest.raises(ValueError, match='Invalid page token'):
+    await session_service.list_sessions_page(
+        app_name='my_app',
+        user_id='user',
+        config=ListSessionsConfig(page_token=page_token),
+    )
+  with pytest.raises(ValueError, match='Invalid page token'):
+    await session_service.list_events(
+        app_name='my_app',
+        user_id='user',
+        session_id=session.id,
+        config=ListEventsConfig(page_token=page_token),
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('service_type', list(SessionServiceType))
+async def test_list_events(service_type):
+  session_service = get_session_service(service_type)
+  app_name = 'my_app'
+  user_id = 'user'
+
+  session = await session_service.create_session(
+      app_name=app_name, user_id=user_id
+  )
+  for i in range(1, 11):
+    content = types.Content(
+        role='model',
+        parts=[
+            types.Part(function_call=types.FunctionCall(name='tool', args={}))
+            if i % 3 == 0
+            else types.Part(text=str(i))
+        ],
+    )
+    await session_service.append_event(
+        session,
+        Event(
+            author='agent' if i % 2 else 'user',
+            timestamp=i,
+            content=content,
+        ),
+    )
+
+  async def list_timestamps(**kwargs):
+    timestamps = []
+    page_token = None
+    while True:
+      response = await session_service.list_events(
+          app_name=app_name,
+          user_id=user_id,
+          session_id=session.id,
+          config=ListEventsConfig(page_size=2, page_token=page_token, **kwargs),
+      )
+      assert len(response.events) <= 2
+      timestamps.extend(event.timestamp for event in response.events)
+      page_token = response.next_page_token
+      if not page_token:
+        return timestamps
+
+  assert await list_timestamps() == list(range(1, 11))
+  assert await list_timestamps(authors=['user']) == [2, 4, 6, 8, 10]
+  assert await list_timestamps(after_timestamp=3, before_timestamp=7) == [
+      3,
+      4,
+      5,
+      6,
+  ]
+  assert await list_timestamps(has_function_calls=True) == [3, 6, 9]
+  assert await list_timestamps(has_function_calls=False, authors=['agent']) == [
+      1,
+      5,
+      7,
+  ]
+
+  response = await session_service.list_events(
+      app_name=app_name, user_id=user_id, session_id='missing'
+  )
+  assert not response.events
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('service_type', list(SessionServiceType))
+async def test_get_session_with_state_keys(service_type):
+  session_service = get_session_service(service_type)
+  app_name = 'my_app'
+  user_id = 'user'
+  session = await session_service.create_session(
+      app_name=app_name,
+      user_id=user_id,
+      state={'app:a': 1, 'app:b': 2, 'user:c': 3, 'd': 4, 'e': {'f': 5}},
+  )
+
+  config = GetSessionConfig(state_keys=['app:b', 'e', 'temp:g', 'missing'])
+  session = await session_service.get_session(
+      app_name=app_name, user_id=user_id, session_id=session.id, config=config
+  )
+  assert session.state == {'app:b': 2, 'e': {'f': 5}}
+
+  config = GetSessionConfig(state_keys=[])
+  session = await session_service.get_session(
+      app_name=app_name, user_id=user_id, session_id=session.id, config=config
+  )
+  assert session.state == {}
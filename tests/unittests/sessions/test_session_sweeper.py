@@ -0,0 +1,207 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+from datetime import datetime
+
+from google.adk.artifacts import InMemoryArtifactService
+from google.adk.events import Event
+from google.adk.events import EventActions
+from google.adk.sessions import DatabaseSessionService
+from google.adk.sessions import RetentionPolicy
+from google.adk.sessions import SessionSweeper
+from google.adk.sessions.database_session_service import StorageSession
+import pytest
+from sqlalchemy import event
+from sqlalchemy import update
+
+
+async def _create_session(session_service, session_id, num_events):
+  session = await session_service.create_session(
+      app_name='my_app', user_id='user', session_id=session_id
+  )
+  for i in range(num_events):
+    await session_service.append_event(
+        session, Event(author='user', timestamp=i + 1)
+    )
+  return session
+
+
+def _expire(session_service, session_id):
+  with session_service.database_session_factory() as session_factory:
+    session_factory.execute(
+        update(StorageSession)
+        .where(StorageSession.id == session_id)
+        .values(update_time=datetime(2000, 1, 1))
+    )
+    session_factory.commit()
+
+
+@pytest.fixture
+def session_service():
+  return DatabaseSessionService('sqlite:///:memory:', per_key_state=True)
+
+
+@pytest.mark.asyncio
+async def test_expired_sessions_are_deleted(session_service):
+  for session_id in ('old_1', 'old_2', 'new'):
+    await _create_session(session_service, session_id, num_events=3)
+  _expire(session_service, 'old_1')
+  _expire(session_service, 'old_2')
+
+  artifact_service = InMemoryArtifactService()
+  sweeper = SessionSweeper(
+      session_service,
+      RetentionPolicy(max_session_age_seconds=3600, batch_size=1),
+      artifact_service=artifact_service,
+  )
+  stats = await sweeper.sweep()
+  assert stats.deleted_sessions == 2
+  assert stats.deleted_events == 6
+  assert stats.archived_events == 6
+
+  response = await session_service.list_sessions(
+      app_name='my_app', user_id='user'
+  )
+  assert [s.id for s in response.sessions] == ['new']
+  versions = await artifact_service.list_versions(
+      app_name='my_app',
+      user_id='user',
+      session_id='old_1',
+      filename='archived_events.jsonl',
+  )
+  assert len(versions) == 3
+  archive = await artifact_service.load_artifact(
+      app_name='my_app',
+      user_id='user',
+      session_id='old_1',
+      filename='archived_events.jsonl',
+      version=0,
+  )
+  assert Event.model_validate_json(archive.inline_data.data).timestamp == 1
+
+  assert (await sweeper.sweep()).deleted_sessions == 0
+
+
+@pytest.mark.asyncio
+async def test_session_row_is_deleted_last_in_batches(session_service):
+  session = await _create_session(session_service, 'old', num_events=5)
+  await session_service.append_event(
+      session,
+      Event(
+          author='user',
+          timestamp=6,
+          actions=EventActions(state_delta={'a': 1, 'b': 2, 'c': 3}),
+      ),
+  )
+  _expire(session_service, 'old')
+  deletes = []
+
+  @event.listens_for(session_service.db_engine, 'after_cursor_execute')
+  def record_deletes(conn, cursor, statement, *args):
+    if statement.startswith('DELETE'):
+      deletes.append((statement.split()[2], cursor.rowcount))
+
+  sweeper = SessionSweeper(
+      session_service,
+      RetentionPolicy(max_session_age_seconds=3600, batch_size=2),
+  )
+  stats = await sweeper.sweep()
+
+  assert stats.deleted_sessions == 1
+  assert stats.deleted_events == 6
+  assert all(rowcount <= 2 for _, rowcount in deletes)
+  assert [table for table, _ in deletes] == (
+      ['events'] * 3 + ['state_entries'] * 2 + ['sessions']
+  )
+
+
+@pytest.mark.asyncio
+async def test_session_updated_during_deletion_is_kept(session_service):
+  session = await _create_session(session_service, 'old', num_events=4)
+  _expire(session_service, 'old')
+
+  sweeper = SessionSweeper(
+      session_service,
+      RetentionPolicy(max_session_age_seconds=3600, batch_size=2),
+  )
+  delete_events = sweeper._delete_events
+
+  async def append_during_deletion(*args, **kwargs):
+    await session_service.append_event(
+        session, Event(author='user', timestamp=5)
+    )
+    return await delete_events(*args, **kwargs)
+
+  sweeper._delete_events = append_during_deletion
+  stats = await sweeper.sweep()
+
+  assert stats.deleted_sessions == 0
+  kept_session = await session_service.get_session(
+      app_name='my_app', user_id='user', session_id='old'
+  )
+  assert [e.timestamp for e in kept_session.events] == [1, 2, 3, 4, 5]
+
+
+@pytest.mark.asyncio
+async def test_old_events_are_trimmed(session_service):
+  session = await _create_session(session_service, 'long', num_events=10)
+  await _create_session(session_service, 'short', num_events=2)
+
+  artifact_service = InMemoryArtifactService()
+  sweeper = SessionSweeper(
+      session_service,
+      RetentionPolicy(max_events_per_session=3, batch_size=2),
+      artifact_service=artifact_service,
+  )
+  stats = await sweeper.sweep()
+  assert stats.deleted_events == 7
+  assert stats.archived_events == 7
+
+  trimmed_session = await session_service.get_session(
+      app_name='my_app', user_id='user', session_id='long'
+  )
+  assert [e.timestamp for e in trimmed_session.events] == [8, 9, 10]
+  short_session = await session_service.get_session(
+      app_name='my_app', user_id='user', session_id='short'
+  )
+  assert len(short_session.events) == 2
+
+  # The session can still be appended to.
+  await session_service.append_event(
+      session, Event(author='user', timestamp=11)
+  )
+  assert (await sweeper.sweep()).deleted_events == 1
+
+
+@pytest.mark.asyncio
+async def test_sweeps_run_in_the_background(session_service):
+  await _create_session(session_service, 'old', num_events=1)
+  _expire(session_service, 'old')
+
+  sweeper = SessionSweeper(
+      session_service,
+      RetentionPolicy(max_session_age_seconds=60),
+      interval_seconds=0.01,
+  )
+  sweeper.start()
+  for _ in range(100):
+    response = await session_service.list_sessions(
+        app_name='my_app', user_id='user'
+    )
+    if not response.sessions:
+      break
+    await asyncio.sleep(0.01)
+  await sweeper.stop()
+  assert not response.sessions
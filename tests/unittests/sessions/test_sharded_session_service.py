@@ -0,0 +1,167 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from google.adk.events import Event
+from google.adk.events import EventActions
+from google.adk.sessions import DatabaseSessionService
+from google.adk.sessions import sharded_session_service
+from google.adk.sessions import ShardedSessionService
+from google.adk.sessions.base_session_service import GetSessionConfig
+import pytest
+
+_USER_IDS = [f'user_{i}' for i in range(12)]
+
+
+def _state_event(state_delta: dict) -> Event:
+  return Event(
+      invocation_id='invocation',
+      author='user',
+      actions=EventActions(state_delta=state_delta),
+  )
+
+
+def _database(tmp_path, name: str) -> DatabaseSessionService:
+  return DatabaseSessionService(f'sqlite:///{tmp_path / name}.db')
+
+
+async def _list_user_ids(shard: DatabaseSessionService) -> set[str]:
+  user_ids = set()
+  for user_id in _USER_IDS:
+    response = await shard.list_sessions(app_name='my_app', user_id=user_id)
+    if response.sessions:
+      user_ids.add(user_id)
+  return user_ids
+
+
+@pytest.mark.asyncio
+async def test_sessions_are_sharded_by_user(tmp_path):
+  shards = {name: _database(tmp_path, name) for name in ('a', 'b', 'c')}
+  primary = _database(tmp_path, 'primary')
+  session_service = ShardedSessionService(shards, primary=primary)
+
+  sessions = {}
+  for user_id in _USER_IDS:
+    session = await session_service.create_session(
+        app_name='my_app', user_id=user_id, state={'user:name': user_id}
+    )
+    await session_service.append_event(
+        session, _state_event({'app:last_user': user_id, 'turn': 1})
+    )
+    sessions[user_id] = session
+
+  for name, shard in shards.items():
+    user_ids = await _list_user_ids(shard)
+    assert user_ids == {
+        user_id
+        for user_id in _USER_IDS
+        if session_service.get_shard_name('my_app', user_id) == name
+    }
+  assert all([await _list_user_ids(shard) for shard in shards.values()])
+
+  # App state is kept on the primary and shared by all shards.
+  assert await primary.get_app_state('my_app') == {'last_user': 'user_11'}
+  for shard in shards.values():
+    assert await shard.get_app_state('my_app') == {}
+  session = await session_service.get_session(
+      app_name='my_app', user_id='user_0', session_id=sessions['user_0'].id
+  )
+  assert session.state == {
+      'app:last_user': 'user_11',
+      'user:name': 'user_0',
+      'turn': 1,
+  }
+  assert len(session.events) == 1
+
+  session = await session_service.get_session(
+      app_name='my_app',
+      user_id='user_0',
+      session_id=sessions['user_0'].id,
+      config=GetSessionConfig(state_keys=['turn']),
+  )
+  assert session.state == {'turn': 1}
+
+
+@pytest.mark.asyncio
+async def test_reads_are_routed_to_replicas(tmp_path):
+  shard = _database(tmp_path, 'shard')
+  # A replica that hasn't caught up with the shard yet.
+  replica = _database(tmp_path, 'replica')
+  session_service = ShardedSessionService(
+      {'shard': shard},
+      primary=shard,
+      replicas={'shard': [replica]},
+      max_replica_lag_seconds=60,
+  )
+  session = await session_service.create_session(
+      app_name='my_app', user_id='user', session_id='session'
+  )
+  await replica.create_session(
+      app_name='my_app',
+      user_id='user',
+      session_id='replica_only',
+  )
+
+  # Reads after a write go to the shard.
+  assert (
+      await session_service.list_sessions(app_name='my_app', user_id='user')
+  ).sessions[0].id == 'session'
+
+  session_service.max_replica_lag_seconds = 0
+  assert (
+      await session_service.list_sessions(app_name='my_app', user_id='user')
+  ).sessions[0].id == 'replica_only'
+  # Sessions missing from the replica are read from the shard.
+  assert await session_service.get_session(
+      app_name='my_app', user_id='user', session_id=session.id
+  )
+
+
+@pytest.mark.asyncio
+async def test_rebalance_moves_users_to_new_shards(tmp_path, mocker):
+  # Copies the rows of the users one at a time.
+  mocker.patch.object(sharded_session_service, '_MOVE_BATCH_SIZE', 1)
+  shards = {name: _database(tmp_path, name) for name in ('a', 'b')}
+  primary = _database(tmp_path, 'primary')
+  session_service = ShardedSessionService(shards, primary=primary)
+  sessions = {}
+  for user_id in _USER_IDS:
+    session = await session_service.create_session(
+        app_name='my_app', user_id=user_id, state={'user:name': user_id}
+    )
+    await session_service.append_event(session, _state_event({'turn': 1}))
+    await session_service.append_event(session, _state_event({'turn': 1}))
+    sessions[user_id] = session
+
+  new_shards = {**shards, 'c': _database(tmp_path, 'c')}
+  session_service = ShardedSessionService(new_shards, primary=primary)
+  moved_user_ids = {
+      user_id
+      for user_id in _USER_IDS
+      if session_service.get_shard_name('my_app', user_id) == 'c'
+  }
+  assert moved_user_ids
+
+  assert session_service.rebalance() == len(moved_user_ids)
+  assert session_service.rebalance() == 0
+
+  assert await _list_user_ids(new_shards['c']) == moved_user_ids
+  for user_id in _USER_IDS:
+    session = await session_service.get_session(
+        app_name='my_app', user_id=user_id, session_id=sessions[user_id].id
+    )
+    assert session.state == {'user:name': user_id, 'turn': 1}
+    assert [e.id for e in session.events] == [
+        e.id for e in sessions[user_id].events
+    ]
+    await session_service.append_event(session, _state_event({'turn': 2}))
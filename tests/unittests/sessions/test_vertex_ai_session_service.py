@@ -12,6 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+import itertools
 import re
 import this
 from typing import Any
@@ -24,6 +26,7 @@ from dateutil.parser import isoparse
 from google.adk.events import Event
 from google.adk.events import EventActions
 from google.adk.sessions import Session
+from google.adk.sessions import vertex_ai_session_service
 from google.adk.sessions import VertexAiSessionService
 from google.genai import types
 import pytest
@@ -359,3 +362,195 @@ async def test_create_session_with_custom_session_id():
   assert str(excinfo.value) == (
       'User-provided Session id is not supported for VertexAISessionService.'
   )
+
+
+class FakeSessionsApi:
+  """A local fake of the reasoning engine sessions REST API.
+
+  Requests take `latency` seconds, operations complete after `lro_polls`
+  polls, and events are listed in pages of `page_size`.
+  """
+
+  def __init__(
+      self, *, latency: float = 0.0, lro_polls: int = 1, page_size: int = 2
+  ) -> None:
+    self.latency = latency
+    self.lro_polls = lro_polls
+    self.page_size = page_size
+    self.sessions: dict[str, dict[str, Any]] = {}
+    self.events: dict[str, list[dict[str, Any]]] = {}
+    self.operation_polls: dict[str, int] = {}
+    self.requests: list[str] = []
+    self.in_flight = 0
+    self.max_in_flight = 0
+
+  async def async_request(
+      self, http_method: str, path: str, request_dict: dict[str, Any]
+  ):
+    self.requests.append(f'{http_method} {path}')
+    self.in_flight += 1
+    self.max_in_flight = max(self.max_in_flight, self.in_flight)
+    try:
+      if self.latency:
+        await asyncio.sleep(self.latency)
+      return self._handle(http_method, path, request_dict)
+    finally:
+      self.in_flight -= 1
+
+  def _handle(self, http_method: str, path: str, request_dict: dict[str, Any]):
+    if http_method == 'POST' and path.endswith('/sessions'):
+      session_id = str(len(self.sessions) + 1)
+      self.sessions[session_id] = {
+          'name': f'reasoningEngines/123/sessions/{session_id}',
+          'userId': request_dict['user_id'],
+          'sessionState': request_dict.get('session_state', {}),
+          'updateTime': '2024-12-12T12:12:12.123456Z',
+      }
+      self.events[session_id] = []
+      self.operation_polls[session_id] = 0
+      return {
+          'name': (
+              f'reasoningEngines/123/sessions/{session_id}/operations/'
+              + session_id
+          )
+      }
+    if match := re.match(LRO_REGEX, path):
+      operation_id = match.group(1)
+      self.operation_polls[operation_id] += 1
+      return {
+          'name': path,
+          'done': self.operation_polls[operation_id] >= self.lro_polls,
+      }
+    if match := re.match(EVENTS_REGEX, path):
+      events = self.events[match.group(2)]
+      start = int(match.group(3) or 0)
+      response = {'sessionEvents': events[start : start + self.page_size]}
+      if start + self.page_size < len(events):
+        response['nextPageToken'] = str(start + self.page_size)
+      return response
+    if match := re.match(SESSION_REGEX, path):
+      return self.sessions[match.group(2)]
+    raise ValueError(f'Unsupported request: {http_method} {path}')
+
+  def add_event(self, session_id: str, event_id: str) -> None:
+    self.events[session_id].append({
+        'name': f'reasoningEngines/123/sessions/{session_id}/events/{event_id}',
+        'invocationId': 'invocation',
+        'author': 'user',
+        'timestamp': f'2024-12-12T12:12:{len(self.events[session_id]):02}Z',
+    })
+
+
+@pytest.mark.asyncio
+async def test_get_session_pipelines_event_pages():
+  api = FakeSessionsApi(latency=0.01, page_size=2)
+  with mock.patch(
+      'google.adk.sessions.vertex_ai_session_service._get_api_client',
+      return_value=api,
+  ):
+    session_service = mock_vertex_ai_session_service()
+    session = await session_service.create_session(
+        app_name='123', user_id='user'
+    )
+    api.sessions[session.id]['updateTime'] = '2024-12-13T00:00:00Z'
+    for i in range(5):
+      api.add_event(session.id, f'event_{i}')
+    api.requests.clear()
+
+    session = await session_service.get_session(
+        app_name='123', user_id='user', session_id=session.id
+    )
+
+  assert [event.id for event in session.events] == [
+      f'event_{i}' for i in range(5)
+  ]
+  # The session and the first page of events are fetched concurrently.
+  assert api.max_in_flight == 2
+  assert len(api.requests) == 4
+
+
+@pytest.mark.asyncio
+async def test_get_session_cancels_the_next_page_on_errors():
+  api = FakeSessionsApi(latency=0.05, page_size=2)
+  with mock.patch(
+      'google.adk.sessions.vertex_ai_session_service._get_api_client',
+      return_value=api,
+  ):
+    session_service = mock_vertex_ai_session_service()
+    session = await session_service.create_session(
+        app_name='123', user_id='user'
+    )
+    for i in range(5):
+      api.add_event(session.id, f'event_{i}')
+
+    with mock.patch(
+        'google.adk.sessions.vertex_ai_session_service._from_api_event',
+        side_effect=ValueError('invalid event'),
+    ):
+      with pytest.raises(ValueError):
+        await session_service.get_session(
+            app_name='123', user_id='user', session_id=session.id
+        )
+    await asyncio.sleep(0)
+
+  # The prefetched page was cancelled rather than left running.
+  assert api.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_create_session_polls_operation_with_backoff():
+  api = FakeSessionsApi(lro_polls=4)
+  sleep = mock.AsyncMock()
+  with (
+      mock.patch(
+          'google.adk.sessions.vertex_ai_session_service._get_api_client',
+          return_value=api,
+      ),
+      mock.patch(
+          'google.adk.sessions.vertex_ai_session_service.asyncio.sleep', sleep
+      ),
+  ):
+    session = await mock_vertex_ai_session_service().create_session(
+        app_name='123', user_id='user'
+    )
+
+  assert session.id == '1'
+  assert api.operation_polls['1'] == 4
+  assert [call.args[0] for call in sleep.await_args_list] == [0.1, 0.2, 0.4]
+
+
+@pytest.mark.asyncio
+async def test_create_session_times_out():
+  api = FakeSessionsApi(lro_polls=1000)
+  with (
+      mock.patch(
+          'google.adk.sessions.vertex_ai_session_service._get_api_client',
+          return_value=api,
+      ),
+      mock.patch(
+          'google.adk.sessions.vertex_ai_session_service.asyncio.sleep',
+          mock.AsyncMock(),
+      ),
+      mock.patch(
+          'google.adk.sessions.vertex_ai_session_service.time.monotonic',
+          side_effect=itertools.count(step=1.0),
+      ),
+      pytest.raises(TimeoutError),
+  ):
+    await mock_vertex_ai_session_service().create_session(
+        app_name='123', user_id='user'
+    )
+
+
+@pytest.mark.asyncio
+async def test_api_clients_are_pooled():
+  with mock.patch(
+      'google.adk.sessions.vertex_ai_session_service.genai.Client'
+  ) as client_class:
+    client_class.side_effect = lambda **kwargs: mock.Mock()
+    api_client = vertex_ai_session_service._get_api_client('p', 'l')
+    assert vertex_ai_session_service._get_api_client('p', 'l') is api_client
+    assert vertex_ai_session_service._get_api_client('p', 'l2') is not (
+        api_client
+    )
+    assert client_class.call_count == 2
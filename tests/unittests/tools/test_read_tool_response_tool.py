@@ -0,0 +1,89 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from google.adk.agents import Agent
+from google.adk.tools import read_tool_response
+from google.adk.tools import ToolContext
+from google.genai import types
+import pytest
+
+from .. import testing_utils
+
+
+async def _create_tool_context() -> ToolContext:
+  invocation_context = await testing_utils.create_invocation_context(
+      Agent(name='agent')
+  )
+  tool_context = ToolContext(invocation_context)
+  await tool_context.save_artifact(
+      'tool_response_tool_1.json',
+      types.Part.from_bytes(data=b'{"a": 1}', mime_type='application/json'),
+  )
+  await tool_context.save_artifact(
+      'tool_response_tool_2.json',
+      types.Part.from_bytes(data=b'\xff\xfe', mime_type='application/json'),
+  )
+  await tool_context.save_artifact(
+      'image.png',
+      types.Part.from_bytes(data=b'\x89PNG', mime_type='image/png'),
+  )
+  await tool_context.save_artifact(
+      'tool_response_image.png',
+      types.Part.from_bytes(data=b'\x89PNG', mime_type='image/png'),
+  )
+  return tool_context
+
+
+@pytest.mark.asyncio
+async def test_read_tool_response():
+  tool_context = await _create_tool_context()
+
+  response = await read_tool_response.run_async(
+      args={
+          'handle': 'tool_response_tool_1.json',
+          'offset': '2',
+          'max_chars': 3,
+      },
+      tool_context=tool_context,
+  )
+
+  assert response == {
+      'handle': 'tool_response_tool_1.json',
+      'total_chars': 8,
+      'content': 'a":',
+      'next_offset': 5,
+  }
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    'args',
+    [
+        {'handle': 'image.png'},
+        {'handle': 'tool_response_image.png'},
+        {'handle': 'tool_response_unknown.json'},
+        {'handle': 'tool_response_tool_2.json'},
+        {'handle': 'tool_response_tool_1.json', 'offset': 'next'},
+        {'handle': 'tool_response_tool_1.json', 'max_chars': [1]},
+        {'handle': 1},
+    ],
+)
+async def test_invalid_reads_return_errors(args):
+  tool_context = await _create_tool_context()
+
+  response = await read_tool_response.run_async(
+      args=args, tool_context=tool_context
+  )
+
+  assert list(response) == ['error']
@@ -0,0 +1,180 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import AsyncGenerator
+
+from google.adk.agents import Agent
+from google.adk.agents import BaseAgent
+from google.adk.agents import LiveRequestQueue
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event
+from google.adk.events import EventActions
+from google.adk.runners import InMemoryRunner
+from google.adk.tools import ToolContext
+from google.genai import types
+import pytest
+
+from .. import testing_utils
+
+
+@pytest.mark.asyncio
+async def test_lookups_are_memoized_within_an_invocation(mocker):
+  invocation_context = await testing_utils.create_invocation_context(
+      Agent(name='agent')
+  )
+  memory_service = invocation_context.memory_service
+  artifact_service = invocation_context.artifact_service
+  search_memory = mocker.spy(type(memory_service), 'search_memory')
+  list_artifact_keys = mocker.spy(type(artifact_service), 'list_artifact_keys')
+  load_artifact = mocker.spy(type(artifact_service), 'load_artifact')
+  await artifact_service.save_artifact(
+      app_name=invocation_context.app_name,
+      user_id=invocation_context.user_id,
+      session_id=invocation_context.session.id,
+      filename='a.txt',
+      artifact=types.Part(text='a'),
+  )
+
+  # Each step of the invocation gets its own tool context.
+  for _ in range(3):
+    tool_context = ToolContext(invocation_context)
+    await tool_context.search_memory('query')
+    assert await tool_context.list_artifacts() == ['a.txt']
+    assert (await tool_context.load_artifact('a.txt')).text == 'a'
+
+  assert search_memory.call_count == 1
+  assert list_artifact_keys.call_count == 1
+  assert load_artifact.call_count == 1
+
+  # Saving an artifact invalidates its lookups.
+  await ToolContext(invocation_context).save_artifact(
+      'a.txt', types.Part(text='b')
+  )
+  tool_context = ToolContext(invocation_context)
+  assert await tool_context.list_artifacts() == ['a.txt']
+  assert (await tool_context.load_artifact('a.txt')).text == 'b'
+  await tool_context.search_memory('query')
+  assert list_artifact_keys.call_count == 2
+  assert load_artifact.call_count == 2
+  assert search_memory.call_count == 1
+
+  # Another invocation doesn't share the lookups.
+  other_context = invocation_context.model_copy()
+  assert other_context.lookup_cache is invocation_context.lookup_cache
+  new_invocation_context = await testing_utils.create_invocation_context(
+      Agent(name='agent')
+  )
+  assert new_invocation_context.lookup_cache is not (
+      invocation_context.lookup_cache
+  )
+
+
+@pytest.mark.asyncio
+async def test_lookups_return_copies():
+  invocation_context = await testing_utils.create_invocation_context(
+      Agent(name='agent')
+  )
+  tool_context = ToolContext(invocation_context)
+  await tool_context.save_artifact('a.txt', types.Part(text='a'))
+
+  (await tool_context.load_artifact('a.txt')).text = 'modified'
+  (await tool_context.list_artifacts()).append('modified.txt')
+  (await tool_context.search_memory('query')).memories.append(None)
+
+  assert (await tool_context.load_artifact('a.txt')).text == 'a'
+  assert await tool_context.list_artifacts() == ['a.txt']
+  assert not (await tool_context.search_memory('query')).memories
+
+
+class _ArtifactWritingAgent(BaseAgent):
+  """Saves an artifact without the tool context, as code execution does."""
+
+  async def _run_live_impl(
+      self, ctx: InvocationContext
+  ) -> AsyncGenerator[Event, None]:
+    tool_context = ToolContext(ctx)
+    await tool_context.load_artifact('a.txt')
+    version = await ctx.artifact_service.save_artifact(
+        app_name=ctx.app_name,
+        user_id=ctx.user_id,
+        session_id=ctx.session.id,
+        filename='a.txt',
+        artifact=types.Part(text='b'),
+    )
+    yield Event(
+        author=self.name,
+        invocation_id=ctx.invocation_id,
+        actions=EventActions(artifact_delta={'a.txt': version}),
+    )
+    artifact = await tool_context.load_artifact('a.txt')
+    yield Event(
+        author=self.name,
+        invocation_id=ctx.invocation_id,
+        content=types.Content(parts=[artifact]),
+    )
+
+
+@pytest.mark.asyncio
+async def test_live_events_invalidate_the_lookups():
+  runner = InMemoryRunner(_ArtifactWritingAgent(name='agent'))
+  session = await runner.session_service.create_session(
+      app_name=runner.app_name, user_id='user'
+  )
+  await runner.artifact_service.save_artifact(
+      app_name=runner.app_name,
+      user_id='user',
+      session_id=session.id,
+      filename='a.txt',
+      artifact=types.Part(text='a'),
+  )
+
+  events = [
+      event
+      async for event in runner.run_live(
+          user_id='user',
+          session_id=session.id,
+          live_request_queue=LiveRequestQueue(),
+      )
+  ]
+
+  assert events[-1].content.parts[0].text == 'b'
+
+
+@pytest.mark.asyncio
+async def test_stream_artifact():
+  invocation_context = await testing_utils.create_invocation_context(
+      Agent(name='agent')
+  )
+  tool_context = ToolContext(invocation_context)
+  assert await tool_context.list_artifacts() == []
+
+  async def chunks():
+    yield b'abc'
+    yield b'def'
+
+  version = await tool_context.save_artifact_chunks(
+      'data.bin', chunks(), 'application/octet-stream'
+  )
+
+  assert version == 0
+  assert tool_context.actions.artifact_delta == {'data.bin': 0}
+  assert await tool_context.list_artifacts() == ['data.bin']
+  metadata = await tool_context.get_artifact_metadata('data.bin')
+  assert (metadata.size, metadata.mime_type) == (6, 'application/octet-stream')
+  assert [
+      chunk
+      async for chunk in tool_context.read_artifact_chunks(
+          'data.bin', offset=1, chunk_size=2
+      )
+  ] == [b'bc', b'de', b'f']